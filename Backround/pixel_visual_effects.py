@@ -3,6 +3,7 @@ import pygame
 import math
 import random
 import numpy as np
+from utils.text_cache import render_text
 
 
 class PixelGlowEffect:
@@ -196,7 +197,7 @@ class PixelBubbleRenderer:
         if bubble.type in label_map:
             from settings import font_bubble, BLACK
             label = label_map[bubble.type]
-            text = font_bubble.render(label, True, BLACK)
+            text = render_text(font_bubble, label, BLACK)
             text_rect = text.get_rect(center=(x, y))
             screen.blit(text, text_rect)
 
@@ -288,7 +289,7 @@ class PixelKeyPlatformRenderer:
         
         # 绘制标签
         from settings import font_key, BLACK
-        label_text = font_key.render(platform.label, True, self.platform_colors['text'])
+        label_text = render_text(font_key, platform.label, self.platform_colors['text'])
         label_rect = label_text.get_rect(center=rect.center)
         screen.blit(label_text, label_rect)
         
@@ -296,7 +297,7 @@ class PixelKeyPlatformRenderer:
         if platform.is_dynamic:
             arrow = "↕"
             from settings import font_tiny
-            arrow_text = font_tiny.render(arrow, True, self.platform_colors['primary'])
+            arrow_text = render_text(font_tiny, arrow, self.platform_colors['primary'])
             arrow_rect = arrow_text.get_rect(
                 center=(platform.x + platform.width // 2, platform.y - 12)
             )
@@ -1,7 +1,7 @@
+import atexit
 import os
 import sys
 
-import cv2
 import pygame
 
 # Make sure the repository root is on sys.path so we can import project modules.
@@ -10,6 +10,11 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from settings import *
+from Start.video_player import VideoPlayer
+from game.scenes import Scene, SceneManager
+from utils.assets import ASSETS
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), '../assets')
 
 
 def draw_hearts(surface, x, y, count, spacing=28, size=18, color=(255, 200, 255)):
@@ -25,70 +30,104 @@ def draw_hearts(surface, x, y, count, spacing=28, size=18, color=(255, 200, 255)
         pygame.draw.polygon(surface, color, points)
 
 
+def intro_video():
+    """The start-screen video player, created once per process (None if the video can't be played).
+
+    StartScene pauses it on exit and resumes it on enter, so the frame cache built
+    during the first visit is reused by every later one.
+    """
+    def load():
+        video_path = os.path.join(ASSETS_DIR, 'StartGameVideo.mp4')
+        if not os.path.exists(video_path):
+            return None
+        try:
+            player = VideoPlayer(video_path, (WIDTH, HEIGHT), max_cache_bytes=START_VIDEO_CACHE_MB * 1024 * 1024)
+        except Exception:
+            return None
+        # stop the decoder before the interpreter shuts down, not in the middle of a read
+        atexit.register(player.close)
+        return player
+
+    return ASSETS.get(('start-video', WIDTH, HEIGHT), load)
+
+
+class StartScene(Scene):
+    """Start screen scene: intro video (or the static picture) with a prompt.
+
+    Args:
+        on_choice: called with 'capture' when SPACE is pressed, 'skip' when S is pressed
+    """
+
+    def __init__(self, on_choice):
+        super().__init__()
+        self.on_choice = on_choice
+        self.video = None
+        self.bg_image = None
+        self.prompt = None
+
+    def enter(self, manager):
+        super().enter(manager)
+
+        # Play the intro video; fall back to the static image when it can't be opened.
+        # Frames are decoded on a background thread at the video's own frame rate.
+        self.video = intro_video()
+        if self.video is not None:
+            self.video.resume()
+        else:
+            # loaded and scaled once per process, reused on every restart
+            self.bg_image = ASSETS.scaled(os.path.join(ASSETS_DIR, 'StartGamePic.png'), (WIDTH, HEIGHT),
+                                          smooth=False, alpha=False)
+
+        # the prompt never changes, so render it once
+        prompt_font = ASSETS.font(None, 36)
+        self.prompt = prompt_font.render('Press Space to Start', True, (230, 230, 230))
+
+    def exit(self):
+        if self.video is not None:
+            # keep the player (and its frame cache) for the next visit
+            self.video.pause()
+            self.video = None
+
+    def handle_event(self, ev):
+        if ev.type == pygame.KEYDOWN:
+            if ev.key == pygame.K_s:
+                self.on_choice('skip')
+            elif ev.key == pygame.K_SPACE:
+                self.on_choice('capture')
+
+    def draw(self, screen):
+        if self.video is not None:
+            if not self.video.draw(screen):
+                # first frame still decoding
+                screen.fill(BLACK)
+        elif self.bg_image is not None:
+            screen.blit(self.bg_image, (0, 0))
+        else:
+            screen.fill(BLACK)
+
+        # 可选：在底部显示提示文字
+        left_offset = 40  # shift text slightly left of center for better balance
+        screen.blit(self.prompt, (WIDTH // 2 - self.prompt.get_width() // 2 - left_offset, HEIGHT - 190))
+
+
 def run_start(screen, clock):
-    """Run the custom start screen. Returns 'capture' if SPACE pressed, 'skip' if S pressed."""
-    assets_dir = os.path.join(os.path.dirname(__file__), '../assets')
-    video_path = os.path.join(assets_dir, 'StartGameVideo.mp4')
-    image_path = os.path.join(assets_dir, 'StartGamePic.png')
-
-    # Try to open the intro video; fall back to the static image on failure.
-    video_cap = None
-    use_video = False
-    try:
-        if os.path.exists(video_path):
-            video_cap = cv2.VideoCapture(video_path)
-            if video_cap.isOpened():
-                use_video = True
-            else:
-                video_cap.release()
-                video_cap = None
-    except Exception:
-        if video_cap is not None:
-            video_cap.release()
-
-    bg_image = None
-    if not use_video:
-        bg_image = pygame.image.load(image_path).convert()
-        bg_image = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
-
-    prompt_font = pygame.font.SysFont(None, 36)
-
-    running = True
+    """Run the start screen on its own. Returns 'capture' if SPACE pressed, 'skip' if S pressed."""
+    manager = SceneManager(screen, clock)
+    choice = []
+
+    def chosen(action):
+        choice.append(action)
+        manager.stop()
+
+    manager.push(StartScene(chosen))
     try:
-        while running:
-            clock.tick(FPS)
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT:
-                    pygame.quit()
-                    raise SystemExit()
-                if ev.type == pygame.KEYDOWN:
-                    if ev.key == pygame.K_s:
-                        return 'skip'
-                    if ev.key == pygame.K_SPACE:
-                        return 'capture'
-
-            if use_video and video_cap is not None:
-                ret, frame = video_cap.read()
-                if not ret:
-                    # Loop the video by restarting from first frame.
-                    video_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    continue
-                frame = cv2.resize(frame, (WIDTH, HEIGHT))
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_surface = pygame.image.frombuffer(frame.tobytes(), (WIDTH, HEIGHT), 'RGB')
-                screen.blit(frame_surface, (0, 0))
-            else:
-                screen.blit(bg_image, (0, 0))
-
-            # 可选：在底部显示提示文字
-            sub = prompt_font.render('Press Space to Start', True, (230, 230, 230))
-            left_offset = 40  # shift text slightly left of center for better balance
-            screen.blit(sub, (WIDTH // 2 - sub.get_width() // 2 - left_offset, HEIGHT - 190))
-
-            pygame.display.flip()
+        manager.run()
     finally:
-        if video_cap is not None:
-            video_cap.release()
+        manager.close()
+    if not choice:
+        pygame.quit()
+        raise SystemExit()
+    return choice[0]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+"""Background-decoded video playback for the start screen.
+
+The decoder thread reads frames with OpenCV at the video's own frame rate and
+resizes them straight into preallocated BGR buffers. Each buffer is wrapped by
+a pygame surface created once with ``pygame.image.frombuffer`` (no copy), so
+the main loop only has to blit the latest surface. After the first full loop
+the decoded frames can be kept in memory at the video's native size; from then
+on the thread only resizes cached frames and the decoder is released.
+
+One player is meant to live for the whole process: pause() it while its scene
+is hidden and resume() it when the scene comes back, so the cache is built once.
+"""
+import threading
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+
+class VideoPlayer:
+    """Play a video file into pygame surfaces without blocking the game loop.
+
+    Args:
+        path: video file path
+        size: (width, height) to scale frames to
+        cache_frames: keep the decoded frames after the first loop and replay them from memory
+        max_cache_bytes: skip caching when the video (at its native size) would not fit in this budget
+    """
+
+    def __init__(self, path, size, cache_frames=True, max_cache_bytes=256 * 1024 * 1024):
+        self.size = (int(size[0]), int(size[1]))
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            self._cap.release()
+            raise RuntimeError(f'Could not open video: {path}')
+
+        fps = self._cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 1 else 30.0
+        self.frame_interval = 1.0 / self.fps
+
+        # cached frames stay at the video's native size and are resized on replay
+        frame_bytes = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)) * int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) * 3
+        frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self._caching = bool(cache_frames) and 0 < frame_count * frame_bytes <= max_cache_bytes
+        self._cache = []
+        self._cached = False  # first loop complete, replaying from self._cache
+
+        w, h = self.size
+
+        # Double buffer: the decoder writes into one while the main loop shows the other.
+        self._buffers = [np.zeros((h, w, 3), dtype=np.uint8) for _ in range(2)]
+        self._surfaces = [pygame.image.frombuffer(buf, self.size, 'BGR') for buf in self._buffers]
+        self._lock = threading.Lock()
+        self._latest = 0
+        self._has_frame = False
+        self._stop = threading.Event()
+        self._playing = threading.Event()
+        self._thread = None
+
+        # decode statistics (read-only for callers)
+        self.decoded_frames = 0
+        self.decode_time = 0.0
+
+    def start(self):
+        self._playing.set()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='VideoPlayer', daemon=True)
+            self._thread.start()
+        return self
+
+    def pause(self):
+        """Stop producing frames; draw() keeps showing the last one."""
+        self._playing.clear()
+
+    def resume(self):
+        """Continue after pause() (starts the thread if needed)."""
+        return self.start()
+
+    def _run(self):
+        next_due = time.perf_counter()
+        replay = 0
+        try:
+            while not self._stop.is_set():
+                if not self._playing.is_set():
+                    self._playing.wait()
+                    next_due = time.perf_counter()
+                    continue
+
+                t0 = time.perf_counter()
+                if self._cached:
+                    frame = self._cache[replay]
+                    replay = (replay + 1) % len(self._cache)
+                else:
+                    ret, frame = self._cap.read()
+                    if not ret:
+                        if self._caching and self._cache:
+                            # First loop is complete: replay from memory and stop decoding.
+                            self._cached = True
+                            self._cap.release()
+                        else:
+                            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    if self._caching:
+                        self._cache.append(frame)
+                    self.decoded_frames += 1
+
+                target = 1 - self._latest
+                cv2.resize(frame, self.size, dst=self._buffers[target])
+                with self._lock:
+                    self._latest = target
+                    self._has_frame = True
+                if not self._cached:
+                    self.decode_time += time.perf_counter() - t0
+
+                # pace decoding at the video's native rate
+                next_due += self.frame_interval
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    next_due = time.perf_counter()
+        finally:
+            self._cap.release()
+
+    def draw(self, screen, pos=(0, 0)):
+        """Blit the most recent frame. Returns False if no frame is available yet."""
+        with self._lock:
+            if not self._has_frame:
+                return False
+            screen.blit(self._surfaces[self._latest], pos)
+        return True
+
+    def close(self):
+        self._stop.set()
+        self._playing.set()  # wake a paused thread so it can exit
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        else:
+            self._cap.release()
+        self._cache = []
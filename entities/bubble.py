@@ -1,30 +1,25 @@
 import pygame
 import math
 from settings import *
+from utils.text_cache import render_text
+from game.skills import SKILLS, POW, SUPER, CTRLC, TYPEERROR, skill_id
 
 class Bubble:
-    def __init__(self, x, y, bubble_type='pow'):
+    def __init__(self, x, y, bubble_type=POW):
         self.x = x
         self.y = y
         self.size = 32
         self.vel_y = 2.5
+        # 泡泡类型是技能 ID（见 game.skills）；也接受技能名
+        if isinstance(bubble_type, str):
+            bubble_type = skill_id(bubble_type)
         self.type = bubble_type
         self.active = True
         
-        if self.type == 'pow':
-            self.color = ORANGE
-        elif self.type == 'delete':
-            self.color = RED
-        elif self.type == 'print':
-            self.color = YELLOW
-        elif self.type == 'super':
-            self.color = (200, 100, 255)  # 紫色
-        elif self.type == 'ctrlc':
-            self.color = CYAN
-        elif self.type == 'typeerror':
-            self.color = DARK_RED
-        else:
-            self.color = GRAY
+        skill = SKILLS[self.type]
+        self.color = skill.color
+        self.label = skill.label
+        self._decorate = _DECORATIONS.get(self.type)
         
     def update(self):
         self.y += self.vel_y
@@ -37,55 +32,54 @@ class Bubble:
         
         text_color = BLACK
         
-        if self.type == 'pow':
-            label = 'pow()'
-        elif self.type == 'delete':
-            label = 'delete'
-        elif self.type == 'print':
-            label = 'print'
-        elif self.type == 'super':
-            label = 'super()'
-        elif self.type == 'ctrlc':
-            label = 'Ctrl+C'
-        elif self.type == 'typeerror':
-            label = 'TypeError'
-        else:
-            label = ''
-
-        if label:
-            text = font_bubble.render(label, True, text_color)
+        if self.label:
+            text = render_text(font_bubble, self.label, text_color)
             text_rect = text.get_rect(center=(int(self.x), int(self.y)))
             screen.blit(text, text_rect)
         
-        if self.type == 'ctrlc':
-            if pygame.time.get_ticks() % 500 < 250:
-                for angle in range(0, 360, 90):
-                    rad = math.radians(angle)
-                    spark_x = int(self.x + math.cos(rad) * (self.size + 5))
-                    spark_y = int(self.y + math.sin(rad) * (self.size + 5))
-                    pygame.draw.circle(screen, WHITE, (spark_x, spark_y), 3)
-        
-        # super()泡泡的星星特效
-        if self.type == 'super':
-            star_count = 6
-            for i in range(star_count):
-                angle = (360 / star_count) * i + (pygame.time.get_ticks() % 360) * 2
-                rad = math.radians(angle)
-                star_x = int(self.x + math.cos(rad) * (self.size + 8))
-                star_y = int(self.y + math.sin(rad) * (self.size + 8))
-                pygame.draw.circle(screen, (255, 215, 0), (star_x, star_y), 3)
-        
-        # TypeError泡泡的混乱特效
-        if self.type == 'typeerror':
-            if pygame.time.get_ticks() % 400 < 200:
-                # 绘制旋转的箭头
-                for angle in [45, 135, 225, 315]:
-                    rad = math.radians(angle)
-                    arrow_x = int(self.x + math.cos(rad) * (self.size + 8))
-                    arrow_y = int(self.y + math.sin(rad) * (self.size + 8))
-                    pygame.draw.circle(screen, DARK_RED, (arrow_x, arrow_y), 3)
+        if self._decorate:
+            self._decorate(self, screen)
     
     def check_collision(self, player):
         dist = math.sqrt((self.x - (player.x + player.width//2))**2 + 
                         (self.y - (player.y + player.height//2))**2)
-        return dist < self.size + player.width//2
\ No newline at end of file
+        return dist < self.size + player.width//2
+
+
+def _draw_sparks(bubble, screen):
+    """Ctrl+C 泡泡的闪烁火花"""
+    if pygame.time.get_ticks() % 500 < 250:
+        for angle in range(0, 360, 90):
+            rad = math.radians(angle)
+            spark_x = int(bubble.x + math.cos(rad) * (bubble.size + 5))
+            spark_y = int(bubble.y + math.sin(rad) * (bubble.size + 5))
+            pygame.draw.circle(screen, WHITE, (spark_x, spark_y), 3)
+
+
+def _draw_stars(bubble, screen):
+    """super() 泡泡的星星特效"""
+    star_count = 6
+    for i in range(star_count):
+        angle = (360 / star_count) * i + (pygame.time.get_ticks() % 360) * 2
+        rad = math.radians(angle)
+        star_x = int(bubble.x + math.cos(rad) * (bubble.size + 8))
+        star_y = int(bubble.y + math.sin(rad) * (bubble.size + 8))
+        pygame.draw.circle(screen, (255, 215, 0), (star_x, star_y), 3)
+
+
+def _draw_confusion(bubble, screen):
+    """TypeError 泡泡的混乱特效（旋转的箭头）"""
+    if pygame.time.get_ticks() % 400 < 200:
+        for angle in [45, 135, 225, 315]:
+            rad = math.radians(angle)
+            arrow_x = int(bubble.x + math.cos(rad) * (bubble.size + 8))
+            arrow_y = int(bubble.y + math.sin(rad) * (bubble.size + 8))
+            pygame.draw.circle(screen, DARK_RED, (arrow_x, arrow_y), 3)
+
+
+# 按泡泡类型分发的额外装饰
+_DECORATIONS = {
+    CTRLC: _draw_sparks,
+    SUPER: _draw_stars,
+    TYPEERROR: _draw_confusion,
+}
@@ -3,6 +3,7 @@ import pygame
 import math
 import random
 from settings import font_bubble, BLACK, WHITE
+from utils.text_cache import render_text
 
 
 class EnhancedBubble:
@@ -197,10 +198,10 @@ class EnhancedBubble:
         
         if self.type in label_map:
             label = label_map[self.type]
-            text = font_bubble.render(label, True, BLACK)
+            text = render_text(font_bubble, label, BLACK)
             
             # 添加白色阴影以增强可读性
-            shadow = font_bubble.render(label, True, WHITE)
+            shadow = render_text(font_bubble, label, WHITE)
             for offset_x, offset_y in [(1, 1), (-1, -1), (1, -1), (-1, 1)]:
                 text_rect = shadow.get_rect(center=(x + offset_x, y + offset_y))
                 screen.blit(shadow, text_rect)
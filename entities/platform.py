@@ -1,7 +1,11 @@
 import pygame
 import random
 import math
+import numpy as np
 from settings import *
+from game.timers import TimerWheel
+from utils.assets import ASSETS
+from utils.text_cache import render_text
 
 # Purple palette for platforms (local variants for contrast)
 # Use global PURPLE from settings and derive lighter/darker tones.
@@ -13,6 +17,152 @@ P_SHADOW = (140, 110, 160)     # muted shadow (not too dark)
 P_HIGHLIGHT = (255, 250, 255)  # near-white highlight for sparkle
 P_TEXT = (80, 40, 110)         # readable but softer dark purple for labels
 
+# 冰块碎片精灵表：每种尺寸的平台预渲染 模板 × 透明度档位 × 旋转角度档位
+SHARD_TEMPLATES = 6
+SHARD_ALPHA_LEVELS = 8
+SHARD_ANGLE_BUCKETS = 24
+SHARD_COLORS = [
+    (240, 220, 255),  # very light purple
+    (230, 200, 255),  # light lavender
+    (210, 180, 255),  # pastel purple
+    (250, 235, 255),  # ultra pale
+]
+_shard_sheets = {}
+
+# 键帽精灵缓存：键帽主体按 (宽, 高, 颜色, 是否空格) 缓存，发光边按 (宽, 高, 强度档位) 缓存。
+# 动态平台的呼吸发光被量化成 GLOW_LEVELS 档，每档只渲染一次。
+# 预先构建的资源包（utils.bundle）里有对应精灵时直接使用，本文件改动后自动失效。
+GLOW_LEVELS = 12
+SPRITE_SOURCES = ('entities/platform.py',)
+_key_faces = {}
+_key_glows = {}
+
+
+class ShardSheet:
+    """预渲染好的碎片旋转精灵表（按平台尺寸共享）
+
+    frames[t][a][r] 是模板 t、透明度档位 a、角度档位 r 的已旋转 Surface，
+    half_sizes[t, r] 是对应旋转后尺寸的一半，用于按中心点定位。
+    """
+
+    def __init__(self, width, height):
+        rng = random.Random(width * 1000 + height)
+        self.sizes = np.zeros((SHARD_TEMPLATES, 2), dtype=np.float32)
+        self.half_sizes = np.zeros((SHARD_TEMPLATES, SHARD_ANGLE_BUCKETS, 2), dtype=np.float32)
+        self.frames = []
+        step = 360.0 / SHARD_ANGLE_BUCKETS
+        for t in range(SHARD_TEMPLATES):
+            w = rng.randint(int(width * 0.15), int(width * 0.3))
+            h = rng.randint(int(height * 0.4), int(height * 0.8))
+            color = SHARD_COLORS[t % len(SHARD_COLORS)]
+            self.sizes[t] = (w, h)
+            by_alpha = []
+            for a in range(SHARD_ALPHA_LEVELS):
+                alpha = 255 * (a + 1) / SHARD_ALPHA_LEVELS
+                base = self._render_shard(w, h, color, alpha)
+                rotated = [pygame.transform.rotate(base, r * step) for r in range(SHARD_ANGLE_BUCKETS)]
+                by_alpha.append(rotated)
+                if a == 0:
+                    for r, surf in enumerate(rotated):
+                        self.half_sizes[t, r] = (surf.get_width() / 2, surf.get_height() / 2)
+            self.frames.append(by_alpha)
+
+    @staticmethod
+    def _render_shard(w, h, color, alpha):
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        # 冰块主体
+        pygame.draw.rect(surf, (*color[:3], int(alpha)), (0, 0, w, h))
+        # 高光（更浅的紫色高光）
+        pygame.draw.rect(surf, (255, 250, 255, int(alpha * 0.6)), (2, 2, max(1, w - 4), max(1, int(h * 0.3))), 1)
+        # 边缘裂纹（浅紫色边缘）
+        pygame.draw.rect(surf, (210, 185, 220, int(alpha * 0.8)), (0, 0, w, h), 2)
+        return surf
+
+
+def get_shard_sheet(width, height):
+    """获取（必要时创建）指定平台尺寸的碎片精灵表"""
+    key = (int(width), int(height))
+    sheet = _shard_sheets.get(key)
+    if sheet is None:
+        sheet = ShardSheet(*key)
+        _shard_sheets[key] = sheet
+    return sheet
+
+
+class ShardBurst:
+    """一次碎裂产生的全部碎片，状态保存在 NumPy 数组中整体更新"""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.clear()
+
+    def clear(self):
+        self.pos = np.zeros((0, 2), dtype=np.float32)   # 左上角 x, y
+        self.vel = np.zeros((0, 2), dtype=np.float32)
+        self.rotation = np.zeros(0, dtype=np.float32)
+        self.rot_speed = np.zeros(0, dtype=np.float32)
+        self.alpha = np.zeros(0, dtype=np.float32)
+        self.template = np.zeros(0, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.alpha)
+
+    def spawn(self, x, y, width, height, count=12):
+        template = np.random.randint(0, SHARD_TEMPLATES, count)
+        size = self.sheet.sizes[template]
+        # 起始位置在平台范围内
+        self.pos = np.column_stack((
+            x + np.random.uniform(0, 1, count) * np.maximum(0, width - size[:, 0]),
+            y + np.random.uniform(0, 1, count) * np.maximum(0, height - size[:, 1]),
+        )).astype(np.float32)
+        # 随机速度（向外爆炸效果），向上弹起
+        angle = np.random.uniform(0, 2 * math.pi, count)
+        speed = np.random.uniform(2, 6, count)
+        self.vel = np.column_stack((np.cos(angle) * speed, -np.random.uniform(3, 8, count))).astype(np.float32)
+        self.rotation = np.random.uniform(0, 360, count).astype(np.float32)
+        self.rot_speed = np.random.uniform(-15, 15, count).astype(np.float32)
+        self.alpha = np.full(count, 255, dtype=np.float32)
+        self.template = template
+
+    def update(self):
+        if not len(self):
+            return
+        self.pos += self.vel
+        self.vel[:, 1] += 0.5  # 重力
+        self.rotation += self.rot_speed
+        self.alpha -= 3  # 淡出
+
+        # 移除完全透明或掉出屏幕的碎片
+        alive = (self.alpha > 0) & (self.pos[:, 1] <= HEIGHT + 50)
+        if not alive.all():
+            self.pos = self.pos[alive]
+            self.vel = self.vel[alive]
+            self.rotation = self.rotation[alive]
+            self.rot_speed = self.rot_speed[alive]
+            self.alpha = self.alpha[alive]
+            self.template = self.template[alive]
+
+    def draw(self, screen):
+        if not len(self):
+            return
+        sheet = self.sheet
+        angle_idx = ((self.rotation % 360) * (SHARD_ANGLE_BUCKETS / 360.0)).astype(np.intp) % SHARD_ANGLE_BUCKETS
+        alpha_idx = np.clip(np.ceil(self.alpha * (SHARD_ALPHA_LEVELS / 255.0)).astype(np.intp) - 1, 0, SHARD_ALPHA_LEVELS - 1)
+        centers = self.pos + sheet.sizes[self.template] / 2
+        dest = (centers - sheet.half_sizes[self.template, angle_idx]).astype(np.intp).tolist()
+        frames = sheet.frames
+        screen.blits([
+            (frames[t][a][r], d)
+            for t, a, r, d in zip(self.template.tolist(), alpha_idx.tolist(), angle_idx.tolist(), dest)
+        ], doreturn=False)
+
+        # 飞散的冰晶粒子
+        sparkle = np.random.random(len(self)) < 0.3
+        if sparkle.any():
+            pts = centers[sparkle] + np.random.randint(-5, 6, (int(sparkle.sum()), 2))
+            for (px, py), a in zip(pts.astype(np.intp).tolist(), self.alpha[sparkle].tolist()):
+                pygame.draw.circle(screen, (240, 210, 255, int(a * 0.5)), (px, py), 1)
+
 class KeyPlatform:
     def _draw_bottom_glow(self, screen, rect):
         """在键帽底部绘制一条发光的像素条，增强立体感"""
@@ -47,11 +197,12 @@ class KeyPlatform:
             return 0.85 + 0.30 * (0.5 * (math.sin(t) + 1.0))
         return 1.0
 
-    def _draw_edge_glow(self, screen, rect, side):
+    def _draw_edge_glow(self, screen, rect, side, factor=None):
         """在指定边绘制像素风发光条: side in ['bottom','top','left','right']。
         包含第一层亮条和第二层更淡的外扩光晕。"""
         base = (193, 104, 255)
-        factor = self._glow_factor()
+        if factor is None:
+            factor = self._glow_factor()
         # 加粗外发光：增加层数与逐步衰减的 alpha 值
         base_alphas = [200, 160, 120, 85, 55, 35, 20, 10]  # 主层更多行形成更厚的主体辉光
         alphas = [min(255, max(0, int(a * factor))) for a in base_alphas]
@@ -146,13 +297,129 @@ class KeyPlatform:
                     pygame.draw.rect(surf2, (*base, a2), (x2, inset2, 1, glow_h - inset2 * 2))
                 screen.blit(surf2, (rect.left - glow_w - ext_w, rect.top))
 
-    def _draw_glow_edges(self, screen, rect):
+    def _draw_glow_edges(self, screen, rect, factor=None):
         """在四周绘制发光像素条"""
         # 加粗后的四周发光（上下 + 左右）
-        self._draw_edge_glow(screen, rect, "bottom")
-        self._draw_edge_glow(screen, rect, "top")
-        self._draw_edge_glow(screen, rect, "left")
-        self._draw_edge_glow(screen, rect, "right")
+        self._draw_edge_glow(screen, rect, "bottom", factor)
+        self._draw_edge_glow(screen, rect, "top", factor)
+        self._draw_edge_glow(screen, rect, "left", factor)
+        self._draw_edge_glow(screen, rect, "right", factor)
+
+    def _glow_padding(self):
+        """发光边向键帽外扩展的像素 (横向, 纵向)"""
+        glow_w = max(6, self.width // 8)
+        glow_h = max(6, self.height // 8)
+        return glow_w + max(3, glow_w // 2), glow_h + max(3, glow_h // 2)
+
+    def _glow_sprite(self):
+        """取当前发光强度对应的发光边精灵，返回 (surface, 相对键帽左上角的偏移)"""
+        if self.is_dynamic:
+            level = int((self._glow_factor() - 0.85) / 0.30 * (GLOW_LEVELS - 1) + 0.5)
+        else:
+            level = -1
+        return self._glow_sprite_at(level)
+
+    def _glow_sprite_at(self, level):
+        """发光强度档位 level 的发光边精灵；-1 表示静态平台的固定强度"""
+        key = (self.width, self.height, level)
+        px, py = self._glow_padding()
+        surf = _key_glows.get(key)
+        if surf is None:
+            factor = 1.0 if level < 0 else 0.85 + 0.30 * level / (GLOW_LEVELS - 1)
+
+            def render():
+                glow = pygame.Surface((self.width + 2 * px, self.height + 2 * py), pygame.SRCALPHA)
+                self._draw_glow_edges(glow, pygame.Rect(px, py, self.width, self.height), factor)
+                return glow
+
+            surf = ASSETS.baked(f"keyglow:{self.width}x{self.height}:{level}", render, sources=SPRITE_SOURCES)
+            _key_glows[key] = surf
+        return surf, (-px, -py)
+
+    def _key_face(self, key_color):
+        """键帽主体（顶面、侧面、描边）精灵，四周各留 1px 给外描边"""
+        is_space = str(self.label).strip().lower() in ("space", "spacebar", "空格")
+        key = (self.width, self.height, key_color, is_space)
+        face = _key_faces.get(key)
+        if face is None:
+            def render():
+                surf = pygame.Surface((self.width + 2, self.height + 2), pygame.SRCALPHA)
+                self._draw_key_face(surf, pygame.Rect(1, 1, self.width, self.height), key_color, is_space)
+                return surf
+
+            color = ','.join(str(c) for c in key_color)
+            face = ASSETS.baked(f"keyface:{self.width}x{self.height}:{color}:{int(is_space)}", render,
+                                sources=SPRITE_SOURCES)
+            _key_faces[key] = face
+        return face
+
+    def _draw_key_face(self, screen, rect, key_color, is_space):
+        """绘制像素风键帽主体（不含发光边、冰晶纹理和标签）"""
+        # 将所有键帽改回像素风长方形（颜色保持不变）
+        # 小画布像素化参数
+        PX = 4
+        sw = max(6, self.width // PX)
+        sh = max(4, self.height // PX)
+
+        small = pygame.Surface((sw, sh), pygame.SRCALPHA)
+        small.fill((0, 0, 0, 0))
+
+        # 投影（右下偏移）
+        try:
+            pygame.draw.rect(small, P_SHADOW, (1, 1, sw - 1, sh - 1))
+        except Exception:
+            pass
+
+        # 侧面（底部像素条）
+        side_h = max(1, sh // 4)
+        pygame.draw.rect(small, P_SIDE, (0, sh - side_h, sw, side_h))
+
+        # 顶面
+        top_h = sh - side_h
+        pygame.draw.rect(small, key_color, (0, 0, sw, top_h))
+
+        # 顶部高光（像素条）
+        hl_h = max(1, top_h // 4)
+        pygame.draw.rect(small, P_HIGHLIGHT, (1, 1, sw - 2, hl_h))
+
+        # 像素风斜角处理：原先透明，现在改为以白色填充形成“白色倒角”效果
+        if sw > 6 and sh > 6:
+            corner_clear = [(0,0),(1,0),(0,1), (sw-1,0),(sw-2,0),(sw-1,1), (0,sh-1),(0,sh-2),(1,sh-1), (sw-1,sh-1),(sw-2,sh-1),(sw-1,sh-2)]
+            for (cx, cy) in corner_clear:
+                # 仅清除顶面与阴影区域，不影响侧面底部条（避免破坏立体感）
+                if cy < top_h:  # 顶面或高光区域
+                    small.set_at((cx, cy), (255,255,255,255))
+
+        # 缩放到目标尺寸（最近邻放大以保持像素感）
+        try:
+            scaled = pygame.transform.scale(small, (self.width, self.height))
+            screen.blit(scaled, rect.topleft)
+        except Exception:
+            pygame.draw.rect(screen, key_color, rect)
+
+        # 像素风外描边：使用独立 surface 并裁剪角落像素
+        outline_color = (193, 104, 255)
+        if is_space:
+            outline_rect = rect.copy()
+        else:
+            outline_rect = rect.inflate(2, 2)
+        outline_surf = pygame.Surface((outline_rect.width, outline_rect.height), pygame.SRCALPHA)
+        pygame.draw.rect(outline_surf, outline_color, outline_surf.get_rect(), 2)
+        # 描边角从透明改为白色填充（与顶面白角统一）
+        ow, oh = outline_surf.get_width(), outline_surf.get_height()
+        if ow > 6 and oh > 6:
+            corner_blocks = [
+                (0,0),(1,0),(0,1),
+                (ow-1,0),(ow-2,0),(ow-1,1),
+                (0,oh-1),(0,oh-2),(1,oh-1),
+                (ow-1,oh-1),(ow-2,oh-1),(ow-1,oh-2)
+            ]
+            for (cx, cy) in corner_blocks:
+                outline_surf.set_at((cx, cy), (255,255,255,255))
+        screen.blit(outline_surf, outline_rect.topleft)
+
+        # 细边框（1px）以突出键帽轮廓
+        pygame.draw.rect(screen, (max(0, P_SIDE[0]-20), max(0, P_SIDE[1]-20), max(0, P_SIDE[2]-20)), rect, 1)
 
     def _draw_ice_texture(self, screen):
         ice_white = P_HIGHLIGHT
@@ -175,46 +442,92 @@ class KeyPlatform:
                 pygame.draw.circle(screen, ice_white, (px, py), 2)
         random.seed()  # 恢复随机种子
     """键盘按键平台类"""
-    def __init__(self, x, y, width, height, label, is_dynamic=False, is_breakable=False):
+    def __init__(self, x, y, width, height, label, is_dynamic=False, is_breakable=False,
+                 move_axis=None, move_range=60, move_speed=1, move_direction=1, carry_boost=1.0,
+                 break_threshold=0, respawn_time=180, timers=None):
         self.x = x
         self.y = y
-        self.base_y = y  # 用于动态平台
+        self.base_x = x  # 用于动态平台
+        self.base_y = y
         self.width = width
         self.height = height
         self.label = label
         self.is_dynamic = is_dynamic
-        self.move_direction = 1
-        self.move_speed = 1
-        self.move_range = 60  # 移动范围
+        # 移动路径：'x' 水平往返，'y' 垂直往返（动态平台默认垂直）
+        self.move_axis = move_axis or ('y' if is_dynamic else None)
+        self.move_direction = move_direction
+        self.move_speed = move_speed
+        self.move_range = move_range  # 移动范围
+        self.carry_boost = carry_boost  # 有玩家站在上面时的速度倍率
         
         # 可断裂平台相关
         self.is_breakable = is_breakable
         self.is_broken = False
         self.break_timer = 0  # 站在上面的计时
-        self.break_threshold = 0  # 立即断裂 = 0帧（检测到就断）
-        self.respawn_timer = 0  # 重生计时
-        self.respawn_time = 180  # 3秒 = 180帧
+        self.break_threshold = break_threshold  # 0 = 立即断裂（检测到就断）
+        self.respawn_time = respawn_time  # 180帧 = 3秒
         self.player_on_platform = False
+        # 重生由计时轮在到期帧触发（见 game.timers）；未传入时可断裂平台自己持有一个，
+        # 在 update() 中推进，GameState 会换成共享的计时轮
+        self.timers = timers if timers is not None or not is_breakable else TimerWheel()
+        self._owns_timers = timers is None
+        self._respawn_timer = None
         
-        # 冰块碎片系统
-        self.ice_shards = []
+        # 冰块碎片系统：可断裂平台在创建时就准备好碎片精灵表
+        self.ice_shards = ShardBurst(get_shard_sheet(width, height)) if is_breakable else None
         
+    def attach_timers(self, timers):
+        """改用共享的计时轮，未到期的重生一并迁移"""
+        if not self.is_breakable or timers is self.timers:
+            return
+        left = self.timers.remaining(self._respawn_timer)
+        self.timers.cancel(self._respawn_timer)
+        self.timers = timers
+        self._owns_timers = False
+        if self.is_broken:
+            self._respawn_timer = timers.schedule(left, self.respawn)
+    
+    def snapshot(self):
+        """会随模拟变化的字段打包成元组（回滚联机，见 game.snapshot）"""
+        timer = self._respawn_timer
+        respawn = timer.deadline if timer is not None and not timer.cancelled else 0
+        return (self.x, self.y, self.move_direction, self.is_broken, self.break_timer,
+                self.player_on_platform, respawn)
+    
+    def restore_snapshot(self, row):
+        """从 snapshot() 的结果恢复；调用前计时轮已清空并回到快照时的帧号"""
+        was_broken = self.is_broken
+        (self.x, self.y, self.move_direction, self.is_broken, self.break_timer,
+         self.player_on_platform, respawn) = row
+        self._respawn_timer = self.timers.schedule_at(respawn, self.respawn) if respawn else None
+        if was_broken and not self.is_broken:
+            self.ice_shards.clear()
+    
+    def respawn(self):
+        """重生：恢复成完整的键帽并回到基准位置"""
+        self.is_broken = False
+        self.break_timer = 0
+        self._respawn_timer = None
+        self.ice_shards.clear()
+        self.y = self.base_y
+    
     def update(self, players=None):
         """更新动态平台位置和断裂状态"""
+        if self.is_breakable and self._owns_timers:
+            self.timers.advance()
         # 动态移动（即使可以断裂也能移动）
         if self.is_dynamic and not self.is_broken:
-            # 检查是否有 base_x 属性（水平移动）
-            if hasattr(self, 'base_x'):
+            if self.move_axis == 'x':
                 # 检查是否有玩家站在平台上
                 has_player = False
-                if players:
+                if players and self.carry_boost != 1.0:
                     for player in players:
                         if self.check_player_standing(player):
                             has_player = True
                             break
                 
                 # 根据是否有玩家调整速度
-                current_speed = self.move_speed * 2.5 if has_player else self.move_speed
+                current_speed = self.move_speed * self.carry_boost if has_player else self.move_speed
                 
                 # 水平移动
                 self.x += current_speed * self.move_direction
@@ -237,27 +550,8 @@ class KeyPlatform:
         # 断裂机制
         if self.is_breakable:
             if self.is_broken:
-                # 更新冰块碎片
-                for shard in self.ice_shards[:]:
-                    shard['x'] += shard['vx']
-                    shard['y'] += shard['vy']
-                    shard['vy'] += 0.5  # 重力
-                    shard['rotation'] += shard['rot_speed']
-                    shard['alpha'] -= 3  # 淡出
-                    
-                    # 移除完全透明或掉出屏幕的碎片
-                    if shard['alpha'] <= 0 or shard['y'] > HEIGHT + 50:
-                        self.ice_shards.remove(shard)
-                
-                # 重生倒计时
-                self.respawn_timer += 1
-                if self.respawn_timer >= self.respawn_time:
-                    self.is_broken = False
-                    self.break_timer = 0
-                    self.respawn_timer = 0
-                    self.ice_shards.clear()
-                    # 重生时恢复到基准位置
-                    self.y = self.base_y
+                # 更新冰块碎片（整体向量化更新）；重生由计时轮触发 respawn()
+                self.ice_shards.update()
             else:
                 # 检测是否有玩家站在上面
                 self.player_on_platform = False
@@ -271,6 +565,7 @@ class KeyPlatform:
                                 self.is_broken = True
                                 self.break_timer = 0
                                 self._create_ice_shards()
+                                self._respawn_timer = self.timers.schedule(self.respawn_time, self.respawn)
                             break
                 
                 # 如果没有玩家，重置计时
@@ -279,43 +574,8 @@ class KeyPlatform:
     
     def _create_ice_shards(self):
         """创建冰块碎片"""
-        self.ice_shards.clear()
-        
-        # 创建多个不规则冰块碎片
-        num_shards = 12
-        for i in range(num_shards):
-            # 随机大小和位置
-            shard_w = random.randint(int(self.width * 0.15), int(self.width * 0.3))
-            shard_h = random.randint(int(self.height * 0.4), int(self.height * 0.8))
-            
-            # 起始位置在平台范围内
-            start_x = self.x + random.uniform(0, self.width - shard_w)
-            start_y = self.y + random.uniform(0, self.height - shard_h)
-            
-            # 随机速度（向外爆炸效果）
-            center_x = self.x + self.width / 2
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 6)
-            
-            shard = {
-                'x': start_x,
-                'y': start_y,
-                'w': shard_w,
-                'h': shard_h,
-                'vx': math.cos(angle) * speed,
-                'vy': -random.uniform(3, 8),  # 向上弹起
-                'rotation': random.uniform(0, 360),
-                'rot_speed': random.uniform(-15, 15),
-                'alpha': 255,
-                'color': random.choice([
-                    (240, 220, 255),  # very light purple
-                    (230, 200, 255),  # light lavender
-                    (210, 180, 255),  # pastel purple
-                    (250, 235, 255),  # ultra pale
-                ])
-            }
-            self.ice_shards.append(shard)
-    
+        self.ice_shards.spawn(self.x, self.y, self.width, self.height, count=12)
+
     def check_player_standing(self, player):
         """检查玩家是否站在平台上"""
         return (player.x < self.x + self.width and
@@ -323,17 +583,20 @@ class KeyPlatform:
                 player.y + player.height >= self.y and
                 player.y + player.height <= self.y + 10)
     
-    def draw(self, screen):
-        # 选择主面颜色
+    def _face_color(self):
+        """键帽主面颜色：动态平台更亮"""
         if self.is_dynamic and self.is_breakable:
-            key_color = P_LIGHT
+            return P_LIGHT
         elif self.is_dynamic:
-            key_color = P_LIGHT
+            return P_LIGHT
         elif self.is_breakable:
-            key_color = P_PRIMARY
+            return P_PRIMARY
         else:
-            key_color = P_PRIMARY
+            return P_PRIMARY
+
+    def draw(self, screen):
         """绘制3D键帽效果"""
+        key_color = self._face_color()
         # 如果已断裂，绘制冰块碎片
         if self.is_broken:
             self._draw_ice_shards(screen)
@@ -341,130 +604,33 @@ class KeyPlatform:
             return
         
 
-        # 将所有键帽改回像素风长方形（颜色保持不变）
         rect = pygame.Rect(self.x, self.y, self.width, self.height)
 
-        # 小画布像素化参数
-        PX = 4
-        sw = max(6, self.width // PX)
-        sh = max(4, self.height // PX)
-
-        small = pygame.Surface((sw, sh), pygame.SRCALPHA)
-        small.fill((0, 0, 0, 0))
-
-        # 投影（右下偏移）
-        try:
-            pygame.draw.rect(small, P_SHADOW, (1, 1, sw - 1, sh - 1))
-        except Exception:
-            pass
-
-        # 侧面（底部像素条）
-        side_h = max(1, sh // 4)
-        pygame.draw.rect(small, P_SIDE, (0, sh - side_h, sw, side_h))
-
-        # 顶面
-        top_h = sh - side_h
-        pygame.draw.rect(small, key_color, (0, 0, sw, top_h))
-
-        # 顶部高光（像素条）
-        hl_h = max(1, top_h // 4)
-        pygame.draw.rect(small, P_HIGHLIGHT, (1, 1, sw - 2, hl_h))
-
-        # 像素风斜角处理：原先透明，现在改为以白色填充形成“白色倒角”效果
-        if sw > 6 and sh > 6:
-            corner_clear = [(0,0),(1,0),(0,1), (sw-1,0),(sw-2,0),(sw-1,1), (0,sh-1),(0,sh-2),(1,sh-1), (sw-1,sh-1),(sw-2,sh-1),(sw-1,sh-2)]
-            for (cx, cy) in corner_clear:
-                # 仅清除顶面与阴影区域，不影响侧面底部条（避免破坏立体感）
-                if cy < top_h:  # 顶面或高光区域
-                    small.set_at((cx, cy), (255,255,255,255))
-
-        # 缩放到目标尺寸（最近邻放大以保持像素感）
-        try:
-            scaled = pygame.transform.scale(small, (self.width, self.height))
-            screen.blit(scaled, rect.topleft)
-        except Exception:
-            pygame.draw.rect(screen, key_color, rect)
-
-        # 像素风外描边：使用独立 surface 并裁剪角落像素
-        outline_color = (193, 104, 255)
-        is_space = str(self.label).strip().lower() in ("space", "spacebar", "空格")
-        if is_space:
-            outline_rect = rect.copy()
-        else:
-            outline_rect = rect.inflate(2, 2)
-        outline_surf = pygame.Surface((outline_rect.width, outline_rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(outline_surf, outline_color, outline_surf.get_rect(), 2)
-        # 描边角从透明改为白色填充（与顶面白角统一）
-        ow, oh = outline_surf.get_width(), outline_surf.get_height()
-        if ow > 6 and oh > 6:
-            corner_blocks = [
-                (0,0),(1,0),(0,1),
-                (ow-1,0),(ow-2,0),(ow-1,1),
-                (0,oh-1),(0,oh-2),(1,oh-1),
-                (ow-1,oh-1),(ow-2,oh-1),(ow-1,oh-2)
-            ]
-            for (cx, cy) in corner_blocks:
-                outline_surf.set_at((cx, cy), (255,255,255,255))
-        screen.blit(outline_surf, outline_rect.topleft)
-
-        # 细边框（1px）以突出键帽轮廓
-        pygame.draw.rect(screen, (max(0, P_SIDE[0]-20), max(0, P_SIDE[1]-20), max(0, P_SIDE[2]-20)), rect, 1)
-
-        # 四周发光像素条（增强立体感）
-        self._draw_glow_edges(screen, rect)
+        # 键帽主体和发光边都来自缓存的精灵
+        screen.blit(self._key_face(key_color), (rect.x - 1, rect.y - 1))
+        glow, (gx, gy) = self._glow_sprite()
+        screen.blit(glow, (rect.x + gx, rect.y + gy))
 
         # 如果需要，绘制冰晶纹理（仍然使用单独方法）
         if (self.is_dynamic and self.is_breakable) or self.is_breakable:
             self._draw_ice_texture(screen)
 
         # 标签（居中）
-        label_text = font_key.render(self.label, True, P_TEXT)
+        label_text = render_text(font_key, self.label, P_TEXT)
         label_rect = label_text.get_rect(center=rect.center)
         screen.blit(label_text, label_rect)
 
         # 动态平台额外标识（小箭头）
         if self.is_dynamic:
-            # Tab 键显示左右箭头，其它动态平台显示上下箭头
-            label_norm = str(self.label).strip().lower()
-            if label_norm == "tab":
+            # 水平移动的平台（如 Tab 键）显示左右箭头，其它动态平台显示上下箭头
+            if self.move_axis == 'x':
                 arrow = "↔"
             else:
                 arrow = "↕"
-            arrow_text = font_tiny.render(arrow, True, P_PRIMARY)
+            arrow_text = render_text(font_tiny, arrow, P_PRIMARY)
             arrow_rect = arrow_text.get_rect(center=(self.x + self.width//2, self.y - 12))
             screen.blit(arrow_text, arrow_rect)
     
     def _draw_ice_shards(self, screen):
-        """绘制飞散的冰块碎片"""
-        for shard in self.ice_shards:
-            if shard['alpha'] <= 0:
-                continue
-            
-            # 创建带旋转的冰块碎片
-            surf = pygame.Surface((int(shard['w']), int(shard['h'])), pygame.SRCALPHA)
-            
-            # 绘制冰块主体
-            color_with_alpha = (*shard['color'][:3], int(shard['alpha']))
-            pygame.draw.rect(surf, color_with_alpha, (0, 0, int(shard['w']), int(shard['h'])))
-            
-            # 添加高光（更浅的紫色高光）
-            highlight_color = (255, 250, 255, int(shard['alpha'] * 0.6))
-            pygame.draw.rect(surf, highlight_color, (2, 2, max(1, int(shard['w']) - 4), max(1, int(shard['h'] * 0.3))), 1)
-            
-            # 添加边缘裂纹（浅紫色边缘）
-            edge_color = (210, 185, 220, int(shard['alpha'] * 0.8))
-            pygame.draw.rect(surf, edge_color, (0, 0, int(shard['w']), int(shard['h'])), 2)
-            
-            # 旋转碎片
-            rotated = pygame.transform.rotate(surf, shard['rotation'])
-            rotated_rect = rotated.get_rect(center=(int(shard['x'] + shard['w']/2), 
-                                                     int(shard['y'] + shard['h']/2)))
-            
-            screen.blit(rotated, rotated_rect)
-            
-            # 绘制飞散的冰晶粒子
-            if random.random() < 0.3:
-                particle_x = int(shard['x'] + shard['w']/2 + random.randint(-5, 5))
-                particle_y = int(shard['y'] + shard['h']/2 + random.randint(-5, 5))
-                particle_color = (240, 210, 255, int(shard['alpha'] * 0.5))
-                pygame.draw.circle(screen, particle_color, (particle_x, particle_y), 1)  
\ No newline at end of file
+        """绘制飞散的冰块碎片（从预渲染的精灵表中取帧）"""
+        self.ice_shards.draw(screen)
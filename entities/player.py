@@ -1,10 +1,25 @@
 import pygame
 import random
-import os
 from settings import *
+from utils.text_cache import render_text
+from utils.assets import ASSETS
+from game.effects import (FreezeEffect, ReverseEffect, SuperEffect, EFFECT_TYPES,
+                          FROZEN, REVERSED, SUPER_FORM)
+from game.skills import SKILLS
+from game.timers import TimerWheel
 
 class Player:
-    def __init__(self, x, y, color, controls, facing_right=True, avatar=None):
+    def __init__(self, x, y, color, controls, facing_right=True, avatar=None,
+                 name=None, team=None, tag=None, tag_color=WHITE, timers=None):
+        # 冷却、挥击和状态效果的到期由计时轮触发（见 game.timers）。
+        # 未传入时使用自己的计时轮并在 update() 中推进；GameState 会换成所有实体共享的计时轮。
+        self.timers = timers if timers is not None else TimerWheel()
+        self._owns_timers = timers is None
+        self._attack_ready = 0
+        self._attack_start = 0
+        self._attack_timer = None
+        self._super_hit_ready = 0
+        
         self.x = x
         self.y = y
         self.width = 60
@@ -18,60 +33,37 @@ class Player:
         self.facing_right = facing_right
         self.controls = controls
         
-        self.skill = None
+        # 多人模式：名称、所属队伍（同队不互相伤害）和脚下的编号标记（None 表示不显示）
+        self.name = name
+        self.team = team
+        self.tag = tag
+        self.tag_color = tag_color
+        
+        self.skill = None  # 持有的技能 ID（见 game.skills），None 表示没有
         self.attack_cooldown = 0
         self.is_attacking = False
         self.attack_frame = 0
         self.attack_power = 3
         self.knockback_x = 0
         
+        # 限时状态效果（见 game.effects），效果负责设置和清除下面的状态标记
+        self.effects = []
         self.is_frozen = False
-        self.freeze_timer = 0
         
         # 反转状态
         self.is_reversed = False
-        self.reverse_timer = 0
         
         # super() 形态
         self.is_super = False
-        self.super_timer = 0
-        self.super_duration = 300  # 5秒 = 300帧（60fps）
+        self.super_duration = SUPER_TIME  # 5秒
         self.super_collision_cooldown = 0  # 碰撞冷却，防止连续伤害
 
-        # 尝试加载玩家贴图（frame1.png 用于蓝色玩家，frame2.png 用于红色玩家）
-        self.image1 = None
-        self.image2 = None
-        self._flipped_image1 = None
-        self._flipped_image2 = None
-        def _try_load(name):
-            # 尝试多个常见路径
-            candidates = [
-                name,
-                os.path.join(os.path.dirname(__file__), name),
-                os.path.join(os.path.dirname(__file__), '..', name),
-                os.path.join(os.path.dirname(__file__), '..', 'assets', name),
-            ]
-            for p in candidates:
-                try:
-                    surf = pygame.image.load(p).convert_alpha()
-                    return surf
-                except Exception:
-                    continue
-            return None
-
-        # 只尝试在初始化一次加载资源并缩放到玩家尺寸
-        raw1 = _try_load('frame1.png')
-        raw2 = _try_load('frame2.png')
-        if raw1:
-            try:
-                self.image1 = pygame.transform.smoothscale(raw1, (self.width, self.height))
-            except Exception:
-                self.image1 = pygame.transform.scale(raw1, (self.width, self.height))
-        if raw2:
-            try:
-                self.image2 = pygame.transform.smoothscale(raw2, (self.width, self.height))
-            except Exception:
-                self.image2 = pygame.transform.scale(raw2, (self.width, self.height))
+        # 玩家贴图（frame1.png 用于蓝色玩家，frame2.png 用于红色玩家）
+        # 由资源注册表统一加载并缩放到玩家尺寸，重开一局时直接复用
+        self.image1 = ASSETS.scaled('frame1.png', (self.width, self.height))
+        self.image2 = ASSETS.scaled('frame2.png', (self.width, self.height))
+        self._flipped_image1 = ASSETS.flipped('frame1.png', (self.width, self.height)) if self.image1 else None
+        self._flipped_image2 = ASSETS.flipped('frame2.png', (self.width, self.height)) if self.image2 else None
 
         # 根据传入的颜色选择默认显示帧（如果两帧都存在，蓝色用frame1，红色用frame2）
         self.use_image = False
@@ -91,30 +83,104 @@ class Player:
         self.avatar = avatar
         self._cached_avatar = None
         
-    def update(self, keys, platforms):
-        # 更新反转状态
-        if self.is_reversed:
-            self.reverse_timer -= 1
-            if self.reverse_timer <= 0:
-                self.is_reversed = False
-                self.reverse_timer = 0
+    # ---- 计时轮驱动的冷却和挥击 ----
+    
+    @property
+    def attack_cooldown(self):
+        """距离可以再次释放技能还剩多少帧"""
+        return max(0, self._attack_ready - self.timers.now)
+    
+    @attack_cooldown.setter
+    def attack_cooldown(self, frames):
+        self._attack_ready = self.timers.now + frames
+    
+    @property
+    def super_collision_cooldown(self):
+        """super() 形态撞人后的冷却剩余帧数"""
+        return max(0, self._super_hit_ready - self.timers.now)
+    
+    @super_collision_cooldown.setter
+    def super_collision_cooldown(self, frames):
+        self._super_hit_ready = self.timers.now + frames
+    
+    @property
+    def attack_frame(self):
+        """当前挥击进行到第几帧（第 5 帧判定命中），不在挥击时为 0"""
+        if not self.is_attacking:
+            return 0
+        return self.timers.now - self._attack_start
+    
+    @attack_frame.setter
+    def attack_frame(self, frame):
+        self._attack_start = self.timers.now - frame
+    
+    def _start_swing(self, frame=0):
+        """开始（或从第 frame 帧继续）一次挥击，到期时自动结束"""
+        self.timers.cancel(self._attack_timer)
+        self.is_attacking = True
+        self.attack_frame = frame
+        self._attack_timer = self.timers.schedule(ATTACK_SWING_FRAMES + 1 - frame, self._end_swing)
+    
+    def _end_swing(self):
+        self.is_attacking = False
+        self._attack_timer = None
+    
+    # ---- 快照（回滚联机，见 game.snapshot）----
+    
+    def snapshot(self):
+        """会随模拟变化的字段打包成元组；计时器记录为到期帧号，没有技能记为 0"""
+        timer = self._attack_timer
+        attack_end = timer.deadline if timer is not None and not timer.cancelled else 0
+        return (self.x, self.y, self.vel_x, self.vel_y, self.hp, self.on_ground, self.facing_right,
+                self.skill or 0, self.knockback_x, self.is_attacking, self._attack_start, attack_end,
+                self._attack_ready, self._super_hit_ready, self.is_frozen, self.is_reversed, self.is_super,
+                tuple((e.kind, e.duration, e.timer.deadline) for e in self.effects))
+    
+    def restore_snapshot(self, row):
+        """从 snapshot() 的结果恢复；调用前计时轮已清空并回到快照时的帧号"""
+        (self.x, self.y, self.vel_x, self.vel_y, self.hp, self.on_ground, self.facing_right,
+         self.skill, self.knockback_x, self.is_attacking, self._attack_start, attack_end,
+         self._attack_ready, self._super_hit_ready, self.is_frozen, self.is_reversed, self.is_super,
+         effects) = row
+        self.skill = self.skill or None
+        timers = self.timers
+        self._attack_timer = timers.schedule_at(attack_end, self._end_swing) if attack_end else None
+        # 状态标记已经随字段恢复，这里只重建效果对象和到期计时器，不再调用 apply
+        self.effects = []
+        for kind, duration, deadline in effects:
+            effect = EFFECT_TYPES[kind](duration)
+            effect.timer = timers.schedule_at(deadline, self._expire_effect, effect)
+            self.effects.append(effect)
+    
+    def attach_timers(self, timers):
+        """改用共享的计时轮（由 GameState 统一推进），未到期的冷却、挥击和效果一并迁移"""
+        if timers is self.timers:
+            return
+        old = self.timers
+        cooldown = self.attack_cooldown
+        super_cooldown = self.super_collision_cooldown
+        swing = self.attack_frame if self.is_attacking else None
+        effects = [(effect, old.remaining(effect.timer)) for effect in self.effects]
+        old.cancel(self._attack_timer)
+        for effect, _ in effects:
+            old.cancel(effect.timer)
         
-        # 更新 super() 形态
-        if self.is_super:
-            self.super_timer -= 1
-            if self.super_timer <= 0:
-                self.is_super = False
-                self.super_timer = 0
-            # super() 形态下的碰撞冷却
-            if self.super_collision_cooldown > 0:
-                self.super_collision_cooldown -= 1
+        self.timers = timers
+        self._owns_timers = False
+        self.attack_cooldown = cooldown
+        self.super_collision_cooldown = super_cooldown
+        if swing is not None:
+            self._start_swing(swing)
+        for effect, left in effects:
+            effect.timer = timers.schedule(left, self._expire_effect, effect)
+    
+    def update(self, keys, platforms):
+        # 独立使用（没有 GameState）时自己推进计时轮
+        if self._owns_timers:
+            self.timers.advance()
         
-        # 更新冻结状态
+        # 冻结时只受重力影响
         if self.is_frozen:
-            self.freeze_timer -= 1
-            if self.freeze_timer <= 0:
-                self.is_frozen = False
-                self.freeze_timer = 0
             self.vel_x = 0
             self.vel_y += GRAVITY
             self.y += self.vel_y
@@ -130,15 +196,6 @@ class Player:
             
             return
         
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-        
-        if self.is_attacking:
-            self.attack_frame += 1
-            if self.attack_frame > 15:
-                self.is_attacking = False
-                self.attack_frame = 0
-        
         if abs(self.knockback_x) > 0.1:
             self.x += self.knockback_x
             self.knockback_x *= 0.8
@@ -201,9 +258,8 @@ class Player:
             self.skill = None
             self.attack_cooldown = ATTACK_COOLDOWN
             
-            if used_skill in ['pow', 'delete']:
-                self.is_attacking = True
-                self.attack_frame = 0
+            if SKILLS[used_skill].melee:
+                self._start_swing()
             
             return used_skill
         return None
@@ -227,51 +283,60 @@ class Player:
             'height': attack_height
         }
     
+    def is_enemy(self, other):
+        """是否为敌对玩家（不同队伍；未设置队伍时除自己外都是敌人）"""
+        if other is self:
+            return False
+        return self.team is None or self.team != other.team
+    
     def take_damage(self, damage, knockback_direction):
         self.hp -= damage
         if self.hp < 0:
             self.hp = 0
         self.knockback_x = knockback_direction * 15
     
+    def add_effect(self, effect):
+        """加上一个状态效果并登记到期时间；已有同种效果时用新效果替换（刷新持续时间）"""
+        for i, current in enumerate(self.effects):
+            if current.kind == effect.kind:
+                self.timers.cancel(current.timer)
+                self.effects[i] = effect
+                break
+        else:
+            self.effects.append(effect)
+        effect.timer = self.timers.after(effect.duration, self._expire_effect, effect)
+        effect.apply(self)
+        return effect
+    
+    def _expire_effect(self, effect):
+        if effect in self.effects:
+            self.effects.remove(effect)
+            effect.expire(self)
+    
+    def clear_effects(self):
+        """立即结束所有状态效果"""
+        effects, self.effects = self.effects, []
+        for effect in effects:
+            self.timers.cancel(effect.timer)
+            effect.expire(self)
+    
+    def effect_remaining(self, kind):
+        """某种状态效果的剩余帧数，没有该效果时为 0"""
+        for effect in self.effects:
+            if effect.kind == kind:
+                return self.timers.remaining(effect.timer)
+        return 0
+    
     def freeze(self):
-        self.is_frozen = True
-        self.freeze_timer = FREEZE_DURATION
-        self.vel_x = 0
-        # 播放冰冻音效（容错处理）
-        try:
-            # 初始化 mixer（如果尚未初始化）
-            try:
-                if not pygame.mixer.get_init():
-                    pygame.mixer.init()
-            except Exception:
-                pass
-            # 构造 assets 路径并尝试加载播放短音效
-            repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-            # 使用新上传的 WAV 作为冰冻音效
-            ice_path = os.path.join(repo_root, 'assets', '436972_creeeeak_ice_sounds5.wav')
-            try:
-                ice_sound = pygame.mixer.Sound(ice_path)
-                try:
-                    ice_sound.set_volume(0.8)
-                except Exception:
-                    pass
-                ice_sound.play()
-            except Exception:
-                # 如果加载或播放失败，不要抛出异常影响游戏
-                pass
-        except Exception:
-            pass
+        self.add_effect(FreezeEffect(FREEZE_TIME))
     
     def reverse_controls(self):
         """反转玩家控制"""
-        self.is_reversed = True
-        self.reverse_timer = REVERSED_DURATION
+        self.add_effect(ReverseEffect(REVERSED_TIME))
     
     def activate_super(self):
         """激活 super() 形态"""
-        self.is_super = True
-        self.super_timer = self.super_duration
-        self.skill = None  # 清除其他技能
+        self.add_effect(SuperEffect(self.super_duration))
     
     def check_super_collision(self, other_player):
         """检查 super() 形态下是否与对方碰撞"""
@@ -315,7 +380,8 @@ class Player:
             # 绘制膨胀的玩家（2倍大小）
             scale = 2.0
             # 最后1秒闪烁效果
-            if self.super_timer < 60 and (self.super_timer // 10) % 2 == 0:
+            super_timer = self.effect_remaining(SUPER_FORM)
+            if super_timer < 60 and (super_timer // 10) % 2 == 0:
                 scale = 1.8
             
             expanded_width = int(self.width * scale)
@@ -353,8 +419,8 @@ class Player:
             pygame.draw.rect(screen, (200, 100, 255), super_rect, 3)
             
             # 绘制倒计时
-            super_seconds = self.super_timer // 60 + 1
-            super_text = font_tiny.render(f"SUPER: {super_seconds}s", True, (200, 100, 255))
+            super_seconds = super_timer // 60 + 1
+            super_text = render_text(font_tiny, f"SUPER: {super_seconds}s", (200, 100, 255))
             text_rect = super_text.get_rect(center=(int(self.x + self.width // 2), 
                                                     int(self.y - 40)))
             screen.blit(super_text, text_rect)
@@ -381,14 +447,14 @@ class Player:
                                 self.width + reverse_padding*2, self.height + reverse_padding*2), 4)
             
             # 显示反转倒计时
-            reverse_seconds = self.reverse_timer // FPS + 1
-            reverse_text = font_tiny.render(f"REVERSED: {reverse_seconds}s", True, DARK_RED)
+            reverse_seconds = self.effect_remaining(REVERSED) // FPS + 1
+            reverse_text = render_text(font_tiny, f"REVERSED: {reverse_seconds}s", DARK_RED)
             text_rect = reverse_text.get_rect(center=(int(self.x + self.width//2), 
                                                      int(self.y - 30)))
             screen.blit(reverse_text, text_rect)
             
             # 绘制反向箭头
-            arrow_text = font_small.render("⇄", True, DARK_RED)
+            arrow_text = render_text(font_small, "⇄", DARK_RED)
             arrow_rect = arrow_text.get_rect(center=(int(self.x + self.width//2), 
                                                      int(self.y - 50)))
             screen.blit(arrow_text, arrow_rect)
@@ -444,8 +510,8 @@ class Player:
                 snowflake_y = int(self.y + random.randint(0, self.height))
                 pygame.draw.circle(screen, WHITE, (snowflake_x, snowflake_y), 2)
             
-            freeze_seconds = self.freeze_timer // FPS + 1
-            freeze_text = font_tiny.render(f"FROZEN: {freeze_seconds}s", True, CYAN)
+            freeze_seconds = self.effect_remaining(FROZEN) // FPS + 1
+            freeze_text = render_text(font_tiny, f"FROZEN: {freeze_seconds}s", CYAN)
             text_rect = freeze_text.get_rect(center=(int(self.x + self.width//2), 
                                                      int(self.y - 20)))
             screen.blit(freeze_text, text_rect)
@@ -506,25 +572,22 @@ class Player:
         
         # 已移除眼睛绘制（使用图片或方块作为视觉表现）
         
+        # 多人模式下在脚下显示玩家编号，方便区分相同贴图的角色
+        if self.tag:
+            tag_text = render_text(font_indicator, self.tag, self.tag_color)
+            tag_rect = tag_text.get_rect(center=(int(self.x + self.width // 2), int(self.y + self.height + 8)))
+            screen.blit(tag_text, tag_rect)
+        
         if self.skill and not self.is_frozen:
             indicator_x = int(self.x + self.width // 2)
             indicator_y = int(self.y - 15)
             
-            if self.skill == 'pow':
-                skill_color = ORANGE
-                skill_text = 'pow()'
-            elif self.skill == 'delete':
-                skill_color = RED
-                skill_text = 'del'
-            elif self.skill == 'print':
-                skill_color = YELLOW
-                skill_text = 'prn'
-            else:
-                skill_color = WHITE
-                skill_text = '?'
+            skill = SKILLS[self.skill]
+            skill_color = skill.color
+            skill_text = skill.indicator or '?'
             
             pygame.draw.circle(screen, skill_color, (indicator_x, indicator_y), 8)
-            tiny_text = pygame.font.Font(None, 14).render(skill_text, True, BLACK)
+            tiny_text = render_text(font_indicator, skill_text, BLACK)
             text_rect = tiny_text.get_rect(center=(indicator_x, indicator_y))
             screen.blit(tiny_text, text_rect)
         
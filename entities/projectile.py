@@ -1,5 +1,6 @@
 import pygame
 from settings import *
+from utils.text_cache import render_text
 
 class Projectile:
     def __init__(self, x, y, direction, owner):
@@ -18,10 +19,10 @@ class Projectile:
             self.active = False
     
     def draw(self, screen):
-        text = font_small.render(self.text, True, YELLOW)
+        text = render_text(font_small, self.text, YELLOW)
         text_rect = text.get_rect(center=(int(self.x), int(self.y)))
         
-        glow_text = font_small.render(self.text, True, (255, 255, 200))
+        glow_text = render_text(font_small, self.text, (255, 255, 200))
         glow_rect = glow_text.get_rect(center=(int(self.x), int(self.y)))
         screen.blit(glow_text, (glow_rect.x + 2, glow_rect.y + 2))
         screen.blit(text, text_rect)
@@ -1,38 +1,32 @@
 import cv2
 import numpy as np
-from PIL import Image, ImageDraw, ImageOps
 import time
 import os
-# --- Stability and detection config ---
-MIN_BOX_CHANGE = 8         # 边框变化小于此像素不更新
-MIN_FACE_SIZE = 80         # 检测最小人脸尺寸
-STABLE_REQUIRED = 8        # 稳定帧数要求
-MOVEMENT_THRESHOLD = 12    # 稳定判定最大移动像素
-HOLD_FRAMES_SINGLE = 12    # 单人脸hold帧数
-HOLD_FRAMES_TWO = 16       # 双人脸hold帧数
-SMOOTH_ALPHA_SINGLE = 0.35 # 单人脸平滑系数
-SMOOTH_ALPHA_TWO = 0.28    # 双人脸平滑系数
-
-# Try to import mediapipe
 try:
-    import mediapipe as mp
-    HAS_MEDIAPIPE = True
-    mp_face_detection = mp.solutions.face_detection
-except Exception:
-    HAS_MEDIAPIPE = False
+    from face_detection import stylize
+    from face_detection.detectors import select_detector
+    from face_detection.sources import open_source
+    from face_detection.stability import (
+        HOLD_SECONDS_SINGLE, HOLD_SECONDS_TWO, SMOOTH_SECONDS_SINGLE, SMOOTH_SECONDS_TWO, StabilityTracker,
+    )
+except ImportError:  # 直接运行 python face_detection/Face_Detection.py
+    import stylize
+    from detectors import select_detector
+    from sources import open_source
+    from stability import (
+        HOLD_SECONDS_SINGLE, HOLD_SECONDS_TWO, SMOOTH_SECONDS_SINGLE, SMOOTH_SECONDS_TWO, StabilityTracker,
+    )
+# Stability and smoothing config (time-based windows) lives in stability.py
 
 # Simple face-capture -> rage-comic stylizer
 # Workflow:
-# 1. Open webcam and detect faces using Haar cascade
+# 1. Open webcam and detect faces (backend picked by detectors.select_detector)
 # 2. When a face is found, wait 3 seconds
 # 3. Capture the frame, crop to largest face, create circular face image
 # 4. Apply a cartoon / "rage comic" style (edge exaggeration, posterize, bold eyes/mouth placeholders)
 # 5. Save output to ./outputs with timestamp
 
 
-CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-
-
 def ensure_outputs_dir():
     out_dir = os.path.join(os.path.dirname(__file__), 'outputs')
     os.makedirs(out_dir, exist_ok=True)
@@ -88,31 +82,22 @@ def imshow_mirror(window_name, img, mirror=True, annotations=None):
             pass
 
 
-def capture_face_image(wait_seconds=3, label=None):
-    cap = cv2.VideoCapture(0)
+def capture_face_image(wait_seconds=3, label=None, source=0):
+    # source: camera index, video file or image sequence (see sources.open_source);
+    # recordings play back at their own frame rate and loop
+    cap = open_source(source, loop=True, realtime=True)
     if not cap.isOpened():
         raise RuntimeError('Could not open camera')
-    face_cascade = cv2.CascadeClassifier(CASCADE_PATH)
-
-    if HAS_MEDIAPIPE:
-        mp_detector = mp_face_detection.FaceDetection(model_selection=0, min_detection_confidence=0.5)
-    else:
-        mp_detector = None
+    # benchmark detector backends on a real camera frame (only once per process)
+    ret, first = cap.read()
+    detector = select_detector([first] if ret else None)
     print('Looking for faces. Press Ctrl+C to quit.')
 
     captured = None
     captured_face_box = None
     try:
-        # stability tracking: keep recent centers
-        recent_centers = []
-        stable_required = STABLE_REQUIRED  # number of frames with low movement required
-        movement_threshold = MOVEMENT_THRESHOLD  # pixels threshold for motion
-
-        # smoothing / hold parameters to avoid flicker when detection is intermittent
-        last_box = None  # (x, y, w, h) last drawn box
-        last_seen = 0
-        hold_frames = HOLD_FRAMES_SINGLE
-        smooth_alpha = SMOOTH_ALPHA_SINGLE
+        # stability tracking, box smoothing and hold (time-based, see stability.py)
+        stability = StabilityTracker(1, smooth_seconds=SMOOTH_SECONDS_SINGLE, hold_seconds=HOLD_SECONDS_SINGLE)
 
         while True:
             ret, frame = cap.read()
@@ -123,24 +108,7 @@ def capture_face_image(wait_seconds=3, label=None):
             # annotations for text drawn after any mirroring (so text stays readable)
             annotations = []
 
-            if HAS_MEDIAPIPE and mp_detector is not None:
-                # MediaPipe expects RGB
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                print("rgb done")
-                results = mp_detector.process(rgb)
-                print("process done")
-                faces = []
-                if results.detections:
-                    for det in results.detections:
-                        bbox = det.location_data.relative_bounding_box
-                        x = int(bbox.xmin * frame.shape[1])
-                        y = int(bbox.ymin * frame.shape[0])
-                        w = int(bbox.width * frame.shape[1])
-                        h = int(bbox.height * frame.shape[0])
-                        faces.append((x, y, w, h))
-            else:
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE))
+            faces = detector.detect(frame)
 
             display = frame.copy()
 
@@ -149,57 +117,20 @@ def capture_face_image(wait_seconds=3, label=None):
                 faces = sorted(faces, key=lambda r: r[2] * r[3], reverse=True)
                 x, y, w, h = faces[0]
 
-                # compute center and track stability
-                cx = x + w // 2
-                cy = y + h // 2
-                recent_centers.append((cx, cy))
-                if len(recent_centers) > stable_required:
-                    recent_centers.pop(0)
-
-                # smooth box coordinates with previous one to reduce jitter
-                if last_box is None:
-                    smooth_box = (x, y, w, h)
-                else:
-                    lx, ly, lw, lh = last_box
-                    sx = int(lx * (1 - smooth_alpha) + x * smooth_alpha)
-                    sy = int(ly * (1 - smooth_alpha) + y * smooth_alpha)
-                    sw = int(lw * (1 - smooth_alpha) + w * smooth_alpha)
-                    sh = int(lh * (1 - smooth_alpha) + h * smooth_alpha)
-                    # deadzone: ignore tiny changes to prevent jitter
-                    if abs(sx - lx) < MIN_BOX_CHANGE:
-                        sx = lx
-                    if abs(sy - ly) < MIN_BOX_CHANGE:
-                        sy = ly
-                    if abs(sw - lw) < MIN_BOX_CHANGE:
-                        sw = lw
-                    if abs(sh - lh) < MIN_BOX_CHANGE:
-                        sh = lh
-                    smooth_box = (sx, sy, sw, sh)
-
-                last_box = smooth_box
-                last_seen = 0
+                # track stability over the last STABLE_SECONDS and smooth the box
+                stable = stability.update([(x, y, w, h)], cap.timestamp)
 
                 # draw smoothed rectangle
-                bx, by, bw, bh = smooth_box
+                bx, by, bw, bh = stability.boxes[0]
                 cv2.rectangle(display, (bx, by), (bx + bw, by + bh), (0, 255, 0), 2)
 
-                # check movement over recent centers
-                stable = False
-                if len(recent_centers) >= stable_required:
-                    dx = max(c[0] for c in recent_centers) - min(c[0] for c in recent_centers)
-                    dy = max(c[1] for c in recent_centers) - min(c[1] for c in recent_centers)
-                    # require both axes motion to be small to be considered stable
-                    if dx <= movement_threshold and dy <= movement_threshold:
-                        stable = True
-
                 # draw stability hint as annotation so it remains readable when mirrored
                 status_text = 'Stable' if stable else 'Hold still...'
                 color = (0, 255, 0) if stable else (0, 165, 255)
-                # use smoothed box coords for label placement when available
-                label_x, label_y = (bx, by) if last_box is not None else (x, y)
+                # use smoothed box coords for label placement
                 annotations.append({
                     'text': status_text,
-                    'pos': (label_x, label_y - 30),
+                    'pos': (bx, by - 30),
                     'font': cv2.FONT_HERSHEY_SIMPLEX,
                     'scale': 0.9,
                     'color': color,
@@ -210,10 +141,7 @@ def capture_face_image(wait_seconds=3, label=None):
                 # show a small circular preview of the face on the top-left
                 face_crop = crop_to_face(frame, (x, y, w, h), pad=0.2)
                 try:
-                    pil_crop = Image.fromarray(cv2.cvtColor(face_crop, cv2.COLOR_BGR2RGB))
-                    circ = circular_mask_image(pil_crop)
-                    circ = circ.resize((120, 120))
-                    circ_np = cv2.cvtColor(np.array(circ), cv2.COLOR_RGBA2BGRA)
+                    circ_np = stylize.circular(cv2.resize(face_crop, (120, 120)))
                     # paste preview into display (top-left corner)
                     h0, w0 = circ_np.shape[:2]
                     overlay = display.copy()
@@ -356,34 +284,10 @@ def capture_face_image(wait_seconds=3, label=None):
                         continue
 
                     # ensure the captured frame still has a detectable face
-                    if HAS_MEDIAPIPE and mp_detector is not None:
-                        try:
-                            rgb_final = cv2.cvtColor(frame2, cv2.COLOR_BGR2RGB)
-                            results_final = mp_detector.process(rgb_final)
-                            faces_final = []
-                            if results_final.detections:
-                                for det in results_final.detections:
-                                    bbox = det.location_data.relative_bounding_box
-                                    fx = int(bbox.xmin * frame2.shape[1])
-                                    fy = int(bbox.ymin * frame2.shape[0])
-                                    fw = int(bbox.width * frame2.shape[1])
-                                    fh = int(bbox.height * frame2.shape[0])
-                                    faces_final.append((fx, fy, fw, fh))
-                        except Exception:
-                            faces_final = []
-                    else:
-                        gray_final = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
-                        faces_final = face_cascade.detectMultiScale(
-                            gray_final,
-                            scaleFactor=1.1,
-                            minNeighbors=5,
-                            minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE),
-                        )
-
-                    if isinstance(faces_final, np.ndarray):
-                        faces_final = faces_final.tolist()
-                    elif not isinstance(faces_final, list):
-                        faces_final = list(faces_final)
+                    try:
+                        faces_final = detector.detect(frame2)
+                    except Exception:
+                        faces_final = []
                     if len(faces_final) == 0:
                         try:
                             cv2.destroyWindow(ready_win)
@@ -416,15 +320,10 @@ def capture_face_image(wait_seconds=3, label=None):
                         })
                     except Exception:
                         pass
-                    # keep showing last_box for a short smooth hold to prevent flicker
-                    if last_box is not None and last_seen < hold_frames:
-                        fb = display.copy()
-                        bx, by, bw, bh = last_box
-                        cv2.rectangle(fb, (bx, by), (bx + bw, by + bh), (0, 200, 0), 2)
-                        imshow_mirror('Face Capture', fb, annotations=annotations)
-                        last_seen += 1
-                    else:
-                        imshow_mirror('Face Capture', display, annotations=annotations)
+                    # keep showing the smoothed box to prevent flicker
+                    fb = display.copy()
+                    cv2.rectangle(fb, (bx, by), (bx + bw, by + bh), (0, 200, 0), 2)
+                    imshow_mirror('Face Capture', fb, annotations=annotations)
                     if cv2.waitKey(1) & 0xFF == 27:
                         break
 
@@ -442,31 +341,24 @@ def capture_face_image(wait_seconds=3, label=None):
                 })
             except Exception:
                 pass
-            # if detection disappeared this frame, optionally show the last_box for a few frames
-            if last_box is not None and len(faces) == 0:
-                # hold last box for a few frames to avoid flicker
-                if last_seen < hold_frames:
-                    bx, by, bw, bh = last_box
-                    fb = frame.copy()
-                    cv2.rectangle(fb, (bx, by), (bx + bw, by + bh), (0, 200, 0), 2)
-                    try:
-                        annotations.append({
-                            'text': lab,
-                            'pos': (10, 30),
-                            'font': cv2.FONT_HERSHEY_SIMPLEX,
-                            'scale': 0.9,
-                            'color': (255, 255, 255),
-                            'thickness': 2,
-                            'outline': True,
-                        })
-                    except Exception:
-                        pass
-                    imshow_mirror('Face Capture', fb, annotations=annotations)
-                    last_seen += 1
-                else:
-                    # give up holding after hold_frames
-                    last_box = None
-                    imshow_mirror('Face Capture', frame, annotations=annotations)
+            # if detection disappeared this frame, keep showing the last box for HOLD_SECONDS_SINGLE
+            if len(faces) == 0 and stability.miss(cap.timestamp):
+                bx, by, bw, bh = stability.boxes[0]
+                fb = frame.copy()
+                cv2.rectangle(fb, (bx, by), (bx + bw, by + bh), (0, 200, 0), 2)
+                try:
+                    annotations.append({
+                        'text': lab,
+                        'pos': (10, 30),
+                        'font': cv2.FONT_HERSHEY_SIMPLEX,
+                        'scale': 0.9,
+                        'color': (255, 255, 255),
+                        'thickness': 2,
+                        'outline': True,
+                    })
+                except Exception:
+                    pass
+                imshow_mirror('Face Capture', fb, annotations=annotations)
             else:
                 imshow_mirror('Face Capture', frame, annotations=annotations)
             if cv2.waitKey(1) & 0xFF == 27:  # ESC to quit
@@ -474,6 +366,7 @@ def capture_face_image(wait_seconds=3, label=None):
     finally:
         cap.release()
         cv2.destroyAllWindows()
+        detector.close()
 
     if captured is None or captured_face_box is None:
         raise RuntimeError('No frame captured')
@@ -481,32 +374,24 @@ def capture_face_image(wait_seconds=3, label=None):
     return captured, captured_face_box
 
 
-def capture_two_faces(wait_seconds=3, label1=None, label2=None):
+def capture_two_faces(wait_seconds=3, label1=None, label2=None, source=0):
     """Wait until two faces are detected, both stable and fully inside the frame,
     then perform a countdown and capture a single frame. Returns (frame, [face1, face2]).
     face entries are (x, y, w, h) for the two largest faces found.
+    source: camera index, video file or image sequence (see sources.open_source).
     """
-    cap = cv2.VideoCapture(0)
+    cap = open_source(source, loop=True, realtime=True)
     if not cap.isOpened():
         raise RuntimeError('Could not open camera')
-    face_cascade = cv2.CascadeClassifier(CASCADE_PATH)
-
-    if HAS_MEDIAPIPE:
-        mp_detector = mp_face_detection.FaceDetection(model_selection=0, min_detection_confidence=0.5)
-    else:
-        mp_detector = None
+    # benchmark detector backends on a real camera frame (only once per process)
+    ret, first = cap.read()
+    detector = select_detector([first] if ret else None)
     print('Looking for two faces. Press Ctrl+C to quit.')
 
     captured = None
     try:
-        recent_centers = []
-        stable_required = STABLE_REQUIRED
-        movement_threshold = MOVEMENT_THRESHOLD
-
-        last_boxes = None  # [(x1,y1,w1,h1),(x2,y2,w2,h2)]
-        last_seen = 0
-        hold_frames = HOLD_FRAMES_TWO
-        smooth_alpha = SMOOTH_ALPHA_TWO
+        # both faces share one time-based stability window (see stability.py)
+        stability = StabilityTracker(2, smooth_seconds=SMOOTH_SECONDS_TWO, hold_seconds=HOLD_SECONDS_TWO)
 
         # cache last display, previews, and annotations for hold logic
         last_preview1 = None
@@ -519,98 +404,37 @@ def capture_two_faces(wait_seconds=3, label1=None, label2=None):
             if not ret:
                 continue
 
-            if HAS_MEDIAPIPE and mp_detector is not None:
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = mp_detector.process(rgb)
-                faces = []
-                if results.detections:
-                    for det in results.detections:
-                        bbox = det.location_data.relative_bounding_box
-                        x = int(bbox.xmin * frame.shape[1])
-                        y = int(bbox.ymin * frame.shape[0])
-                        w = int(bbox.width * frame.shape[1])
-                        h = int(bbox.height * frame.shape[0])
-                        faces.append((x, y, w, h))
-            else:
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = list(face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE)))
+            faces = detector.detect(frame)
 
 
             if len(faces) >= 2:
                 # 始终按x坐标排序，左边的脸是player1，右边是player2
                 cand = sorted(faces, key=lambda r: r[0])[:2]
                 (x1, y1, w1, h1), (x2, y2, w2, h2) = cand
-                # 稳定性处理（平滑+deadzone）
-                if last_boxes is None:
-                    sb1 = (x1, y1, w1, h1)
-                    sb2 = (x2, y2, w2, h2)
-                else:
-                    (lx1, ly1, lw1, lh1), (lx2, ly2, lw2, lh2) = last_boxes
-                    def smooth_box(x, y, w, h, lx, ly, lw, lh):
-                        sx = int(lx * (1 - smooth_alpha) + x * smooth_alpha)
-                        sy = int(ly * (1 - smooth_alpha) + y * smooth_alpha)
-                        sw = int(lw * (1 - smooth_alpha) + w * smooth_alpha)
-                        sh = int(lh * (1 - smooth_alpha) + h * smooth_alpha)
-                        if abs(sx - lx) < MIN_BOX_CHANGE:
-                            sx = lx
-                        if abs(sy - ly) < MIN_BOX_CHANGE:
-                            sy = ly
-                        if abs(sw - lw) < MIN_BOX_CHANGE:
-                            sw = lw
-                        if abs(sh - lh) < MIN_BOX_CHANGE:
-                            sh = lh
-                        return (sx, sy, sw, sh)
-                    sb1 = smooth_box(x1, y1, w1, h1, lx1, ly1, lw1, lh1)
-                    sb2 = smooth_box(x2, y2, w2, h2, lx2, ly2, lw2, lh2)
+                # 稳定性处理（按时间窗口判定，平滑+deadzone）
+                stable = stability.update(cand, cap.timestamp)
+                sb1, sb2 = stability.boxes
 
                 # update previews only if faces detected和稳定，否则hold之前的
                 try:
                     crop1 = crop_to_face(frame, (x1, y1, w1, h1), pad=0.2)
                     crop2 = crop_to_face(frame, (x2, y2, w2, h2), pad=0.2)
-                    p1 = Image.fromarray(cv2.cvtColor(crop1, cv2.COLOR_BGR2RGB))
-                    p2 = Image.fromarray(cv2.cvtColor(crop2, cv2.COLOR_BGR2RGB))
-                    c1 = circular_mask_image(p1).resize((100, 100))
-                    c2 = circular_mask_image(p2).resize((100, 100))
-                    c1_np = cv2.cvtColor(np.array(c1), cv2.COLOR_RGBA2BGRA)
-                    c2_np = cv2.cvtColor(np.array(c2), cv2.COLOR_RGBA2BGRA)
+                    c1_np = stylize.circular(cv2.resize(crop1, (100, 100)))
+                    c2_np = stylize.circular(cv2.resize(crop2, (100, 100)))
                     last_preview1 = c1_np
                     last_preview2 = c2_np
                 except Exception:
                     pass
 
-                last_boxes = (sb1, sb2)
-                last_seen = 0
-
-                # use smoothed boxes for display and for stability tracking
+                # use smoothed boxes for display
                 x1, y1, w1, h1 = sb1
                 x2, y2, w2, h2 = sb2
                 display = frame.copy()
                 cv2.rectangle(display, (x1, y1), (x1 + w1, y1 + h1), (0, 255, 0), 2)
                 cv2.rectangle(display, (x2, y2), (x2 + w2, y2 + h2), (0, 255, 0), 2)
 
-                cx1, cy1 = x1 + w1 // 2, y1 + h1 // 2
-                cx2, cy2 = x2 + w2 // 2, y2 + h2 // 2
-                recent_centers.append(((cx1, cy1), (cx2, cy2)))
-                if len(recent_centers) > stable_required:
-                    recent_centers.pop(0)
-
-                stable1 = stable2 = False
-                if len(recent_centers) >= stable_required:
-                    xs1 = [c[0][0] for c in recent_centers]
-                    ys1 = [c[0][1] for c in recent_centers]
-                    xs2 = [c[1][0] for c in recent_centers]
-                    ys2 = [c[1][1] for c in recent_centers]
-                    dx1 = max(xs1) - min(xs1)
-                    dy1 = max(ys1) - min(ys1)
-                    dx2 = max(xs2) - min(xs2)
-                    dy2 = max(ys2) - min(ys2)
-                    if dx1 <= movement_threshold and dy1 <= movement_threshold:
-                        stable1 = True
-                    if dx2 <= movement_threshold and dy2 <= movement_threshold:
-                        stable2 = True
-
-                status_text = f"{'Stable' if (stable1 and stable2) else 'Hold still...'}"
-                color = (0, 255, 0) if (stable1 and stable2) else (0, 165, 255)
+                status_text = 'Stable' if stable else 'Hold still...'
+                color = (0, 255, 0) if stable else (0, 165, 255)
                 # collect annotations so text is rendered after any mirror flip
                 annotations = [
                     {
@@ -670,7 +494,7 @@ def capture_two_faces(wait_seconds=3, label1=None, label2=None):
                 fully1 = (x1 > margin and y1 > margin and x1 + w1 < frame.shape[1] - margin and y1 + h1 < frame.shape[0] - margin)
                 fully2 = (x2 > margin and y2 > margin and x2 + w2 < frame.shape[1] - margin and y2 + h2 < frame.shape[0] - margin)
 
-                if stable1 and stable2 and fully1 and fully2:
+                if stable and fully1 and fully2:
                     # build a ready display from raw frame without player labels
                     try:
                         disp_ready = frame.copy()
@@ -766,34 +590,10 @@ def capture_two_faces(wait_seconds=3, label1=None, label2=None):
                     if not ret2:
                         continue
 
-                    if HAS_MEDIAPIPE and mp_detector is not None:
-                        try:
-                            rgb_final = cv2.cvtColor(frame2, cv2.COLOR_BGR2RGB)
-                            results_final = mp_detector.process(rgb_final)
-                            faces_final = []
-                            if results_final.detections:
-                                for det in results_final.detections:
-                                    bbox = det.location_data.relative_bounding_box
-                                    fx = int(bbox.xmin * frame2.shape[1])
-                                    fy = int(bbox.ymin * frame2.shape[0])
-                                    fw = int(bbox.width * frame2.shape[1])
-                                    fh = int(bbox.height * frame2.shape[0])
-                                    faces_final.append((fx, fy, fw, fh))
-                        except Exception:
-                            faces_final = []
-                    else:
-                        gray_final = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
-                        faces_final = face_cascade.detectMultiScale(
-                            gray_final,
-                            scaleFactor=1.1,
-                            minNeighbors=5,
-                            minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE),
-                        )
-
-                    if isinstance(faces_final, np.ndarray):
-                        faces_final = faces_final.tolist()
-                    elif not isinstance(faces_final, list):
-                        faces_final = list(faces_final)
+                    try:
+                        faces_final = detector.detect(frame2)
+                    except Exception:
+                        faces_final = []
 
                     if len(faces_final) < 2:
                         try:
@@ -816,13 +616,11 @@ def capture_two_faces(wait_seconds=3, label1=None, label2=None):
                         break
 
             # show live frame while waiting for two faces
-            if last_display is not None and last_annotations is not None and last_boxes is not None and len(faces) < 2:
-                # hold时间加长，减少闪烁
-                if last_seen < hold_frames * 2:
+            if last_display is not None and last_annotations is not None and len(faces) < 2:
+                # hold时间加长（HOLD_SECONDS_TWO），减少闪烁
+                if stability.miss(cap.timestamp):
                     imshow_mirror('Face Capture', last_display, annotations=last_annotations)
-                    last_seen += 1
                 else:
-                    last_boxes = None
                     last_display = None
                     last_annotations = None
                     imshow_mirror('Face Capture', frame)
@@ -838,8 +636,8 @@ def capture_two_faces(wait_seconds=3, label1=None, label2=None):
         raise RuntimeError('No frame captured')
 
     # recompute faces on the captured frame to return accurate boxes
-    gray = cv2.cvtColor(captured, cv2.COLOR_BGR2GRAY)
-    faces = list(face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE)))
+    faces = detector.detect(captured)
+    detector.close()
     if len(faces) < 2:
         # fallback: return the two previously found areas (best-effort)
         return captured, []
@@ -861,123 +659,18 @@ def crop_to_face(frame, face_rect, pad=0.4):
 
 
 def circular_mask_image(pil_img):
-    w, h = pil_img.size
-    mask = Image.new('L', (w, h), 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse((0, 0, w, h), fill=255)
-    result = Image.new('RGBA', (w, h))
-    result.paste(pil_img.convert('RGBA'), (0, 0), mask=mask)
-    return result
+    """PIL wrapper around stylize.circular (circle-masked RGBA)."""
+    return stylize.to_pil(stylize.circular(stylize.from_pil(pil_img.convert('RGB'))))
 
 
 def stylize_rage_comic(pil_img):
-    # Produce a bold, high-contrast rage-comic style (black ink on white)
-    base = pil_img.convert('RGB')
-    base = ImageOps.fit(base, (512, 512))
-
-    # Use OpenCV bilateral filter to smooth colors while preserving edges
-    bgr = cv2.cvtColor(np.array(base), cv2.COLOR_RGB2BGR)
-    smooth = cv2.bilateralFilter(bgr, d=9, sigmaColor=75, sigmaSpace=75)
-
-    # Convert to grayscale and detect strong edges
-    gray = cv2.cvtColor(smooth, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, threshold1=50, threshold2=150)
-    # Thicken edges for bold comic ink
-    kernel = np.ones((3, 3), np.uint8)
-    edges = cv2.dilate(edges, kernel, iterations=2)
-
-    # Create white canvas and draw black edges
-    canvas = np.ones((512, 512, 3), dtype=np.uint8) * 255
-    canvas[edges != 0] = (0, 0, 0)
-
-    # Convert canvas to PIL and draw exaggerated comedic features
-    pil_canvas = Image.fromarray(cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)).convert('RGBA')
-    draw = ImageDraw.Draw(pil_canvas)
-    w, h = pil_canvas.size
-
-    # Exaggerated eyes with thick borders
-    eye_w = w // 6
-    eye_h = h // 6
-    lx = w // 3 - eye_w // 2
-    ly = h // 3 - eye_h // 2
-    rx = 2 * w // 3 - eye_w // 2
-    ry = ly
-    # thick black border then white fill
-    draw.ellipse((lx - 8, ly - 8, lx + eye_w + 8, ly + eye_h + 8), fill='black')
-    draw.ellipse((lx, ly, lx + eye_w, ly + eye_h), fill='white')
-    draw.ellipse((rx - 8, ry - 8, rx + eye_w + 8, ry + eye_h + 8), fill='black')
-    draw.ellipse((rx, ry, rx + eye_w, ry + eye_h), fill='white')
-    # pupils
-    pup_w = eye_w // 3
-    pup_h = eye_h // 3
-    draw.ellipse((lx + eye_w // 2 - pup_w // 2, ly + eye_h // 2 - pup_h // 2, lx + eye_w // 2 + pup_w // 2, ly + eye_h // 2 + pup_h // 2), fill='black')
-    draw.ellipse((rx + eye_w // 2 - pup_w // 2, ry + eye_h // 2 - pup_h // 2, rx + eye_w // 2 + pup_w // 2, ry + eye_h // 2 + pup_h // 2), fill='black')
-
-    # Angry eyebrows
-    draw.line((lx - 10, ly - 20, lx + eye_w + 10, ly - 5), fill='black', width=10)
-    draw.line((rx - 10, ry - 20, rx + eye_w + 10, ry - 5), fill='black', width=10)
-
-    # Big open mouth (black border with white inner and tooth lines)
-    mouth_w = w // 2
-    mouth_h = h // 5
-    mx = w // 2 - mouth_w // 2
-    my = 2 * h // 3 - mouth_h // 2
-    draw.ellipse((mx - 12, my - 12, mx + mouth_w + 12, my + mouth_h + 12), fill='black')
-    draw.ellipse((mx + 6, my + 6, mx + mouth_w - 6, my + mouth_h - 6), fill='white')
-    # teeth lines
-    teeth = 6
-    for i in range(1, teeth):
-        tx = mx + i * (mouth_w // teeth)
-        draw.line((tx, my + 6, tx, my + mouth_h - 6), fill='black', width=4)
-
-    return pil_canvas
+    """Bold, high-contrast rage-comic style (black ink on white), 512x512 RGBA."""
+    return stylize.to_pil(stylize.rage_comic(stylize.from_pil(pil_img)))
 
 
 def stylize_cute(pil_img):
     """Produce a cute, soft stylized avatar: smooth colors, big eyes, blush and a small smile."""
-    base = pil_img.convert('RGBA')
-    base = ImageOps.fit(base, (512, 512))
-
-    # smooth colors with bilateral filter
-    bgr = cv2.cvtColor(np.array(base.convert('RGB')), cv2.COLOR_RGB2BGR)
-    smooth = cv2.bilateralFilter(bgr, d=9, sigmaColor=100, sigmaSpace=75)
-    img = Image.fromarray(cv2.cvtColor(smooth, cv2.COLOR_BGR2RGB)).convert('RGBA')
-    draw = ImageDraw.Draw(img, 'RGBA')
-    w, h = img.size
-
-    # big white eyes
-    eye_r = w // 12
-    lx = w // 3
-    rx = 2 * w // 3
-    eye_y = h // 3
-    draw.ellipse((lx - eye_r, eye_y - eye_r, lx + eye_r, eye_y + eye_r), fill=(255, 255, 255, 255))
-    draw.ellipse((rx - eye_r, eye_y - eye_r, rx + eye_r, eye_y + eye_r), fill=(255, 255, 255, 255))
-
-    # pupils (slightly low for cute look)
-    pup_r = max(3, eye_r // 3)
-    draw.ellipse((lx - pup_r, eye_y, lx + pup_r, eye_y + pup_r * 2), fill=(40, 40, 40, 255))
-    draw.ellipse((rx - pup_r, eye_y, rx + pup_r, eye_y + pup_r * 2), fill=(40, 40, 40, 255))
-
-    # sparkles
-    draw.ellipse((lx + eye_r - 6, eye_y - eye_r + 6, lx + eye_r - 2, eye_y - eye_r + 10), fill=(255, 255, 255, 255))
-    draw.ellipse((rx - eye_r + 2, eye_y - eye_r + 6, rx - eye_r + 6, eye_y - eye_r + 10), fill=(255, 255, 255, 255))
-
-    # small smiling mouth (soft arc)
-    mx = w // 2
-    my = 2 * h // 3
-    mouth_box = (mx - 28, my - 8, mx + 28, my + 18)
-    draw.arc(mouth_box, start=0, end=180, fill=(150, 40, 80, 255), width=6)
-
-    # blush cheeks
-    blush_r = w // 18
-    draw.ellipse((lx - blush_r - 6, my - 4, lx - 6, my + blush_r), fill=(255, 140, 170, 120))
-    draw.ellipse((rx + 6, my - 4, rx + blush_r + 6, my + blush_r), fill=(255, 140, 170, 120))
-
-    # gentle warm overlay for pastel toning
-    overlay = Image.new('RGBA', img.size, (255, 240, 240, 30))
-    img = Image.alpha_composite(img, overlay)
-
-    return img
+    return stylize.to_pil(stylize.cute(stylize.from_pil(pil_img)))
 
 
 # Pixel-art stylizer function (map to small grid + palette)
@@ -986,82 +679,7 @@ def stylize_sprite(pil_img, sprite_size=32, scale=12, palette_mode='default'):
     sprite_size: the small pixel grid size (e.g., 24)
     scale: upscale factor for final PNG (sprite_size * scale)
     """
-    small = pil_img.convert('RGBA').resize((sprite_size, sprite_size), resample=Image.NEAREST)
-
-    # palette choices: default (reference) or 'cute' (pastel)
-    if palette_mode == 'cute':
-        palette = [
-            (70, 50, 30, 255),    # outline
-            (255, 220, 140, 255),  # soft yellow / skin
-            (220, 180, 90, 255),   # soft shadow
-            (255, 245, 200, 255),  # highlight
-            (255, 120, 170, 255),  # mouth pink
-            (255, 190, 210, 255),  # light pink
-            (120, 200, 140, 255),  # soft green eye
-            (180, 140, 110, 255),  # mid brown
-        ]
-    else:
-        # palette sampled/tuned to match the provided reference sprite
-        palette = [
-            (60, 48, 18, 255),     # dark outline / border
-            (245, 213, 40, 255),   # main yellow
-            (190, 144, 22, 255),   # darker side shade
-            (255, 245, 120, 255),  # highlight (bright yellow)
-            (206, 30, 130, 255),   # mouth magenta / dark pink
-            (255, 150, 200, 255),  # mouth light pink
-            (45, 95, 30, 255),     # green eye
-            (120, 110, 90, 255),   # mid brown / metal accent
-        ]
-
-    pal = np.array(palette, dtype=np.int32)
-    arr = np.array(small)
-    h, w = arr.shape[:2]
-    out = np.zeros((h, w, 4), dtype=np.uint8)
-    # Heuristics to force yellow style:
-    # - If pixel is bluish, map it toward yellow palette
-    # - Preserve pink/magenta for mouth if strongly pink
-    # - Preserve green for eyes if strongly green
-    for y in range(h):
-        for x in range(w):
-            px = arr[y, x]
-            # preserve transparency outside circular mask
-            if px[3] < 30:
-                out[y, x] = (0, 0, 0, 0)
-                continue
-            r, g, b, a = px
-
-            # detect mouth-like magenta/pink
-            if r > 180 and g < 120 and b > 130:
-                # map to mouth pinks in palette (index 4 or 5)
-                out[y, x] = palette[4] if r < 230 else palette[5]
-                continue
-
-            # detect green eyes
-            if g > 90 and r < 120 and b < 100:
-                out[y, x] = palette[6]
-                continue
-
-            # detect bluish pixels and remap toward yellow / pastel depending on mode
-            if b > r and b > g and b > 100:
-                out[y, x] = palette[3] if x > w * 0.6 else palette[1]
-                continue
-
-            # otherwise choose nearest yellow/brown in palette by color distance
-            d = np.sum((pal[:, :3] - px[:3]) ** 2, axis=1)
-            best = int(np.argmin(d))
-            out[y, x] = tuple(pal[best])
-
-    # Upscale using nearest neighbor to keep pixelated look
-    final = Image.fromarray(out, mode='RGBA').resize((sprite_size * scale, sprite_size * scale), resample=Image.NEAREST)
-
-    # Add a 1-pixel outline by detecting transparent->opaque edges
-    final_np = np.array(final)
-    alpha = final_np[:, :, 3]
-    edges = cv2.Canny(alpha, 1, 255)
-    edges = cv2.dilate(edges, np.ones((2, 2), np.uint8), iterations=1)
-    # paint edges dark
-    final_np[edges != 0] = (24, 24, 24, 255)
-    return Image.fromarray(final_np, mode='RGBA')
+    return stylize.to_pil(stylize.sprite(stylize.from_pil(pil_img.convert('RGBA')), sprite_size, scale, palette_mode))
 
 
 def make_rage_face():
@@ -1071,28 +689,15 @@ def make_rage_face():
         raise RuntimeError('No face detected')
 
     crop = crop_to_face(frame, face, pad=0.5)
-    pil = Image.fromarray(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
-    circ = circular_mask_image(pil)
-    # Create a hand-drawn line-art sketch for preview
-    def line_art(pil_img):
-        gray = pil_img.convert('L')
-        arr = np.array(gray)
-        gx = cv2.Sobel(arr, cv2.CV_64F, 1, 0, ksize=3)
-        gy = cv2.Sobel(arr, cv2.CV_64F, 0, 1, ksize=3)
-        edges = np.hypot(gx, gy)
-        edges = (edges / edges.max() * 255).astype(np.uint8)
-        sketch = Image.fromarray(edges).convert('L').point(lambda p: 255 if p > 50 else 0)
-        sketch = ImageOps.invert(sketch).convert('RGBA')
-        return sketch
-
-    # generate cute styled and sprite previews
-    styled = stylize_cute(circ)
-    sprite = stylize_sprite(circ, palette_mode='cute')
+    # circular original, cute styled and pixel sprite in one pass, all as BGRA arrays
+    styles = stylize.stylize_all(crop, styles=('circle', 'cute', 'sprite'), palette_mode='cute')
+    styled = styles['cute']
+    sprite = styles['sprite']
 
     # show side-by-side preview: original cropped circular image, cute styled, and pixel sprite
-    orig_np = cv2.cvtColor(np.array(circ.resize((512, 512))), cv2.COLOR_RGBA2BGRA)
-    styl_np = cv2.cvtColor(np.array(styled.resize((512, 512))), cv2.COLOR_RGBA2BGRA)
-    sprite_np = cv2.cvtColor(np.array(sprite.resize((512, 512))), cv2.COLOR_RGBA2BGRA)
+    orig_np = cv2.resize(styles['circle'], (512, 512))
+    styl_np = styled  # already 512x512
+    sprite_np = cv2.resize(sprite, (512, 512), interpolation=cv2.INTER_NEAREST)
 
     # compose a display image: left original, middle styled, right sprite
     display_h = 512
@@ -1103,7 +708,7 @@ def make_rage_face():
     display_img[:, 1024:1536] = sprite_np
 
     # convert to BGR for OpenCV display
-    display_bgr = cv2.cvtColor(display_img, cv2.COLOR_RGBA2BGR)
+    display_bgr = cv2.cvtColor(display_img, cv2.COLOR_BGRA2BGR)
     window_title = 'Capture Preview (original | stylized | sketch) - s=save, q=quit'
     imshow_mirror(window_title, display_bgr)
 
@@ -1130,8 +735,8 @@ def make_rage_face():
         # save sprite as primary output and also save styled version
         filename_sprite = os.path.join(out_dir, f'rage_face_sprite_{ts}.png')
         filename_styled = os.path.join(out_dir, f'rage_face_{ts}.png')
-        sprite.save(filename_sprite)
-        styled.save(filename_styled)
+        cv2.imwrite(filename_sprite, sprite)
+        cv2.imwrite(filename_styled, styled)
         print('Saved:', filename_sprite, filename_styled)
         return filename_sprite
     else:
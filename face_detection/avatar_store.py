@@ -0,0 +1,237 @@
+"""头像库：认出回头客，直接复用他们上次的头像
+
+每个捕获过的玩家在 outputs 目录里留一张圆形头像 PNG 和一个很小的人脸描述子
+（人脸框裁成 24x24 灰度图、直方图均衡、去均值后归一化的向量，本地计算，不联网）。
+捕获场景每拿到一帧就和库里的描述子比一比（余弦相似度），连续几帧都认出同一批人时
+直接用他们的头像开局，不用再等稳定和倒计时。
+
+索引存在 outputs/index.json，按最近使用顺序排列；超过 AVATAR_STORE_SIZE 个时删掉
+最久没用的头像。没进库的 Face1_avatar_<ts>.png 之类的旧文件也算进上限，先删最旧的。
+"""
+import base64
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, os.pardir))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from settings import AVATAR_STORE_SIZE  # noqa: E402
+from face_detection.Face_Detection import crop_to_face, ensure_outputs_dir  # noqa: E402
+from face_detection.face_login_demo import save_avatar_set  # noqa: E402
+
+DESCRIPTOR_SIZE = 24
+# 余弦相似度达到这个值才算同一个人（同一个人在同一台机器前通常在 0.93 以上）
+MATCH_THRESHOLD = 0.9
+# 认出来之后新描述子占的比例，让库里的描述子慢慢跟上发型、光线的变化
+BLEND = 0.2
+INDEX_NAME = 'index.json'
+
+
+def face_descriptor(frame, box):
+    """(x, y, w, h) 人脸框的描述子：float32 单位向量；框太小或在画面外时返回 None"""
+    x, y, w, h = (int(v) for v in box)
+    fh, fw = frame.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(fw, x + w), min(fh, y + h)
+    if x1 - x0 < 8 or y1 - y0 < 8:
+        return None
+    gray = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+    thumb = cv2.resize(gray, (DESCRIPTOR_SIZE, DESCRIPTOR_SIZE), interpolation=cv2.INTER_AREA)
+    vec = cv2.equalizeHist(thumb).astype(np.float32).ravel()
+    vec -= vec.mean()
+    norm = float(np.linalg.norm(vec))
+    if norm < 1e-6:
+        return None
+    return vec / norm
+
+
+def _encode(vec):
+    return base64.b64encode(vec.astype(np.float32).tobytes()).decode('ascii')
+
+
+def _decode(text):
+    return np.frombuffer(base64.b64decode(text), dtype=np.float32).copy()
+
+
+class AvatarStore:
+    """outputs 目录里的头像和描述子，按最近使用淘汰
+
+    Args:
+        directory: 头像目录，None 时用 face_detection/outputs
+        capacity: 最多保留的头像数
+        threshold: 认人的余弦相似度阈值
+    """
+
+    def __init__(self, directory=None, capacity=AVATAR_STORE_SIZE, threshold=MATCH_THRESHOLD):
+        self.directory = directory or ensure_outputs_dir()
+        self.capacity = max(1, capacity)
+        self.threshold = threshold
+        self.entries = OrderedDict()  # id -> 条目，最久没用的在前
+        self._surfaces = OrderedDict()
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._ids = []
+        self._load()
+        with self._lock:
+            self._evict()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for item in sorted(data.get('entries', []), key=lambda e: e.get('last_used', 0)):
+            try:
+                item['vector'] = _decode(item['descriptor'])
+            except Exception:
+                continue
+            if item['vector'].size == DESCRIPTOR_SIZE * DESCRIPTOR_SIZE and os.path.exists(self._path(item)):
+                self.entries[item['id']] = item
+
+    def _save(self):
+        data = {'entries': [{k: v for k, v in e.items() if k != 'vector'} for e in self.entries.values()]}
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.index_path)
+        self._matrix = None
+
+    def _path(self, entry):
+        return os.path.join(self.directory, entry['file'])
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ---- 认人 ----
+
+    def recognise(self, descriptors):
+        """为每个描述子找库里的同一个人，返回 id 列表（认不出的为 None，不同的脸不会对到同一个 id）"""
+        result = [None] * len(descriptors)
+        with self._lock:
+            if not self.entries:
+                return result
+            if self._matrix is None:
+                self._ids = list(self.entries)
+                self._matrix = np.stack([self.entries[i]['vector'] for i in self._ids])
+            ids, matrix = self._ids, self._matrix
+        rows = [i for i, d in enumerate(descriptors) if d is not None]
+        if not rows:
+            return result
+        scores = np.stack([descriptors[i] for i in rows]) @ matrix.T
+        # 贪心配对：每次取剩下的最高分
+        while True:
+            r, c = np.unravel_index(np.argmax(scores), scores.shape)
+            if scores[r, c] < self.threshold:
+                break
+            result[rows[r]] = ids[c]
+            scores[r, :] = -1.0
+            scores[:, c] = -1.0
+        return result
+
+    def use(self, ids, descriptors=None):
+        """认出的 id 记为刚用过（描述子往新的方向挪一点），返回它们的头像路径"""
+        paths = []
+        with self._lock:
+            for i, entry_id in enumerate(ids):
+                entry = self.entries[entry_id]
+                self.entries.move_to_end(entry_id)
+                entry['last_used'] = time.time()
+                entry['uses'] = entry.get('uses', 0) + 1
+                if descriptors is not None and descriptors[i] is not None:
+                    vec = entry['vector'] * (1 - BLEND) + descriptors[i] * BLEND
+                    entry['vector'] = vec / max(float(np.linalg.norm(vec)), 1e-6)
+                    entry['descriptor'] = _encode(entry['vector'])
+                paths.append(self._path(entry))
+            self._save()
+        return paths
+
+    def add(self, frame, box, label='Face', descriptor=None):
+        """保存一张新头像，返回路径；库满时淘汰最久没用的"""
+        if descriptor is None:
+            descriptor = face_descriptor(frame, box)
+        entry_id = uuid.uuid4().hex[:12]
+        entry = {'id': entry_id, 'file': f'{label}_avatar_{entry_id}.png', 'label': label}
+        # 编码 PNG 不需要持锁；和其他头像一样经 save_avatar_set 限制在 MAX_AVATAR 以内
+        stem = os.path.splitext(self._path(entry))[0]
+        save_avatar_set(crop_to_face(frame, box, pad=0.5), stem, sizes=())
+        if descriptor is None:
+            # 描述子算不出来就只当普通头像用，不进库（按旧文件一样计入上限）
+            return self._path(entry)
+        now = time.time()
+        entry.update(created=now, last_used=now, uses=1, descriptor=_encode(descriptor), vector=descriptor)
+        with self._lock:
+            self.entries[entry_id] = entry
+            self._evict()
+            self._save()
+        return self._path(entry)
+
+    def _remove(self, name):
+        path = os.path.join(self.directory, name)
+        self._surfaces.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        while len(self.entries) > self.capacity:
+            _, entry = self.entries.popitem(last=False)
+            self._remove(entry['file'])
+        # 没进库的旧头像文件也算进上限，先删最旧的
+        tracked = {e['file'] for e in self.entries.values()}
+        loose = [p for p in glob.glob(os.path.join(self.directory, '*_avatar_*.png'))
+                 if os.path.basename(p) not in tracked]
+        excess = len(tracked) + len(loose) - self.capacity
+        if excess > 0:
+            loose.sort(key=os.path.getmtime)
+            for path in loose[:excess]:
+                self._remove(os.path.basename(path))
+
+    # ---- 头像 Surface ----
+
+    def surface(self, path, loader):
+        """回头客的头像 Surface 在进程里留着，下一局不用再读盘、缩放"""
+        with self._lock:
+            surf = self._surfaces.get(path)
+            if surf is not None:
+                self._surfaces.move_to_end(path)
+                return surf
+        surf = loader(path)
+        if surf is None:
+            return None
+        with self._lock:
+            self._surfaces[path] = surf
+            while len(self._surfaces) > self.capacity:
+                self._surfaces.popitem(last=False)
+        return surf
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def avatar_store():
+    """进程内共享的头像库；AVATAR_STORE_SIZE 为 0 时返回 None"""
+    global _store
+    if AVATAR_STORE_SIZE <= 0:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = AvatarStore()
+        return _store
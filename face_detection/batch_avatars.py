@@ -0,0 +1,201 @@
+"""批量生成头像（比赛报名用）
+
+一帧画面里检测最多 N 张脸，每张脸的 圆形遮罩 → 缩放 → 保存 PNG 交给线程池（或进程池）
+并行处理。每个人除了原尺寸头像，还直接写出游戏里用的预缩放版本（face_login_demo.AVATAR_SIZES：
+80px 是 main.load_avatar_surface 的显示尺寸，30px 是画在角色身体中间的大小）。
+加 --register 时同时把每个人存进头像库（avatar_store），开局捕获时直接认出来。
+
+    python -m face_detection.batch_avatars --camera --max-faces 8
+    python -m face_detection.batch_avatars --camera --source signup.mp4   # 录好的视频代替摄像头
+    python -m face_detection.batch_avatars group1.jpg group2.jpg --out face_detection/outputs/bracket
+    python -m face_detection.batch_avatars --bench 16      # 合成画面，对比串行和并行的耗时
+
+输出按从上到下、从左到右编号：P01_avatar.png、P01_avatar_80.png、P01_avatar_30.png ...
+"""
+import argparse
+import concurrent.futures
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, os.pardir))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from face_detection.Face_Detection import crop_to_face, ensure_outputs_dir  # noqa: E402
+from face_detection.detectors import select_detector  # noqa: E402
+from face_detection.sources import open_source  # noqa: E402
+from face_detection.stability import StabilityTracker  # noqa: E402
+from face_detection.face_login_demo import AVATAR_SIZES, save_avatar_set  # noqa: E402
+
+MAX_FACES = 16
+
+
+def order_faces(faces):
+    """按行（从上到下）再按列（从左到右）排序；行高取人脸框高度的中位数"""
+    if not faces:
+        return []
+    row = max(1, int(np.median([h for _, _, _, h in faces])))
+    return sorted(faces, key=lambda r: ((r[1] + r[3] // 2) // row, r[0]))
+
+
+def pick_faces(faces, max_faces):
+    """取最大的 max_faces 张脸，再按报名顺序排好"""
+    return order_faces(sorted(faces, key=lambda r: r[2] * r[3], reverse=True)[:max_faces])
+
+
+def make_batch(jobs, out_dir, sizes=AVATAR_SIZES, workers=None, processes=False, store=None):
+    """并行生成一批头像
+
+    Args:
+        jobs: [(frame, face_box, name), ...]，name 是文件名前缀（如 'P01'）
+        out_dir: 输出目录
+        sizes: 除原尺寸外再写出的预缩放尺寸
+        workers: 线程 / 进程数，None 时用 CPU 核数
+        processes: True 时用进程池（裁剪在主进程做，只把小图传过去）
+        store: 头像库，给出时每个人同时存进库里（只在线程里做，库不跨进程）
+
+    Returns:
+        每个人写出的路径列表，顺序与 jobs 相同
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    pool_type = concurrent.futures.ProcessPoolExecutor if processes else concurrent.futures.ThreadPoolExecutor
+    with pool_type(max_workers=workers) as pool:
+        futures = [pool.submit(save_avatar_set, crop_to_face(frame, box, pad=0.5).copy(),
+                               os.path.join(out_dir, f'{name}_avatar'), sizes)
+                   for frame, box, name in jobs]
+        if store is not None:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as store_pool:
+                list(store_pool.map(lambda job: store.add(job[0], job[1], job[2]), jobs))
+        return [f.result() for f in futures]
+
+
+def wait_for_group(cap, detector, max_faces, min_faces=1, wait_seconds=3.0):
+    """读摄像头直到人数不变且所有人都站稳，再等 wait_seconds 倒计时，返回 (画面, 人脸框)
+
+    cap 是 sources.FrameSource；站稳和倒计时都按画面时间戳算（回放录像时用录像里的时间）。
+    """
+    tracker = None
+    locked_at = None
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            raise RuntimeError('Camera read failed')
+        now = cap.timestamp
+        faces = pick_faces(detector.detect(frame), max_faces)
+        if len(faces) < min_faces or (tracker is not None and tracker.count != len(faces)):
+            tracker = None
+            if locked_at is not None:
+                print('Group moved, waiting again...')
+            locked_at = None
+        if len(faces) >= min_faces and tracker is None:
+            tracker = StabilityTracker(len(faces))
+        stable = tracker is not None and tracker.update(faces, now)
+        if stable and locked_at is None:
+            locked_at = now
+            print(f'{len(faces)} faces steady, capturing in {wait_seconds:g}s...')
+        if locked_at is not None and now - locked_at >= wait_seconds:
+            if stable:
+                return frame, faces
+            locked_at = None
+
+
+def synthetic_group(count, face=120, seed=0):
+    """合成 count 张"脸"排成几行的画面（给 --bench 用）"""
+    rng = np.random.default_rng(seed)
+    cols = min(count, 6)
+    rows = (count + cols - 1) // cols
+    gap = face // 2
+    frame = np.full((rows * (face + gap) + gap, cols * (face + gap) + gap, 3), 80, np.uint8)
+    faces = []
+    for i in range(count):
+        x = gap + (i % cols) * (face + gap)
+        y = gap + (i // cols) * (face + gap)
+        patch = rng.integers(0, 255, (8, 8, 3), dtype=np.uint8)
+        frame[y:y + face, x:x + face] = cv2.resize(patch, (face, face), interpolation=cv2.INTER_CUBIC)
+        faces.append((x, y, face, face))
+    return frame, faces
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch avatar generation for tournament sign-up')
+    parser.add_argument('images', nargs='*', help='group photos to take faces from')
+    parser.add_argument('--camera', action='store_true', help='capture one group shot from the webcam')
+    parser.add_argument('--source', default='0', help='camera index, video file or image sequence for --camera')
+    parser.add_argument('--max-faces', type=int, default=MAX_FACES)
+    parser.add_argument('--wait', type=float, default=3.0, help='countdown once the group is steady (camera)')
+    parser.add_argument('--out', default=None, help='output directory (default: outputs/batch_<timestamp>)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--processes', action='store_true', help='use a process pool instead of threads')
+    parser.add_argument('--register', action='store_true', help='also add every face to the avatar store')
+    parser.add_argument('--bench', type=int, default=0, metavar='N', help='time serial vs parallel on N synthetic faces')
+    args = parser.parse_args(argv)
+
+    out_dir = args.out or os.path.join(ensure_outputs_dir(), f'batch_{int(time.time())}')
+
+    if args.bench:
+        frame, faces = synthetic_group(args.bench)
+        jobs = [(frame, box, f'P{i + 1:02d}') for i, box in enumerate(faces)]
+        make_batch(jobs[:1], out_dir, workers=1)  # 预热（编解码器初始化）
+        t0 = time.perf_counter()
+        make_batch(jobs, out_dir, workers=1)
+        serial = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        make_batch(jobs, out_dir, workers=args.workers, processes=args.processes)
+        parallel = time.perf_counter() - t0
+        print(f'{len(jobs)} faces: serial {serial * 1e3:.0f} ms, parallel {parallel * 1e3:.0f} ms '
+              f'({serial / parallel:.1f}x, {args.workers or os.cpu_count()} workers) -> {out_dir}')
+        return
+
+    if not args.camera and not args.images:
+        parser.error('give group photos or --camera')
+
+    detector = select_detector()
+    frames = []
+    if args.camera:
+        cap = open_source(args.source, realtime=True)
+        if not cap.isOpened():
+            raise SystemExit('Could not open camera')
+        try:
+            frames.append(wait_for_group(cap, detector, args.max_faces, wait_seconds=args.wait))
+        finally:
+            cap.release()
+    for path in args.images:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f'Skipping unreadable image: {path}')
+            continue
+        frames.append((frame, pick_faces(detector.detect(frame), args.max_faces)))
+    detector.close()
+
+    jobs = []
+    for frame, faces in frames:
+        for box in faces:
+            jobs.append((frame, box, f'P{len(jobs) + 1:02d}'))
+    if not jobs:
+        raise SystemExit('No faces found')
+
+    store = None
+    if args.register:
+        from face_detection.avatar_store import avatar_store
+        store = avatar_store()
+        if store is None:
+            print('Avatar store is disabled (KOP_AVATAR_STORE=0); not registering')
+        elif len(jobs) > store.capacity:
+            print(f'Avatar store keeps {store.capacity} players; raise KOP_AVATAR_STORE to register all {len(jobs)}')
+
+    t0 = time.perf_counter()
+    results = make_batch(jobs, out_dir, workers=args.workers, processes=args.processes, store=store)
+    elapsed = time.perf_counter() - t0
+    for (_, _, name), paths in zip(jobs, results):
+        print(name, ', '.join(os.path.basename(p) for p in paths))
+    print(f'{len(jobs)} avatars in {elapsed * 1e3:.0f} ms -> {out_dir}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""离线回放录像，测人脸捕获每个阶段的耗时和锁定时间
+
+不开窗口、不用摄像头：按录像的帧逐帧走一遍捕获流程（和 capture_scene 一样的 FaceTracker），
+统计每个阶段的耗时：
+
+    read      读帧 / 解码
+    detect    人脸检测（后端和游戏里一样由 select_detector 选，第一帧测速不计入）
+    track     平滑、稳定判定
+    avatar    锁定那一帧的裁剪 + 圆形遮罩（make_avatar_image）
+    encode    头像 PNG 编码
+    descriptor 头像库的人脸描述子
+
+time-to-lock 是从录像开头到 FaceTracker 第一次 ready（稳定且完整在画面内）的录像时间。
+稳定判定按画面时间戳算（stability.py），所以结果和机器快慢无关，改了 KOP_STABLE_SECONDS
+之类的参数可以直接对比。录像可以是视频文件、图片目录或通配符
+（见 sources.open_source）。
+
+    python -m face_detection.bench_capture clips/two_players.mp4 --faces 2
+    python -m face_detection.bench_capture clips/*.mp4 --json bench.json --max-lock 2.5
+
+有录像没锁定（或锁定晚于 --max-lock 秒）时退出码为 1，可以放进 CI。
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, os.pardir))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from face_detection.avatar_store import face_descriptor  # noqa: E402
+from face_detection.capture_scene import FaceTracker  # noqa: E402
+from face_detection.detectors import select_detector  # noqa: E402
+from face_detection.face_login_demo import make_avatar_image  # noqa: E402
+from face_detection.sources import open_source  # noqa: E402
+
+STAGES = ('read', 'detect', 'track', 'avatar', 'encode', 'descriptor')
+
+
+def _summary(samples):
+    if not samples:
+        return None
+    ms = np.asarray(samples) * 1000
+    return {'mean_ms': round(float(ms.mean()), 3), 'p95_ms': round(float(np.percentile(ms, 95)), 3),
+            'count': len(samples)}
+
+
+def bench_clip(spec, faces=2, backend='auto', fps=None, full=False):
+    """回放一段录像，返回这段的统计（dict）
+
+    full=False 时锁定后就停；True 时读完整段（看检测在整段录像上的耗时）。
+    """
+    source = open_source(spec, fps=fps)
+    if not source.isOpened():
+        raise RuntimeError(f'Could not open {spec!r}')
+    times = {name: [] for name in STAGES}
+    tracker = FaceTracker(faces)
+    detector = None
+    lock = None
+    frame_size = None
+    t_start = time.perf_counter()
+    try:
+        while True:
+            t0 = time.perf_counter()
+            ret, frame = source.read()
+            t1 = time.perf_counter()
+            if not ret:
+                break
+            times['read'].append(t1 - t0)
+            if detector is None:
+                detector = select_detector([frame], backend=backend)
+                frame_size = (frame.shape[1], frame.shape[0])
+                t1 = time.perf_counter()
+            found = detector.detect(frame)
+            t2 = time.perf_counter()
+            ready = tracker.update(found, frame_size, source.timestamp)
+            t3 = time.perf_counter()
+            times['detect'].append(t2 - t1)
+            times['track'].append(t3 - t2)
+            if ready and lock is None:
+                lock = {'frame': source.index, 'seconds': round(source.timestamp, 3)}
+                for box in tracker.picked:
+                    t0 = time.perf_counter()
+                    avatar = make_avatar_image(frame, box)
+                    t1 = time.perf_counter()
+                    cv2.imencode('.png', avatar)
+                    t2 = time.perf_counter()
+                    face_descriptor(frame, box)
+                    t3 = time.perf_counter()
+                    times['avatar'].append(t1 - t0)
+                    times['encode'].append(t2 - t1)
+                    times['descriptor'].append(t3 - t2)
+                if not full:
+                    break
+    finally:
+        source.release()
+        if detector is not None:
+            detector.close()
+    return {
+        'source': str(spec),
+        'detector': detector.name if detector is not None else None,
+        'fps': source.fps,
+        'frames': source.index,
+        'lock': lock,
+        'wall_s': round(time.perf_counter() - t_start, 3),
+        'stages': {name: _summary(samples) for name, samples in times.items()},
+    }
+
+
+def _print_result(result):
+    lock = result['lock']
+    lock_text = f"locked at {lock['seconds']:.2f}s (frame {lock['frame']})" if lock else 'never locked'
+    print(f"{result['source']}: {result['frames']} frames @ {result['fps']:g}fps, "
+          f"{result['detector']}, {lock_text}, {result['wall_s'] * 1000:.0f} ms wall")
+    for name, stats in result['stages'].items():
+        if stats:
+            print(f"  {name:10s} mean {stats['mean_ms']:7.2f} ms   p95 {stats['p95_ms']:7.2f} ms   n={stats['count']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded clips through the face capture pipeline')
+    parser.add_argument('clips', nargs='+', help='video files, image directories or glob patterns')
+    parser.add_argument('--faces', type=int, default=2, choices=(1, 2), help='players to lock on')
+    parser.add_argument('--detector', default='auto', help='detector backend (default: auto selection)')
+    parser.add_argument('--fps', type=float, default=None, help='frame rate for image sequences (default 30)')
+    parser.add_argument('--full', action='store_true', help='keep reading after the lock')
+    parser.add_argument('--max-lock', type=float, default=None, metavar='S',
+                        help='fail when a clip locks later than S seconds')
+    parser.add_argument('--json', default=None, help='write the results to this file')
+    args = parser.parse_args(argv)
+
+    results = []
+    failed = False
+    for spec in args.clips:
+        result = bench_clip(spec, faces=args.faces, backend=args.detector, fps=args.fps, full=args.full)
+        _print_result(result)
+        lock = result['lock']
+        if lock is None or (args.max_lock is not None and lock['seconds'] > args.max_lock):
+            failed = True
+        results.append(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'clips': results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
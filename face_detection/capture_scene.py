@@ -0,0 +1,443 @@
+"""游戏内人脸捕获
+
+摄像头预览、人脸框、稳定提示和倒计时直接画在游戏自己的 pygame 窗口里，
+不再弹出 cv2.imshow 窗口，也不用 cv2.waitKey 控制节奏：
+
+    - CameraFeed 在后台线程读摄像头、检测人脸，并把镜像后的画面缩放写进预先分配的
+      NumPy 缓冲区（双缓冲）。每个缓冲区只在第一次拿到画面时用 pygame.image.frombuffer
+      包成 Surface（共享内存，不复制），之后主循环只需要 blit。
+    - FaceTracker 按摄像头帧平滑人脸框、判断是否稳定并完整地在画面里。
+    - FaceCaptureScene 是场景栈里的一个场景：人脸稳定后显示 "ready"、倒计时，
+      然后用最新一帧在后台线程生成圆形头像。ESC 取消倒计时；搜索阶段按 ESC 跳过捕获。
+      给了头像库（avatar_store.AvatarStore）时，搜索阶段连续几帧认出的都是老玩家就
+      直接用他们上次的头像，不等倒计时。
+
+稳定判定和人脸框平滑按画面时间戳算，参数在 stability.py。
+"""
+import math
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, os.pardir))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from settings import *  # noqa: E402
+from game.scenes import Scene  # noqa: E402
+from utils.text_cache import render_text  # noqa: E402
+from face_detection.stability import (  # noqa: E402
+    HOLD_SECONDS_SINGLE, HOLD_SECONDS_TWO, SMOOTH_SECONDS_SINGLE, SMOOTH_SECONDS_TWO, StabilityTracker,
+)
+from face_detection.Face_Detection import (  # noqa: E402
+    MIRROR_PREVIEW,
+)
+from face_detection.detectors import select_detector  # noqa: E402
+from face_detection.sources import open_source  # noqa: E402
+from face_detection.face_login_demo import save_avatars  # noqa: E402
+from face_detection.avatar_store import face_descriptor  # noqa: E402
+
+# 捕获流程的阶段
+SEARCH, READY, COUNTDOWN, CAPTURE, SAVING = range(5)
+READY_SECONDS = 1.0
+RECOGNISE_FRAMES = 5  # 连续这么多个摄像头帧认出同一批人才复用头像
+PREVIEW_SIZE = 100
+BOX_COLOR = (0, 255, 0)
+HOLD_COLOR = (0, 200, 0)
+WAIT_COLOR = (255, 165, 0)
+
+
+class CameraFeed:
+    """后台线程读摄像头并检测人脸，画面写进可以直接 blit 的 Surface
+
+    Args:
+        max_size: 预览画面的最大尺寸，按摄像头画面的宽高比缩放
+        source: 摄像头编号、录像或图片序列（见 sources.open_source；录像按帧率循环播放）
+        mirror: 预览是否镜像（自拍视角）；人脸框坐标仍然是原始画面的坐标
+    """
+
+    def __init__(self, max_size, source=CAMERA_SOURCE, mirror=MIRROR_PREVIEW):
+        self.max_size = max_size
+        self.source = source
+        self.mirror = mirror
+        self.size = None        # 预览尺寸（第一帧之后才知道）
+        self.frame_size = None  # 原始画面尺寸
+        self.scale = 1.0
+        self.error = None
+        self._buffers = None
+        self._surfaces = None
+        self._latest = 0
+        self._frame = None
+        self._faces = []
+        self._stamp = 0.0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.detector = None
+
+        # 统计（只读）
+        self.frames = 0
+        self.detect_time = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='CameraFeed', daemon=True)
+            self._thread.start()
+        return self
+
+    def _allocate(self, frame):
+        fh, fw = frame.shape[:2]
+        scale = min(self.max_size[0] / fw, self.max_size[1] / fh)
+        w, h = max(1, int(fw * scale)), max(1, int(fh * scale))
+        self._buffers = [np.zeros((h, w, 3), dtype=np.uint8) for _ in range(2)]
+        self._surfaces = [pygame.image.frombuffer(buf, (w, h), 'BGR') for buf in self._buffers]
+        self.frame_size = (fw, fh)
+        self.scale = scale
+        self.size = (w, h)
+
+    def _run(self):
+        # 打开摄像头可能要一秒多，放在线程里做，场景照常刷新
+        cap = None
+        try:
+            cap = open_source(self.source, loop=True, realtime=True)
+            if not cap.isOpened():
+                self.error = 'Could not open camera'
+                return
+            detector = None
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    self._stop.wait(0.01)
+                    continue
+                if detector is None:
+                    # 第一帧用来给检测后端测速（每个进程只测一次）
+                    detector = self.detector = select_detector([frame])
+                t0 = time.perf_counter()
+                faces = detector.detect(frame)
+                self.detect_time += time.perf_counter() - t0
+                if self._buffers is None:
+                    self._allocate(frame)
+                target = 1 - self._latest
+                buf = self._buffers[target]
+                cv2.resize(frame, self.size, dst=buf)
+                if self.mirror:
+                    cv2.flip(buf, 1, dst=buf)
+                with self._lock:
+                    self._latest = target
+                    self._frame = frame
+                    self._faces = faces
+                    self._stamp = cap.timestamp
+                    self._seq += 1
+                self.frames += 1
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if cap is not None:
+                cap.release()
+            if self.detector is not None:
+                self.detector.close()
+
+    def latest(self):
+        """返回 (序号, 原始画面, 人脸框列表, 画面时间戳)；还没有画面时序号为 0"""
+        with self._lock:
+            return self._seq, self._frame, self._faces, self._stamp
+
+    def to_display(self, box):
+        """原始画面里的 (x, y, w, h) 换算成预览画面里的 Rect（考虑镜像）"""
+        x, y, w, h = box
+        if self.mirror:
+            x = self.frame_size[0] - x - w
+        s = self.scale
+        return pygame.Rect(int(x * s), int(y * s), max(1, int(w * s)), max(1, int(h * s)))
+
+    def draw(self, screen, pos):
+        """把最新画面画到 screen 上；还没有画面时返回 False"""
+        with self._lock:
+            if not self._seq:
+                return False
+            screen.blit(self._surfaces[self._latest], pos)
+        return True
+
+    def crop(self, rect, size):
+        """从预览画面裁出 rect（预览坐标）并缩放到 size，返回新 Surface"""
+        with self._lock:
+            if not self._seq:
+                return None
+            surface = self._surfaces[self._latest]
+            rect = rect.clip(surface.get_rect())
+            if rect.width <= 0 or rect.height <= 0:
+                return None
+            return pygame.transform.smoothscale(surface.subsurface(rect), size)
+
+    def close(self):
+        # 不等线程退出（正在读的那一帧读完后自己释放摄像头），切换场景不卡顿
+        self._stop.set()
+        self._thread = None
+
+
+class FaceTracker:
+    """按摄像头帧跟踪 count 张脸：平滑人脸框、判断是否稳定、检测短暂丢失时保留上一次的框
+    （稳定判定和平滑按时间算，见 stability.StabilityTracker）
+
+    单人取最大的一张脸；双人按 x 坐标取左边两张（左边是玩家 1）。
+    """
+
+    def __init__(self, count):
+        self.count = count
+        if count == 1:
+            self.stability = StabilityTracker(1, smooth_seconds=SMOOTH_SECONDS_SINGLE, hold_seconds=HOLD_SECONDS_SINGLE)
+        else:
+            self.stability = StabilityTracker(count, smooth_seconds=SMOOTH_SECONDS_TWO, hold_seconds=HOLD_SECONDS_TWO)
+        self.margin = 8 if count == 1 else 5
+        self.reset()
+
+    def reset(self):
+        self.stability.reset()
+        self.picked = None    # 这一帧选中的原始人脸框（没检测全时为 None）
+        self.missing = 0      # 连续没检测到的帧数
+        self.ready = False
+
+    @property
+    def boxes(self):
+        """平滑后的人脸框（用来画）；丢失超过保留时间后为 None"""
+        return self.stability.boxes
+
+    @property
+    def stable(self):
+        return self.stability.stable
+
+    def _pick(self, faces):
+        if self.count == 1:
+            return [max(faces, key=lambda r: r[2] * r[3])]
+        return sorted(faces, key=lambda r: r[0])[:self.count]
+
+    def update(self, faces, frame_size, now):
+        """输入一帧的检测结果和画面时间戳（秒）；所有人脸都稳定且完整在画面内时返回 True"""
+        if len(faces) < self.count:
+            self.picked = None
+            self.missing += 1
+            self.stability.miss(now)
+            self.ready = False
+            return False
+
+        picked = self.picked = self._pick(faces)
+        self.missing = 0
+        stable = self.stability.update(picked, now)
+
+        fw, fh = frame_size
+        m = self.margin
+        inside = all(x > m and y > m and x + w < fw - m and y + h < fh - m for x, y, w, h in picked)
+        self.ready = stable and inside
+        return self.ready
+
+
+def _circle_mask(size):
+    mask = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(mask, (255, 255, 255, 255), (size // 2, size // 2), size // 2)
+    return mask
+
+
+class FaceCaptureScene(Scene):
+    """在游戏窗口里捕获玩家头像
+
+    Args:
+        on_done: 完成或跳过时调用，参数为保存的头像路径列表（跳过时为 None 列表）
+        count: 要捕获的人脸数（1 或 2）
+        labels: 头像文件名前缀，每人一个
+        wait_seconds: 倒计时秒数
+        store: 头像库，None 时不认人，每次都拍新头像
+        source: 画面来源，默认 KOP_CAMERA（摄像头 0）
+    """
+
+    def __init__(self, on_done, count=2, labels=('Face1', 'Face2'), wait_seconds=3, store=None,
+                 source=CAMERA_SOURCE):
+        super().__init__()
+        self.on_done = on_done
+        self.count = count
+        self.labels = labels[:count]
+        self.wait_seconds = wait_seconds
+        self.source = source
+        self.feed = None
+        self.tracker = FaceTracker(count)
+        self.phase = SEARCH
+        self.deadline = 0.0
+        self.seq = 0
+        self.previews = [None] * count
+        self.store = store
+        self.known = None       # 上一帧认出的头像库 id
+        self.known_frames = 0
+        self.finished = False
+        self._saved = None
+
+    def enter(self, manager):
+        super().enter(manager)
+        self.feed = CameraFeed((WIDTH, HEIGHT), self.source).start()
+        self.mask = _circle_mask(PREVIEW_SIZE)
+        self.preview_labels = [render_text(font_small, f'Player {i + 1} face', WHITE) for i in range(self.count)]
+        self.hint = render_text(font_small, 'ESC: skip', (200, 200, 200))
+        self.waiting = render_text(font_medium, 'Starting camera...', WHITE)
+        self.welcome = render_text(font_medium, 'Welcome back!', BOX_COLOR)
+
+    def exit(self):
+        if self.feed is not None:
+            self.feed.close()
+            self.feed = None
+
+    def finish(self, paths):
+        if self.finished:
+            return
+        self.finished = True
+        self.on_done(paths if paths else [None] * self.count)
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN or event.key != pygame.K_ESCAPE:
+            return
+        if self.phase == SEARCH:
+            self.finish(None)
+        elif self.phase != SAVING:
+            # 取消倒计时，重新等待人脸稳定
+            self.phase = SEARCH
+            self.tracker.reset()
+
+    def update(self):
+        if self.finished:
+            return
+        feed = self.feed
+        if feed.error:
+            print(f'[FACE] {feed.error}; continuing without avatars')
+            self.finish(None)
+            return
+        seq, frame, faces, stamp = feed.latest()
+        fresh = seq != self.seq
+        self.seq = seq
+        now = time.perf_counter()
+
+        if self.phase == SEARCH:
+            if fresh and self.tracker.update(faces, feed.frame_size, stamp):
+                self.phase = READY
+                self.deadline = now + READY_SECONDS
+            if fresh and self.tracker.boxes is not None and self.tracker.missing == 0:
+                self._update_previews()
+            if fresh and self.store is not None and self._recognise(frame):
+                return
+        elif self.phase == READY:
+            if now >= self.deadline:
+                self.phase = COUNTDOWN
+                self.deadline = now + self.wait_seconds
+        elif self.phase == COUNTDOWN:
+            if now >= self.deadline:
+                self.phase = CAPTURE
+        elif self.phase == CAPTURE and fresh:
+            # 用倒计时结束后的第一帧，脸还在画面里才保存
+            if len(faces) < self.count:
+                self.phase = SEARCH
+                self.tracker.reset()
+                return
+            picked = sorted(faces, key=lambda r: r[2] * r[3], reverse=True)[:self.count]
+            # 左边的脸是玩家 1
+            picked.sort(key=lambda r: r[0])
+            # 编码保存 PNG 要几十毫秒，放到线程里做，画面不掉帧
+            self.phase = SAVING
+            self._saved = []
+            threading.Thread(target=self._save, args=(frame, picked), name='SaveAvatars', daemon=True).start()
+        elif self.phase == SAVING and self._saved:
+            self.finish(self._saved[0])
+
+    def _recognise(self, frame):
+        """连续 RECOGNISE_FRAMES 帧认出同一批老玩家时直接结束，返回是否结束"""
+        picked = self.tracker.picked
+        ids = None
+        if picked is not None:
+            descriptors = [face_descriptor(frame, box) for box in picked]
+            ids = self.store.recognise(descriptors)
+            if None in ids:
+                ids = None
+        if ids is None or ids != self.known:
+            self.known = ids
+            self.known_frames = 1 if ids is not None else 0
+            return False
+        self.known_frames += 1
+        if self.known_frames < RECOGNISE_FRAMES:
+            return False
+        self.finish(self.store.use(ids, descriptors))
+        return True
+
+    def _save(self, frame, faces):
+        try:
+            if self.store is None:
+                paths = save_avatars(frame, faces, self.labels)
+            else:
+                # 只有一个人是老玩家时，他仍然用库里的头像，另一个人拍新的
+                descriptors = [face_descriptor(frame, box) for box in faces]
+                ids = self.store.recognise(descriptors)
+                paths = [self.store.use([i], [d])[0] if i is not None else self.store.add(frame, box, label, d)
+                         for i, d, box, label in zip(ids, descriptors, faces, self.labels)]
+        except Exception as e:
+            print(f'[FACE] failed to save avatars: {e}')
+            paths = None
+        self._saved.append(paths)
+
+    def _update_previews(self):
+        for i, box in enumerate(self.tracker.boxes):
+            rect = self.feed.to_display(box)
+            size = int(max(rect.width, rect.height) * 1.2)
+            crop = self.feed.crop(pygame.Rect(0, 0, size, size).move(rect.centerx - size // 2, rect.centery - size // 2),
+                                  (PREVIEW_SIZE, PREVIEW_SIZE))
+            if crop is not None:
+                crop = crop.convert_alpha()
+                crop.blit(self.mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+                self.previews[i] = crop
+
+    def draw(self, screen):
+        screen.fill(BLACK)
+        feed = self.feed
+        if feed is None or feed.size is None:
+            screen.blit(self.waiting, self.waiting.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+            return
+        ox = (WIDTH - feed.size[0]) // 2
+        oy = (HEIGHT - feed.size[1]) // 2
+        feed.draw(screen, (ox, oy))
+        center = (WIDTH // 2, HEIGHT // 2)
+
+        tracker = self.tracker
+        if tracker.boxes is not None and self.phase != COUNTDOWN:
+            color = BOX_COLOR if tracker.missing == 0 else HOLD_COLOR
+            rects = [feed.to_display(b).move(ox, oy) for b in tracker.boxes]
+            for rect in rects:
+                pygame.draw.rect(screen, color, rect, 2)
+            if self.phase == SEARCH and self.known is not None:
+                screen.blit(self.welcome, self.welcome.get_rect(center=center))
+            elif self.phase == SEARCH:
+                status = render_text(font_small, 'Stable' if tracker.stable else 'Hold still...',
+                                     BOX_COLOR if tracker.stable else WAIT_COLOR)
+                anchor = (rects[0].left, rects[0].top - 30) if self.count == 1 else (ox + 10, oy + PREVIEW_SIZE + 20)
+                screen.blit(status, anchor)
+
+        if self.phase == SEARCH:
+            # 左上是玩家 1，右上是玩家 2
+            for i, (preview, label) in enumerate(zip(self.previews, self.preview_labels)):
+                if i == 0:
+                    px = ox + 10
+                    lx = px + PREVIEW_SIZE + 10
+                else:
+                    px = ox + feed.size[0] - 10 - PREVIEW_SIZE
+                    lx = px - 10 - label.get_width()
+                if preview is not None:
+                    screen.blit(preview, (px, oy + 10))
+                screen.blit(label, (lx, oy + 20))
+        elif self.phase in (READY, CAPTURE, SAVING):
+            text = render_text(font_medium, 'ready to take picture' if self.phase == READY else 'Saving...', WHITE)
+            screen.blit(text, text.get_rect(center=center))
+        elif self.phase == COUNTDOWN:
+            remaining = max(1, math.ceil(self.deadline - time.perf_counter()))
+            text = render_text(font_large, str(remaining), BOX_COLOR)
+            screen.blit(text, text.get_rect(center=center))
+
+        screen.blit(self.hint, (WIDTH - self.hint.get_width() - 16, HEIGHT - self.hint.get_height() - 12))
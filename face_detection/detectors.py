@@ -0,0 +1,308 @@
+"""人脸检测后端
+
+每个后端都是一个 FaceDetector：detect(frame) 输入 BGR 画面，返回 (x, y, w, h) 整数元组列表，
+并记录自己的调用次数和耗时。可用的后端：
+
+    - mediapipe:  MediaPipe 近距离模型（装了 mediapipe 时）
+    - yunet:      OpenCV FaceDetectorYN（models/ 下有 face_detection_yunet*.onnx 时）
+    - dnn:        OpenCV DNN 的 ResNet-10 SSD（models/ 下有 deploy.prototxt 和 res10_*.caffemodel 时）
+    - haar:       Haar 级联（OpenCV 自带）
+    - haar_fast:  Haar 级联，在半分辨率画面上检测
+
+select_detector() 在启动时用一两帧画面给所有可用后端测速，按上面的顺序（大致是准确度从高到低）
+选第一个每帧耗时不超过 FACE_DETECT_BUDGET_MS 的；都超时就选最快的。KOP_DETECTOR 指定
+后端名时跳过测速。测速结果在进程里缓存，之后的捕获场景直接用，detector_timings() 可以查看。
+
+    python -m face_detection.detectors            # 打印各后端的耗时和自动选择的结果
+    python -m face_detection.detectors clip.mp4   # 用录像里的画面测速
+"""
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, os.pardir))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from settings import CAMERA_SOURCE, FACE_DETECT_BUDGET_MS, FACE_DETECTOR  # noqa: E402
+from face_detection.sources import open_source  # noqa: E402
+
+MODELS_DIR = os.path.join(HERE, 'models')
+CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+MIN_FACE_SIZE = 80         # 检测最小人脸尺寸
+MIN_CONFIDENCE = 0.5
+BENCH_REPEATS = 3
+
+
+class FaceDetector:
+    """检测后端基类：子类实现 _detect，detect 负责计时"""
+
+    name = 'base'
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.last_ms = 0.0
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def detect(self, frame):
+        t0 = time.perf_counter()
+        faces = self._detect(frame)
+        dt = time.perf_counter() - t0
+        self.calls += 1
+        self.total_time += dt
+        self.last_ms = dt * 1000
+        return faces
+
+    def _detect(self, frame):
+        raise NotImplementedError
+
+    @property
+    def mean_ms(self):
+        return self.total_time / self.calls * 1000 if self.calls else 0.0
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f'<{self.name} detector {self.mean_ms:.1f} ms/frame over {self.calls}>'
+
+
+class HaarDetector(FaceDetector):
+    """Haar 级联；scale < 1 时先缩小画面再检测（最小人脸尺寸同比缩小）"""
+
+    name = 'haar'
+
+    def __init__(self, scale=1.0, min_size=MIN_FACE_SIZE):
+        super().__init__()
+        self.scale = scale
+        self.min_size = max(20, int(min_size * scale))
+        self.cascade = cv2.CascadeClassifier(CASCADE_PATH)
+
+    @classmethod
+    def available(cls):
+        return hasattr(cv2, 'CascadeClassifier') and os.path.exists(CASCADE_PATH)
+
+    def _detect(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        found = self.cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5,
+                                              minSize=(self.min_size, self.min_size))
+        s = 1.0 / self.scale
+        return [tuple(int(v * s) for v in r) for r in found]
+
+
+class FastHaarDetector(HaarDetector):
+    name = 'haar_fast'
+
+    def __init__(self):
+        super().__init__(scale=0.5)
+
+
+class MediaPipeDetector(FaceDetector):
+    """MediaPipe 近距离人脸检测（2 米以内）"""
+
+    name = 'mediapipe'
+
+    def __init__(self, model_selection=0, min_confidence=MIN_CONFIDENCE):
+        super().__init__()
+        import mediapipe as mp
+        self.detector = mp.solutions.face_detection.FaceDetection(
+            model_selection=model_selection, min_detection_confidence=min_confidence)
+
+    @classmethod
+    def available(cls):
+        try:
+            import mediapipe  # noqa: F401
+        except Exception:
+            return False
+        return True
+
+    def _detect(self, frame):
+        results = self.detector.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        faces = []
+        if results.detections:
+            fh, fw = frame.shape[:2]
+            for det in results.detections:
+                bbox = det.location_data.relative_bounding_box
+                faces.append((int(bbox.xmin * fw), int(bbox.ymin * fh), int(bbox.width * fw), int(bbox.height * fh)))
+        return faces
+
+    def close(self):
+        self.detector.close()
+
+
+def _model_file(pattern):
+    found = sorted(glob.glob(os.path.join(MODELS_DIR, pattern)))
+    return found[-1] if found else None
+
+
+class YuNetDetector(FaceDetector):
+    """OpenCV FaceDetectorYN（YuNet ONNX 模型）"""
+
+    name = 'yunet'
+
+    def __init__(self, min_confidence=MIN_CONFIDENCE):
+        super().__init__()
+        self.detector = cv2.FaceDetectorYN.create(_model_file('face_detection_yunet*.onnx'), '', (320, 320),
+                                                  score_threshold=min_confidence)
+        self.size = None
+
+    @classmethod
+    def available(cls):
+        return hasattr(cv2, 'FaceDetectorYN') and _model_file('face_detection_yunet*.onnx') is not None
+
+    def _detect(self, frame):
+        fh, fw = frame.shape[:2]
+        if self.size != (fw, fh):
+            self.detector.setInputSize((fw, fh))
+            self.size = (fw, fh)
+        _, found = self.detector.detect(frame)
+        if found is None:
+            return []
+        return [tuple(int(v) for v in row[:4]) for row in found]
+
+
+class DnnDetector(FaceDetector):
+    """OpenCV DNN 的 ResNet-10 SSD（300x300 输入）"""
+
+    name = 'dnn'
+    INPUT = (300, 300)
+    MEAN = (104.0, 177.0, 123.0)
+
+    def __init__(self, min_confidence=MIN_CONFIDENCE):
+        super().__init__()
+        self.net = cv2.dnn.readNet(_model_file('res10_*.caffemodel'), os.path.join(MODELS_DIR, 'deploy.prototxt'))
+        self.min_confidence = min_confidence
+
+    @classmethod
+    def available(cls):
+        return (hasattr(cv2, 'dnn') and os.path.exists(os.path.join(MODELS_DIR, 'deploy.prototxt'))
+                and _model_file('res10_*.caffemodel') is not None)
+
+    def _detect(self, frame):
+        fh, fw = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.resize(frame, self.INPUT), 1.0, self.INPUT, self.MEAN)
+        self.net.setInput(blob)
+        out = self.net.forward().reshape(-1, 7)
+        faces = []
+        for conf, x0, y0, x1, y1 in out[:, 2:7]:
+            if conf < self.min_confidence:
+                continue
+            x0, y0 = int(max(0.0, x0) * fw), int(max(0.0, y0) * fh)
+            x1, y1 = int(min(1.0, x1) * fw), int(min(1.0, y1) * fh)
+            if x1 > x0 and y1 > y0:
+                faces.append((x0, y0, x1 - x0, y1 - y0))
+        return faces
+
+
+# 按准确度从高到低排列，自动选择时优先选前面的
+BACKENDS = {cls.name: cls for cls in (MediaPipeDetector, YuNetDetector, DnnDetector, HaarDetector, FastHaarDetector)}
+
+_timings = {}    # 后端名 -> 测速的每帧毫秒数
+_choice = None   # 自动选择的后端名
+
+
+def available_backends():
+    return [name for name, cls in BACKENDS.items() if cls.available()]
+
+
+def create_detector(name):
+    """按名字创建后端；不可用时抛 RuntimeError"""
+    cls = BACKENDS.get(name)
+    if cls is None:
+        raise RuntimeError(f'Unknown face detector {name!r} (choose from {", ".join(BACKENDS)})')
+    if not cls.available():
+        raise RuntimeError(f'Face detector {name!r} is not available here')
+    return cls()
+
+
+def sample_frame(size=(640, 480), seed=0):
+    """没有摄像头画面时测速用的合成画面（平滑的随机色块）"""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    small = rng.integers(0, 255, (h // 16, w // 16, 3), dtype=np.uint8)
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_CUBIC)
+
+
+def benchmark(frames, names=None, repeats=BENCH_REPEATS):
+    """给各后端测速，返回 {后端名: 每帧毫秒数}（第一帧是预热，不计时）"""
+    results = {}
+    for name in names or available_backends():
+        try:
+            detector = create_detector(name)
+        except Exception as e:
+            print(f'[FACE] {name} detector failed to load: {e}')
+            continue
+        try:
+            detector.detect(frames[0])
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                for frame in frames:
+                    detector.detect(frame)
+            results[name] = (time.perf_counter() - t0) / (repeats * len(frames)) * 1000
+        except Exception as e:
+            print(f'[FACE] {name} detector failed: {e}')
+        finally:
+            detector.close()
+    return results
+
+
+def choose(timings, budget_ms=FACE_DETECT_BUDGET_MS):
+    """按优先顺序选第一个不超过预算的后端；都超过时选最快的"""
+    if not timings:
+        return None
+    for name in BACKENDS:
+        if name in timings and timings[name] <= budget_ms:
+            return name
+    return min(timings, key=timings.get)
+
+
+def select_detector(frames=None, backend=FACE_DETECTOR, budget_ms=FACE_DETECT_BUDGET_MS):
+    """创建本次捕获用的检测器
+
+    backend 为 'auto' 时第一次调用会用 frames（最好是真实的摄像头画面，None 时用合成画面）
+    给所有后端测速并缓存选择；每次调用都返回新的检测器实例（后端不一定线程安全）。
+    """
+    global _choice
+    if backend and backend != 'auto':
+        return create_detector(backend)
+    if _choice is None:
+        timings = benchmark(frames or [sample_frame()])
+        _timings.update(timings)
+        _choice = choose(timings, budget_ms)
+        if _choice is None:
+            raise RuntimeError('No face detector available')
+        summary = ', '.join(f'{n} {ms:.1f}ms' for n, ms in timings.items())
+        print(f'[FACE] detector: {_choice} (budget {budget_ms:g}ms; {summary})')
+    return create_detector(_choice)
+
+
+def detector_timings():
+    """启动测速的结果 {后端名: 每帧毫秒数}（还没测过时为空）"""
+    return dict(_timings)
+
+
+if __name__ == '__main__':
+    frames = [sample_frame()]
+    cap = open_source(sys.argv[1] if len(sys.argv) > 1 else CAMERA_SOURCE)
+    if cap.isOpened():
+        for _ in range(5):
+            ret, frame = cap.read()
+            if ret:
+                frames = [frame]
+    cap.release()
+    print('available:', ', '.join(available_backends()) or 'none')
+    timings = benchmark(frames, repeats=10)
+    for name, ms in timings.items():
+        print(f'  {name:10s} {ms:7.2f} ms/frame')
+    print(f'auto choice (budget {FACE_DETECT_BUDGET_MS:g} ms): {choose(timings)}')
@@ -3,7 +3,6 @@ import sys
 import time
 import pygame
 import cv2
-from PIL import Image
 
 # Ensure repo root is on sys.path so package imports work when this file
 # is executed directly (python face_detection/face_login_demo.py) from the repo root.
@@ -12,9 +11,10 @@ REPO_ROOT = os.path.abspath(os.path.join(HERE, os.pardir))
 if REPO_ROOT not in sys.path:
     sys.path.insert(0, REPO_ROOT)
 
-from face_detection.Face_Detection import capture_face_image, crop_to_face, circular_mask_image, ensure_outputs_dir  # noqa: E402
+from face_detection.Face_Detection import capture_face_image, crop_to_face, ensure_outputs_dir  # noqa: E402
+from face_detection import stylize  # noqa: E402
 
-def capture_and_make_sprite(player_label, palette_mode='cute'):
+def capture_and_make_sprite(player_label, palette_mode='cute', source=0):
     print(f'Please position {player_label} in front of the camera...')
     # derive a nicer display label for the capture window (show "Player 1 face" / "Player 2 face")
     if '1' in player_label:
@@ -27,27 +27,18 @@ def capture_and_make_sprite(player_label, palette_mode='cute'):
     # give the user a short pause to get ready before the detection begins
     # print(f'Starting capture for {display_label} in 5 seconds...')
     # time.sleep(5)
-    frame, face = capture_face_image(wait_seconds=3, label=display_label)
+    frame, face = capture_face_image(wait_seconds=3, label=display_label, source=source)
     if face is None:
         raise RuntimeError('No face captured')
     crop = crop_to_face(frame, face, pad=0.5)
-    pil = Image.fromarray(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
-    # Keep saved avatar orientation as captured (do not mirror text or avatar)
-    circ = circular_mask_image(pil)
-    # Save the plain circular avatar (no stylization) so the avatar looks normal
-    # Cap saved avatar size so files are moderate (not oversized)
-    MAX_AVATAR = 256
-    w, h = circ.size
-    if max(w, h) > MAX_AVATAR:
-        circ = circ.resize((MAX_AVATAR, MAX_AVATAR), resample=Image.LANCZOS)
+    # Save the plain circular avatar (no stylization) so the avatar looks normal,
+    # capped at MAX_AVATAR so files are moderate (not oversized)
     out_dir = ensure_outputs_dir()
     ts = int(time.time())
-    avatar_path = os.path.join(out_dir, f'{player_label}_avatar_{ts}.png')
-    circ.save(avatar_path)
-    return avatar_path
+    return save_avatar_set(crop, os.path.join(out_dir, f'{player_label}_avatar_{ts}'), sizes=())[0]
 
 
-def capture_two_and_make_sprites(label1='Face1', label2='Face2', palette_mode='cute'):
+def capture_two_and_make_sprites(label1='Face1', label2='Face2', palette_mode='cute', source=0):
     """Capture two faces in one session and save two avatar files.
     Returns (path1, path2).
     """
@@ -61,37 +52,66 @@ def capture_two_and_make_sprites(label1='Face1', label2='Face2', palette_mode='c
     else:
         display2 = label2
 
-    from face_detection.Face_Detection import capture_two_faces, crop_to_face, circular_mask_image, ensure_outputs_dir  # noqa: E402
+    from face_detection.Face_Detection import capture_two_faces  # noqa: E402
 
-    frame, faces = capture_two_faces(wait_seconds=3, label1=display1, label2=display2)
+    frame, faces = capture_two_faces(wait_seconds=3, label1=display1, label2=display2, source=source)
     if not faces or len(faces) < 2:
         raise RuntimeError('Failed to detect two faces')
 
+    # ensure consistent ordering: left face -> player1, right face -> player2
+    faces_sorted = sorted(faces, key=lambda r: r[0])[:2]
+    p1_path, p2_path = save_avatars(frame, faces_sorted, (label1, label2))
+    return p1_path, p2_path
+
+
+def save_avatars(frame, faces, labels):
+    """Crop each face box out of the frame and save it as a circular avatar PNG.
+
+    Returns the saved paths, one per (face, label) pair.
+    """
     out_dir = ensure_outputs_dir()
     ts = int(time.time())
+    paths = []
+    for face, label in zip(faces, labels):
+        path = os.path.join(out_dir, f'{label}_avatar_{ts}.png')
+        cv2.imwrite(path, make_avatar_image(frame, face))
+        paths.append(path)
+    return paths
 
-    # ensure consistent ordering: left face -> player1, right face -> player2
-    faces_sorted = sorted(faces, key=lambda r: r[0])
-    (x1, y1, w1, h1), (x2, y2, w2, h2) = faces_sorted
 
-    # crop and save both
-    crop1 = crop_to_face(frame, (x1, y1, w1, h1), pad=0.5)
-    crop2 = crop_to_face(frame, (x2, y2, w2, h2), pad=0.5)
+def make_avatar_image(frame, face):
+    """Circular BGRA avatar array cropped around one (x, y, w, h) face box."""
+    return avatar_from_crop(crop_to_face(frame, face, pad=0.5))
 
-    pil1 = Image.fromarray(cv2.cvtColor(crop1, cv2.COLOR_BGR2RGB))
-    pil2 = Image.fromarray(cv2.cvtColor(crop2, cv2.COLOR_BGR2RGB))
 
+def avatar_from_crop(crop):
+    """Circular BGRA avatar array from a BGR face crop."""
     # Keep saved avatar orientation as captured (do not mirror text or avatar)
+    return stylize.circular(crop)
 
-    circ1 = circular_mask_image(pil1)
-    circ2 = circular_mask_image(pil2)
 
-    p1_path = os.path.join(out_dir, f'{label1}_avatar_{ts}.png')
-    p2_path = os.path.join(out_dir, f'{label2}_avatar_{ts}.png')
-    circ1.save(p1_path)
-    circ2.save(p2_path)
+# Game-ready avatar sizes: 80 px is what main.load_avatar_surface displays,
+# 30 px is the avatar drawn inside a 60 px player body.
+AVATAR_SIZES = (80, 30)
+MAX_AVATAR = 256
 
-    return p1_path, p2_path
+
+def save_avatar_set(crop, stem, sizes=AVATAR_SIZES):
+    """Save one face crop as `<stem>.png` (capped at MAX_AVATAR) plus `<stem>_<size>.png` per size.
+
+    Takes the crop rather than the whole frame so it is cheap to hand to a
+    process pool. Returns the list of written paths, full size first.
+    """
+    circ = avatar_from_crop(crop)
+    if max(circ.shape[:2]) > MAX_AVATAR:
+        circ = stylize.resize_rgba(circ, (MAX_AVATAR, MAX_AVATAR))
+    paths = [f'{stem}.png']
+    cv2.imwrite(paths[0], circ)
+    for size in sizes:
+        path = f'{stem}_{size}.png'
+        cv2.imwrite(path, stylize.resize_rgba(circ, (size, size)))
+        paths.append(path)
+    return paths
 
 
 def run_login_and_demo():
@@ -0,0 +1,133 @@
+"""画面来源：摄像头、视频文件或图片序列
+
+捕获函数原来写死 cv2.VideoCapture(0)，只能对着真摄像头调试。open_source() 按来源的写法
+返回一个 FrameSource，接口和 cv2.VideoCapture 一样（isOpened / read / release / get），
+所以原来的捕获代码不用改读帧的逻辑：
+
+    0、'1'                 摄像头编号
+    clip.mp4              视频文件（或 OpenCV 能打开的 URL）
+    frames/、'shots/*.png' 图片目录或通配符，按文件名排序逐帧读出
+    face.jpg              单张图片（一直重复这一帧，需要 loop=True）
+
+回放录像时 timestamp 是录像里的时间（帧号 / fps），和处理快慢无关；realtime=True 时
+按 fps 控制读取速度，像真摄像头一样（游戏里用 KOP_CAMERA 指定录像时就是这样）。
+"""
+import glob
+import os
+import time
+
+import cv2
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+DEFAULT_FPS = 30.0
+
+
+def _image_paths(spec):
+    if os.path.isdir(spec):
+        return sorted(p for p in glob.glob(os.path.join(spec, '*')) if p.lower().endswith(IMAGE_EXTS))
+    if any(ch in spec for ch in '*?['):
+        return sorted(p for p in glob.glob(spec) if p.lower().endswith(IMAGE_EXTS))
+    if spec.lower().endswith(IMAGE_EXTS):
+        return [spec]
+    return None
+
+
+class FrameSource:
+    """cv2.VideoCapture 风格的画面来源
+
+    Args:
+        spec: 摄像头编号、视频路径、图片目录 / 通配符 / 单张图片
+        fps: 录像和图片序列的帧率（None 时视频用文件里的帧率，图片用 30）
+        loop: 录像读完后从头再来
+        realtime: 按 fps 控制录像的读取速度（摄像头本身就是实时的）
+    """
+
+    def __init__(self, spec=0, fps=None, loop=False, realtime=False):
+        self.spec = spec
+        self.loop = loop
+        self.realtime = realtime
+        self.index = 0          # 已读出的帧数
+        self.timestamp = 0.0    # 最近一帧的时间（秒，从第一帧算起）
+        self._images = None
+        self._pos = 0           # 图片序列里的下一张
+        self._cap = None
+        self._start = None
+
+        if isinstance(spec, int) or (isinstance(spec, str) and spec.strip().isdigit()):
+            self.live = True
+            self._cap = cv2.VideoCapture(int(spec))
+            self.fps = fps or self._cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+            return
+        self.live = False
+        self._images = _image_paths(spec)
+        if self._images is None:
+            self._cap = cv2.VideoCapture(spec)
+            self.fps = fps or self._cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        else:
+            self.fps = fps or DEFAULT_FPS
+
+    def __repr__(self):
+        kind = 'camera' if self.live else ('images' if self._images is not None else 'video')
+        return f'<FrameSource {kind} {self.spec!r} {self.fps:g}fps>'
+
+    def isOpened(self):
+        if self._images is not None:
+            return bool(self._images)
+        return self._cap is not None and self._cap.isOpened()
+
+    def _read_raw(self):
+        if self._images is not None:
+            if self._pos >= len(self._images):
+                if not self.loop or not self._images:
+                    return False, None
+                self._pos = 0
+            frame = cv2.imread(self._images[self._pos])
+            self._pos += 1
+            return frame is not None, frame
+        ret, frame = self._cap.read()
+        if not ret and self.loop and not self.live and self.index > 0:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._cap.read()
+        return ret, frame
+
+    def read(self):
+        if self.realtime and not self.live and self._start is not None:
+            # 录像按帧率放，等到这一帧该出现的时候
+            delay = self._start + self.index / self.fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        ret, frame = self._read_raw()
+        if not ret:
+            return False, None
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        if self.live:
+            self.timestamp = now - self._start
+        else:
+            self.timestamp = self.index / self.fps
+        self.index += 1
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.timestamp * 1000
+        if self._images is not None:
+            if prop == cv2.CAP_PROP_FRAME_COUNT:
+                return float(len(self._images))
+            if prop == cv2.CAP_PROP_POS_FRAMES:
+                return float(self.index)
+            return 0.0
+        return self._cap.get(prop)
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+        self._images = None if self._images is None else []
+
+
+def open_source(spec=0, fps=None, loop=False, realtime=False):
+    """按来源的写法打开摄像头、录像或图片序列（见模块说明）"""
+    return FrameSource(spec, fps=fps, loop=loop, realtime=realtime)
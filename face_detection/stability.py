@@ -0,0 +1,166 @@
+"""人脸稳定判定和人脸框平滑（按时间，不按帧数）
+
+原来的判定是"最近 STABLE_REQUIRED 帧里人脸中心移动不超过 MOVEMENT_THRESHOLD 像素"，
+平滑系数和保留时间也按帧算，锁定要多久全看摄像头帧率和检测速度：检测慢的机器上 8 帧
+要一秒多。StabilityTracker 把这些都换成时间：
+
+    - 人脸中心连同时间戳存进环形缓冲区（NumPy 数组）；样本覆盖了最近 STABLE_SECONDS 秒
+      （有一个样本不晚于窗口起点），并且从这个样本到现在每张脸的中心移动都不超过
+      MOVEMENT_THRESHOLD 像素才算稳定。检测很慢、窗口里只有一两帧时也照样比较移动
+    - 移动超过阈值或检测丢失时从这一帧重新计时（丢失期间人可能已经走开了）
+    - 人脸框做指数平滑，系数按和上一帧的时间间隔算（1 - exp(-dt / tau)），帧率变了手感不变；
+      变化小于 MIN_BOX_CHANGE 像素的不更新（防抖）
+    - 检测短暂丢失时保留上一次的框 hold_seconds 秒（只用来画，不算进稳定判定）
+
+时间戳由调用方给：摄像头用读到帧的时刻，回放录像用录像里的时间（sources.FrameSource.timestamp），
+所以 bench_capture 测出来的锁定时间和机器快慢无关。单人、双人和批量报名共用这一个实现。
+"""
+import math
+import os
+import sys
+
+import numpy as np
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, os.pardir))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from settings import FACE_STABLE_SECONDS  # noqa: E402
+
+MIN_BOX_CHANGE = 8            # 边框变化小于此像素不更新
+MOVEMENT_THRESHOLD = 12       # 稳定判定最大移动像素
+STABLE_SECONDS = FACE_STABLE_SECONDS  # 需要保持不动的时间
+HOLD_SECONDS_SINGLE = 0.4     # 单人脸丢失后保留框的时间
+HOLD_SECONDS_TWO = 1.0        # 双人脸丢失后保留框的时间
+SMOOTH_SECONDS_SINGLE = 0.08  # 单人脸平滑时间常数（30fps 时相当于原来的系数 0.35）
+SMOOTH_SECONDS_TWO = 0.1      # 双人脸平滑时间常数（30fps 时相当于原来的系数 0.28）
+RING_SIZE = 32                # 缓冲区初始容量，窗口里的样本更多时自动翻倍
+
+
+def _smooth(box, last, alpha):
+    smoothed = []
+    for v, lv in zip(box, last):
+        sv = int(lv * (1 - alpha) + v * alpha)
+        # deadzone: ignore tiny changes to prevent jitter
+        smoothed.append(lv if abs(sv - lv) < MIN_BOX_CHANGE else sv)
+    return tuple(smoothed)
+
+
+class StabilityTracker:
+    """按时间窗口跟踪 count 张脸：平滑人脸框、判断是否稳定、丢失时短暂保留
+
+    Args:
+        count: 人脸数（每帧按同样的玩家顺序给出）
+        window: 需要保持不动的秒数
+        threshold: 窗口内人脸中心允许的最大移动（像素）
+        smooth_seconds: 人脸框平滑的时间常数（秒），0 时不平滑
+        hold_seconds: 检测丢失后保留上一次框的秒数
+    """
+
+    def __init__(self, count=1, window=STABLE_SECONDS, threshold=MOVEMENT_THRESHOLD,
+                 smooth_seconds=SMOOTH_SECONDS_SINGLE, hold_seconds=HOLD_SECONDS_SINGLE):
+        self.count = count
+        self.window = window
+        self.threshold = threshold
+        self.smooth_seconds = smooth_seconds
+        self.hold_seconds = hold_seconds
+        self._times = np.zeros(RING_SIZE)
+        self._centers = np.zeros((RING_SIZE, count, 2))
+        self.reset()
+
+    def reset(self):
+        self.boxes = None      # 平滑后的人脸框
+        self.last_seen = None  # 最近一次检测全的时间
+        self.restart()
+
+    def restart(self):
+        """清空稳定窗口，从下一帧重新计时（保留平滑后的框）"""
+        self.stable = False
+        self._head = 0         # 下一个写入位置
+        self._size = 0
+
+    def _push(self, now, centers):
+        cap = len(self._times)
+        if self._size == cap and self._times[(self._head + 1) % cap] > now - self.window:
+            # 覆盖最旧的样本后就没有窗口起点之前的样本了（帧率很高或窗口很长）：按时间顺序展开后容量翻倍
+            order = (np.arange(cap) + self._head) % cap
+            self._times = np.concatenate([self._times[order], np.zeros(cap)])
+            self._centers = np.concatenate([self._centers[order], np.zeros_like(self._centers)])
+            self._head = cap
+        self._times[self._head] = now
+        self._centers[self._head] = centers
+        self._head = (self._head + 1) % len(self._times)
+        self._size = min(self._size + 1, len(self._times))
+
+    def _window(self, now):
+        """窗口内的样本（连同窗口起点之前最近的一个），以及样本是否覆盖了整个窗口"""
+        times = self._times[:self._size]
+        before = times <= now - self.window
+        covered = bool(before.any())
+        start = times[before].max() if covered else -np.inf
+        return self._centers[:self._size][times >= start], covered
+
+    def spread(self, now):
+        """从窗口起点到现在人脸中心的最大移动（像素，所有脸、两个方向里取最大）"""
+        recent, _ = self._window(now)
+        if len(recent) < 2:
+            return 0.0
+        return float((recent.max(axis=0) - recent.min(axis=0)).max())
+
+    def update(self, boxes, now):
+        """输入这一帧的 count 个 (x, y, w, h)（按玩家顺序）和时间戳（秒），返回是否稳定"""
+        # 两次检测之间隔得再久也不算丢失（检测慢），丢失由 miss() 处理
+        if self.boxes is None:
+            self.boxes = [tuple(int(v) for v in b) for b in boxes]
+        else:
+            dt = max(0.0, now - self.last_seen)
+            alpha = 1.0 - math.exp(-dt / self.smooth_seconds) if self.smooth_seconds > 0 else 1.0
+            self.boxes = [_smooth(b, last, alpha) for b, last in zip(boxes, self.boxes)]
+        self.last_seen = now
+        centers = [(x + w // 2, y + h // 2) for x, y, w, h in boxes]
+        self._push(now, centers)
+        if self.spread(now) > self.threshold:
+            # 动了：从这一帧重新计时
+            self.restart()
+            self._push(now, centers)
+        self.stable = self._window(now)[1]
+        return self.stable
+
+    def miss(self, now):
+        """这一帧没检测全：稳定窗口从头开始；返回是否还在保留上一次的框（超过 hold_seconds 就清掉）"""
+        self.restart()
+        if self.last_seen is not None and now - self.last_seen > self.hold_seconds:
+            self.reset()
+        return self.boxes is not None
+
+
+if __name__ == '__main__':
+    # 自检：各种帧率下的锁定时间，以及两种不该判为稳定的情况
+    faces = [(100, 100, 80, 80), (300, 100, 80, 80)]
+    for fps in (2, 5, 10, 30, 60, 120):
+        tracker = StabilityTracker(2)
+        i = 0
+        while not tracker.update(faces, i / fps):
+            i += 1
+        print(f'{fps:4d} fps: stable after {i / fps:.3f}s ({i + 1} frames)')
+
+    # 检测很慢（2fps）：窗口里只有一两帧时也要比较移动
+    tracker = StabilityTracker(1)
+    assert not tracker.update([(100, 100, 80, 80)], 0.0)
+    assert not tracker.update([(250, 100, 80, 80)], 0.5), 'slow detector: moved 150px but reported stable'
+
+    # 丢失不到 hold_seconds 后在 150px 外出现：不能一回来就稳定
+    tracker = StabilityTracker(2, hold_seconds=HOLD_SECONDS_TWO)
+    for i in range(30):
+        tracker.update(faces, i / 30)
+    assert tracker.stable
+    for i in range(30, 48):
+        assert tracker.miss(i / 30)
+    moved = [(x + 150, y, w, h) for x, y, w, h in faces]
+    assert not tracker.update(moved, 48 / 30), 'dropout: came back 150px away but reported stable'
+    i = 49
+    while not tracker.update(moved, i / 30):
+        i += 1
+    print(f'after a 0.6s dropout: stable again {(i - 48) / 30:.3f}s after the faces came back')
+    print('ok')
@@ -2,17 +2,39 @@ import pygame
 import os
 import math
 import random
-from settings import WIDTH, HEIGHT, KEY_SIDE, KEY_COLOR, KEY_SHADOW, ORANGE, YELLOW, BLACK, font_small, font_medium, CYAN, FPS
+import threading
+from settings import WIDTH, HEIGHT, KEY_SIDE, KEY_COLOR, KEY_SHADOW, ORANGE, YELLOW, BLACK, font_small, font_medium, font_indicator, CYAN, FPS
+from utils.assets import ASSETS
+from utils.text_cache import render_text
+from game.scenes import Scene
 
 
-# Preload and clean monitor image at module import so animation can start instantly
+# Final-scene images. These need a display surface for convert()/convert_alpha(),
+# so they are loaded by _load_assets() on first use instead of at import time.
+# Everything that is pre-scaled goes through ASSETS.baked(), so a prebuilt asset
+# bundle (python -m utils.bundle build) skips decoding the large source PNGs.
 MONITOR_SURF = None
-try:
+CROWN_SURF = None
+FINAL_BG_SURF = None
+FINAL_BG_UPDATE_SCALED = None
+_assets_loaded = False
+_assets_lock = threading.Lock()
+_crown_sprites = {}
+
+BASE_DIR = os.path.dirname(__file__)
+WINNER_SCALE = 1.4  # how much larger the winner should appear in the final scene
+
+
+def _monitor_path():
     # Prefer a no-background asset if present (user-supplied image)
-    base_dir = os.path.dirname(__file__)
-    preferred = os.path.join(base_dir, 'Computer_nobackground.png')
-    fallback = os.path.join(base_dir, 'computer.png')
+    preferred = os.path.join(BASE_DIR, 'Computer_nobackground.png')
+    fallback = os.path.join(BASE_DIR, 'computer.png')
     img_path = preferred if os.path.exists(preferred) else fallback
+    return img_path if os.path.exists(img_path) else None
+
+
+def _render_monitor(img_path):
+    """Load the monitor image, remove a white background if needed, and scale it down."""
     _raw = pygame.image.load(img_path)
     # If the loaded image already has per-pixel alpha, use it directly
     if _raw.get_flags() & pygame.SRCALPHA or _raw.get_alpha() is not None:
@@ -20,781 +42,437 @@ try:
         _mw, _mh = _raw.get_size()
         target_w, target_h = 520 - 20, 360 - 20
         scale = min(target_w / _mw, target_h / _mh)
-        MONITOR_SURF = pygame.transform.smoothscale(_raw, (max(1, int(_mw * scale)), max(1, int(_mh * scale))))
-    else:
-        # Image has no alpha channel; remove near-white background into an alpha surface
-        _raw = _raw.convert()
-        _mw, _mh = _raw.get_size()
-        _clean = pygame.Surface((_mw, _mh), pygame.SRCALPHA)
-        try:
-            _px = pygame.surfarray.pixels3d(_raw)
-            # no alpha channel present; treat near-white pixels as transparent
-            for _y in range(_mh):
-                for _x in range(_mw):
-                    r, g, b = _px[_x, _y]
-                    if r > 245 and g > 245 and b > 245:
-                        continue
-                    _clean.set_at((_x, _y), (r, g, b, 255))
-        except Exception:
-            # fallback: blit raw to clean (no transparency cleanup)
-            _clean.blit(_raw, (0, 0))
-        target_w, target_h = 520 - 20, 360 - 20
-        scale = min(target_w / _mw, target_h / _mh)
-        MONITOR_SURF = pygame.transform.smoothscale(_clean, (max(1, int(_mw * scale)), max(1, int(_mh * scale))))
-except Exception:
-    MONITOR_SURF = None
+        return pygame.transform.smoothscale(_raw, (max(1, int(_mw * scale)), max(1, int(_mh * scale))))
 
+    # Image has no alpha channel; remove near-white background into an alpha surface
+    _raw = _raw.convert()
+    _mw, _mh = _raw.get_size()
+    _clean = pygame.Surface((_mw, _mh), pygame.SRCALPHA)
+    try:
+        _px = pygame.surfarray.pixels3d(_raw)
+        # no alpha channel present; treat near-white pixels as transparent
+        for _y in range(_mh):
+            for _x in range(_mw):
+                r, g, b = _px[_x, _y]
+                if r > 245 and g > 245 and b > 245:
+                    continue
+                _clean.set_at((_x, _y), (r, g, b, 255))
+    except Exception:
+        # fallback: blit raw to clean (no transparency cleanup)
+        _clean.blit(_raw, (0, 0))
+    target_w, target_h = 520 - 20, 360 - 20
+    scale = min(target_w / _mw, target_h / _mh)
+    return pygame.transform.smoothscale(_clean, (max(1, int(_mw * scale)), max(1, int(_mh * scale))))
+
+
+def _load_image(path):
+    """Load an optional image, preferring an alpha-preserving surface when available."""
+    if not os.path.exists(path):
+        return None
+    img = pygame.image.load(path)
+    if img.get_flags() & pygame.SRCALPHA or img.get_alpha() is not None:
+        return img.convert_alpha()
+    return img.convert()
+
+
+def _render_final_bg_update():
+    """Pre-scale the updated final background to cover the screen (cover semantics)."""
+    bg = _load_image(os.path.join(BASE_DIR, 'Final_background_update.png'))
+    if bg is None:
+        return None
+    # We allow separate overall scaling and width-compression so the image can be
+    # slightly larger while being narrower horizontally (user-requested).
+    bw, bh = bg.get_size()
+    # Slightly enlarge overall, but compress horizontal length more
+    OVERALL_BG_SCALE = 1.02  # slightly smaller overall scale
+    BG_WIDTH_COMPRESS = 0.82  # reduce horizontal compression (less squashed)
+    BG_HEIGHT_COMPRESS = 0.82  # slightly stronger vertical compression to reduce height a bit
+    base_scale = max(WIDTH / bw, HEIGHT / bh) * OVERALL_BG_SCALE
+    new_w = max(1, int(bw * base_scale * BG_WIDTH_COMPRESS))
+    new_h = max(1, int(bh * base_scale * BG_HEIGHT_COMPRESS))
+    # Prevent vertical cropping: if the compressed height still exceeds the
+    # screen height, scale down so new_h == HEIGHT (no top/bottom cutoff).
+    if new_h > HEIGHT:
+        scale_down = HEIGHT / float(new_h)
+        new_h = HEIGHT
+        new_w = max(1, int(new_w * scale_down))
+    try:
+        return pygame.transform.smoothscale(bg, (new_w, new_h))
+    except Exception:
+        return pygame.transform.scale(bg, (new_w, new_h))
 
-# Preload crown image (pixel crown) for the final animation
-CROWN_SURF = None
-try:
-    base_dir = os.path.dirname(__file__)
-    crown_path = os.path.join(base_dir, 'Crown.png')
-    if os.path.exists(crown_path):
-        _c = pygame.image.load(crown_path)
-        # prefer alpha-preserving surface
-        if _c.get_flags() & pygame.SRCALPHA or _c.get_alpha() is not None:
-            CROWN_SURF = _c.convert_alpha()
-        else:
-            CROWN_SURF = _c.convert()
-except Exception:
-    CROWN_SURF = None
 
+def _load_assets():
+    """Load and pre-scale the monitor and background images once."""
+    global _assets_loaded
+    if _assets_loaded:
+        return
+    # may run on the scene preloader thread while the match is still going
+    with _assets_lock:
+        if not _assets_loaded:
+            _load_assets_locked()
+            _assets_loaded = True
 
-# Preload optional final background image to use inside the decorative frame
-FINAL_BG_SURF = None
-try:
-    base_dir = os.path.dirname(__file__)
-    final_bg_path = os.path.join(base_dir, 'Final_background.png')
-    if os.path.exists(final_bg_path):
-        _bg = pygame.image.load(final_bg_path)
-        # prefer alpha-preserving surface when available
-        if _bg.get_flags() & pygame.SRCALPHA or _bg.get_alpha() is not None:
-            FINAL_BG_SURF = _bg.convert_alpha()
-        else:
-            FINAL_BG_SURF = _bg.convert()
-except Exception:
-    FINAL_BG_SURF = None
 
+def _load_assets_locked():
+    global MONITOR_SURF, FINAL_BG_SURF, FINAL_BG_UPDATE_SCALED
+    # Preload and clean monitor image so animation can start instantly
+    MONITOR_SURF = None
+    try:
+        img_path = _monitor_path()
+        if img_path is not None:
+            rel = ASSETS.relpath(img_path)
+            MONITOR_SURF = ASSETS.baked(f"score:monitor:{os.path.basename(img_path)}",
+                                        lambda: _render_monitor(img_path),
+                                        sources=('final/score.py', rel) if rel else ())
+    except Exception:
+        MONITOR_SURF = None
 
-# Preload an updated full-screen final background (preferred)
-FINAL_BG_UPDATE_SURF = None
-try:
-    base_dir = os.path.dirname(__file__)
-    final_bg_update_path = os.path.join(base_dir, 'Final_background_update.png')
-    if os.path.exists(final_bg_update_path):
-        _bg2 = pygame.image.load(final_bg_update_path)
-        if _bg2.get_flags() & pygame.SRCALPHA or _bg2.get_alpha() is not None:
-            FINAL_BG_UPDATE_SURF = _bg2.convert_alpha()
-        else:
-            FINAL_BG_UPDATE_SURF = _bg2.convert()
-except Exception:
-    FINAL_BG_UPDATE_SURF = None
+    # Pre-scaled updated full-screen final background (preferred)
+    FINAL_BG_UPDATE_SCALED = None
+    try:
+        FINAL_BG_UPDATE_SCALED = ASSETS.baked(
+            'score:final_bg_update', _render_final_bg_update,
+            sources=('final/score.py', 'final/Final_background_update.png', 'settings.py'))
+    except Exception:
+        FINAL_BG_UPDATE_SCALED = None
 
-# Pre-scale the updated final background to cover the screen (cover semantics)
-# We allow separate overall scaling and width-compression so the image can be
-# slightly larger while being narrower horizontally (user-requested).
-FINAL_BG_UPDATE_SCALED = None
-try:
-    if FINAL_BG_UPDATE_SURF is not None:
-        bw, bh = FINAL_BG_UPDATE_SURF.get_size()
-        # Slightly enlarge overall, but compress horizontal length more
-        OVERALL_BG_SCALE = 1.02  # slightly smaller overall scale
-        BG_WIDTH_COMPRESS = 0.82  # reduce horizontal compression (less squashed)
-        BG_HEIGHT_COMPRESS = 0.82  # slightly stronger vertical compression to reduce height a bit
-        base_scale = max(WIDTH / bw, HEIGHT / bh) * OVERALL_BG_SCALE
-        new_w = max(1, int(bw * base_scale * BG_WIDTH_COMPRESS))
-        new_h = max(1, int(bh * base_scale * BG_HEIGHT_COMPRESS))
-        # Prevent vertical cropping: if the compressed height still exceeds the
-        # screen height, scale down so new_h == HEIGHT (no top/bottom cutoff).
-        if new_h > HEIGHT:
-            scale_down = HEIGHT / float(new_h)
-            new_h = HEIGHT
-            new_w = max(1, int(new_w * scale_down))
+    # The framed fallback background is only needed without the updated one
+    FINAL_BG_SURF = None
+    if FINAL_BG_UPDATE_SCALED is None:
         try:
-            FINAL_BG_UPDATE_SCALED = pygame.transform.smoothscale(FINAL_BG_UPDATE_SURF, (new_w, new_h))
+            FINAL_BG_SURF = _load_image(os.path.join(BASE_DIR, 'Final_background.png'))
         except Exception:
-            FINAL_BG_UPDATE_SCALED = pygame.transform.scale(FINAL_BG_UPDATE_SURF, (new_w, new_h))
-    else:
-        FINAL_BG_UPDATE_SCALED = None
-except Exception:
-    FINAL_BG_UPDATE_SCALED = None
-
+            FINAL_BG_SURF = None
 
-def play_score_animation(screen, winner, loser, winner_avatar=None):
-    # --- UI装饰函数 ---
-    def draw_hearts(surface, x, y, count, spacing=28, size=18, color=(255, 200, 255)):
-        for i in range(count):
-            cx = x + i * spacing
-            left = (cx - size//4, y)
-            right = (cx + size//4, y)
-            # top point not used explicitly; circle + polygon form the heart
-            pygame.draw.circle(surface, color, left, size//3)
-            pygame.draw.circle(surface, color, right, size//3)
-            points = [(cx - size//2, y), (cx + size//2, y), (cx, y + size//2)]
-            pygame.draw.polygon(surface, color, points)
-
-    def draw_score_ui(surface):
-        # If a pre-scaled full-screen updated background is provided, use it and skip the purple frame.
-        if FINAL_BG_UPDATE_SCALED is not None:
-            try:
-                bw, bh = FINAL_BG_UPDATE_SCALED.get_size()
-                # small offset to nudge the image slightly right
-                FINAL_BG_OFFSET_X = 20
-                FINAL_BG_OFFSET_Y = 12
-                bx = (WIDTH - bw) // 2 + FINAL_BG_OFFSET_X + (globals().get('SCENE_SHIFT_X') if 'SCENE_SHIFT_X' in globals() else 0)
-                by = (HEIGHT - bh) // 2 + FINAL_BG_OFFSET_Y
-                # Clamp vertical position so the image never extends off-screen
-                if by < 0:
-                    by = 0
-                if by + bh > HEIGHT:
-                    by = HEIGHT - bh
-                # Clear to solid black first so no gameplay remnants show outside the background
-                try:
-                    surface.fill(BLACK)
-                except Exception:
-                    surface.fill((0, 0, 0))
-                # draw the pre-scaled background (centered)
-                surface.blit(FINAL_BG_UPDATE_SCALED, (bx, by))
-            except Exception:
-                # fallback to the purple frame if blit fails
-                surface.fill((180, 120, 220))
-                inner_rect = pygame.Rect(40, 40, WIDTH - 80, HEIGHT - 120)
-                pygame.draw.rect(surface, BLACK, inner_rect)
-            return
 
-        # 紫色外框和黑色内框 (fallback behavior)
-        surface.fill((180, 120, 220))
-        inner_rect = pygame.Rect(40, 40, WIDTH - 80, HEIGHT - 120)
-        # If a final background image is provided, draw it into the inner rect.
-        # Keep aspect ratio and center it. Otherwise fallback to a flat black background.
-        if FINAL_BG_SURF is not None:
-            try:
-                bw, bh = FINAL_BG_SURF.get_size()
-                # compute scale to fit inner rect while preserving aspect
-                scale = min((inner_rect.width) / bw, (inner_rect.height) / bh)
-                new_w = max(1, int(bw * scale))
-                new_h = max(1, int(bh * scale))
-                try:
-                    bg_s = pygame.transform.smoothscale(FINAL_BG_SURF, (new_w, new_h))
-                except Exception:
-                    bg_s = pygame.transform.scale(FINAL_BG_SURF, (new_w, new_h))
-                bx = inner_rect.left + (inner_rect.width - new_w) // 2
-                by = inner_rect.top + (inner_rect.height - new_h) // 2
-                # draw a subtle black fill behind the image for safety
-                pygame.draw.rect(surface, BLACK, inner_rect)
-                surface.blit(bg_s, (bx, by))
-            except Exception:
-                pygame.draw.rect(surface, BLACK, inner_rect)
-        else:
-            pygame.draw.rect(surface, BLACK, inner_rect)
-        # 顶部 hearts
-        draw_hearts(surface, inner_rect.left + 80, inner_rect.top + 20, 10, spacing=40, size=20, color=(240, 200, 255))
-        # 底部说明文字（上移一些避免与标题重叠）
-        sub = font_small.render('Press SPACE to continue', True, (220, 220, 240))
-        surface.blit(sub, (inner_rect.centerx - sub.get_width()//2, inner_rect.bottom - 80))
-    """Play a short ending animation: winner walks to a computer, sits, and wears a crown.
+def preload(winner_width=60):
+    """Load the final-scene images and the crown ahead of time.
 
-    Args:
-        screen: pygame display surface
-        winner: Player object who won
-        loser: Player object who lost (may be used for camera framing)
-        winner_avatar: Optional surface to show as avatar during the sequence
+    Safe on the preload thread: it only decodes, scales and convert()s the images
+    (convert() reads the display's pixel format, it never draws to the display).
     """
-    clock = pygame.time.Clock()
-
-    # (No special background) use normal BG_COLOR (import from settings if needed at module level)
-
-    # Setup simple scene positions (computer centered on screen)
-    # enlarge the monitor so the pixel-art image is more prominent
-    SCENE_SHIFT_X = -40
-    # Nudge the losing player's position (and its avatar) further left so it sits closer to the monitor
-    LOSER_NUDGE = -48
-    comp_w = 520
-    comp_h = 360
-    # center monitor in the middle of the screen (apply scene shift)
-    comp_x = WIDTH // 2 + SCENE_SHIFT_X
-    comp_y = HEIGHT // 2 + 80  # slightly lower than exact center so characters sit comfortably
-    monitor_rect = pygame.Rect(comp_x - comp_w // 2, comp_y - comp_h // 2 - 20, comp_w, comp_h)
-    chair_x = comp_x - 40
-    chair_y = monitor_rect.bottom + 6
-
-    # Pre-render VICTORY text and rect so we can position the winner above it
-    vt = font_medium.render("VICTORY", True, ORANGE)
-    vt_rect = vt.get_rect(center=(monitor_rect.centerx, monitor_rect.centery))
-    VT_FEET_GAP = 8  # pixels gap between top of victory text and winner's feet
-    WINNER_SCALE = 1.4  # how much larger the winner should appear in the final scene
-
-    # prefer the preloaded pixel crown if available; keep legacy fallback
-    crown = CROWN_SURF
-
-    # Determine target x for winner to walk to (center of computer)
-    target_x = comp_x - winner.width // 2
-    walking = True
-    sit_timer = 0
-    # show crown from the start of the animation
-    crown_timer = FPS * 6
-    crown_allowed = True
-    # Prepare jump animation params
-    jump_phase = 0.0
-    jump_speed = 0.18
-    jump_height = 40
-
-    # tears for loser
-    tears = []
-
-    # Freeze both players movement for the animation
-    winner.vel_x = 0
-    winner.vel_y = 0
-    loser.vel_x = 0
-    loser.vel_y = 0
-
-    # Save gameplay-related state and clear effects so final animation isn't affected
-    _saved_winner_state = {}
-    _saved_loser_state = {}
-    try:
-        for p, storage in ((winner, _saved_winner_state), (loser, _saved_loser_state)):
-            storage['is_super'] = getattr(p, 'is_super', False)
-            storage['super_timer'] = getattr(p, 'super_timer', 0)
-            storage['super_collision_cooldown'] = getattr(p, 'super_collision_cooldown', 0)
-            storage['is_frozen'] = getattr(p, 'is_frozen', False)
-            storage['freeze_timer'] = getattr(p, 'freeze_timer', 0)
-            storage['is_reversed'] = getattr(p, 'is_reversed', False)
-            storage['reverse_timer'] = getattr(p, 'reverse_timer', 0)
-            storage['skill'] = getattr(p, 'skill', None)
-            storage['is_attacking'] = getattr(p, 'is_attacking', False)
-            storage['attack_frame'] = getattr(p, 'attack_frame', 0)
-            storage['attack_cooldown'] = getattr(p, 'attack_cooldown', 0)
-            storage['knockback_x'] = getattr(p, 'knockback_x', 0)
-            storage['vel_x'] = getattr(p, 'vel_x', 0)
-            storage['vel_y'] = getattr(p, 'vel_y', 0)
-            storage['on_ground'] = getattr(p, 'on_ground', False)
-
-            # clear active effects
-            p.is_super = False
-            p.super_timer = 0
-            p.super_collision_cooldown = 0
-            p.is_frozen = False
-            p.freeze_timer = 0
-            p.is_reversed = False
-            p.reverse_timer = 0
-            p.skill = None
-            p.is_attacking = False
-            p.attack_frame = 0
-            p.attack_cooldown = 0
-            p.knockback_x = 0
-            p.vel_x = 0
-            p.vel_y = 0
-            p.on_ground = True
-    except Exception:
-        # if anything goes wrong, fall back to not crashing the animation
-        _saved_winner_state = {}
-        _saved_loser_state = {}
-
-    # Place loser beside the monitor image (prefer right side if there's space)
-    # default spacing from monitor edge (smaller so avatar sits closer)
-    side_spacing = 8  # reduced spacing to bring loser closer horizontally
-    # preferred to the right of the monitor
-    right_x = monitor_rect.right + side_spacing
-    left_x = monitor_rect.left - side_spacing - loser.width
-    # choose the side that fits within the screen; prefer right if room
-    if right_x + loser.width + 16 < WIDTH:
-        loser_target_x = right_x
-    else:
-        loser_target_x = max(8, left_x)
-    # nudge loser slightly up and left to sit visually closer to the monitor
-    loser.x = int(loser_target_x) - 8 + LOSER_NUDGE
-    loser.y = monitor_rect.bottom - loser.height + 10
+    _load_assets()
+    crown_sprite(winner_width)
 
-    # Use a module-preloaded monitor surface for instant start
-    monitor_s = MONITOR_SURF
 
-    # Walk loop: move winner toward target_x
-    for frame in range(FPS * 6):  # up to 6 seconds
-        clock.tick(FPS)
-        for ev in pygame.event.get():
-            if ev.type == pygame.QUIT:
-                return
-
-        # move winner toward target
-        if walking:
-            if abs(winner.x - target_x) > 4:
-                step = 3 if winner.x < target_x else -3
-                winner.x += step
-                winner.facing_right = True if step > 0 else False
-            else:
-                walking = False
-                sit_timer = FPS * 1  # 1 second to sit
-
-        elif sit_timer > 0:
-            # small sitting animation: lower y a bit
-            winner.y += (chair_y - winner.y) * 0.2
-            sit_timer -= 1
-            if sit_timer <= 0:
-                # start crown timer immediately and allow crown to appear as soon as jump starts
-                crown_timer = FPS * 2  # 2 seconds as safety, but we'll also show crown when jumping begins
-
-        elif crown_timer > 0:
-            crown_timer -= 1
-
-
-        # 先画UI装饰
-        draw_score_ui(screen)
-
-        # 再画原有胜利场景（电脑、椅子、角色等）
-        # draw computer (base + monitor)
-        # Prefer using a pixel-art monitor image if available in final/computer.png
-        # draw monitor: use preloaded image if available
-        if monitor_s is not None:
-            screen.blit(monitor_s, (monitor_rect.centerx - monitor_s.get_width()//2, monitor_rect.centery - monitor_s.get_height()//2))
-        else:
-            base_h = 12
-            base_rect = pygame.Rect(monitor_rect.left, monitor_rect.bottom + 6, comp_w, base_h)
-            pygame.draw.rect(screen, KEY_SIDE, base_rect)
-            pygame.draw.rect(screen, KEY_COLOR, monitor_rect)
-            pygame.draw.rect(screen, KEY_SHADOW, monitor_rect, 3)
+def reload_assets():
+    """Forget the loaded final-scene images so the next use loads them again."""
+    global _assets_loaded, CROWN_SURF
+    _assets_loaded = False
+    CROWN_SURF = None
+    _crown_sprites.clear()
+    _load_assets()
 
-            # draw chair (decorative) under the monitor area only when drawing the fallback monitor
-            pygame.draw.rect(screen, KEY_SIDE, (chair_x, chair_y, 50, 10))
-            pygame.draw.rect(screen, KEY_COLOR, (chair_x, chair_y - 30, 50, 30))
 
-        # draw VICTORY text at the same position each frame (position unchanged)
-        screen.blit(vt, vt_rect)
+def crown_sprite(winner_width):
+    """Pixel crown scaled for a winner of the given width (cached per width).
 
-    # (chair is drawn with the fallback monitor only)
+    Returns None when Crown.png is missing, so callers draw the polygon fallback.
+    """
+    desired_w = max(1, int(winner_width * WINNER_SCALE * 0.9))
+    if desired_w in _crown_sprites:
+        return _crown_sprites[desired_w]
+
+    def render():
+        global CROWN_SURF
+        if CROWN_SURF is None:
+            CROWN_SURF = _load_image(os.path.join(BASE_DIR, 'Crown.png'))
+        if CROWN_SURF is None:
+            return None
+        cw, ch = CROWN_SURF.get_size()
+        scale_h = int(ch * (desired_w / cw)) if cw else ch
+        return pygame.transform.smoothscale(CROWN_SURF, (desired_w, max(1, scale_h)))
 
-        # draw loser beside the computer (prefer right side when space allows)
-        side_spacing = 8
-        right_x = monitor_rect.right + side_spacing
-        left_x = monitor_rect.left - side_spacing - loser.width
-        if right_x + loser.width + 16 < WIDTH:
-            loser_target_x = right_x
-        else:
-            loser_target_x = max(8, left_x)
-        # apply the same visual nudge as initial placement (left and up)
-        loser.x = int(loser_target_x) - 8 + LOSER_NUDGE
-        loser.y = monitor_rect.bottom - loser.height + 10
-        # Prevent duplicate avatars: temporarily hide loser's avatar while drawing base sprite
+    try:
+        sprite = ASSETS.baked(f"score:crown:{desired_w}", render,
+                              sources=('final/score.py', 'final/Crown.png'))
+    except Exception:
+        sprite = None
+    _crown_sprites[desired_w] = sprite
+    return sprite
+
+
+# Scene layout (computer centered on screen, shifted slightly left)
+SCENE_SHIFT_X = -40
+# Nudge the losing player's position (and its avatar) further left so it sits closer to the monitor
+LOSER_NUDGE = -48
+COMP_W = 520
+COMP_H = 360
+VT_FEET_GAP = 8  # pixels gap between top of victory text and winner's feet
+WALK_SPEED = 3
+JUMP_SPEED = 0.18
+JUMP_HEIGHT = 40
+# The walk/sit/crown part of the sequence gives up after this many frames
+SEQUENCE_FRAMES = FPS * 6
+
+# Scene phases
+WALK, SIT, CROWN, WAIT = range(4)
+
+
+def _draw_hearts(surface, x, y, count, spacing=28, size=18, color=(255, 200, 255)):
+    for i in range(count):
+        cx = x + i * spacing
+        left = (cx - size//4, y)
+        right = (cx + size//4, y)
+        # top point not used explicitly; circle + polygon form the heart
+        pygame.draw.circle(surface, color, left, size//3)
+        pygame.draw.circle(surface, color, right, size//3)
+        points = [(cx - size//2, y), (cx + size//2, y), (cx, y + size//2)]
+        pygame.draw.polygon(surface, color, points)
+
+
+def _draw_score_ui(surface):
+    # If a pre-scaled full-screen updated background is provided, use it and skip the purple frame.
+    if FINAL_BG_UPDATE_SCALED is not None:
         try:
-            _saved_avatar = getattr(loser, 'avatar', None)
-            _saved_cached = getattr(loser, '_cached_avatar', None)
-            try:
-                loser.avatar = None
-            except Exception:
-                pass
-            try:
-                loser._cached_avatar = None
-            except Exception:
-                pass
-
-            # draw the loser's body (without avatar)
-            loser.draw(screen)
-
-            # draw a single avatar manually (shifted left to sit closer to monitor)
-            avatar_surf = _saved_avatar or _saved_cached
-            if avatar_surf:
-                try:
-                    aw, ah = avatar_surf.get_size()
-                    max_aw = int(loser.width * 0.5)
-                    max_ah = int(loser.height * 0.5)
-                    scale = min(max_aw / aw if aw else 1, max_ah / ah if ah else 1, 1)
-                    new_w = max(1, int(aw * scale))
-                    new_h = max(1, int(ah * scale))
-                    try:
-                        av = pygame.transform.smoothscale(avatar_surf, (new_w, new_h))
-                    except Exception:
-                        av = pygame.transform.scale(avatar_surf, (new_w, new_h))
-                    # Center avatar within the loser's frame (same logic as winner)
-                    ax = int(loser.x + (loser.width - av.get_width()) / 2)
-                    ay = int(loser.y + (loser.height - av.get_height()) / 2)
-                    screen.blit(av, (ax, ay))
-                except Exception:
-                    pass
-        finally:
-            # restore avatar fields
+            bw, bh = FINAL_BG_UPDATE_SCALED.get_size()
+            # small offset to nudge the image slightly right
+            FINAL_BG_OFFSET_X = 20
+            FINAL_BG_OFFSET_Y = 12
+            bx = (WIDTH - bw) // 2 + FINAL_BG_OFFSET_X
+            by = (HEIGHT - bh) // 2 + FINAL_BG_OFFSET_Y
+            # Clamp vertical position so the image never extends off-screen
+            by = max(0, min(by, HEIGHT - bh))
+            # Clear to solid black first so no gameplay remnants show outside the background
+            surface.fill(BLACK)
+            surface.blit(FINAL_BG_UPDATE_SCALED, (bx, by))
+        except Exception:
+            # fallback to the purple frame if blit fails
+            surface.fill((180, 120, 220))
+            inner_rect = pygame.Rect(40, 40, WIDTH - 80, HEIGHT - 120)
+            pygame.draw.rect(surface, BLACK, inner_rect)
+        return
+
+    # 紫色外框和黑色内框 (fallback behavior)
+    surface.fill((180, 120, 220))
+    inner_rect = pygame.Rect(40, 40, WIDTH - 80, HEIGHT - 120)
+    pygame.draw.rect(surface, BLACK, inner_rect)
+    # If a final background image is provided, fit it into the inner rect keeping its aspect ratio.
+    if FINAL_BG_SURF is not None:
+        try:
+            bw, bh = FINAL_BG_SURF.get_size()
+            scale = min(inner_rect.width / bw, inner_rect.height / bh)
+            new_w = max(1, int(bw * scale))
+            new_h = max(1, int(bh * scale))
             try:
-                loser.avatar = _saved_avatar
+                bg_s = pygame.transform.smoothscale(FINAL_BG_SURF, (new_w, new_h))
             except Exception:
-                pass
+                bg_s = pygame.transform.scale(FINAL_BG_SURF, (new_w, new_h))
+            surface.blit(bg_s, (inner_rect.left + (inner_rect.width - new_w) // 2,
+                                inner_rect.top + (inner_rect.height - new_h) // 2))
+        except Exception:
+            pass
+    # 顶部 hearts
+    _draw_hearts(surface, inner_rect.left + 80, inner_rect.top + 20, 10, spacing=40, size=20, color=(240, 200, 255))
+    # 底部说明文字（上移一些避免与标题重叠）
+    sub = render_text(font_small, 'Press SPACE to continue', (220, 220, 240))
+    surface.blit(sub, (inner_rect.centerx - sub.get_width()//2, inner_rect.bottom - 80))
+
+
+def _figure_sprite(player, size, facing_right, avatar):
+    """Render a player's body (sprite image or colored block) with its avatar centered on it.
+
+    The result is what Player.draw() shows without status effects, scaled to `size`.
+    """
+    img = player.current_image if getattr(player, 'use_image', False) else None
+    if img is not None:
+        if not facing_right:
+            img = pygame.transform.flip(img, True, False)
+        if img.get_size() != size:
             try:
-                loser._cached_avatar = _saved_cached
+                img = pygame.transform.smoothscale(img, size)
             except Exception:
-                pass
-
-        # draw winner (on top of monitor, jumping)
-        if not walking:
-            jump_phase += jump_speed
-            offset = -int(abs(math.sin(jump_phase)) * jump_height)
-            # place the winner so their feet sit above the top of the VICTORY text
-            base_y = vt_rect.top - winner.height - VT_FEET_GAP
-            winner.y = base_y + offset
-            # allow crown once the winner has actually reached the base_y (i.e. above VICTORY)
-            if not crown_allowed:
-                try:
-                    if abs(winner.y - base_y) <= 2:
-                        crown_allowed = True
-                except Exception:
-                    crown_allowed = True
-        winner.x = int(winner.x)
-        # draw enlarged winner for the final animation (do not modify Player permanently)
+                img = pygame.transform.scale(img, size)
+        sprite = img.copy()
+    else:
+        sprite = pygame.Surface(size, pygame.SRCALPHA)
+        sprite.fill(player.color)
+    if avatar is not None:
         try:
-            scale = WINNER_SCALE
-            expanded_w = int(winner.width * scale)
-            expanded_h = int(winner.height * scale)
-            # Align expanded image such that the feet align with original bottom (winner.y + winner.height)
-            draw_x = int(winner.x + winner.width / 2 - expanded_w / 2)
-            draw_y = int(winner.y + winner.height - expanded_h)
-
-            if getattr(winner, 'use_image', False) and getattr(winner, 'current_image', None):
-                img = winner.current_image
-                if not winner.facing_right:
-                    try:
-                        img = pygame.transform.flip(img, True, False)
-                    except Exception:
-                        pass
-                try:
-                    big = pygame.transform.smoothscale(img, (expanded_w, expanded_h))
-                except Exception:
-                    big = pygame.transform.scale(img, (expanded_w, expanded_h))
-                screen.blit(big, (draw_x, draw_y))
-                # draw avatar inside the enlarged sprite if available
-                avatar_surf = None
-                if getattr(winner, 'avatar', None):
-                    avatar_surf = winner.avatar
-                elif getattr(winner, '_cached_avatar', None):
-                    avatar_surf = winner._cached_avatar
-
-                if avatar_surf:
-                    try:
-                        aw, ah = avatar_surf.get_size()
-                        max_aw = int(expanded_w * 0.5)
-                        max_ah = int(expanded_h * 0.5)
-                        scale = min(max_aw / aw if aw else 1, max_ah / ah if ah else 1, 1)
-                        new_w = max(1, int(aw * scale))
-                        new_h = max(1, int(ah * scale))
-                        try:
-                            av = pygame.transform.smoothscale(avatar_surf, (new_w, new_h))
-                        except Exception:
-                            av = pygame.transform.scale(avatar_surf, (new_w, new_h))
-                        ax = draw_x + (expanded_w - av.get_width()) // 2
-                        ay = draw_y + (expanded_h - av.get_height()) // 2
-                        screen.blit(av, (ax, ay))
-                    except Exception:
-                        pass
-            else:
-                # fallback: draw a larger rect
-                pygame.draw.rect(screen, winner.color, (draw_x, draw_y, expanded_w, expanded_h))
-                # draw avatar inside enlarged rect if available
-                avatar_surf = getattr(winner, 'avatar', None) or getattr(winner, '_cached_avatar', None)
-                if avatar_surf:
-                    try:
-                        aw, ah = avatar_surf.get_size()
-                        max_aw = int(expanded_w * 0.5)
-                        max_ah = int(expanded_h * 0.5)
-                        scale = min(max_aw / aw if aw else 1, max_ah / ah if ah else 1, 1)
-                        new_w = max(1, int(aw * scale))
-                        new_h = max(1, int(ah * scale))
-                        try:
-                            av = pygame.transform.smoothscale(avatar_surf, (new_w, new_h))
-                        except Exception:
-                            av = pygame.transform.scale(avatar_surf, (new_w, new_h))
-                        ax = draw_x + (expanded_w - av.get_width()) // 2
-                        ay = draw_y + (expanded_h - av.get_height()) // 2
-                        screen.blit(av, (ax, ay))
-                    except Exception:
-                        pass
-        except Exception:
-            # On any error, fall back to the normal draw call
+            aw, ah = avatar.get_size()
+            max_aw = int(size[0] * 0.5)
+            max_ah = int(size[1] * 0.5)
+            scale = min(max_aw / aw if aw else 1, max_ah / ah if ah else 1, 1)
+            new_w = max(1, int(aw * scale))
+            new_h = max(1, int(ah * scale))
             try:
-                winner.draw(screen)
+                av = pygame.transform.smoothscale(avatar, (new_w, new_h))
             except Exception:
-                pass
-
-        # no avatar above the winner in the final animation (keep screen clean)
-        # show crown when timer active OR when the winner has started the jump animation
-        # only draw crown after the winner has moved into position above VICTORY
-        if crown_allowed and (crown_timer > 0 or jump_phase > 0 or (not walking and sit_timer <= 0)):
-            # position crown relative to the enlarged winner drawing
-            cx = int(winner.x + winner.width//2)
-            cy = int(winner.y - 22)
-            if crown is not None:
-                try:
-                    cw, ch = crown.get_size()
-                    # crown should scale roughly with the enlarged winner width
-                    desired_w = int(winner.width * WINNER_SCALE * 0.9)
-                    scale_h = int(ch * (desired_w / cw)) if cw else ch
-                    crown_s = pygame.transform.smoothscale(crown, (max(1, desired_w), max(1, scale_h)))
-                    screen.blit(crown_s, (cx - crown_s.get_width()//2, cy - crown_s.get_height()//2))
-                except Exception:
-                    # fallback to simple polygon if crown blit fails
-                    points = [(cx - 18, cy + 12), (cx - 12, cy - 6), (cx - 4, cy + 8), (cx + 4, cy - 6), (cx + 12, cy + 12)]
-                    pygame.draw.polygon(screen, ORANGE, points)
-                    pygame.draw.polygon(screen, YELLOW, points, 2)
-            else:
-                points = [(cx - 18, cy + 12), (cx - 12, cy - 6), (cx - 4, cy + 8), (cx + 4, cy - 6), (cx + 12, cy + 12)]
-                pygame.draw.polygon(screen, ORANGE, points)
-                pygame.draw.polygon(screen, YELLOW, points, 2)
+                av = pygame.transform.scale(avatar, (new_w, new_h))
+            sprite.blit(av, ((size[0] - new_w) // 2, (size[1] - new_h) // 2))
+        except Exception:
+            pass
+    return sprite
 
-    # top-left caption removed per UX request
 
-        # draw tears for loser
-        if random.random() < 0.12:
-            eye_x = int(loser.x + loser.width * 0.5)
-            eye_y = int(loser.y + 16)
-            tears.append({'x': eye_x + random.randint(-6, 6), 'y': eye_y, 'vy': 2 + random.random()*2})
+class ScoreScene(Scene):
+    """Ending scene: the winner walks to a computer, sits, and keeps jumping with a crown on.
 
-        for t in tears[:]:
-            pygame.draw.circle(screen, CYAN, (int(t['x']), int(t['y'])), 3)
-            t['y'] += t['vy']
-            t['vy'] += 0.12
-            if t['y'] > HEIGHT:
-                tears.remove(t)
+    The scene is a small state machine (WALK -> SIT -> CROWN -> WAIT) driven by the
+    caller's loop: call handle_event() for each event, then update() and draw() once
+    per frame, until `done` is set (SPACE pressed, or the sequence timed out).
+    On a scene stack it pops itself once done.
 
-        pygame.display.flip()
+    Everything that needs scaling is prepared once here: the static backdrop (background,
+    monitor, VICTORY text and the loser) is baked into one surface, and the enlarged
+    winner is rendered once per facing. A frame is then a few blits. The players are
+    only read, never modified; the scene keeps its own copy of the winner's position.
 
-        # early exit when crown animation done (mark finished instead of returning immediately)
-        finished = False
-        if not walking and sit_timer <= 0 and crown_timer <= 0:
-            finished = True
-            break
-
-    # If the animation reached the finished state, keep rendering the final scene
-    # until the player presses SPACE. This allows the animation to loop indefinitely
-    # and only continue when the user confirms.
-    if 'finished' in locals() and finished:
-        waiting = True
-        while waiting:
-            clock.tick(FPS)
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT:
-                    return
-                if ev.type == pygame.KEYDOWN and ev.key == pygame.K_SPACE:
-                    waiting = False
-            # Advance jump animation so the winner keeps bouncing while waiting
-            try:
-                if not walking:
-                    jump_phase += jump_speed
-                    offset = -int(abs(math.sin(jump_phase)) * jump_height)
-                    base_y = vt_rect.top - winner.height - VT_FEET_GAP
-                    winner.y = base_y + offset
-                    # allow crown once the winner is roughly at base_y
-                    if not crown_allowed:
-                        try:
-                            if abs(winner.y - base_y) <= 2:
-                                crown_allowed = True
-                        except Exception:
-                            crown_allowed = True
-                winner.x = int(winner.x)
-            except Exception:
-                pass
-
-            # redraw final UI and scene each frame
-            draw_score_ui(screen)
+    Args:
+        winner: Player object who won
+        loser: Player object who lost
+        winner_avatar: Optional surface shown on the winner (defaults to the winner's avatar)
+    """
 
-            # draw monitor (use preloaded image if available)
-            if monitor_s is not None:
-                try:
-                    screen.blit(monitor_s, (monitor_rect.centerx - monitor_s.get_width()//2, monitor_rect.centery - monitor_s.get_height()//2))
-                except Exception:
-                    pass
+    def __init__(self, winner, loser, winner_avatar=None):
+        super().__init__()
+        _load_assets()
+        self.phase = WALK
+        self.done = False
+        self.frame = 0
+        self.timer = 0
+        self.jump_phase = 0.0
+        self.tears = []
+
+        comp_x = WIDTH // 2 + SCENE_SHIFT_X
+        comp_y = HEIGHT // 2 + 80  # slightly lower than exact center so characters sit comfortably
+        monitor_rect = pygame.Rect(comp_x - COMP_W // 2, comp_y - COMP_H // 2 - 20, COMP_W, COMP_H)
+        vt = render_text(font_medium, "VICTORY", ORANGE)
+        vt_rect = vt.get_rect(center=monitor_rect.center)
+
+        # Winner: walks toward the center of the computer, then jumps on top of the VICTORY text
+        self.width = winner.width
+        self.height = winner.height
+        self.x = winner.x
+        self.y = winner.y
+        self.facing_right = winner.facing_right
+        self.target_x = comp_x - winner.width // 2
+        self.base_y = vt_rect.top - winner.height - VT_FEET_GAP
+        expanded = (int(winner.width * WINNER_SCALE), int(winner.height * WINNER_SCALE))
+        avatar = winner_avatar or getattr(winner, 'avatar', None) or getattr(winner, '_cached_avatar', None)
+        self.winner_sprites = {facing: _figure_sprite(winner, expanded, facing, avatar) for facing in (True, False)}
+        self.crown = crown_sprite(winner.width)
+
+        # Loser: placed beside the monitor (prefer right side when space allows)
+        right_x = monitor_rect.right + 8
+        left_x = monitor_rect.left - 8 - loser.width
+        loser_x = right_x if right_x + loser.width + 16 < WIDTH else max(8, left_x)
+        loser_x = int(loser_x) - 8 + LOSER_NUDGE
+        loser_y = monitor_rect.bottom - loser.height + 10
+        self.eye = (int(loser_x + loser.width * 0.5), int(loser_y + 16))
+
+        # Static backdrop, composed once
+        backdrop = pygame.Surface((WIDTH, HEIGHT))
+        _draw_score_ui(backdrop)
+        if MONITOR_SURF is not None:
+            backdrop.blit(MONITOR_SURF, MONITOR_SURF.get_rect(center=monitor_rect.center))
+        else:
+            chair_x = comp_x - 40
+            chair_y = monitor_rect.bottom + 6
+            pygame.draw.rect(backdrop, KEY_SIDE, (monitor_rect.left, monitor_rect.bottom + 6, COMP_W, 12))
+            pygame.draw.rect(backdrop, KEY_COLOR, monitor_rect)
+            pygame.draw.rect(backdrop, KEY_SHADOW, monitor_rect, 3)
+            # draw chair (decorative) under the monitor area only when drawing the fallback monitor
+            pygame.draw.rect(backdrop, KEY_SIDE, (chair_x, chair_y, 50, 10))
+            pygame.draw.rect(backdrop, KEY_COLOR, (chair_x, chair_y - 30, 50, 30))
+        backdrop.blit(vt, vt_rect)
+        loser_avatar = getattr(loser, 'avatar', None) or getattr(loser, '_cached_avatar', None)
+        backdrop.blit(_figure_sprite(loser, (loser.width, loser.height), loser.facing_right, loser_avatar),
+                      (loser_x, loser_y))
+        if getattr(loser, 'tag', None):
+            tag_text = render_text(font_indicator, loser.tag, loser.tag_color)
+            backdrop.blit(tag_text, tag_text.get_rect(center=(loser_x + loser.width // 2, loser_y + loser.height + 8)))
+        try:
+            backdrop = backdrop.convert()
+        except Exception:
+            pass
+        self.backdrop = backdrop
+
+    def handle_event(self, event):
+        """SPACE skips the rest of the scene. Returns True when the event was used."""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+            self.done = True
+            return True
+        return False
+
+    def update(self):
+        if self.done:
+            if self.manager is not None:
+                self.manager.pop(self)
+            return
+        self.frame += 1
+        if self.phase == WALK:
+            if abs(self.x - self.target_x) > 4:
+                step = WALK_SPEED if self.x < self.target_x else -WALK_SPEED
+                self.x += step
+                self.facing_right = step > 0
             else:
-                try:
-                    base_h = 12
-                    base_rect = pygame.Rect(monitor_rect.left, monitor_rect.bottom + 6, comp_w, base_h)
-                    pygame.draw.rect(screen, KEY_SIDE, base_rect)
-                    pygame.draw.rect(screen, KEY_COLOR, monitor_rect)
-                    pygame.draw.rect(screen, KEY_SHADOW, monitor_rect, 3)
-                    pygame.draw.rect(screen, KEY_SIDE, (chair_x, chair_y, 50, 10))
-                    pygame.draw.rect(screen, KEY_COLOR, (chair_x, chair_y - 30, 50, 30))
-                except Exception:
-                    pass
-
-            # draw VICTORY text
-            try:
-                screen.blit(vt, vt_rect)
-            except Exception:
-                pass
-
-            # draw loser (reuse the same safe avatar logic)
-            try:
-                side_spacing = 8
-                right_x = monitor_rect.right + side_spacing
-                left_x = monitor_rect.left - side_spacing - loser.width
-                if right_x + loser.width + 16 < WIDTH:
-                    loser_target_x = right_x
-                else:
-                    loser_target_x = max(8, left_x)
-                loser.x = int(loser_target_x) - 8 + LOSER_NUDGE
-                loser.y = monitor_rect.bottom - loser.height + 10
-
-                _saved_avatar = getattr(loser, 'avatar', None)
-                _saved_cached = getattr(loser, '_cached_avatar', None)
-                try:
-                    loser.avatar = None
-                except Exception:
-                    pass
-                try:
-                    loser._cached_avatar = None
-                except Exception:
-                    pass
-
-                loser.draw(screen)
-
-                avatar_surf = _saved_avatar or _saved_cached
-                if avatar_surf:
-                    try:
-                        aw, ah = avatar_surf.get_size()
-                        max_aw = int(loser.width * 0.5)
-                        max_ah = int(loser.height * 0.5)
-                        scale = min(max_aw / aw if aw else 1, max_ah / ah if ah else 1, 1)
-                        new_w = max(1, int(aw * scale))
-                        new_h = max(1, int(ah * scale))
-                        try:
-                            av = pygame.transform.smoothscale(avatar_surf, (new_w, new_h))
-                        except Exception:
-                            av = pygame.transform.scale(avatar_surf, (new_w, new_h))
-                        ax = int(loser.x + (loser.width - av.get_width()) / 2)
-                        ay = int(loser.y + (loser.height - av.get_height()) / 2)
-                        screen.blit(av, (ax, ay))
-                    except Exception:
-                        pass
-                try:
-                    loser.avatar = _saved_avatar
-                except Exception:
-                    pass
-                try:
-                    loser._cached_avatar = _saved_cached
-                except Exception:
-                    pass
-            except Exception:
-                pass
-
-            # draw enlarged winner and avatar
-            try:
-                scale = WINNER_SCALE
-                expanded_w = int(winner.width * scale)
-                expanded_h = int(winner.height * scale)
-                draw_x = int(winner.x + winner.width / 2 - expanded_w / 2)
-                draw_y = int(winner.y + winner.height - expanded_h)
-
-                if getattr(winner, 'use_image', False) and getattr(winner, 'current_image', None):
-                    img = winner.current_image
-                    if not winner.facing_right:
-                        try:
-                            img = pygame.transform.flip(img, True, False)
-                        except Exception:
-                            pass
-                    try:
-                        big = pygame.transform.smoothscale(img, (expanded_w, expanded_h))
-                    except Exception:
-                        big = pygame.transform.scale(img, (expanded_w, expanded_h))
-                    screen.blit(big, (draw_x, draw_y))
-                    avatar_surf = None
-                    if getattr(winner, 'avatar', None):
-                        avatar_surf = winner.avatar
-                    elif getattr(winner, '_cached_avatar', None):
-                        avatar_surf = winner._cached_avatar
-
-                    if avatar_surf:
-                        try:
-                            aw, ah = avatar_surf.get_size()
-                            max_aw = int(expanded_w * 0.5)
-                            max_ah = int(expanded_h * 0.5)
-                            scale = min(max_aw / aw if aw else 1, max_ah / ah if ah else 1, 1)
-                            new_w = max(1, int(aw * scale))
-                            new_h = max(1, int(ah * scale))
-                            try:
-                                av = pygame.transform.smoothscale(avatar_surf, (new_w, new_h))
-                            except Exception:
-                                av = pygame.transform.scale(avatar_surf, (new_w, new_h))
-                            ax = draw_x + (expanded_w - av.get_width()) // 2
-                            ay = draw_y + (expanded_h - av.get_height()) // 2
-                            screen.blit(av, (ax, ay))
-                        except Exception:
-                            pass
-                else:
-                    pygame.draw.rect(screen, winner.color, (draw_x, draw_y, expanded_w, expanded_h))
-                    avatar_surf = getattr(winner, 'avatar', None) or getattr(winner, '_cached_avatar', None)
-                    if avatar_surf:
-                        try:
-                            aw, ah = avatar_surf.get_size()
-                            max_aw = int(expanded_w * 0.5)
-                            max_ah = int(expanded_h * 0.5)
-                            scale = min(max_aw / aw if aw else 1, max_ah / ah if ah else 1, 1)
-                            new_w = max(1, int(aw * scale))
-                            new_h = max(1, int(ah * scale))
-                            try:
-                                av = pygame.transform.smoothscale(avatar_surf, (new_w, new_h))
-                            except Exception:
-                                av = pygame.transform.scale(avatar_surf, (new_w, new_h))
-                            ax = draw_x + (expanded_w - av.get_width()) // 2
-                            ay = draw_y + (expanded_h - av.get_height()) // 2
-                            screen.blit(av, (ax, ay))
-                        except Exception:
-                            pass
-            except Exception:
-                try:
-                    winner.draw(screen)
-                except Exception:
-                    pass
-
-            # draw crown
-            try:
-                if crown is not None:
-                    cw, ch = crown.get_size()
-                    desired_w = int(winner.width * WINNER_SCALE * 0.9)
-                    scale_h = int(ch * (desired_w / cw)) if cw else ch
-                    crown_s = pygame.transform.smoothscale(crown, (max(1, desired_w), max(1, scale_h)))
-                    cx = int(winner.x + winner.width//2)
-                    cy = int(winner.y - 22)
-                    screen.blit(crown_s, (cx - crown_s.get_width()//2, cy - crown_s.get_height()//2))
-            except Exception:
-                pass
+                self.phase = SIT
+                self.timer = FPS  # 1 second to sit
+        elif self.phase == SIT:
+            self.timer -= 1
+            if self.timer <= 0:
+                self.phase = CROWN
+                self.timer = FPS * 2
+        elif self.phase == CROWN:
+            self.timer -= 1
+            if self.timer <= 0:
+                # keep the final scene up (winner bouncing) until SPACE
+                self.phase = WAIT
+
+        if self.phase != WALK:
+            self.jump_phase += JUMP_SPEED
+            self.y = self.base_y - int(abs(math.sin(self.jump_phase)) * JUMP_HEIGHT)
+        self.x = int(self.x)
+
+        # tears for loser
+        if random.random() < 0.12:
+            self.tears.append([self.eye[0] + random.randint(-6, 6), self.eye[1], 2 + random.random() * 2])
+        for t in self.tears:
+            t[1] += t[2]
+            t[2] += 0.12
+        self.tears = [t for t in self.tears if t[1] <= HEIGHT]
+
+        if self.phase != WAIT and self.frame >= SEQUENCE_FRAMES:
+            self.done = True
+
+    def draw(self, screen):
+        screen.blit(self.backdrop, (0, 0))
+
+        # enlarged winner, feet aligned with the original bottom edge
+        sprite = self.winner_sprites[self.facing_right]
+        draw_x = int(self.x + self.width / 2 - sprite.get_width() / 2)
+        draw_y = int(self.y + self.height - sprite.get_height())
+        screen.blit(sprite, (draw_x, draw_y))
+
+        cx = int(self.x + self.width // 2)
+        cy = int(self.y - 22)
+        if self.crown is not None:
+            screen.blit(self.crown, (cx - self.crown.get_width()//2, cy - self.crown.get_height()//2))
+        else:
+            points = [(cx - 18, cy + 12), (cx - 12, cy - 6), (cx - 4, cy + 8), (cx + 4, cy - 6), (cx + 12, cy + 12)]
+            pygame.draw.polygon(screen, ORANGE, points)
+            pygame.draw.polygon(screen, YELLOW, points, 2)
 
-            # tears update
-            try:
-                if random.random() < 0.12:
-                    eye_x = int(loser.x + loser.width * 0.5)
-                    eye_y = int(loser.y + 16)
-                    tears.append({'x': eye_x + random.randint(-6, 6), 'y': eye_y, 'vy': 2 + random.random()*2})
-            except Exception:
-                pass
+        for x, y, _ in self.tears:
+            pygame.draw.circle(screen, CYAN, (int(x), int(y)), 3)
 
-            for t in tears[:]:
-                try:
-                    pygame.draw.circle(screen, CYAN, (int(t['x']), int(t['y'])), 3)
-                    t['y'] += t['vy']
-                    t['vy'] += 0.12
-                    if t['y'] > HEIGHT:
-                        tears.remove(t)
-                except Exception:
-                    pass
 
-            pygame.display.flip()
+def play_score_animation(screen, winner, loser, winner_avatar=None):
+    """Play the ending scene in its own loop until SPACE (blocking version of ScoreScene).
 
-    # Restore saved gameplay state so players resume normal behavior after the animation
-    try:
-        for p, storage in ((winner, _saved_winner_state), (loser, _saved_loser_state)):
-            if not storage:
-                continue
-            try:
-                p.is_super = storage.get('is_super', False)
-                p.super_timer = storage.get('super_timer', 0)
-                p.super_collision_cooldown = storage.get('super_collision_cooldown', 0)
-                p.is_frozen = storage.get('is_frozen', False)
-                p.freeze_timer = storage.get('freeze_timer', 0)
-                p.is_reversed = storage.get('is_reversed', False)
-                p.reverse_timer = storage.get('reverse_timer', 0)
-                p.skill = storage.get('skill', None)
-                p.is_attacking = storage.get('is_attacking', False)
-                p.attack_frame = storage.get('attack_frame', 0)
-                p.attack_cooldown = storage.get('attack_cooldown', 0)
-                p.knockback_x = storage.get('knockback_x', 0)
-                p.vel_x = storage.get('vel_x', 0)
-                p.vel_y = storage.get('vel_y', 0)
-                p.on_ground = storage.get('on_ground', False)
-            except Exception:
-                # ignore restore errors
-                pass
-    except Exception:
-        pass
+    The main game ticks a ScoreScene from its own loop instead; this is kept for
+    scripts that just want to show the scene.
+    """
+    clock = pygame.time.Clock()
+    scene = ScoreScene(winner, loser, winner_avatar)
+    while not scene.done:
+        clock.tick(FPS)
+        for ev in pygame.event.get():
+            if ev.type == pygame.QUIT:
+                return
+            scene.handle_event(ev)
+        scene.update()
+        scene.draw(screen)
+        pygame.display.flip()
@@ -0,0 +1,201 @@
+"""电脑玩家（bot）
+
+Bot 控制器每帧产生一个与 `pygame.key.get_pressed()` 用法相同的按键对象，
+`Player.update(keys, ...)` 无需任何改动即可由 bot 驱动任意玩家槽位。
+攻击键按下的那一帧由 GameState 调用 `use_skill`，与人类玩家的 KEYDOWN 事件对应。
+
+内置策略：
+    random   随机乱按，用于压力/浸泡测试
+    chaser   贪心地追逐最近的有益泡泡，拿到技能后攻击最近的敌人
+    melee    一直贴近最近的敌人近身攻击
+"""
+import random
+
+from game.skills import SKILLS
+
+
+class BotKeys:
+    """模拟 pygame.key.get_pressed() 的返回值：只回答 bot 按下的键"""
+
+    __slots__ = ('pressed',)
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class BotController:
+    """bot 基类：子类实现 `think()`，返回本帧按下的动作集合
+
+    Args:
+        player: 要驱动的玩家
+        reaction_frames: 每隔多少帧重新决策一次（其余帧沿用上一次的动作，模拟反应时间）
+        seed: 随机种子，便于复现浸泡测试
+    """
+
+    name = 'bot'
+
+    def __init__(self, player, reaction_frames=6, seed=None):
+        self.player = player
+        self.reaction_frames = max(1, reaction_frames)
+        self.rng = random.Random(seed)
+        self._frame = self.rng.randrange(self.reaction_frames)
+        self._actions = frozenset()
+        self._attack_held = False
+        self.attack_pressed = False
+
+    def think(self, state):
+        """返回动作集合，元素为 'left' / 'right' / 'jump' / 'attack'"""
+        return frozenset()
+
+    def update(self, state):
+        """推进一帧，返回供 Player.update 使用的按键对象"""
+        if self._frame % self.reaction_frames == 0:
+            self._actions = frozenset(self.think(state))
+        self._frame += 1
+
+        # 攻击只在“按下”的那一帧生效，与 KEYDOWN 事件一致
+        holding = 'attack' in self._actions
+        self.attack_pressed = holding and not self._attack_held
+        self._attack_held = holding
+
+        controls = self.player.controls
+        return BotKeys(controls[a] for a in self._actions if a in controls)
+
+    # ---- 策略共用的小工具 ----
+
+    def nearest_enemy(self, state):
+        me = self.player
+        enemies = [p for p in state.alive if me.is_enemy(p)]
+        if not enemies:
+            return None
+        return min(enemies, key=lambda p: abs(p.x - me.x) + abs(p.y - me.y))
+
+    def move_towards(self, target_x, actions, deadzone=10):
+        me = self.player
+        center = me.x + me.width / 2
+        if target_x < center - deadzone:
+            actions.add('left')
+        elif target_x > center + deadzone:
+            actions.add('right')
+        return actions
+
+    def in_attack_range(self, target):
+        me = self.player
+        if abs((target.y + target.height / 2) - (me.y + me.height / 2)) > me.height:
+            return False
+        dx = (target.x + target.width / 2) - (me.x + me.width / 2)
+        facing_ok = (dx > 0) == me.facing_right
+        return facing_ok and abs(dx) < me.width / 2 + 80
+
+
+class RandomBot(BotController):
+    """随机按键"""
+
+    name = 'random'
+
+    def think(self, state):
+        rng = self.rng
+        actions = set()
+        r = rng.random()
+        if r < 0.4:
+            actions.add('left')
+        elif r < 0.8:
+            actions.add('right')
+        if rng.random() < 0.2:
+            actions.add('jump')
+        if rng.random() < 0.15:
+            actions.add('attack')
+        return actions
+
+
+class MeleeBot(BotController):
+    """贴身进攻：追向最近的敌人，进入攻击范围就出手"""
+
+    name = 'melee'
+
+    def think(self, state):
+        me = self.player
+        actions = set()
+        target = self.nearest_enemy(state)
+        if target is None:
+            return actions
+        self.move_towards(target.x + target.width / 2, actions, deadzone=me.width / 2)
+        if target.y + target.height < me.y - 20 and me.on_ground:
+            actions.add('jump')
+        if me.skill and SKILLS[me.skill].ranged:
+            # 远程技能：与敌人同一高度就发射
+            if abs(target.y - me.y) < me.height:
+                actions.add('attack')
+        elif me.skill and self.in_attack_range(target):
+            actions.add('attack')
+        return actions
+
+
+class BubbleChaserBot(MeleeBot):
+    """贪心追泡泡：没有技能时追最近的有益泡泡，有技能后转为进攻"""
+
+    name = 'chaser'
+
+    def think(self, state):
+        me = self.player
+        actions = set()
+        if me.skill is None and not me.is_super:
+            center_x = me.x + me.width / 2
+            # 只追有益泡泡：ctrlc / typeerror 会伤害自己
+            bubbles = [b for b in state.bubbles if SKILLS[b.type].helpful and b.y < me.y + me.height]
+            if bubbles:
+                target = min(bubbles, key=lambda b: abs(b.x - center_x) + abs(b.y - me.y) * 0.5)
+                self.move_towards(target.x, actions)
+                if target.y < me.y and abs(target.x - center_x) < 80 and me.on_ground:
+                    actions.add('jump')
+                return actions
+        # 拿到技能（或没有可追的泡泡）时和近战 bot 一样进攻
+        return super().think(state)
+
+
+BOT_POLICIES = {
+    'random': RandomBot,
+    'chaser': BubbleChaserBot,
+    'melee': MeleeBot,
+}
+
+
+def make_bot(policy, player, **kwargs):
+    """按策略名创建 bot；未知的策略名抛出 ValueError"""
+    try:
+        cls = BOT_POLICIES[policy]
+    except KeyError:
+        raise ValueError(f"Unknown bot policy: {policy!r} (choose from {', '.join(BOT_POLICIES)})")
+    return cls(player, **kwargs)
+
+
+def parse_bot_spec(spec, player_count):
+    """解析 bot 配置字符串，返回 {槽位下标: 策略名}
+
+    格式为逗号分隔的 "槽位:策略"，槽位从 1 开始，也可以写 all：
+        "2:melee"            玩家2 由近战 bot 控制（单人模式）
+        "all:random"         所有槽位都是 bot（浸泡测试）
+        "3:chaser,4:melee"
+    """
+    slots = {}
+    if not spec:
+        return slots
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        slot, _, policy = item.partition(':')
+        policy = policy.strip() or 'melee'
+        if policy not in BOT_POLICIES:
+            raise ValueError(f"Unknown bot policy: {policy!r}")
+        if slot.strip().lower() == 'all':
+            for i in range(player_count):
+                slots[i] = policy
+        else:
+            index = int(slot) - 1
+            if 0 <= index < player_count:
+                slots[index] = policy
+    return slots
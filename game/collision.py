@@ -31,3 +31,60 @@ def check_attack_hit(attacker, defender):
         defender.y + defender.height > attack_rect['y']):
         return True
     return False
+
+
+def nearby_pairs(players, reach=0):
+    """扫描排除（sweep and prune）：返回水平范围（各向外扩 reach 像素）有重叠的玩家对
+
+    按 x 排序后只比较区间相交的邻居，人数增加时不必检查所有两两组合。
+    每对只出现一次，且按玩家在列表中的顺序排列 (先, 后)。
+    """
+    order = {id(p): i for i, p in enumerate(players)}
+    spans = sorted(((p.x - reach, p.x + p.width + reach, p) for p in players), key=lambda s: s[0])
+    pairs = []
+    active = []
+    for left, right, p in spans:
+        active = [a for a in active if a[1] > left]
+        for a in active:
+            q = a[2]
+            pairs.append((q, p) if order[id(q)] < order[id(p)] else (p, q))
+        active.append((left, right, p))
+    # 保持确定的处理顺序（与旧的双人逻辑一致：玩家1 在前）
+    pairs.sort(key=lambda pq: (order[id(pq[0])], order[id(pq[1])]))
+    return pairs
+
+
+class CollisionGrid:
+    """静态平台的均匀网格索引
+
+    关卡加载时把不会移动的平台按包围盒登记到固定大小的格子里，
+    玩家每帧只需要检查自己附近格子中的平台，而不是遍历整个键盘。
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def _cell_range(self, x, y, width, height):
+        cs = self.cell_size
+        return (int(x // cs), int(y // cs),
+                int((x + width) // cs), int((y + height) // cs))
+
+    def insert(self, index, rect):
+        """登记一个平台；index 是它在关卡平台列表中的位置，rect 为 (x, y, w, h)"""
+        x0, y0, x1, y1 = self._cell_range(*rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), []).append(index)
+
+    def query(self, x, y, width, height):
+        """返回与该区域所在格子有交集的平台下标集合"""
+        x0, y0, x1, y1 = self._cell_range(x, y, width, height)
+        found = set()
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
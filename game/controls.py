@@ -0,0 +1,26 @@
+"""玩家按键映射
+
+前两组与原来的双人键位相同；其余槽位用于多人乱斗，
+尽量选取互不冲突、在一块键盘上能同时按下的按键区。
+ESC（退出）和 SPACE（重新开始）保留给全局使用。
+"""
+import pygame
+
+PLAYER_CONTROLS = [
+    # 玩家1：WASD + F
+    {'left': pygame.K_a, 'right': pygame.K_d, 'jump': pygame.K_w, 'attack': pygame.K_f},
+    # 玩家2：方向键 + L
+    {'left': pygame.K_LEFT, 'right': pygame.K_RIGHT, 'jump': pygame.K_UP, 'attack': pygame.K_l},
+    # 玩家3：小键盘 4/6/8 + 5
+    {'left': pygame.K_KP4, 'right': pygame.K_KP6, 'jump': pygame.K_KP8, 'attack': pygame.K_KP5},
+    # 玩家4：K/; + O + P
+    {'left': pygame.K_k, 'right': pygame.K_SEMICOLON, 'jump': pygame.K_o, 'attack': pygame.K_p},
+    # 玩家5：Z/C + S + X
+    {'left': pygame.K_z, 'right': pygame.K_c, 'jump': pygame.K_s, 'attack': pygame.K_x},
+    # 玩家6：Delete/PageDown + Home + End
+    {'left': pygame.K_DELETE, 'right': pygame.K_PAGEDOWN, 'jump': pygame.K_HOME, 'attack': pygame.K_END},
+    # 玩家7：V/N + G + B
+    {'left': pygame.K_v, 'right': pygame.K_n, 'jump': pygame.K_g, 'attack': pygame.K_b},
+    # 玩家8：1/3 + 2 + 4
+    {'left': pygame.K_1, 'right': pygame.K_3, 'jump': pygame.K_2, 'attack': pygame.K_4},
+]
@@ -0,0 +1,103 @@
+"""玩家身上的限时状态效果
+
+冻结（Ctrl+C）、反转（TypeError）和 super() 形态都是 StatusEffect 对象，挂在
+`Player.effects` 列表上。效果在加上时设置玩家的状态标记（is_frozen / is_reversed /
+is_super），到期时清除；到期由玩家的计时轮（game.timers）触发，游戏循环只读这些标记。
+
+同一种效果重复获得时刷新剩余时间，不叠加。
+"""
+import contextlib
+
+from utils.assets import ASSETS
+
+# 效果的整数 ID（Player.effect_remaining 等接口使用）
+FROZEN, REVERSED, SUPER_FORM = range(3)
+
+_muted = 0
+
+
+@contextlib.contextmanager
+def muted():
+    """暂时不播放效果音（回滚联机重新模拟已经播放过的帧时使用）"""
+    global _muted
+    _muted += 1
+    try:
+        yield
+    finally:
+        _muted -= 1
+
+
+class StatusEffect:
+    """限时状态效果基类：子类实现 apply / expire
+
+    Args:
+        duration: 持续时间（秒）
+    """
+
+    kind = None
+    name = 'effect'
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.timer = None  # 计时轮上的到期计时器，由 Player.add_effect 登记
+
+    def apply(self, player):
+        """效果开始（或刷新）时调用"""
+
+    def expire(self, player):
+        """效果到期或被清除时调用"""
+
+
+class FreezeEffect(StatusEffect):
+    """冻结：无法移动和攻击，只受重力影响"""
+
+    kind = FROZEN
+    name = 'frozen'
+
+    def apply(self, player):
+        player.is_frozen = True
+        player.vel_x = 0
+        if _muted:
+            return
+        # 播放冰冻音效（容错处理）
+        try:
+            ice_sound = ASSETS.sound('436972_creeeeak_ice_sounds5.wav', volume=0.8)
+            if ice_sound:
+                ice_sound.play()
+        except Exception:
+            # 如果加载或播放失败，不要抛出异常影响游戏
+            pass
+
+    def expire(self, player):
+        player.is_frozen = False
+
+
+class ReverseEffect(StatusEffect):
+    """反转：左右方向键互换"""
+
+    kind = REVERSED
+    name = 'reversed'
+
+    def apply(self, player):
+        player.is_reversed = True
+
+    def expire(self, player):
+        player.is_reversed = False
+
+
+class SuperEffect(StatusEffect):
+    """super() 形态：体型膨胀，撞到敌人造成伤害"""
+
+    kind = SUPER_FORM
+    name = 'super'
+
+    def apply(self, player):
+        player.is_super = True
+        player.skill = None  # 清除其他技能
+
+    def expire(self, player):
+        player.is_super = False
+
+
+# 效果 ID → 效果类（从快照恢复时按 ID 重建效果对象）
+EFFECT_TYPES = {cls.kind: cls for cls in (FreezeEffect, ReverseEffect, SuperEffect)}
@@ -1,27 +1,93 @@
 """游戏状态管理类"""
-import pygame
-import random
 from entities.bubble import Bubble
-from entities.projectile import Projectile
-from settings import BUBBLE_SPAWN_TIME
+from entities.player import Player
+from game.bots import BotKeys
+from game.collision import check_player_collision, check_attack_hit, nearby_pairs
+from game.controls import PLAYER_CONTROLS
+from game.rng import SimRandom
+from game.skills import SKILLS, roll_skill
+from game.timers import TimerWheel, ticks
+from settings import (BUBBLE_SPAWN_TIME, WIDTH, PLAYER_COLORS, PLAYER_HUD_COLORS,
+                      TEAM_COLORS, TEAM_NAMES, SUPER_HIT_COOLDOWN_TIME)
+
+# 两名玩家之间可能发生互动的最大水平距离：攻击判定框宽 80，super() 膨胀约 30
+INTERACTION_REACH = 80
+
+
+def create_players(level, count, team_count=0, avatars=()):
+    """按槽位创建玩家，返回 (玩家列表, HUD 颜色列表, HUD 名称列表)
+
+    team_count 为 0 时各自为战，否则槽位轮流分到各队。
+    多于两人或组队时在玩家脚下显示编号。
+    """
+    players = []
+    hud_colors = []
+    hud_labels = []
+    multi = count > 2 or team_count
+    for i in range(count):
+        team = i % team_count if team_count else i
+        hud_color = TEAM_COLORS[team] if team_count else PLAYER_HUD_COLORS[i]
+        name = f"PLAYER {i + 1}"
+        x, y = level.spawn_point(i)
+        players.append(Player(x, y, PLAYER_COLORS[i], PLAYER_CONTROLS[i],
+                              facing_right=(i % 2 == 0), avatar=avatars[i] if i < len(avatars) else None,
+                              name=name, team=team,
+                              tag=f"P{i + 1}" if multi else None, tag_color=hud_color))
+        hud_colors.append(hud_color)
+        hud_labels.append(f"{name} · {TEAM_NAMES[team]}" if team_count else name)
+    return players, hud_colors, hud_labels
 
 
 class GameState:
-    """管理游戏核心状态和逻辑"""
-    
-    def __init__(self, player1, player2, platforms):
-        self.player1 = player1
-        self.player2 = player2
-        self.platforms = platforms
+    """管理一局游戏的核心状态和逻辑（2~8 名玩家）
+
+    玩家之间的互动（推挤、super() 碰撞、近战命中）统一按玩家对处理，
+    先用扫描排除筛出彼此靠近的玩家对，再双向结算，不再为每个玩家复制一份逻辑。
+    技能和泡泡效果按 ID 查 game.skills 的分发表，这里不关心具体是哪种技能。
+    所有玩家和平台共享一个计时轮（self.timers），每帧推进一次，
+    状态效果、冷却和平台重生在到期的那一帧触发回调。
+
+    Args:
+        players: 玩家列表，顺序即槽位顺序
+        level: world.level.Level 关卡
+        on_hit: 近战命中时的回调 on_hit(attacker, defender)，用于播放音效
+        team_names: 组队模式下队伍编号到名称的映射；None 表示各自为战
+        controllers: {玩家: bot 控制器}，这些玩家的输入由 bot 产生（见 game.bots）
+        on_attack: bot 按下攻击键时的回调 on_attack(player)，与人类玩家按键时的音效一致
+        seed: 本局随机数种子（泡泡位置和类型）；联机时双方使用同一个种子
+    """
+
+    def __init__(self, players, level, on_hit=None, team_names=None, controllers=None, on_attack=None,
+                 seed=None):
+        self.players = list(players)
+        self.level = level
+        self.on_hit = on_hit
+        self.team_names = team_names
+        self.controllers = dict(controllers or {})
+        self.on_attack = on_attack
         self.bubbles = []
         self.projectiles = []
         self.bubble_timer = 0
         self.game_over = False
         self.winner = None
+        self.loser = None
+        self.winner_name = None
         self.score_shown = False
-        self.last_p1_skill = None
-        self.last_p2_skill = None
-    
+        self.last_skill = {p: None for p in self.players}
+        self.eliminated = []
+        self.frame = 0
+        # 模拟只使用自己的随机数发生器，保证同样的输入得到同样的结果
+        self.rng = SimRandom(seed)
+        self.timers = TimerWheel()
+        for player in self.players:
+            player.attach_timers(self.timers)
+        level.attach_timers(self.timers)
+
+    @property
+    def alive(self):
+        """仍在场上的玩家"""
+        return [p for p in self.players if p not in self.eliminated]
+
     def reset(self):
         """重置游戏状态"""
         self.bubbles.clear()
@@ -29,107 +95,174 @@ class GameState:
         self.bubble_timer = 0
         self.game_over = False
         self.winner = None
+        self.loser = None
+        self.winner_name = None
         self.score_shown = False
-        self.last_p1_skill = None
-        self.last_p2_skill = None
-    
-    def spawn_bubble(self, WIDTH):
+        self.last_skill = {p: None for p in self.players}
+        self.eliminated = []
+        self.frame = 0
+
+    def use_skill(self, player):
+        """玩家按下攻击键：释放持有的技能（近战挥击或技能自带的释放效果）"""
+        if player in self.eliminated:
+            return None
+        skill_used = player.use_skill()
+        if skill_used:
+            self.last_skill[player] = skill_used
+            skill = SKILLS[skill_used]
+            if skill.on_use:
+                skill.on_use(self, player, skill)
+        return skill_used
+
+    def update(self, keys):
+        """推进一帧逻辑
+
+        Args:
+            keys: 人类玩家的按键状态（pygame.key.get_pressed()）；全部由 bot 控制时可为 None
+        """
+        if self.game_over:
+            return
+        self.frame += 1
+        alive = self.alive
+        if keys is None:
+            keys = BotKeys()
+
+        # bot 先决策；按下攻击键相当于人类玩家的 KEYDOWN 事件
+        inputs = {}
+        for player in alive:
+            controller = self.controllers.get(player)
+            if controller is None:
+                inputs[player] = keys
+                continue
+            inputs[player] = controller.update(self)
+            if controller.attack_pressed:
+                if self.on_attack:
+                    self.on_attack(player)
+                self.use_skill(player)
+
+        # 推进计时轮：本帧到期的效果、冷却、挥击和平台重生在这里结算
+        # （放在输入之后，人类和 bot 在同一帧按下攻击键的挥击进度一致）
+        self.timers.advance()
+
+        # 更新动态平台
+        self.level.update(alive)
+
+        # 更新玩家（只检查附近未断裂的平台）
+        for player in alive:
+            player.update(inputs[player], self.level.collision_candidates(player))
+
+        self.resolve_interactions(alive)
+        self.update_projectiles(alive)
+        self.spawn_bubble()
+        self.update_bubbles(alive)
+        self.check_game_over()
+
+    def resolve_interactions(self, players):
+        """处理玩家两两之间的推挤、super() 碰撞和近战攻击"""
+        hit_attackers = set()
+        for a, b in nearby_pairs(players, INTERACTION_REACH):
+            if not a.is_enemy(b):
+                continue
+            check_player_collision(a, b)
+
+            # 检测 super() 形态碰撞
+            for attacker, defender in ((a, b), (b, a)):
+                if attacker.check_super_collision(defender):
+                    knockback_dir = 1 if attacker.facing_right else -1
+                    defender.take_damage(5, knockback_dir * 3)  # 伤害5,击退力度3
+                    attacker.super_collision_cooldown = ticks(SUPER_HIT_COOLDOWN_TIME)  # 0.5秒冷却
+
+            # 检测攻击（攻击第5帧判定，一次挥击可以命中多个敌人）
+            for attacker, defender in ((a, b), (b, a)):
+                if not (attacker.is_attacking and attacker.attack_frame == 5 and not attacker.is_frozen):
+                    continue
+                skill_used = self.last_skill.get(attacker)
+                if not skill_used:
+                    continue
+                skill = SKILLS[skill_used]
+                if skill.on_hit and check_attack_hit(attacker, defender):
+                    skill.on_hit(self, attacker, defender, skill)
+                    hit_attackers.add(attacker)
+
+        for attacker in hit_attackers:
+            self.last_skill[attacker] = None
+
+    def spawn_bubble(self):
         """生成技能泡泡"""
         self.bubble_timer += 1
         if self.bubble_timer >= BUBBLE_SPAWN_TIME:
-            x = random.randint(100, WIDTH - 100)
-            # 泡泡生成概率：pow 20%, delete 12%, print 20%, super 20%, ctrlc 13%, typeerror 15%
-            rand = random.random()
-            if rand < 0.20:
-                btype = 'pow'
-            elif rand < 0.32:
-                btype = 'delete'
-            elif rand < 0.52:
-                btype = 'print'
-            elif rand < 0.72:
-                btype = 'super'
-            elif rand < 0.85:
-                btype = 'ctrlc'
-            else:
-                btype = 'typeerror'
-            self.bubbles.append(Bubble(x, -50, btype))
+            x = self.rng.randint(100, WIDTH - 100)
+            self.bubbles.append(Bubble(x, -50, roll_skill(self.rng)))
             self.bubble_timer = 0
-    
-    def update_bubbles(self):
+
+    def update_bubbles(self, players):
         """更新泡泡状态和碰撞检测"""
         for bubble in self.bubbles[:]:
             bubble.update()
             if not bubble.active:
                 self.bubbles.remove(bubble)
-            else:
-                # 检测玩家1碰撞
-                if bubble.check_collision(self.player1):
-                    if bubble.type in ['pow', 'delete', 'print'] and self.player1.skill is None:
-                        self.player1.skill = bubble.type
-                    elif bubble.type == 'super' and not self.player1.is_super:
-                        self.player1.activate_super()
-                    elif bubble.type == 'ctrlc':
-                        self.player1.freeze()
-                        self.player1.take_damage(3, 0)
-                    elif bubble.type == 'typeerror':
-                        self.player1.reverse_controls()
-                        self.player1.take_damage(3, 0)
-                    self.bubbles.remove(bubble)
-                    continue
-                
-                # 检测玩家2碰撞
-                if bubble.check_collision(self.player2):
-                    if bubble.type in ['pow', 'delete', 'print'] and self.player2.skill is None:
-                        self.player2.skill = bubble.type
-                    elif bubble.type == 'super' and not self.player2.is_super:
-                        self.player2.activate_super()
-                    elif bubble.type == 'ctrlc':
-                        self.player2.freeze()
-                        self.player2.take_damage(3, 0)
-                    elif bubble.type == 'typeerror':
-                        self.player2.reverse_controls()
-                        self.player2.take_damage(3, 0)
+                continue
+            for player in players:
+                if bubble.check_collision(player):
+                    self.apply_bubble(player, bubble.type)
                     self.bubbles.remove(bubble)
-    
-    def update_projectiles(self):
+                    break
+
+    def apply_bubble(self, player, btype):
+        """玩家捡到泡泡的效果"""
+        skill = SKILLS[btype]
+        skill.on_pickup(self, player, skill)
+
+    def update_projectiles(self, players):
         """更新飞行道具和碰撞检测"""
         for proj in self.projectiles[:]:
             proj.update()
             if not proj.active:
                 self.projectiles.remove(proj)
-            else:
-                if proj.check_collision(self.player1) and proj.owner != self.player1:
-                    knockback = 10 if proj.direction > 0 else -10
-                    self.player1.take_damage(proj.damage, knockback)
-                    self.projectiles.remove(proj)
-                elif proj.check_collision(self.player2) and proj.owner != self.player2:
-                    knockback = 10 if proj.direction > 0 else -10
-                    self.player2.take_damage(proj.damage, knockback)
+                continue
+            for player in players:
+                if proj.owner is not player and proj.owner.is_enemy(player) and proj.check_collision(player):
+                    knockback = 1 if proj.direction > 0 else -1
+                    player.take_damage(proj.damage, knockback)
                     self.projectiles.remove(proj)
-    
+                    break
+
     def check_game_over(self):
-        """检查游戏是否结束"""
-        if self.player1.hp <= 0:
-            self.game_over = True
-            self.winner = "PLAYER 2"
-        elif self.player2.hp <= 0:
-            self.game_over = True
-            self.winner = "PLAYER 1"
-    
+        """淘汰血量归零的玩家；只剩一名玩家（或一支队伍）时结束"""
+        for player in self.players:
+            if player.hp <= 0 and player not in self.eliminated:
+                self.eliminated.append(player)
+
+        survivors = self.alive
+        if len({p.team for p in survivors}) > 1:
+            return
+
+        self.game_over = True
+        if survivors:
+            self.winner = max(survivors, key=lambda p: p.hp)
+            self.loser = self.eliminated[-1] if self.eliminated else None
+        else:
+            # 同一帧全部倒下：最后一个被结算的玩家获胜
+            self.winner = self.eliminated[-1]
+            self.loser = self.eliminated[-2] if len(self.eliminated) > 1 else None
+        if self.team_names is not None:
+            self.winner_name = self.team_names[self.winner.team]
+        else:
+            self.winner_name = self.winner.name
+
     def draw_entities(self, screen):
         """绘制所有游戏实体"""
         # 绘制平台
-        for platform in self.platforms:
-            platform.draw(screen)
-        
+        self.level.draw(screen)
+
         # 绘制泡泡
         for bubble in self.bubbles:
             bubble.draw(screen)
-        
+
         # 绘制飞行道具
         for proj in self.projectiles:
             proj.draw(screen)
-        
-        # 绘制玩家
-        self.player1.draw(screen)
-        self.player2.draw(screen)
+
+        # 绘制玩家（结束画面保留所有玩家）
+        for player in (self.players if self.game_over else self.alive):
+            player.draw(screen)
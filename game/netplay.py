@@ -0,0 +1,541 @@
+"""双人联机：GGPO 式回滚同步（UDP）
+
+双方每帧只交换本地玩家的输入（左 / 右 / 跳 / 攻击 4 个按键位），各自运行完全相同的
+确定性模拟（GameState 使用自己的种子化随机数，计时器按帧到期）：
+
+    - 本地输入延迟 input_delay 帧生效，给网络传输留出时间
+    - 对方的输入还没到时沿用它最后一次确认的输入（预测），先继续模拟
+    - 真实输入到达且与预测不同时，恢复到该帧之前的快照（game.snapshot），
+      关掉音效用正确的输入重新模拟到当前帧
+    - 领先对方超过 max_rollback 帧时暂停推进，等待对方的输入（不会无限回滚）
+
+每个数据包都带上所有对方尚未确认收到的本地输入，丢包不需要重传；
+每隔 check_interval 帧双方交换一次已确认帧的状态校验和，发现不同步时打印警告。
+
+本机回环测试（两个会话通过 127.0.0.1 上的 UDP 互连，由 bot 产生输入，模拟延迟、抖动和丢包）：
+
+    python -m game.netplay loopback --frames 3600 --latency 80 --jitter 30 --loss 0.05
+"""
+import argparse
+import heapq
+import os
+import random
+import socket
+import struct
+import sys
+import time
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from game.bots import BotKeys
+from game.effects import muted
+from game.snapshot import snapshot, restore, checksum
+from settings import FPS
+
+# 输入位
+LEFT, RIGHT, JUMP, ATTACK = 1, 2, 4, 8
+_ACTIONS = (('left', LEFT), ('right', RIGHT), ('jump', JUMP), ('attack', ATTACK))
+
+# 数据包：魔数、版本、对局编号、输入个数、已收到对方的最后连续帧、第一个输入的帧号、校验帧号、校验和，
+# 随后每帧 1 字节输入
+MAGIC = b'KR'
+VERSION = 1
+_PACKET = struct.Struct('<2sBBBIIII')
+MAX_INPUTS_PER_PACKET = 255
+DEFAULT_PORT = 7000
+
+
+def encode_input(keys, controls, attack=False):
+    """把按键状态编码成输入位
+
+    Args:
+        keys: pygame.key.get_pressed() 或 BotKeys
+        controls: 玩家的按键映射（game.controls）
+        attack: 本帧是否收到过攻击键的 KEYDOWN（快速点按时按键可能已经松开）
+    """
+    bits = ATTACK if attack else 0
+    for action, bit in _ACTIONS:
+        if action in controls and keys[controls[action]]:
+            bits |= bit
+    return bits
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """'host:port' 或 'host' 转成 (host, port)"""
+    host, _, port = text.rpartition(':')
+    if not host:
+        return text, default_port
+    return host, int(port)
+
+
+class InputController:
+    """把输入位还原成按键对象，挂在 GameState.controllers 上（接口与 bot 控制器相同）"""
+
+    def __init__(self, player):
+        self.player = player
+        self.attack_pressed = False
+        self._keys = BotKeys()
+
+    def set_input(self, bits, previous):
+        """设置本帧输入；攻击只在上一帧没有按住攻击键时生效，与 KEYDOWN 事件一致"""
+        self.attack_pressed = bool(bits & ATTACK) and not previous & ATTACK
+        controls = self.player.controls
+        self._keys = BotKeys(controls[a] for a, bit in _ACTIONS if bits & bit and a in controls)
+
+    def update(self, state):
+        return self._keys
+
+
+class UdpTransport:
+    """非阻塞 UDP 套接字
+
+    Args:
+        port: 本地端口（0 表示由系统分配）
+        peer: 对方地址 (host, port)；None 时使用第一个收到的数据包的来源地址
+        host: 绑定的本地地址
+    """
+
+    def __init__(self, port=DEFAULT_PORT, peer=None, host='0.0.0.0'):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.bind((host, port))
+        self.peer = peer
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def send(self, data):
+        if self.peer is None:
+            return
+        try:
+            self.sock.sendto(data, self.peer)
+        except OSError:
+            pass  # 对方还没启动或网络暂时不可达，下一帧会带上同样的输入再发
+
+    def receive(self):
+        """取出所有已到达的数据包"""
+        packets = []
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue  # Windows：上一个包被对方拒收（ICMP port unreachable）
+            except OSError:
+                break
+            if self.peer is None:
+                self.peer = addr
+            if addr == self.peer:
+                packets.append(data)
+        return packets
+
+    def close(self):
+        self.sock.close()
+
+
+class LaggyTransport:
+    """给另一个传输层加上模拟的延迟、抖动和丢包（回环测试用）
+
+    Args:
+        inner: 实际收发的传输层
+        clock: 返回当前时间（秒）的函数
+        latency / jitter: 单向延迟和额外随机延迟（秒）；抖动会让数据包乱序
+        loss: 丢包率
+    """
+
+    def __init__(self, inner, clock, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.inner = inner
+        self.clock = clock
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self._queue = []
+        self._seq = 0
+
+    def send(self, data):
+        if self.rng.random() < self.loss:
+            return
+        due = self.clock() + self.latency + self.rng.uniform(0, self.jitter)
+        self._seq += 1
+        heapq.heappush(self._queue, (due, self._seq, data))
+        self.flush()
+
+    def flush(self):
+        now = self.clock()
+        while self._queue and self._queue[0][0] <= now:
+            self.inner.send(heapq.heappop(self._queue)[2])
+
+    def receive(self):
+        self.flush()
+        return self.inner.receive()
+
+    def close(self):
+        self.inner.close()
+
+
+class _Timing:
+    """耗时统计（微秒）"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        us = seconds * 1e6
+        self.count += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+    @property
+    def avg(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class RollbackSession:
+    """一名本地玩家对一名远程玩家的回滚同步会话
+
+    会话接管 state.controllers：两名玩家都由输入位驱动（InputController），
+    游戏循环每帧调用 advance(本地输入位) 代替 state.update(keys)。
+
+    Args:
+        state: 双方用相同关卡和种子创建的 GameState（恰好两名玩家）
+        local_index: 本地玩家的槽位（0 或 1），双方必须相反
+        transport: 有 send(bytes) / receive() 的传输层（UdpTransport）
+        input_delay: 本地输入延迟帧数
+        max_rollback: 最多预测（可回滚）多少帧
+        check_interval: 每隔多少帧交换一次状态校验和（0 表示不检查）
+        match: 对局编号，忽略上一局残留的数据包（同一个传输层连续进行多局时递增）
+    """
+
+    def __init__(self, state, local_index, transport, input_delay=2, max_rollback=8, check_interval=60,
+                 match=0):
+        if len(state.players) != 2:
+            raise ValueError("rollback netplay supports exactly two players")
+        self.state = state
+        self.local = local_index
+        self.remote = 1 - local_index
+        self.transport = transport
+        self.input_delay = max(0, input_delay)
+        self.max_rollback = max(1, max_rollback)
+        self.check_interval = check_interval
+        self.match = match & 0xFF
+
+        self.controllers = [InputController(p) for p in state.players]
+        state.controllers = dict(zip(state.players, self.controllers))
+
+        self.frame = 0                 # 已模拟的帧数
+        self.confirmed = self.input_delay  # 对方输入连续收到的最后一帧（延迟期间双方都是空输入）
+        self.peer_ack = self.input_delay   # 对方确认收到的本地输入的最后一帧
+        self.inputs = ({}, {})         # 每名玩家已确定的输入：帧号 → 输入位
+        for f in range(1, self.input_delay + 1):
+            self.inputs[0][f] = self.inputs[1][f] = 0
+        self._used = ({}, {})          # 实际用于模拟的输入（含预测），用来判断攻击键按下的那一帧
+        self._predicted = {}           # 对方输入靠预测的帧：帧号 → 预测值
+        self._snapshots = {}           # 帧号 → 模拟该帧之前的状态
+        self._rollback_from = None
+
+        self._checked = 0
+        self._local_checks = {}
+        self._remote_checks = {}
+        self._last_check = (0, 0)
+
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.max_depth = 0
+        self.stalls = 0
+        self.desyncs = 0
+        self.desync_frame = None
+        self.save_time = _Timing()
+        self.restore_time = _Timing()
+
+    @property
+    def settled(self):
+        """当前帧的所有输入都已确认（画面上的结果不会再被回滚改写）"""
+        return self.confirmed >= self.frame
+
+    def advance(self, bits):
+        """推进一帧：处理收到的输入（必要时回滚重算），然后用本地输入位模拟下一帧
+
+        Returns:
+            是否推进了；领先对方太多时返回 False，本帧的本地输入被丢弃
+        """
+        self.sync(send=False)
+        next_frame = self.frame + 1
+        if next_frame - self.confirmed > self.max_rollback:
+            self.stalls += 1
+            self._send()
+            return False
+        self.inputs[self.local][next_frame + self.input_delay] = bits
+        self._step(next_frame)
+        self._send()
+        return True
+
+    def sync(self, send=True):
+        """只收包和回滚，不推进（等待对方或对局结束后保持连接时调用）"""
+        self._poll()
+        if self._rollback_from is not None:
+            self._rollback()
+        self._check_confirmed()
+        if send:
+            self._send()
+
+    # ---- 收发 ----
+
+    def _send(self):
+        local = self.inputs[self.local]
+        start = self.peer_ack + 1
+        end = min(self.frame + 1 + self.input_delay, start + MAX_INPUTS_PER_PACKET)
+        payload = bytes(local[f] for f in range(start, end))
+        check_frame, check_crc = self._last_check
+        header = _PACKET.pack(MAGIC, VERSION, self.match, len(payload), self.confirmed, start,
+                              check_frame, check_crc)
+        self.transport.send(header + payload)
+
+    def _poll(self):
+        remote = self.inputs[self.remote]
+        for data in self.transport.receive():
+            if len(data) < _PACKET.size:
+                continue
+            magic, version, match, count, ack, start, check_frame, check_crc = _PACKET.unpack_from(data)
+            if magic != MAGIC or version != VERSION or match != self.match or len(data) < _PACKET.size + count:
+                continue
+            if ack > self.peer_ack:
+                for f in range(self.peer_ack + 1, ack + 1):
+                    self.inputs[self.local].pop(f - self.max_rollback - 2, None)
+                self.peer_ack = ack
+            for offset in range(count):
+                f = start + offset
+                if f <= self.confirmed or f in remote:
+                    continue
+                bits = data[_PACKET.size + offset]
+                remote[f] = bits
+                # 这一帧已经按预测模拟过，而且猜错了
+                if f <= self.frame and self._predicted.get(f) != bits:
+                    if self._rollback_from is None or f < self._rollback_from:
+                        self._rollback_from = f
+            while self.confirmed + 1 in remote:
+                self.confirmed += 1
+            if check_frame:
+                self._remote_checks[check_frame] = check_crc
+                self._compare(check_frame)
+
+    # ---- 模拟 ----
+
+    def _step(self, frame):
+        state = self.state
+        t0 = time.perf_counter()
+        self._snapshots[frame] = snapshot(state)
+        self.save_time.add(time.perf_counter() - t0)
+
+        remote = self.inputs[self.remote]
+        for i, controller in enumerate(self.controllers):
+            bits = self.inputs[i].get(frame)
+            if i == self.remote:
+                if bits is None:
+                    bits = remote.get(self.confirmed, 0)
+                    self._predicted[frame] = bits
+                else:
+                    self._predicted.pop(frame, None)
+            used = self._used[i]
+            controller.set_input(bits, used.get(frame - 1, 0))
+            used[frame] = bits
+        state.update(None)
+        self.frame = frame
+
+        # 丢掉不可能再回滚到的旧记录
+        old = frame - self.max_rollback - 2
+        self._snapshots.pop(old, None)
+        self._predicted.pop(old, None)
+        self._used[0].pop(old, None)
+        self._used[1].pop(old, None)
+        if old < self.confirmed:
+            remote.pop(old, None)
+
+    def _rollback(self):
+        start, self._rollback_from = self._rollback_from, None
+        end = self.frame
+        state = self.state
+        t0 = time.perf_counter()
+        restore(state, self._snapshots[start])
+        self.restore_time.add(time.perf_counter() - t0)
+
+        # 重新模拟的帧已经播放过音效
+        on_hit, on_attack = state.on_hit, state.on_attack
+        state.on_hit = state.on_attack = None
+        try:
+            with muted():
+                for frame in range(start, end + 1):
+                    self._step(frame)
+        finally:
+            state.on_hit, state.on_attack = on_hit, on_attack
+        depth = end - start + 1
+        self.rollbacks += 1
+        self.resimulated += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    # ---- 同步校验 ----
+
+    def _check_confirmed(self):
+        if not self.check_interval:
+            return
+        # 第 f 帧结束后的状态就是模拟第 f + 1 帧之前的快照
+        upto = min(self.confirmed, self.frame - 1)
+        for f in range(self._checked + 1, upto + 1):
+            if f % self.check_interval:
+                continue
+            snap = self._snapshots.get(f + 1)
+            if snap is None:
+                continue
+            crc = checksum(snap)
+            self._local_checks[f] = crc
+            self._last_check = (f, crc)
+            self._compare(f)
+        self._checked = max(self._checked, upto)
+
+    def _compare(self, frame):
+        if frame not in self._local_checks or frame not in self._remote_checks:
+            return
+        if self._local_checks.pop(frame) != self._remote_checks.pop(frame):
+            self.desyncs += 1
+            if self.desync_frame is None:
+                self.desync_frame = frame
+                print(f"[NET] desync detected at frame {frame}")
+
+    def stats(self):
+        return {
+            'frame': self.frame,
+            'confirmed': self.confirmed,
+            'rollbacks': self.rollbacks,
+            'resimulated': self.resimulated,
+            'max_depth': self.max_depth,
+            'stalls': self.stalls,
+            'desyncs': self.desyncs,
+            'snapshot_us': (self.save_time.avg, self.save_time.max),
+            'restore_us': (self.restore_time.avg, self.restore_time.max),
+        }
+
+
+# ---- 本机回环测试 ----
+
+def run_loopback(frames=1800, stage='arena', input_delay=2, max_rollback=8, latency=0.05, jitter=0.01,
+                 loss=0.0, seed=1, policies=('chaser', 'melee')):
+    """两个会话在本机 UDP 上对打，按 FPS 的虚拟时钟推进，返回汇总 dict
+
+    延迟和抖动按虚拟时钟计算，所以结果与机器快慢无关、可以复现；
+    每一帧两边各自调用一次 advance()，记录最慢的一次和帧预算比较。
+    """
+    from settings import init_runtime
+    from world.level import load_level
+    from game.bots import make_bot
+    from game.game_state import GameState, create_players
+
+    init_runtime(create_display=False)
+    tick = 0
+
+    def clock():
+        return tick / FPS
+
+    sockets = [UdpTransport(0, host='127.0.0.1') for _ in range(2)]
+    sockets[0].peer = sockets[1].address
+    sockets[1].peer = sockets[0].address
+
+    sides = []
+    for i in range(2):
+        level = load_level(stage)
+        players, _, _ = create_players(level, 2)
+        state = GameState(players, level, seed=seed)
+        link = LaggyTransport(sockets[i], clock, latency, jitter, loss, seed=seed * 10 + i)
+        session = RollbackSession(state, i, link, input_delay=input_delay, max_rollback=max_rollback)
+        bot = make_bot(policies[i % len(policies)], players[i], seed=seed * 100 + i)
+        sides.append((session, bot))
+
+    budget = 1000.0 / FPS
+    worst = 0.0
+    over_budget = 0
+    # 对方输入全部丢失时最多多等这么多帧
+    limit = frames * 4 + FPS * 10
+    while tick < limit:
+        tick += 1
+        done = True
+        for session, bot in sides:
+            t0 = time.perf_counter()
+            if session.frame < frames:
+                keys = bot.update(session.state)
+                session.advance(encode_input(keys, bot.player.controls, bot.attack_pressed))
+            else:
+                session.sync()
+            ms = (time.perf_counter() - t0) * 1000
+            worst = max(worst, ms)
+            if ms > budget:
+                over_budget += 1
+            if not (session.frame >= frames and session.settled):
+                done = False
+        # 两个套接字在同一线程，给内核一点时间投递
+        if done:
+            break
+        time.sleep(0)
+
+    crcs = [checksum(snapshot(session.state)) for session, _ in sides]
+    stats = [session.stats() for session, _ in sides]
+    for link in sockets:
+        link.close()
+    return {
+        'frames': frames,
+        'ticks': tick,
+        'in_sync': crcs[0] == crcs[1] and all(s['frame'] == frames for s in stats),
+        'checksums': crcs,
+        'sessions': stats,
+        'worst_ms': worst,
+        'over_budget': over_budget,
+        'budget_ms': budget,
+        'winner': sides[0][0].state.winner_name if sides[0][0].state.game_over else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rollback netplay tools')
+    parser.add_argument('command', choices=('loopback',))
+    parser.add_argument('--frames', type=int, default=1800)
+    parser.add_argument('--stage', default='arena')
+    parser.add_argument('--delay', type=int, default=2, help='local input delay in frames')
+    parser.add_argument('--max-rollback', type=int, default=8, help='frames of prediction before stalling')
+    parser.add_argument('--latency', type=float, default=50, help='one-way latency in ms')
+    parser.add_argument('--jitter', type=float, default=10, help='extra random latency in ms')
+    parser.add_argument('--loss', type=float, default=0.0, help='packet loss rate (0-1)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--policies', default='chaser,melee')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    policies = tuple(p.strip() for p in args.policies.split(',') if p.strip()) or ('melee',)
+    result = run_loopback(frames=args.frames, stage=args.stage, input_delay=args.delay,
+                          max_rollback=args.max_rollback, latency=args.latency / 1000,
+                          jitter=args.jitter / 1000, loss=args.loss, seed=args.seed, policies=policies)
+
+    print(f"[NET] {result['frames']} frames in {result['ticks']} ticks, "
+          f"latency {args.latency:.0f}±{args.jitter:.0f}ms, loss {args.loss:.0%}, delay {args.delay}")
+    for i, s in enumerate(result['sessions']):
+        print(f"[NET] P{i + 1}: rollbacks={s['rollbacks']} resimulated={s['resimulated']} "
+              f"max depth={s['max_depth']} stalls={s['stalls']} desyncs={s['desyncs']} "
+              f"snapshot avg={s['snapshot_us'][0]:.0f}us max={s['snapshot_us'][1]:.0f}us "
+              f"restore avg={s['restore_us'][0]:.0f}us max={s['restore_us'][1]:.0f}us")
+    print(f"[NET] worst frame {result['worst_ms']:.2f}ms (budget {result['budget_ms']:.1f}ms, "
+          f"{result['over_budget']} over); winner={result['winner']}")
+    if result['in_sync']:
+        print(f"[NET] in sync: final checksum {result['checksums'][0]:08x}")
+    else:
+        print(f"[NET] OUT OF SYNC: {result['checksums'][0]:08x} != {result['checksums'][1]:08x}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""模拟用的随机数发生器
+
+random.Random 的状态是 625 个整数（约 2.5KB），每帧都存进快照太贵；
+模拟只用到 random() 和 randint()，64 位 xorshift* 就够了，整个状态只是一个整数。
+同样的种子在任何平台上都得到同样的序列（联机双方、回放和快照恢复依赖这一点）。
+"""
+import random
+
+_MASK = (1 << 64) - 1
+
+
+class SimRandom:
+    """xorshift64* 随机数发生器，接口是 random.Random 的一个子集
+
+    Args:
+        seed: 整数种子；None 时从全局 random 取一个（random.seed 仍能让整局可复现）
+    """
+
+    __slots__ = ('state',)
+
+    def __init__(self, seed=None):
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        # splitmix64 打散种子，相邻的种子也得到差别很大的序列；状态不能为 0
+        z = (seed + 0x9E3779B97F4A7C15) & _MASK
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+        self.state = (z ^ (z >> 31)) or 1
+
+    def next64(self):
+        x = self.state
+        x ^= x >> 12
+        x ^= (x << 25) & _MASK
+        x ^= x >> 27
+        self.state = x
+        return (x * 0x2545F4914F6CDD1D) & _MASK
+
+    def random(self):
+        """[0, 1) 区间的浮点数"""
+        return (self.next64() >> 11) * (1.0 / (1 << 53))
+
+    def randint(self, a, b):
+        """[a, b] 区间的整数（区间很小，取模的偏差可以忽略）"""
+        return a + self.next64() % (b - a + 1)
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
@@ -0,0 +1,161 @@
+"""场景栈
+
+游戏流程（开始画面 → 人脸捕获 → 对局 → 结算动画）由一个 SceneManager 驱动：整个进程只有
+一个主循环和一个显示窗口，各场景实现 enter / handle_event / update / draw / exit，
+管理器每帧把事件交给栈顶场景（栈顶明确表示没用到的事件再交给下面一层），再调用它的
+update 和 draw。切换场景只是压栈 / 出栈 / 替换，不会重新创建窗口，也不会 pygame.quit()
+（字体、音效缓存在各局之间一直有效）。
+
+下一个场景要用的资源（关卡烘焙、结算画面图片等）可以用 preload() 交给后台线程，
+当前场景照常运行；切换时用 take() 取出结果，没有预加载时就地加载。
+"""
+import concurrent.futures
+
+import pygame
+
+from settings import FPS
+
+
+class Scene:
+    """场景基类，子类按需覆盖下面的方法"""
+
+    # 被上层场景盖住时仍然每帧调用 update()（不调用 draw），例如联机对局在结算动画期间继续同步
+    update_when_covered = False
+
+    def __init__(self):
+        self.manager = None
+
+    def enter(self, manager):
+        """压入场景栈时调用"""
+        self.manager = manager
+
+    def exit(self):
+        """离开场景栈时调用（释放视频、线程等）"""
+
+    def handle_event(self, event):
+        """处理一个 pygame 事件（QUIT 由管理器处理）
+
+        返回 False 表示没用到这个事件，管理器把它交给下面一层场景（例如结算动画期间
+        按 ESC 由对局场景处理）；返回其他值（包括 None）时不再往下传。
+        """
+
+    def update(self):
+        """推进一帧"""
+
+    def draw(self, screen):
+        """画出当前帧（不需要 flip）"""
+
+
+class SceneManager:
+    """场景栈和主循环
+
+    Args:
+        screen: 显示 Surface，所有场景共用
+        clock: pygame.time.Clock，None 时新建
+    """
+
+    def __init__(self, screen, clock=None):
+        self.screen = screen
+        self.clock = clock if clock is not None else pygame.time.Clock()
+        self.stack = []
+        self.running = False
+        self._preloads = {}
+        self._executor = None
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    # ---- 场景切换 ----
+
+    def push(self, scene):
+        self.stack.append(scene)
+        scene.enter(self)
+
+    def pop(self, scene=None):
+        """弹出栈顶场景；给出 scene 时只有它还在栈顶才弹出"""
+        if not self.stack or (scene is not None and self.stack[-1] is not scene):
+            return
+        self.stack.pop().exit()
+
+    def replace(self, scene):
+        """用 scene 替换栈顶场景"""
+        if self.stack:
+            self.stack.pop().exit()
+        self.push(scene)
+
+    def reset(self, scene):
+        """清空场景栈，只留下 scene"""
+        while self.stack:
+            self.stack.pop().exit()
+        self.push(scene)
+
+    # ---- 后台预加载 ----
+
+    def preload(self, key, loader):
+        """在后台线程调用 loader()，结果用 take(key) 取出
+
+        同一个 key 的上一次预加载还没完成时不重复提交。loader 只应加载和准备资源
+        （读盘、解码、缩放、烘焙）。可以 convert() / convert_alpha()（只读取显示窗口的
+        像素格式，窗口在预加载期间不会重建），但不要往显示窗口上画、不要 flip，
+        也不要碰正在使用的对象。
+        """
+        pending = self._preloads.get(key)
+        if pending is not None and not pending.done():
+            return
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='preload')
+        self._preloads[key] = self._executor.submit(loader)
+
+    def take(self, key, loader=None):
+        """取出预加载的结果（还没完成时等待）；没有预加载时就地调用 loader()
+
+        loader 在后台抛出的异常在这里重新抛出。
+        """
+        future = self._preloads.pop(key, None)
+        if future is None:
+            return loader() if loader is not None else None
+        return future.result()
+
+    # ---- 主循环 ----
+
+    def run(self):
+        """运行到场景栈为空、收到 QUIT 或 stop() 为止"""
+        self.running = True
+        while self.running and self.stack:
+            self.clock.tick(FPS)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+                    break
+                self._dispatch(event)
+            if not self.running or not self.stack:
+                break
+
+            for scene in self.stack[:-1]:
+                if scene.update_when_covered:
+                    scene.update()
+            self.stack[-1].update()
+            # update 里可能切换了场景，画切换后的栈顶
+            if self.stack:
+                self.stack[-1].draw(self.screen)
+                pygame.display.flip()
+        self.running = False
+
+    def _dispatch(self, event):
+        # 处理事件时可能切换场景，按处理前的栈依次往下传
+        for scene in reversed(list(self.stack)):
+            if scene.handle_event(event) is not False:
+                break
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        """退出所有场景并停止后台预加载线程"""
+        while self.stack:
+            self.stack.pop().exit()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._preloads.clear()
@@ -0,0 +1,140 @@
+"""技能 / 泡泡注册表
+
+每种泡泡是一个 SkillDef，用整数 ID 标识：`Player.skill`、`Bubble.type` 和
+`GameState.last_skill` 存的都是 ID（从 1 开始，None 表示没有技能）。
+行为通过定义上的分发函数挂接，游戏循环只按 ID 查表调用，不再比较字符串：
+
+    on_pickup(state, player, skill)             玩家捡到泡泡
+    on_use(state, player, skill)                按下攻击键释放持有的技能
+    on_hit(state, attacker, defender, skill)    近战挥击在第 5 帧命中敌人
+
+新增技能只需要 register_skill(...)：
+
+    BOOM = register_skill('boom', 'boom()', ORANGE, weight=5, indicator='bm',
+                          melee=True, on_hit=my_hit_handler)
+"""
+import bisect
+import random
+
+from entities.projectile import Projectile
+from game.effects import FreezeEffect, ReverseEffect, SuperEffect
+from settings import ORANGE, RED, YELLOW, CYAN, DARK_RED, FREEZE_TIME, REVERSED_TIME
+
+
+class SkillDef:
+    """一种泡泡 / 技能的定义
+
+    Args:
+        name: 内部名称（日志、配置用）
+        label: 泡泡上显示的文字
+        color: 泡泡颜色，也是头顶技能指示器的颜色
+        weight: 生成泡泡时的相对权重
+        indicator: 持有该技能时头顶显示的缩写；None 表示捡到后立即生效、不能持有
+        helpful: 捡到是否有益（bot 只追有益泡泡）
+        melee: 释放时是否发起近战挥击
+        ranged: 是否为远程技能（bot 用来决定出手时机）
+    """
+
+    __slots__ = ('id', 'name', 'label', 'color', 'weight', 'indicator', 'helpful', 'melee', 'ranged',
+                 'on_pickup', 'on_use', 'on_hit')
+
+    def __init__(self, skill_id, name, label, color, weight, indicator=None, helpful=True,
+                 melee=False, ranged=False, on_pickup=None, on_use=None, on_hit=None):
+        self.id = skill_id
+        self.name = name
+        self.label = label
+        self.color = color
+        self.weight = weight
+        self.indicator = indicator
+        self.helpful = helpful
+        self.melee = melee
+        self.ranged = ranged
+        self.on_pickup = on_pickup or hold_skill
+        self.on_use = on_use
+        self.on_hit = on_hit
+
+
+# 按 ID 索引；下标 0 保留，保证所有技能 ID 都为真值
+SKILLS = [None]
+SKILL_IDS = {}
+_cumulative_weights = []
+
+
+def register_skill(name, label, color, weight, **kwargs):
+    """注册一种技能，返回它的整数 ID"""
+    if name in SKILL_IDS:
+        raise ValueError(f"Skill already registered: {name!r}")
+    skill_id = len(SKILLS)
+    SKILLS.append(SkillDef(skill_id, name, label, color, weight, **kwargs))
+    SKILL_IDS[name] = skill_id
+    total = _cumulative_weights[-1] if _cumulative_weights else 0
+    _cumulative_weights.append(total + weight)
+    return skill_id
+
+
+def skill_id(name):
+    """技能名转 ID；未知名称抛出 ValueError"""
+    try:
+        return SKILL_IDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown skill: {name!r} (choose from {', '.join(SKILL_IDS)})")
+
+
+def roll_skill(rng=random):
+    """按权重随机一种泡泡，返回 ID"""
+    r = rng.random() * _cumulative_weights[-1]
+    return bisect.bisect_right(_cumulative_weights, r) + 1
+
+
+# ---- 分发函数 ----
+
+def hold_skill(state, player, skill):
+    """捡到可持有的技能：手上没有技能时才拿起"""
+    if player.skill is None:
+        player.skill = skill.id
+
+
+def fire_projectile(state, player, skill):
+    """print：朝面向的方向发射飞行道具"""
+    proj_x = player.x + player.width if player.facing_right else player.x
+    proj_y = player.y + player.height // 2
+    direction = 1 if player.facing_right else -1
+    state.projectiles.append(Projectile(proj_x, proj_y, direction, player))
+
+
+def pow_hit(state, attacker, defender, skill):
+    """pow：伤害 8 并击退"""
+    knockback_dir = 1 if attacker.facing_right else -1
+    defender.take_damage(8, knockback_dir)
+    if state.on_hit:
+        state.on_hit(attacker, defender)
+
+
+def delete_hit(state, attacker, defender, skill):
+    """delete：删除对方持有的技能"""
+    defender.skill = None
+
+
+def enter_super(state, player, skill):
+    if not player.is_super:
+        player.add_effect(SuperEffect(player.super_duration))
+
+
+def ctrl_c(state, player, skill):
+    player.add_effect(FreezeEffect(FREEZE_TIME))
+    player.take_damage(3, 0)  # 捡到ctrl+c扣3点血
+
+
+def type_error(state, player, skill):
+    player.add_effect(ReverseEffect(REVERSED_TIME))
+    player.take_damage(3, 0)  # 捡到typeerror扣3点血
+
+
+# ---- 内置技能（权重：pow 30%, delete 15%, print 10%, super 8%, ctrlc 27%, typeerror 10%）----
+
+POW = register_skill('pow', 'pow()', ORANGE, 30, indicator='pow()', melee=True, on_hit=pow_hit)
+DELETE = register_skill('delete', 'delete', RED, 15, indicator='del', melee=True, on_hit=delete_hit)
+PRINT = register_skill('print', 'print', YELLOW, 10, indicator='prn', ranged=True, on_use=fire_projectile)
+SUPER = register_skill('super', 'super()', (200, 100, 255), 8, on_pickup=enter_super)
+CTRLC = register_skill('ctrlc', 'Ctrl+C', CYAN, 27, helpful=False, on_pickup=ctrl_c)
+TYPEERROR = register_skill('typeerror', 'TypeError', DARK_RED, 10, helpful=False, on_pickup=type_error)
@@ -0,0 +1,219 @@
+"""对局状态快照
+
+snapshot(state) 把一局游戏里会随模拟变化的状态打包成一段紧凑的 bytes（双人对局约 300 字节），
+restore(state, blob) 把布局相同的 GameState（同样的关卡和玩家数）原地恢复到快照时的样子：
+
+    - 每名玩家的位置、速度、血量、技能、挥击 / 冷却 / 状态效果的到期帧
+    - 动态平台的位置、移动方向、断裂计时和重生帧
+    - 泡泡和飞行道具列表
+    - 计时轮当前帧、泡泡生成计时、随机数状态和胜负结果
+
+贴图、字体、碎冰粒子等只影响画面的东西不进快照。玩家和平台对象本身保留，
+只覆盖字段，所以 bot 控制器、HUD 等持有的引用在恢复后仍然有效。
+两个函数都足够快（各约 20µs），可以每帧调用：回滚联机每帧存一份，
+也可以用来做从检查点重开、崩溃恢复和回放快进。
+
+    python -m game.snapshot     # 在 bot 对局里测量快照和恢复的耗时
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from entities.bubble import Bubble
+from entities.projectile import Projectile
+
+VERSION = 1
+# 头部：版本、玩家数、动态平台数、泡泡数、飞行道具数、帧号、计时轮帧号、泡泡计时、是否结束、
+# 胜者、败者（槽位，-1 表示没有）、淘汰人数、随机数状态；随后是淘汰顺序（每人 1 字节）
+_HEADER = struct.Struct('<BBBHHiii?bbBQ')
+# 玩家：Player.snapshot() 的字段（效果除外），再加上 last_skill 和效果个数
+_PLAYER = struct.Struct('<ddddh??Bd?iiii???BB')
+_EFFECT = struct.Struct('<Bdi')
+_PLATFORM = struct.Struct('<ddb?i?i')
+_BUBBLE = struct.Struct('<ddB?')
+_PROJECTILE = struct.Struct('<ddbB?')
+
+
+def snapshot(state):
+    """把 state 的可变状态打包成 bytes"""
+    players = state.players
+    platforms = state.level.dynamic_platforms
+    bubbles = state.bubbles
+    projectiles = state.projectiles
+    eliminated = state.eliminated
+    last_skill = state.last_skill
+    index = players.index
+    winner = index(state.winner) if state.winner is not None else -1
+    loser = index(state.loser) if state.loser is not None else -1
+
+    parts = [_HEADER.pack(VERSION, len(players), len(platforms), len(bubbles), len(projectiles),
+                          state.frame, state.timers.now, state.bubble_timer, state.game_over,
+                          winner, loser, len(eliminated), state.rng.getstate())]
+    if eliminated:
+        parts.append(bytes(index(p) for p in eliminated))
+    pack_player = _PLAYER.pack
+    pack_effect = _EFFECT.pack
+    for p in players:
+        *row, effects = p.snapshot()
+        parts.append(pack_player(*row, last_skill.get(p) or 0, len(effects)))
+        for effect in effects:
+            parts.append(pack_effect(*effect))
+    pack_platform = _PLATFORM.pack
+    for p in platforms:
+        parts.append(pack_platform(*p.snapshot()))
+    pack_bubble = _BUBBLE.pack
+    for b in bubbles:
+        parts.append(pack_bubble(b.x, b.y, b.type, b.active))
+    pack_projectile = _PROJECTILE.pack
+    for pr in projectiles:
+        parts.append(pack_projectile(pr.x, pr.y, pr.direction, index(pr.owner), pr.active))
+    return b''.join(parts)
+
+
+def restore(state, blob):
+    """把 state 恢复到 snapshot() 时的状态
+
+    Raises:
+        ValueError: 快照版本不对，或者与 state 的玩家数 / 动态平台数不一致
+    """
+    players = state.players
+    platforms = state.level.dynamic_platforms
+    (version, n_players, n_platforms, n_bubbles, n_projectiles, frame, now, bubble_timer, game_over,
+     winner, loser, n_eliminated, rng_state) = _HEADER.unpack_from(blob)
+    if version != VERSION or n_players != len(players) or n_platforms != len(platforms):
+        raise ValueError(f"snapshot (v{version}, {n_players} players, {n_platforms} moving keys) "
+                         f"does not fit this match ({len(players)} players, {len(platforms)} moving keys)")
+    offset = _HEADER.size
+    eliminated = [players[i] for i in blob[offset:offset + n_eliminated]]
+    offset += n_eliminated
+
+    # 计时器全部按快照里的到期帧重新登记
+    state.timers.clear()
+    state.timers.now = now
+    last_skill = {}
+    unpack_player = _PLAYER.unpack_from
+    unpack_effect = _EFFECT.unpack_from
+    for p in players:
+        *row, skill, n_effects = unpack_player(blob, offset)
+        offset += _PLAYER.size
+        effects = []
+        for _ in range(n_effects):
+            effects.append(unpack_effect(blob, offset))
+            offset += _EFFECT.size
+        row.append(effects)
+        p.restore_snapshot(row)
+        last_skill[p] = skill or None
+    unpack_platform = _PLATFORM.unpack_from
+    for p in platforms:
+        p.restore_snapshot(unpack_platform(blob, offset))
+        offset += _PLATFORM.size
+
+    end = offset + n_bubbles * _BUBBLE.size
+    state.bubbles = [_restore_bubble(*row) for row in _BUBBLE.iter_unpack(blob[offset:end])]
+    offset = end
+    end = offset + n_projectiles * _PROJECTILE.size
+    state.projectiles = [_restore_projectile(players, *row) for row in _PROJECTILE.iter_unpack(blob[offset:end])]
+
+    state.frame = frame
+    state.bubble_timer = bubble_timer
+    state.game_over = game_over
+    state.winner = players[winner] if winner >= 0 else None
+    state.loser = players[loser] if loser >= 0 else None
+    state.eliminated = eliminated
+    state.last_skill = last_skill
+    if state.winner is None:
+        state.winner_name = None
+    elif state.team_names is not None:
+        state.winner_name = state.team_names[state.winner.team]
+    else:
+        state.winner_name = state.winner.name
+    state.rng.setstate(rng_state)
+
+
+def _restore_bubble(x, y, btype, active):
+    bubble = Bubble(x, y, btype)
+    bubble.active = active
+    return bubble
+
+
+def _restore_projectile(players, x, y, direction, owner, active):
+    proj = Projectile(x, y, direction, players[owner])
+    proj.active = active
+    return proj
+
+
+def checksum(blob):
+    """快照的 32 位校验和（比较双方模拟是否一致）"""
+    return zlib.crc32(blob)
+
+
+# ---- 耗时测量 ----
+
+def run_benchmark(frames=3000, players=2, stage='arena', seed=1):
+    """bot 对局中每帧做一次快照和恢复，返回 (快照, 恢复) 的 (平均, 最大) 微秒和快照字节数"""
+    from settings import init_runtime
+    from world.level import load_level
+    from game.bots import make_bot
+    from game.game_state import GameState, create_players
+
+    init_runtime(create_display=False)
+    level = load_level(stage)
+    roster, _, _ = create_players(level, players)
+    controllers = {p: make_bot(('chaser', 'melee')[i % 2], p, seed=seed * 100 + i) for i, p in enumerate(roster)}
+    state = GameState(roster, level, controllers=controllers, seed=seed)
+
+    save_times = []
+    restore_times = []
+    sizes = []
+    for _ in range(frames):
+        if state.game_over:
+            break
+        t0 = time.perf_counter()
+        blob = snapshot(state)
+        t1 = time.perf_counter()
+        restore(state, blob)
+        t2 = time.perf_counter()
+        save_times.append(t1 - t0)
+        restore_times.append(t2 - t1)
+        sizes.append(len(blob))
+        state.update(None)
+
+    def summary(samples):
+        samples = sorted(samples)
+        return (sum(samples) / len(samples) * 1e6, samples[int(len(samples) * 0.99)] * 1e6, samples[-1] * 1e6)
+
+    return {
+        'frames': len(sizes),
+        'snapshot_us': summary(save_times),
+        'restore_us': summary(restore_times),
+        'bytes': (min(sizes), max(sizes)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure match snapshot / restore cost')
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--stage', default='arena')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    result = run_benchmark(args.frames, args.players, args.stage, args.seed)
+    for name in ('snapshot', 'restore'):
+        avg, p99, worst = result[f'{name}_us']
+        print(f"[SNAPSHOT] {name:8s} avg={avg:.1f}us p99={p99:.1f}us max={worst:.1f}us")
+    print(f"[SNAPSHOT] {result['frames']} frames, {result['bytes'][0]}-{result['bytes'][1]} bytes per snapshot")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""bot 对战浸泡测试（soak test）
+
+让 bot 在街机上连续对打数小时，定期打印帧耗时和进程内存，
+用于发现内存增长和帧时间漂移。每局结束后重新加载关卡和玩家，继续下一局。
+
+    python -m game.soak --minutes 120 --players 4 --policies chaser,melee,random
+    python -m game.soak --frames 20000 --no-render       # 只跑逻辑，不绘制
+
+默认使用 SDL 的 dummy 显示驱动在后台绘制；加 --window 可以在真实窗口里观看。
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def rss_mb():
+    """当前进程常驻内存（MB）；无法获取时返回 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        import resource
+        # ru_maxrss 是峰值：Linux 上单位为 KB，macOS 上为字节
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except Exception:
+        return None
+
+
+class FrameStats:
+    """按报告窗口统计帧耗时"""
+
+    def __init__(self):
+        self.samples = []
+        self.first_window = None
+
+    def add(self, seconds):
+        self.samples.append(seconds * 1000.0)
+
+    def flush(self):
+        """返回本窗口的 (平均, p95, 最大) 毫秒，并清空样本"""
+        if not self.samples:
+            return None
+        samples = sorted(self.samples)
+        mean = statistics.fmean(samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        window = (mean, p95, samples[-1])
+        if self.first_window is None:
+            self.first_window = window
+        self.samples = []
+        return window
+
+
+def run_soak(players=2, policies=('chaser', 'melee'), stage='arena', frames=None, minutes=None,
+             render=True, report_every=30.0, max_match_frames=60 * 180, seed=None, fps=0,
+             memwatch=False):
+    """运行 bot 对战，直到达到帧数或时长上限（都不设置时一直运行）
+
+    Args:
+        players: 每局玩家数
+        policies: bot 策略列表，按槽位循环分配
+        stage: 关卡名
+        frames / minutes: 结束条件
+        render: 是否绘制（包含 HUD），关闭后只跑游戏逻辑
+        report_every: 报告间隔（秒）
+        max_match_frames: 单局最长帧数，超过后判为平局并开始下一局
+        seed: 随机种子
+        fps: 大于 0 时按该帧率限速，0 表示全速运行
+        memwatch: 每局结束后记录 tracemalloc 快照和 Surface/Sound 数量（见 utils.memwatch）
+
+    Returns:
+        汇总统计 dict
+    """
+    import pygame
+    from settings import init_runtime, BG_COLOR
+    from world.level import load_level
+    from game.bots import make_bot
+    from game.game_state import GameState, create_players
+    from utils.ui import draw_ui
+    from utils.memwatch import MemoryWatch
+
+    if seed is not None:
+        random.seed(seed)
+    screen = init_runtime(create_display=render)
+    clock = pygame.time.Clock() if fps else None
+
+    stats = FrameStats()
+    wins = {}
+    matches = 0
+    total_frames = 0
+    start = time.perf_counter()
+    last_report = start
+    deadline = start + minutes * 60 if minutes else None
+    rss_start = rss_mb()
+    memory_watch = MemoryWatch().start() if memwatch else None
+
+    def new_match():
+        level = load_level(stage)
+        if render:
+            level.bake()
+        roster, colors, labels = create_players(level, players)
+        controllers = {p: make_bot(policies[i % len(policies)], p,
+                                   seed=None if seed is None else seed * 100 + matches * 10 + i)
+                       for i, p in enumerate(roster)}
+        state = GameState(roster, level, controllers=controllers,
+                          seed=None if seed is None else seed * 100 + matches)
+        return state, colors, labels
+
+    state, hud_colors, hud_labels = new_match()
+    print(f"[SOAK] {players} bots ({', '.join(policies)}) on '{stage}', render={'on' if render else 'off'}")
+    try:
+        while True:
+            if frames is not None and total_frames >= frames:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+            t0 = time.perf_counter()
+            if render:
+                pygame.event.pump()
+            state.update(None)
+            if render:
+                screen.fill(BG_COLOR)
+                state.draw_entities(screen)
+                draw_ui(screen, state.players, (), hud_colors, hud_labels)
+                pygame.display.flip()
+            stats.add(time.perf_counter() - t0)
+            total_frames += 1
+            if clock:
+                clock.tick(fps)
+
+            if state.game_over or state.frame >= max_match_frames:
+                matches += 1
+                key = state.winner_name if state.game_over else 'draw'
+                wins[key] = wins.get(key, 0) + 1
+                if memory_watch:
+                    # 先释放上一局的对象，再记录保留下来的内存
+                    state = None
+                    memory_watch.match_finished(f"match {matches} ({key})")
+                state, hud_colors, hud_labels = new_match()
+
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                window = stats.flush()
+                rss = rss_mb()
+                rss_text = f"{rss:.1f}MB" if rss is not None else "n/a"
+                print(f"[SOAK] t={now - start:7.0f}s frames={total_frames} matches={matches} "
+                      f"frame avg={window[0]:.2f}ms p95={window[1]:.2f}ms max={window[2]:.2f}ms "
+                      f"rss={rss_text}")
+    except KeyboardInterrupt:
+        pass
+
+    window = stats.flush()
+    elapsed = time.perf_counter() - start
+    rss_end = rss_mb()
+    summary = {
+        'frames': total_frames,
+        'matches': matches,
+        'elapsed': elapsed,
+        'wins': wins,
+        'first_window': stats.first_window,
+        'last_window': window,
+        'rss_start_mb': rss_start,
+        'rss_end_mb': rss_end,
+        'memory_history': memory_watch.history if memory_watch else None,
+    }
+    print(f"[SOAK] done: {total_frames} frames, {matches} matches in {elapsed:.0f}s; wins={wins}")
+    if stats.first_window and window:
+        print(f"[SOAK] frame avg drift: {stats.first_window[0]:.2f}ms -> {window[0]:.2f}ms")
+    if rss_start is not None and rss_end is not None:
+        print(f"[SOAK] rss: {rss_start:.1f}MB -> {rss_end:.1f}MB")
+    pygame.quit()
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bot-vs-bot soak test')
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--policies', default='chaser,melee', help='comma-separated bot policies, cycled over slots')
+    parser.add_argument('--stage', default='arena')
+    parser.add_argument('--frames', type=int, default=None)
+    parser.add_argument('--minutes', type=float, default=None)
+    parser.add_argument('--report-every', type=float, default=30.0, help='seconds between reports')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--fps', type=int, default=0, help='cap the frame rate (0 = run flat out)')
+    parser.add_argument('--no-render', action='store_true', help='run game logic only')
+    parser.add_argument('--window', action='store_true', help='draw into a real window instead of the dummy driver')
+    parser.add_argument('--memwatch', action='store_true', help='tracemalloc snapshot and leak check after every match')
+    args = parser.parse_args(argv)
+
+    if not args.window:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    from settings import MAX_PLAYERS
+    players = max(2, min(MAX_PLAYERS, args.players))
+    policies = tuple(p.strip() for p in args.policies.split(',') if p.strip()) or ('melee',)
+    run_soak(players=players, policies=policies, stage=args.stage, frames=args.frames,
+             minutes=args.minutes, render=not args.no_render, report_every=args.report_every,
+             seed=args.seed, fps=args.fps, memwatch=args.memwatch)
+
+
+if __name__ == '__main__':
+    main()
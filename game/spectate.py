@@ -0,0 +1,489 @@
+"""观战直播：主机把对局状态实时推送给局域网里的其他电脑
+
+主机每帧把对局快照（game.snapshot，几百字节）交给 SpectatorServer，
+服务器只编码一次：与上一帧快照逐字节比较，只发送变化的字节段（位置、血量、状态标记、
+泡泡、平台等），每秒发一次完整的关键帧；同一段 bytes 原样写给所有观众，
+所以观众再多，主机每帧的编码开销也不变，每名观众的带宽也不变。
+跟不上的观众（发送缓冲区堆积）暂停接收增量，等下一个关键帧再接上，不会拖慢主机。
+
+观众端用同样的关卡和玩家数建一个 GameState，把收到的快照恢复进去，
+再用现有的 draw_entities / draw_ui 在本地绘制。
+
+    KOP_SPECTATE_PORT=7300 python main.py               # 主机：开启观战服务器
+    python -m game.spectate watch 192.168.1.20:7300     # 观众
+    python -m game.spectate bench --clients 64          # 压力测试：编码耗时和每名观众的带宽
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(HERE, '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from settings import FPS
+
+DEFAULT_PORT = 7300
+
+# 消息：正文长度、类型，随后是正文
+_FRAME = struct.Struct('<IB')
+HELLO, KEYFRAME, DELTA = 1, 2, 3
+# 增量里的一段：偏移、长度，随后是新的字节
+_RUN = struct.Struct('<HB')
+_MAX_RUN = 255
+
+
+def _message(kind, body):
+    return _FRAME.pack(len(body), kind) + body
+
+
+def encode_delta(prev, blob):
+    """blob 相对 prev（等长）变化的字节段；相隔不超过 3 个字节的变化合并成一段"""
+    runs = []
+    n = len(blob)
+    i = 0
+    while i < n:
+        # 8 字节一组快速跳过没变的部分
+        if prev[i:i + 8] == blob[i:i + 8]:
+            i += 8
+            continue
+        if prev[i] == blob[i]:
+            i += 1
+            continue
+        start = i
+        same = 0
+        while i < n and i - start < _MAX_RUN:
+            if prev[i] == blob[i]:
+                same += 1
+                if same > 3:
+                    break
+            else:
+                same = 0
+            i += 1
+        end = i - same
+        runs.append(_RUN.pack(start, end - start))
+        runs.append(blob[start:end])
+    return b''.join(runs)
+
+
+def apply_delta(blob, delta):
+    """把 encode_delta 的结果应用到 blob 上，返回新的 bytes"""
+    out = bytearray(blob)
+    offset = 0
+    while offset < len(delta):
+        start, length = _RUN.unpack_from(delta, offset)
+        offset += _RUN.size
+        out[start:start + length] = delta[offset:offset + length]
+        offset += length
+    return bytes(out)
+
+
+class SpectatorFeed:
+    """观众端：把收到的字节流还原成当前的快照"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.hello = None
+        self.blob = None
+        self.received = 0
+
+    def feed(self, data):
+        """喂入收到的数据，返回本次处理的消息类型列表"""
+        self.received += len(data)
+        buf = self._buffer
+        buf.extend(data)
+        kinds = []
+        while len(buf) >= _FRAME.size:
+            length, kind = _FRAME.unpack_from(buf)
+            end = _FRAME.size + length
+            if len(buf) < end:
+                break
+            body = bytes(buf[_FRAME.size:end])
+            del buf[:end]
+            if kind == HELLO:
+                self.hello = json.loads(body.decode('utf-8'))
+                self.blob = None
+            elif kind == KEYFRAME:
+                self.blob = body
+            elif kind == DELTA and self.blob is not None:
+                self.blob = apply_delta(self.blob, body)
+            kinds.append(kind)
+        return kinds
+
+
+class _Client:
+    __slots__ = ('writer', 'task', 'needs_keyframe')
+
+    def __init__(self, writer, task):
+        self.writer = writer
+        self.task = task
+        self.needs_keyframe = True
+
+
+class SpectatorServer:
+    """asyncio 观战服务器，运行在后台线程里；游戏线程只调用 start_match / publish
+
+    Args:
+        host / port: 监听地址（port 为 0 时由系统分配，启动后可读 self.port）
+        keyframe_interval: 每隔多少帧发一次完整快照
+        max_buffer: 单个观众的发送缓冲区超过这么多字节时暂停发给他，等下一个关键帧
+    """
+
+    def __init__(self, host='0.0.0.0', port=DEFAULT_PORT, keyframe_interval=FPS, max_buffer=256 * 1024):
+        self.host = host
+        self.port = port
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.max_buffer = max_buffer
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._clients = set()
+        self._hello = None
+        self._last_blob = None
+        self._keyframe_msg = None
+        self._frame = 0
+
+        self.frames = 0
+        self.bytes_out = 0
+        self.encoded_bytes = 0
+        self.encode_time = 0.0
+        self.skipped = 0
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def start(self):
+        """在后台线程启动服务器，监听成功后返回"""
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        error = []
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._server = self._loop.run_until_complete(
+                    asyncio.start_server(self._handle, self.host, self.port))
+            except OSError as e:
+                error.append(e)
+                ready.set()
+                return
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='spectator-server', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if error:
+            raise error[0]
+        return self
+
+    def stop(self):
+        """断开所有观众并停止服务器线程"""
+        if self._loop is None:
+            return
+        try:
+            self.call(self._close()).result(timeout=2)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
+        self._loop.close()
+        self._loop = None
+
+    def call(self, coro):
+        """在服务器线程里运行协程，返回 concurrent.futures.Future（压测的观众连接也跑在这里）"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # ---- 游戏线程调用 ----
+
+    def start_match(self, stage, players, teams=0):
+        """新的一局：观众据此加载关卡并创建玩家"""
+        hello = json.dumps({'stage': stage, 'players': players, 'teams': teams}).encode('utf-8')
+        self._loop.call_soon_threadsafe(self._new_match, _message(HELLO, hello))
+
+    def publish(self, blob):
+        """推送本帧快照（game.snapshot.snapshot 的结果）"""
+        self._loop.call_soon_threadsafe(self._publish, blob)
+
+    # ---- 服务器线程 ----
+
+    def _new_match(self, hello):
+        self._hello = hello
+        self._last_blob = None
+        self._keyframe_msg = None
+        self._frame = 0
+        for client in list(self._clients):
+            client.needs_keyframe = True
+            self._send(client, hello)
+
+    def _publish(self, blob):
+        t0 = time.perf_counter()
+        prev = self._last_blob
+        self._last_blob = blob
+        self._frame += 1
+        message = None
+        if prev is not None and len(prev) == len(blob) and self._frame % self.keyframe_interval:
+            delta = encode_delta(prev, blob)
+            if len(delta) < len(blob):
+                message = _message(DELTA, delta)
+        keyframe = message is None
+        if keyframe:
+            message = _message(KEYFRAME, blob)
+        self._keyframe_msg = message if keyframe else None
+        self.encode_time += time.perf_counter() - t0
+        self.encoded_bytes += len(message)
+        self.frames += 1
+
+        for client in list(self._clients):
+            if client.needs_keyframe and not keyframe:
+                continue
+            if client.writer.transport.get_write_buffer_size() > self.max_buffer:
+                # 跟不上：丢掉积压之后的增量，等下一个关键帧
+                client.needs_keyframe = True
+                self.skipped += 1
+                continue
+            client.needs_keyframe = False
+            self._send(client, message)
+
+    def _send(self, client, message):
+        try:
+            client.writer.write(message)
+            self.bytes_out += len(message)
+        except (ConnectionError, RuntimeError):
+            self._clients.discard(client)
+
+    async def _handle(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+        client = _Client(writer, asyncio.current_task())
+        self._clients.add(client)
+        if self._hello is not None:
+            self._send(client, self._hello)
+            if self._last_blob is not None:
+                if self._keyframe_msg is None:
+                    self._keyframe_msg = _message(KEYFRAME, self._last_blob)
+                self._send(client, self._keyframe_msg)
+                client.needs_keyframe = False
+        try:
+            # 观众不发送数据，读到 EOF 表示断开
+            while await reader.read(1024):
+                pass
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            # 关闭服务时 _close() 取消这里；正常结束，不让 asyncio 打印取消的回溯
+            pass
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+    async def _close(self):
+        if self._server is not None:
+            self._server.close()
+        tasks = [client.task for client in self._clients]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._clients.clear()
+
+
+# ---- 观众端 ----
+
+def watch(address):
+    """连接主机并在本地窗口里绘制对局；断线后每 2 秒重连一次"""
+    import pygame
+    from settings import init_runtime, BG_COLOR, BLACK, WHITE, ORANGE, TEAM_NAMES, font_large, font_medium
+    from world.level import load_level
+    from game.game_state import GameState, create_players
+    from game.snapshot import restore
+    from utils.text_cache import render_text
+    from utils.ui import draw_ui
+
+    host, _, port = address.rpartition(':')
+    addr = (host, int(port)) if host else (address, DEFAULT_PORT)
+    screen = init_runtime()
+    pygame.display.set_caption(f"King of Python - watching {addr[0]}:{addr[1]}")
+    clock = pygame.time.Clock()
+
+    sock = None
+    feed = None
+    match = None  # (state, hud_colors, hud_labels)
+    applied = None
+    next_connect = 0.0
+    running = True
+    while running:
+        clock.tick(FPS)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+
+        now = time.monotonic()
+        if sock is None and now >= next_connect:
+            try:
+                sock = socket.create_connection(addr, timeout=1.0)
+                sock.setblocking(False)
+                feed = SpectatorFeed()
+                match = None
+                applied = None
+            except OSError:
+                sock = None
+                next_connect = now + 2.0
+
+        if sock is not None:
+            chunks = []
+            while True:
+                try:
+                    data = sock.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    data = b''
+                if not data:
+                    sock.close()
+                    sock = None
+                    next_connect = now + 2.0
+                    break
+                chunks.append(data)
+            if chunks and HELLO in feed.feed(b''.join(chunks)):
+                hello = feed.hello
+                level = load_level(hello['stage'])
+                level.bake()
+                players, colors, labels = create_players(level, hello['players'], hello['teams'])
+                state = GameState(players, level, team_names=TEAM_NAMES if hello['teams'] else None)
+                match = (state, colors, labels)
+            if match is not None and feed.blob is not None and feed.blob is not applied:
+                restore(match[0], feed.blob)
+                applied = feed.blob
+
+        screen.fill(BG_COLOR)
+        if match is not None and applied is not None:
+            state, colors, labels = match
+            state.draw_entities(screen)
+            draw_ui(screen, state.players, (), colors, labels)
+            if state.game_over:
+                overlay = pygame.Surface(screen.get_size())
+                overlay.set_alpha(200)
+                overlay.fill(BLACK)
+                screen.blit(overlay, (0, 0))
+                text = render_text(font_large, f"{state.winner_name} WINS!", ORANGE)
+                screen.blit(text, text.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2)))
+        else:
+            message = "Waiting for the match..." if sock is not None else f"Connecting to {addr[0]}:{addr[1]}..."
+            text = render_text(font_medium, message, WHITE)
+            screen.blit(text, text.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2)))
+        pygame.display.flip()
+
+    if sock is not None:
+        sock.close()
+    pygame.quit()
+
+
+# ---- 压力测试 ----
+
+def run_bench(clients=32, frames=600, stage='arena', players=2, seed=1):
+    """bot 对局 + 本机 N 个观众连接；返回主机每帧编码耗时、每名观众收到的字节数，
+    并确认所有观众最后还原出的快照与主机一致"""
+    from settings import init_runtime
+    from world.level import load_level
+    from game.bots import make_bot
+    from game.game_state import GameState, create_players
+    from game.snapshot import snapshot
+
+    init_runtime(create_display=False)
+    server = SpectatorServer('127.0.0.1', 0).start()
+
+    feeds = [SpectatorFeed() for _ in range(clients)]
+
+    async def spectator(feed, connected):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        connected.set()
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            feed.feed(data)
+
+    connections = []
+    for feed in feeds:
+        connected = threading.Event()
+        connections.append(server.call(spectator(feed, connected)))
+        connected.wait(5)
+
+    level = load_level(stage)
+    roster, _, _ = create_players(level, players)
+    controllers = {p: make_bot(('chaser', 'melee')[i % 2], p, seed=seed * 100 + i) for i, p in enumerate(roster)}
+    state = GameState(roster, level, controllers=controllers, seed=seed)
+    server.start_match(stage, players)
+
+    publish_time = 0.0
+    blob = None
+    for _ in range(frames):
+        state.update(None)
+        blob = snapshot(state)
+        t0 = time.perf_counter()
+        server.publish(blob)
+        publish_time += time.perf_counter() - t0
+        time.sleep(1 / FPS / 8)
+
+    # 等观众收完
+    deadline = time.perf_counter() + 5
+    while time.perf_counter() < deadline and not all(f.blob == blob for f in feeds):
+        time.sleep(0.05)
+    in_sync = sum(f.blob == blob for f in feeds)
+    received = [f.received for f in feeds]
+    result = {
+        'clients': clients,
+        'frames': server.frames,
+        'encode_us': server.encode_time / max(1, server.frames) * 1e6,
+        'publish_us': publish_time / frames * 1e6,
+        'bytes_per_frame': server.encoded_bytes / max(1, server.frames),
+        'snapshot_bytes': len(blob),
+        'client_kbps': (sum(received) / clients) / (frames / FPS) / 1024,
+        'in_sync': in_sync,
+        'skipped': server.skipped,
+    }
+    for connection in connections:
+        connection.cancel()
+    server.stop()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Spectator client and fan-out benchmark')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_watch = sub.add_parser('watch', help='watch a match hosted with KOP_SPECTATE_PORT')
+    p_watch.add_argument('address', help=f'host[:port] (default port {DEFAULT_PORT})')
+    p_bench = sub.add_parser('bench', help='measure encode cost and per-spectator bandwidth')
+    p_bench.add_argument('--clients', type=int, default=32)
+    p_bench.add_argument('--frames', type=int, default=600)
+    p_bench.add_argument('--stage', default='arena')
+    p_bench.add_argument('--players', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.command == 'watch':
+        watch(args.address)
+        return
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    r = run_bench(args.clients, args.frames, args.stage, args.players)
+    print(f"[SPECTATE] {r['clients']} spectators, {r['frames']} frames: encode {r['encode_us']:.1f}us/frame "
+          f"(publish call {r['publish_us']:.1f}us), {r['bytes_per_frame']:.0f} bytes/frame "
+          f"(full snapshot {r['snapshot_bytes']} bytes)")
+    print(f"[SPECTATE] per spectator {r['client_kbps']:.1f} KB/s; {r['in_sync']}/{r['clients']} in sync, "
+          f"{r['skipped']} frames skipped for slow spectators")
+
+
+if __name__ == '__main__':
+    main()
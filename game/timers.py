@@ -0,0 +1,114 @@
+"""模拟帧计时轮（timer wheel）
+
+状态效果、攻击冷却、挥击动画和平台重生都登记为“第几帧到期”的计时器，
+由计时轮在对应的模拟帧触发回调，实体不再每帧自己递减计数器：
+没有计时器到期的帧只需一次字典查找，空闲的玩家和平台每帧零开销。
+
+时长用秒表示，按 FPS 换算成模拟帧（ticks）；计时轮只认帧，
+所以同样的输入总是在同一帧到期，与实际帧率无关。
+
+    wheel = TimerWheel()
+    timer = wheel.after(3.0, player.unfreeze)     # 3 秒后
+    wheel.remaining(timer)                        # 剩余帧数
+    wheel.cancel(timer)
+    wheel.advance()                               # 每个模拟帧调用一次
+"""
+from settings import FPS
+
+
+def ticks(seconds):
+    """秒换算成模拟帧数（至少 1 帧）"""
+    return max(1, int(round(seconds * FPS)))
+
+
+class Timer:
+    """一个已登记的计时器；cancelled 后不会再触发"""
+
+    __slots__ = ('deadline', 'callback', 'args', 'cancelled')
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class TimerWheel:
+    """哈希计时轮：计时器按到期帧号放进 slots 个槽位之一
+
+    到期时间超过一圈的计时器留在槽位里，轮到时比较到期帧号决定是否触发。
+    槽位按需创建，所以每个实体单独持有一个计时轮也很便宜。
+
+    Args:
+        slots: 槽位数量（一圈覆盖的帧数）
+    """
+
+    def __init__(self, slots=256):
+        self.slots = slots
+        self.now = 0
+        self._wheel = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def schedule(self, delay, callback, *args):
+        """delay 帧之后（至少 1 帧）触发 callback(*args)，返回 Timer"""
+        return self.schedule_at(self.now + max(1, int(delay)), callback, *args)
+
+    def schedule_at(self, tick, callback, *args):
+        """在第 tick 帧触发（已经过去的帧号按下一帧处理）"""
+        tick = max(tick, self.now + 1)
+        timer = Timer(tick, callback, args)
+        slot = self._wheel.get(tick % self.slots)
+        if slot is None:
+            self._wheel[tick % self.slots] = [timer]
+        else:
+            slot.append(timer)
+        self._count += 1
+        return timer
+
+    def after(self, seconds, callback, *args):
+        """seconds 秒之后触发"""
+        return self.schedule(ticks(seconds), callback, *args)
+
+    def cancel(self, timer):
+        """取消计时器（惰性删除：槽位轮到时丢弃）"""
+        if timer is not None and not timer.cancelled:
+            timer.cancelled = True
+            if timer.deadline > self.now:
+                self._count -= 1
+
+    def remaining(self, timer):
+        """距离到期还剩多少帧；None 或已取消时为 0"""
+        if timer is None or timer.cancelled:
+            return 0
+        return max(0, timer.deadline - self.now)
+
+    def advance(self, steps=1):
+        """推进 steps 帧，按登记顺序触发到期的计时器"""
+        for _ in range(steps):
+            self.now += 1
+            now = self.now
+            slot = self._wheel.pop(now % self.slots, None)
+            if slot is None:
+                continue
+            due = []
+            later = []
+            for timer in slot:
+                if timer.cancelled:
+                    continue
+                (due if timer.deadline <= now else later).append(timer)
+            if later:
+                # 回调里新登记的计时器可能已经放进了同一个槽位
+                self._wheel.setdefault(now % self.slots, []).extend(later)
+            for timer in due:
+                if timer.cancelled:
+                    continue
+                self._count -= 1
+                timer.cancelled = True
+                timer.callback(*timer.args)
+
+    def clear(self):
+        self._wheel.clear()
+        self._count = 0
@@ -1,76 +1,45 @@
 import pygame
 import sys
 import os
-import random
-import time
 import faulthandler
-import signal
 from settings import *
-from entities.player import Player
-from entities.bubble import Bubble
-from entities.projectile import Projectile
-from entities.platform import KeyPlatform
-from final.score import play_score_animation
+from utils.text_cache import render_text
+from utils.ui import draw_ui
+from utils.assets import ASSETS
+from utils.memwatch import MemoryWatch, memwatch_enabled
+from game.game_state import GameState, create_players
+from game.bots import make_bot, parse_bot_spec
+from game.netplay import RollbackSession, UdpTransport, encode_input, parse_address
+from game.snapshot import snapshot
+from game.spectate import SpectatorServer
+from world.level import load_level
+from game.scenes import Scene, SceneManager
+from final.score import ScoreScene, preload as preload_score
 try:
     from Backround import backround_2 as background
 except Exception:
     from Backround import backround_1 as background
-from Start.StartGame import run_start
+from Start.StartGame import StartScene
+
+# Enable faulthandler to dump tracebacks on crashes (SIGSEGV) for debugging
+faulthandler.enable()
+HERE = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(HERE)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
 
 try:
-    # Enable faulthandler to dump tracebacks on crashes (SIGSEGV) for debugging
-    faulthandler.register(signal.SIGSEGV, all_threads=True)
-    faulthandler.enable()
-    HERE = os.path.dirname(__file__)
-    REPO_ROOT = os.path.abspath(HERE)
-    if REPO_ROOT not in sys.path:
-        sys.path.insert(0, REPO_ROOT)
-    # try to import the batch two-face capture helper if available
-    # Import face capture helpers only when not explicitly disabled via env.
+    # Import the in-game face capture scene only when not explicitly disabled via env.
     if os.environ.get('DISABLE_FACE') != '1':
-        from face_detection.face_login_demo import capture_two_and_make_sprites, capture_and_make_sprite
+        from face_detection.capture_scene import FaceCaptureScene
+        from face_detection.avatar_store import avatar_store
     else:
-        capture_two_and_make_sprites = None
-        capture_and_make_sprite = None
+        FaceCaptureScene = None
 except Exception:
-    # fall back to single-capture function if batch isn't available
-    try:
-        from face_detection.face_login_demo import capture_and_make_sprite
-        capture_two_and_make_sprites = None
-    except Exception:
-        capture_and_make_sprite = None
-        capture_two_and_make_sprites = None
+    # camera / OpenCV helpers unavailable: the start screen goes straight to the arena
+    FaceCaptureScene = None
 
 
-
-def check_player_collision(player1, player2):
-    if (player1.x < player2.x + player2.width and
-        player1.x + player1.width > player2.x and
-        player1.y < player2.y + player2.height and
-        player1.y + player1.height > player2.y):
-        
-        if player1.x < player2.x:
-            player1.x -= 2
-            player2.x += 2
-        else:
-            player1.x += 2
-            player2.x -= 2
-        
-        return True
-    return False
-
-def check_attack_hit(attacker, defender):
-    attack_rect = attacker.get_attack_rect()
-    if not attack_rect:
-        return False
-    
-    if (defender.x < attack_rect['x'] + attack_rect['width'] and
-        defender.x + defender.width > attack_rect['x'] and
-        defender.y < attack_rect['y'] + attack_rect['height'] and
-        defender.y + defender.height > attack_rect['y']):
-        return True
-    return False
-
 def load_avatar_surface(path, max_display=80):
     try:
         surf = pygame.image.load(path).convert_alpha()
@@ -82,618 +51,278 @@ def load_avatar_surface(path, max_display=80):
         surf = pygame.transform.smoothscale(surf, (int(w * scale), int(h * scale)))
     return surf
 
-def draw_ui(screen, player1, player2, p1_avatar=None, p2_avatar=None):
-    hp_bar_width = 300
-    hp_bar_height = 25
-    hp_bar_y = 60
-    
-    # 玩家1血条（矩形）
-    p1_x = 50
-    # 玩家1 color (used for fill, border and glow)
-    p1_color = (104, 143, 255)
-    # draw a colored outer glow around the HP border using layered outlines
-    try:
-        glow = 12
-        glow_surf = pygame.Surface((hp_bar_width + glow * 2, hp_bar_height + glow * 2), pygame.SRCALPHA)
-        # draw rings from inner (near border) to outer; alpha decreases outward
-        max_alpha = 120
-        for r in range(0, glow):
-            # r=0 is the inner ring (strongest), larger r are farther out (weaker)
-            a = int(max_alpha * (1 - (r / float(max(1, glow)))))
-            clr = (p1_color[0], p1_color[1], p1_color[2], a)
-            rect = (glow - r, glow - r, hp_bar_width + r * 2, hp_bar_height + r * 2)
-            try:
-                # inner ring slightly thicker for a crisper edge
-                width = 2 if r == 0 else 1
-                pygame.draw.rect(glow_surf, clr, rect, width)
-            except Exception:
-                pass
-        # blit glow behind the HP bar so the border sits on top
-        screen.blit(glow_surf, (p1_x - glow, hp_bar_y - glow))
-    except Exception:
-        pass
-    pygame.draw.rect(screen, GRAY, (p1_x, hp_bar_y, hp_bar_width, hp_bar_height))
-    hp1_width = int((player1.hp / player1.max_hp) * hp_bar_width)
-    if hp1_width > 0:
-        pygame.draw.rect(screen, p1_color, (p1_x, hp_bar_y, hp1_width, hp_bar_height))
-    pygame.draw.rect(screen, p1_color, (p1_x, hp_bar_y, hp_bar_width, hp_bar_height), 2)
-    
-    name1 = "PLAYER 1"
-    p1_text = font_small.render(name1, True, p1_color)
-    if p1_text.get_width() > hp_bar_width:
-        small_font = pygame.font.Font(None, 20)
-        p1_text = small_font.render(name1, True, player1.color)
-    p1_text_rect = p1_text.get_rect(center=(p1_x + hp_bar_width // 2, hp_bar_y - 12))
-    screen.blit(p1_text, p1_text_rect)
-    
-    if p1_avatar:
-        aw = p1_avatar.get_width()
-        ah = p1_avatar.get_height()
-        ax = p1_x - aw - 8
-        ay = hp_bar_y + (hp_bar_height // 2) - (ah // 2)
-        if ax < 8:
-            ax = 8
-        if ay < 8:
-            ay = 8
-        screen.blit(p1_avatar, (ax, ay))
-    
-    # 玩家2血条（从右到左填充，扣血时从左边减少，保持右对齐）
-    p2_x = WIDTH - 50 - hp_bar_width
-    # 玩家2 color (used for fill, border and glow)
-    p2_color = (255, 104, 147)
-    # draw a colored outer glow around player2's HP border
-    try:
-        glow = 12
-        glow_surf2 = pygame.Surface((hp_bar_width + glow * 2, hp_bar_height + glow * 2), pygame.SRCALPHA)
-        max_alpha = 120
-        for r in range(0, glow):
-            a = int(max_alpha * (1 - (r / float(max(1, glow)))))
-            clr = (p2_color[0], p2_color[1], p2_color[2], a)
-            rect = (glow - r, glow - r, hp_bar_width + r * 2, hp_bar_height + r * 2)
-            try:
-                width = 2 if r == 0 else 1
-                pygame.draw.rect(glow_surf2, clr, rect, width)
-            except Exception:
-                pass
-        screen.blit(glow_surf2, (p2_x - glow, hp_bar_y - glow))
-    except Exception:
-        pass
-    pygame.draw.rect(screen, GRAY, (p2_x, hp_bar_y, hp_bar_width, hp_bar_height))
-    hp2_width = int((player2.hp / player2.max_hp) * hp_bar_width)
-    # 使用指定颜色显示玩家2 血条与名称（与玩家1互换）
-    # 血条右对齐，扣血时从左边消失
-    hp2_start_x = p2_x + (hp_bar_width - hp2_width)
-    if hp2_width > 0:
-        pygame.draw.rect(screen, p2_color, (hp2_start_x, hp_bar_y, hp2_width, hp_bar_height))
-    pygame.draw.rect(screen, p2_color, (p2_x, hp_bar_y, hp_bar_width, hp_bar_height), 2)
-    
-    name2 = "PLAYER 2"
-    p2_text = font_small.render(name2, True, p2_color)
-    if p2_text.get_width() > hp_bar_width:
-        small_font = pygame.font.Font(None, 20)
-        p2_text = small_font.render(name2, True, player2.color)
-    p2_text_rect = p2_text.get_rect(center=(p2_x + hp_bar_width // 2, hp_bar_y - 12))
-    screen.blit(p2_text, p2_text_rect)
-    
-    if p2_avatar:
-        aw = p2_avatar.get_width()
-        ah = p2_avatar.get_height()
-        ax = p2_x + hp_bar_width + 8
-        ay = hp_bar_y + (hp_bar_height // 2) - (ah // 2)
-        if ax + aw > WIDTH - 8:
-            ax = WIDTH - aw - 8
-        if ay < 8:
-            ay = 8
-        screen.blit(p2_avatar, (ax, ay))
-    
-    # 技能说明 - SPACE 平台下方，等间距水平排列，整体居中
-    space_bottom = HEIGHT - 100 + 38
-    remaining_space = HEIGHT - space_bottom
-    info_y = space_bottom + remaining_space // 2  # SPACE 底部到屏幕底部的中间位置
-    
-    skill_infos = [
-        ("pow(): Attack 8HP", ORANGE),
-        ("delete: Remove skill", RED),
-        ("print: Shoot 2HP", YELLOW),
-        ("super(): Giant 5s", (200, 100, 255)),
-        ("Ctrl+C: Freeze 3s", CYAN),
-        ("TypeError: Reverse 10s", DARK_RED)
-    ]
-    
-    # 计算图标和文字的参数
-    icon_radius = 6
-    icon_text_gap = 8
-    item_spacing = 20  # 每个技能项之间的间隔
-    
-    # 预渲染所有文字并计算每个技能项的宽度
-    skill_items = []
-    total_content_width = 0
-    for text, color in skill_infos:
-        skill_text = font_tiny.render(text, True, WHITE)
-        item_width = icon_radius * 2 + icon_text_gap + skill_text.get_width()
-        skill_items.append((skill_text, color, item_width))
-        total_content_width += item_width
-    
-    # 加上所有间隔
-    total_content_width += item_spacing * (len(skill_infos) - 1)
-    
-    # 整体居中：从屏幕中心减去总宽度的一半
-    start_x = (WIDTH - total_content_width) / 2
-    
-    # 绘制每个技能说明
-    current_x = start_x
-    for i, (skill_text, color, item_width) in enumerate(skill_items):
-        # 绘制彩色圆点图标
-        icon_x = int(current_x + icon_radius)
-        icon_y = int(info_y)
-        pygame.draw.circle(screen, color, (icon_x, icon_y), icon_radius)
-        
-        # 绘制技能文字
-        text_x = int(current_x + icon_radius * 2 + icon_text_gap)
-        text_y = int(info_y)
-        
-        # 文字阴影（增强可读性）
-        shadow_text = font_tiny.render(skill_infos[i][0], True, BLACK)
-        shadow_rect = shadow_text.get_rect(midleft=(text_x + 1, text_y + 1))
-        screen.blit(shadow_text, shadow_rect)
-        
-        # 主文字
-        text_rect = skill_text.get_rect(midleft=(text_x, text_y))
-        screen.blit(skill_text, text_rect)
-        
-        # 移动到下一个技能项
-        current_x += item_width + item_spacing
-
-def create_keyboard_platforms():
-    """创建键盘主题的平台布局"""
-    platforms = []
-    
-    # SPACE键 - 最底部的主平台（超长）
-    platforms.append(KeyPlatform(75, HEIGHT - 100, 1050, 38, "SPACE"))
-    
-    # QWER 行 - 中层平台（调整位置，Q 远离 Shift 下方）
-    platforms.append(KeyPlatform(280, 400, 100, 32, "Q"))  # Q 向上移动
-    platforms.append(KeyPlatform(450, 520, 100, 32, "W"))
-    platforms.append(KeyPlatform(620, 480, 100, 32, "E"))  # E 向上移动
-    platforms.append(KeyPlatform(950, 440, 100, 32, "R"))  # R 向上移动并向右移动
-    
-    # ASD 行 - 较低层（调整位置和间距）
-    platforms.append(KeyPlatform(180, 570, 100, 32, "A"))
-    platforms.append(KeyPlatform(720, 610, 100, 32, "S"))  # S 向下移动
-    platforms.append(KeyPlatform(900, 570, 100, 32, "D"))
-    
-    # Shift键 - 可断裂平台（左侧，碎裂后落空）
-    platforms.append(KeyPlatform(75, 360, 120, 32, "Shift", is_dynamic=True, is_breakable=True))
-    
-    # Tab键 - 高层平台（左右移动）
-    tab_platform = KeyPlatform(600, 310, 100, 32, "Tab", is_dynamic=True)
-    tab_platform.move_direction = 1  # 1=右移, -1=左移
-    tab_platform.move_speed = 1.5  # 水平移动速度
-    tab_platform.move_range = 400  # 左右移动范围
-    tab_platform.base_x = 600  # 记录初始x位置
-    platforms.append(tab_platform)
-    
-    return platforms
-
-def main():
-    clock = pygame.time.Clock()
-    start = True
-    local_p1 = None
-    local_p2 = None
-    global screen, WIDTH, HEIGHT
-    # if display was quit by external code (e.g. face capture), re-init it
-    if not pygame.get_init() or not pygame.display.get_init() or pygame.display.get_surface() is None:
-        pygame.init()
-        # recreate the screen surface from settings
-        try:
-            screen = pygame.display.set_mode((WIDTH, HEIGHT))
-            pygame.display.set_caption("King of Python - The Great Keyboard")
-        except Exception:
-            # if settings not available, ignore; errors will surface later
-            pass
-    # 尝试初始化混音器并加载攻击音效（如果可用）
-    attack_sound = None
+def prepare_level():
+    """加载并烘焙本局的键盘关卡（静态键帽预先画成一层，动态键帽每帧单独绘制）"""
+    level = load_level(STAGE)
+    level.bake()
+    return level
+
+
+def start_game_music():
+    # Start gameplay background music (loop) after the start screen finishes
+    repo_root = os.path.abspath(os.path.dirname(__file__))
+    game_music_path = os.path.join(repo_root, 'assets', 'Game sound.mp3')
     try:
-        # 确保 mixer 已初始化
+        # use mixer.music for streaming background track
         try:
             if not pygame.mixer.get_init():
                 pygame.mixer.init()
         except Exception:
             pass
-        # 优先从项目 assets 中加载刚刚添加的音效文件
-        repo_root = os.path.abspath(os.path.dirname(__file__))
-        attack_path = os.path.join(repo_root, 'assets', 'magic_hit_lightning.mp3')
-        try:
-            attack_sound = pygame.mixer.Sound(attack_path)
-            try:
-                attack_sound.set_volume(0.8)
-            except Exception:
-                pass
-            # Debug: print that sound was loaded
-            try:
-                print(f"[SFX] loaded attack_sound: {attack_path}, length={attack_sound.get_length():.3f}s")
-            except Exception:
-                print(f"[SFX] loaded attack_sound: {attack_path}")
-        except Exception as e:
-            attack_sound = None
-            print(f"[SFX] failed to load attack_sound: {attack_path} -> {e}")
-    except Exception:
-        attack_sound = None
-    # Initialize and attach the animated background early so the start
-    # screen (run_start) can use it as well.
-    try:
-        # initialize background module sizes and streams (no new display)
-        background.init(WIDTH, HEIGHT, create_display=False)
-        background.set_surface(screen)
-        # 强制使用项目内的像素字体以确保嵌入时的视觉与独立运行一致
-        try:
-            background.module_font = pygame.font.Font(FONT_PATH, background.font_size)
-            background.module_is_pixel_font = True
-        except Exception:
-            # 如果字体加载失败，忽略并允许模块回退到默认字体
-            pass
-    except Exception:
-        pass
-    
-    # Prepare entry/start sound and play it when the start screen appears.
-    entry_sound = None
-    try:
-        repo_root = os.path.abspath(os.path.dirname(__file__))
-        entry_path = os.path.join(repo_root, 'assets', 'Game_Enter.mp3')
+        pygame.mixer.music.load(game_music_path)
         try:
-            if not pygame.mixer.get_init():
-                pygame.mixer.init()
+            pygame.mixer.music.set_volume(0.6)
         except Exception:
             pass
-        try:
-            entry_sound = pygame.mixer.Sound(entry_path)
-            try:
-                entry_sound.set_volume(0.7)
-            except Exception:
-                pass
-            # play once when start screen is shown
+        pygame.mixer.music.play(loops=-1)
+        print(f"[MUSIC] started gameplay music: {game_music_path}")
+    except Exception as e:
+        print(f"[MUSIC] failed to start gameplay music: {game_music_path} -> {e}")
+
+
+class GameFlow:
+    """开始画面 → 人脸捕获 → 对局 → 结算动画 → 开始画面 的场景切换
+
+    在开始画面停留时，下一局的关卡在后台加载烘焙；对局进行时，结算动画的图片在后台加载。
+
+    Args:
+        manager: SceneManager
+        memory_watch: 可选的 MemoryWatch，每局结束时记录一次
+    """
+
+    def __init__(self, manager, memory_watch=None):
+        self.manager = manager
+        self.memory_watch = memory_watch
+        self.entry_sound = None
+
+    def show_start(self):
+        # Prepare entry/start sound and play it when the start screen appears.
+        self.entry_sound = ASSETS.sound('Game_Enter.mp3', volume=0.7)
+        if self.entry_sound:
             try:
-                entry_sound.play()
-                print(f"[SFX] played entry_sound: {entry_path}")
+                self.entry_sound.play()
+                print("[SFX] played entry_sound: Game_Enter.mp3")
             except Exception:
                 pass
-        except Exception as e:
-            entry_sound = None
-            print(f"[SFX] failed to load entry_sound: {entry_path} -> {e}")
-    except Exception:
-        entry_sound = None
+        else:
+            print("[SFX] failed to load entry_sound: Game_Enter.mp3")
+        self.manager.reset(StartScene(self.start_chosen))
+        self.manager.preload('level', prepare_level)
 
-    # Use the new Start screen module to show a stylized start menu.
-    try:
-        action = run_start(screen, clock)
+    def start_chosen(self, action):
         # If the player pressed SPACE (capture) to start the game, stop the entry music
-        try:
-            if action == 'capture' and entry_sound:
-                # prefer a short fadeout for smoothness, fallback to stop()
-                try:
-                    entry_sound.fadeout(250)
-                except Exception:
-                    try:
-                        entry_sound.stop()
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-        # Start gameplay background music (loop) after the start screen finishes
-        game_music_path = None
-        try:
-            repo_root = os.path.abspath(os.path.dirname(__file__))
-            game_music_path = os.path.join(repo_root, 'assets', 'Game sound.mp3')
+        if action == 'capture' and self.entry_sound:
+            # prefer a short fadeout for smoothness, fallback to stop()
             try:
-                # use mixer.music for streaming background track
-                try:
-                    if not pygame.mixer.get_init():
-                        pygame.mixer.init()
-                except Exception:
-                    pass
-                pygame.mixer.music.load(game_music_path)
+                self.entry_sound.fadeout(250)
+            except Exception:
                 try:
-                    pygame.mixer.music.set_volume(0.6)
+                    self.entry_sound.stop()
                 except Exception:
                     pass
-                pygame.mixer.music.play(loops=-1)
-                print(f"[MUSIC] started gameplay music: {game_music_path}")
-            except Exception as e:
-                print(f"[MUSIC] failed to start gameplay music: {game_music_path} -> {e}")
-        except Exception:
-            game_music_path = None
-    except SystemExit:
-        pygame.quit()
-        sys.exit()
+        start_game_music()
 
-    # If user chose to capture, run the capture flow (same as before)
-    if action == 'capture' and (capture_two_and_make_sprites is not None or capture_and_make_sprite is not None):
-        if capture_two_and_make_sprites is not None:
-            try:
-                p1, p2 = capture_two_and_make_sprites('Face1', 'Face2')
-            except KeyboardInterrupt:
-                p1 = None
-                p2 = None
-            except Exception:
-                try:
-                    p1 = capture_and_make_sprite('Face1') if capture_and_make_sprite else None
-                except Exception:
-                    p1 = None
-                time.sleep(1.0)
-                try:
-                    p2 = capture_and_make_sprite('Face2') if capture_and_make_sprite else None
-                except Exception:
-                    p2 = None
+        if action == 'capture' and FaceCaptureScene is not None:
+            self.manager.replace(FaceCaptureScene(self.captured, store=avatar_store()))
         else:
+            # either user skipped or capture unavailable
+            self.start_match((None, None))
+
+    def captured(self, paths):
+        # 头像库里的老玩家直接用进程里缓存的 Surface
+        store = avatar_store()
+        load = load_avatar_surface if store is None else (lambda p: store.surface(p, load_avatar_surface))
+        self.start_match(tuple(load(p) if p else None for p in paths))
+
+    def start_match(self, avatars):
+        level = self.manager.take('level', prepare_level)
+        self.manager.replace(ArenaScene(self, level, avatars))
+        self.manager.preload('score', preload_score)
+
+    def match_finished(self):
+        if self.memory_watch:
+            self.memory_watch.match_finished()
+        self.show_start()
+
+
+class ArenaScene(Scene):
+    """一局对战：玩家、bot、联机会话、观战直播、HUD 和胜负画面
+
+    比赛结束时压入结算动画；动画结束回到这里显示胜利画面，按 SPACE（或 ESC）回到开始画面。
+    """
+
+    # 结算动画期间联机会话继续同步、观战继续推送
+    update_when_covered = True
+
+    def __init__(self, flow, level, avatars):
+        super().__init__()
+        self.flow = flow
+        self.level = level
+        self.avatars = avatars
+
+    def enter(self, manager):
+        global _match_number
+        super().enter(manager)
+        # 攻击音效（资源注册表只在第一次使用时读盘，重开一局直接复用）
+        self.attack_sound = ASSETS.sound('magic_hit_lightning.mp3', volume=0.8)
+        if self.attack_sound:
             try:
-                p1 = capture_and_make_sprite('Face1')
-            except Exception:
-                p1 = None
-            time.sleep(1.0)
-            try:
-                p2 = capture_and_make_sprite('Face2')
+                print(f"[SFX] loaded attack_sound: magic_hit_lightning.mp3, length={self.attack_sound.get_length():.3f}s")
             except Exception:
-                p2 = None
+                print("[SFX] loaded attack_sound: magic_hit_lightning.mp3")
+        else:
+            print("[SFX] failed to load attack_sound: magic_hit_lightning.mp3")
 
-        local_p1 = load_avatar_surface(p1)
-        local_p2 = load_avatar_surface(p2)
-    else:
-        # either user skipped or capture unavailable
-        local_p1 = None
-        local_p2 = None
-    
-    # 创建键盘平台
-    platforms = create_keyboard_platforms()
-
-    # 将背景渲染目标设为主屏幕（背景模块现在是导入安全的）
-    try:
-        background.set_surface(screen)
-    except Exception:
-        # 如果背景模块不可用或 set_surface 失败，不影响主流程
-        pass
-    
-    # 创建玩家
-    player1_controls = {
-        'left': pygame.K_a,
-        'right': pygame.K_d,
-        'jump': pygame.K_w,
-        'attack': pygame.K_f
-    }
-    player2_controls = {
-        'left': pygame.K_LEFT,
-        'right': pygame.K_RIGHT,
-        'jump': pygame.K_UP,
-        'attack': pygame.K_l
-    }
-    
-    player1 = Player(200, 300, BLUE, player1_controls, facing_right=True, avatar=local_p1)
-    player2 = Player(550, 300, RED, player2_controls, facing_right=False, avatar=local_p2)
-    
-    bubbles = []
-    projectiles = []
-    bubble_timer = 0
-    
-    running = True
-    game_over = False
-    winner = None
-    score_shown = False
-    
-    last_p1_skill = None
-    last_p2_skill = None
-    
-    while running:
-        clock.tick(FPS)
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                if game_over and event.key == pygame.K_SPACE:
-                    return
-                
-                if not game_over:
-                    if event.key == player1.controls['attack']:
-                        # 每次按下攻击键都播放音效（无论是否有技能）
-                        try:
-                            print("[SFX] attack key pressed: player1")
-                            # lazy load if previous load failed
-                            if not attack_sound:
-                                try:
-                                    attack_path = os.path.join(HERE, 'assets', 'magic_hit_lightning.mp3')
-                                    attack_sound = pygame.mixer.Sound(attack_path)
-                                    attack_sound.set_volume(0.8)
-                                    print("[SFX] lazy loaded attack_sound for player1")
-                                except Exception as e:
-                                    attack_sound = None
-                                    print(f"[SFX] lazy load failed for player1: {e}")
-                            if attack_sound:
-                                attack_sound.play()
-                                print("[SFX] played attack_sound for player1")
-                            else:
-                                print("[SFX] attack_sound is None")
-                        except Exception as e:
-                            print(f"[SFX] play failed for player1: {e}")
-                        skill_used = player1.use_skill()
-                        if skill_used:
-                            last_p1_skill = skill_used
-                            if skill_used == 'print':
-                                proj_x = player1.x + player1.width if player1.facing_right else player1.x
-                                proj_y = player1.y + player1.height // 2
-                                direction = 1 if player1.facing_right else -1
-                                projectiles.append(Projectile(proj_x, proj_y, direction, player1))
-                    
-                    if event.key == player2.controls['attack']:
-                        # 每次按下攻击键都播放音效（无论是否有技能）
-                        try:
-                            print("[SFX] attack key pressed: player2")
-                            # lazy load if previous load failed
-                            if not attack_sound:
-                                try:
-                                    attack_path = os.path.join(HERE, 'assets', 'magic_hit_lightning.mp3')
-                                    attack_sound = pygame.mixer.Sound(attack_path)
-                                    attack_sound.set_volume(0.8)
-                                    print("[SFX] lazy loaded attack_sound for player2")
-                                except Exception as e:
-                                    attack_sound = None
-                                    print(f"[SFX] lazy load failed for player2: {e}")
-                            if attack_sound:
-                                attack_sound.play()
-                                print("[SFX] played attack_sound for player2")
-                            else:
-                                print("[SFX] attack_sound is None")
-                        except Exception as e:
-                            print(f"[SFX] play failed for player2: {e}")
-                        skill_used = player2.use_skill()
-                        if skill_used:
-                            last_p2_skill = skill_used
-                            if skill_used == 'print':
-                                proj_x = player2.x + player2.width if player2.facing_right else player2.x
-                                proj_y = player2.y + player2.height // 2
-                                direction = 1 if player2.facing_right else -1
-                                projectiles.append(Projectile(proj_x, proj_y, direction, player2))
-        
-        if not game_over:
+        # 将背景渲染目标设为主屏幕（背景模块现在是导入安全的）
+        try:
+            if background.screen is not manager.screen:
+                background.set_surface(manager.screen)
+        except Exception:
+            # 如果背景模块不可用或 set_surface 失败，不影响主流程
+            pass
+
+        # 创建玩家（槽位 0/1 使用捕获的头像；多人时头像缩小以适应紧凑的 HUD）
+        # 联机模式固定双人对战，不组队、没有 bot
+        online = bool(NET_PEER)
+        player_count = 2 if online else PLAYER_COUNT
+        captured = list(self.avatars)
+        players, self.hud_colors, self.hud_labels = create_players(self.level, player_count,
+                                                                   0 if online else TEAM_COUNT, avatars=captured)
+        self.players = players
+        if player_count > 2:
+            self.hud_avatars = [pygame.transform.smoothscale(a, (min(36, a.get_width()), min(36, a.get_height()))) if a else None
+                                for a in captured]
+        else:
+            self.hud_avatars = captured
+
+        # 电脑玩家（KOP_BOTS，例如 "2:melee" 为单人模式）
+        controllers = {}
+        for index, policy in ([] if online else parse_bot_spec(BOT_SPEC, len(players)).items()):
+            controllers[players[index]] = make_bot(policy, players[index])
+
+        _match_number += 1
+        self.state = GameState(players, self.level, on_hit=self.play_hit_sound,
+                               team_names=TEAM_NAMES if TEAM_COUNT and not online else None,
+                               controllers=controllers, on_attack=self.play_attack_sound,
+                               seed=_match_number if online else None)
+
+        # 联机：两名玩家都由回滚会话按输入位驱动（本机玩家用自己槽位的按键）
+        self.session = None
+        self.local_player = None
+        if online:
+            self.session = RollbackSession(self.state, NET_SLOT - 1, net_transport(), input_delay=NET_INPUT_DELAY,
+                                           match=_match_number)
+            self.local_player = players[NET_SLOT - 1]
+
+        # 观战直播：每帧把快照推给观众（编码一次，所有观众共享）
+        self.spectators = spectator_server()
+        if self.spectators is not None:
+            self.spectators.start_match(STAGE, player_count, 0 if online else TEAM_COUNT)
+
+        # 联机时预测出来的结束画面要等双方输入都确认后才显示
+        self.match_over = False
+        self.attack_tapped = False
+
+    def play_hit_sound(self, attacker, defender):
+        # 命中时播放音效
+        try:
+            if self.attack_sound:
+                self.attack_sound.play()
+                print(f"[SFX] played hit sound ({attacker.name} -> {defender.name})")
+            else:
+                print("[SFX] attack_sound is None when attempting hit play")
+        except Exception as e:
+            print(f"[SFX] play failed on hit for {attacker.name}->{defender.name}: {e}")
+
+    def play_attack_sound(self, player):
+        # 每次按下攻击键都播放音效（无论是否有技能）
+        try:
+            print(f"[SFX] attack key pressed: {player.name}")
+            # lazy load if previous load failed
+            if not self.attack_sound:
+                try:
+                    ASSETS.discard(('sound', 'magic_hit_lightning.mp3', 0.8))
+                    self.attack_sound = ASSETS.sound('magic_hit_lightning.mp3', volume=0.8)
+                    if self.attack_sound is None:
+                        raise RuntimeError('sound unavailable')
+                    print(f"[SFX] lazy loaded attack_sound for {player.name}")
+                except Exception as e:
+                    self.attack_sound = None
+                    print(f"[SFX] lazy load failed for {player.name}: {e}")
+            if self.attack_sound:
+                self.attack_sound.play()
+                print(f"[SFX] played attack_sound for {player.name}")
+            else:
+                print("[SFX] attack_sound is None")
+        except Exception as e:
+            print(f"[SFX] play failed for {player.name}: {e}")
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_ESCAPE or (self.match_over and event.key == pygame.K_SPACE):
+            self.flow.match_finished()
+            return
+
+        state = self.state
+        if self.session is not None:
+            self.attack_tapped = self.attack_tapped or event.key == self.local_player.controls['attack']
+        elif not state.game_over:
+            for player in state.alive:
+                if event.key != player.controls['attack'] or player in state.controllers:
+                    continue
+                self.play_attack_sound(player)
+                state.use_skill(player)
+
+    def update(self):
+        state = self.state
+        session = self.session
+        if session is not None:
+            if state.game_over:
+                session.sync()
+            else:
+                keys = pygame.key.get_pressed()
+                session.advance(encode_input(keys, self.local_player.controls, self.attack_tapped))
+        elif not state.game_over:
             keys = pygame.key.get_pressed()
-            
-            # 更新动态平台
-            for platform in platforms:
-                platform.update(players=[player1, player2])
-            
-            # 更新玩家（只使用未断裂的平台）
-            active_platforms = [p for p in platforms if not p.is_broken]
-            player1.update(keys, active_platforms)
-            player2.update(keys, active_platforms)
-            
-            check_player_collision(player1, player2)
-            
-            # 检测 super() 形态碰撞
-            if player1.check_super_collision(player2):
-                knockback_dir = 1 if player1.facing_right else -1
-                player2.take_damage(5, knockback_dir * 3)  # 伤害5,击退力度3
-                player1.super_collision_cooldown = 30  # 0.5秒冷却
-            
-            if player2.check_super_collision(player1):
-                knockback_dir = 1 if player2.facing_right else -1
-                player1.take_damage(5, knockback_dir * 3)  # 伤害5,击退力度3
-                player2.super_collision_cooldown = 30  # 0.5秒冷却
-            
-            # 检测攻击
-            if player1.is_attacking and player1.attack_frame == 5 and not player1.is_frozen:
-                if last_p1_skill == 'pow' and check_attack_hit(player1, player2):
-                    knockback_dir = 1 if player1.facing_right else -1
-                    player2.take_damage(8, knockback_dir)
-                    # 命中时播放音效
-                    try:
-                        if attack_sound:
-                            attack_sound.play()
-                            print("[SFX] played hit sound (player1 -> player2)")
-                        else:
-                            print("[SFX] attack_sound is None when attempting hit play")
-                    except Exception as e:
-                        print(f"[SFX] play failed on hit for player1->player2: {e}")
-                    last_p1_skill = None
-                elif last_p1_skill == 'delete' and check_attack_hit(player1, player2):
-                    player2.skill = None
-                    last_p1_skill = None
-            
-            if player2.is_attacking and player2.attack_frame == 5 and not player2.is_frozen:
-                if last_p2_skill == 'pow' and check_attack_hit(player2, player1):
-                    knockback_dir = 1 if player2.facing_right else -1
-                    player1.take_damage(8, knockback_dir)
-                    # 命中时播放音效
+            state.update(keys)
+        self.attack_tapped = False
+        self.match_over = state.game_over and (session is None or session.settled)
+        if self.spectators is not None:
+            self.spectators.publish(snapshot(state))
+
+        if self.match_over and not state.score_shown:
+            state.score_shown = True
+            # stop or fade out gameplay music before showing the score animation
+            try:
+                if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
                     try:
-                        if attack_sound:
-                            attack_sound.play()
+                        pygame.mixer.music.fadeout(500)
                     except Exception:
-                        pass
-                    last_p2_skill = None
-                elif last_p2_skill == 'delete' and check_attack_hit(player2, player1):
-                    player1.skill = None
-                    last_p2_skill = None
-            
-            # 更新飞行道具
-            for proj in projectiles[:]:
-                proj.update()
-                if not proj.active:
-                    projectiles.remove(proj)
-                else:
-                    if proj.check_collision(player1) and proj.owner != player1:
-                        knockback = 1 if proj.direction > 0 else -1
-                        player1.take_damage(proj.damage, knockback)
-                        projectiles.remove(proj)
-                    elif proj.check_collision(player2) and proj.owner != player2:
-                        knockback = 1 if proj.direction > 0 else -1
-                        player2.take_damage(proj.damage, knockback)
-                        projectiles.remove(proj)
-            
-            # 生成泡泡
-            bubble_timer += 1
-            if bubble_timer >= BUBBLE_SPAWN_TIME:
-                x = random.randint(100, WIDTH - 100)
-                # 泡泡生成概率：pow 30%, delete 15%, print 10%, super 8%, ctrlc 27%, typeerror 25%
-                rand = random.random()
-                if rand < 0.30:
-                    btype = 'pow'
-                elif rand < 0.45:
-                    btype = 'delete'
-                elif rand < 0.55:
-                    btype = 'print'
-                elif rand < 0.63:
-                    btype = 'super'
-                elif rand < 0.90:
-                    btype = 'ctrlc'
-                else:
-                    btype = 'typeerror'
-                bubbles.append(Bubble(x, -50, btype))
-                bubble_timer = 0
-            
-            # 更新泡泡
-            for bubble in bubbles[:]:
-                bubble.update()
-                if not bubble.active:
-                    bubbles.remove(bubble)
+                        try:
+                            pygame.mixer.music.stop()
+                        except Exception:
+                            pass
+            except Exception:
+                pass
+
+            # play one-shot score/settlement sound (non-looping)
+            try:
+                score_snd = ASSETS.sound('score_sound.mp3', volume=0.9)
+                if score_snd:
+                    score_snd.play()
+                    print("[SFX] played score sound: score_sound.mp3")
                 else:
-                    if bubble.check_collision(player1):
-                        if bubble.type in ['pow', 'delete', 'print'] and player1.skill is None:
-                            player1.skill = bubble.type
-                        elif bubble.type == 'super' and not player1.is_super:
-                            player1.activate_super()
-                        elif bubble.type == 'ctrlc':
-                            player1.freeze()
-                            player1.take_damage(3, 0)  # 捡到ctrl+c扣3点血
-                        elif bubble.type == 'typeerror':
-                            player1.reverse_controls()
-                            player1.take_damage(3, 0)  # 捡到typeerror扣3点血
-                        bubbles.remove(bubble)
-                        continue
-
-                    if bubble.check_collision(player2):
-                        if bubble.type in ['pow', 'delete', 'print'] and player2.skill is None:
-                            player2.skill = bubble.type
-                        elif bubble.type == 'super' and not player2.is_super:
-                            player2.activate_super()
-                        elif bubble.type == 'ctrlc':
-                            player2.freeze()
-                            player2.take_damage(3, 0)  # 捡到ctrl+c扣3点血
-                        elif bubble.type == 'typeerror':
-                            player2.reverse_controls()
-                            player2.take_damage(3, 0)  # 捡到typeerror扣3点血
-                        bubbles.remove(bubble)
-            
-            # 检查游戏结束
-            if player1.hp <= 0:
-                game_over = True
-                winner = "PLAYER 2"
-            elif player2.hp <= 0:
-                game_over = True
-                winner = "PLAYER 1"
-        
-        # 绘制
-        screen.fill(BG_COLOR)
+                    print("[SFX] failed to load score sound: score_sound.mp3")
+            except Exception as e:
+                print(f"[SFX] failed to play score sound: {e}")
+
+            # 结算动画播完（SPACE）后回到下面的胜利画面
+            self.manager.push(ScoreScene(state.winner, state.loser, winner_avatar=state.winner.avatar))
 
+    def draw(self, screen):
+        state = self.state
+        screen.fill(BG_COLOR)
         # 背景更新与绘制（来自 Backround.backround_1）
         try:
             background.update(pygame.time.get_ticks())
@@ -701,82 +330,92 @@ def main():
         except Exception:
             # if background fails, ignore so main loop continues
             pass
-        
-        # 绘制所有键盘平台
-        for platform in platforms:
-            platform.draw(screen)
-        
-        # 绘制泡泡
-        for bubble in bubbles:
-            bubble.draw(screen)
-        
-        # 绘制飞行道具
-        for proj in projectiles:
-            proj.draw(screen)
-        
-        # 绘制玩家
-        player1.draw(screen)
-        player2.draw(screen)
-        
-        # 绘制UI
-        draw_ui(screen, player1, player2, p1_avatar=local_p1, p2_avatar=local_p2)
-        
-        # 游戏结束画面
-        if game_over:
-            if not score_shown:
-                # stop or fade out gameplay music before showing the score animation
-                try:
-                    if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
-                        try:
-                            pygame.mixer.music.fadeout(500)
-                        except Exception:
-                            try:
-                                pygame.mixer.music.stop()
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
 
-                # play one-shot score/settlement sound (non-looping)
-                try:
-                    repo_root = os.path.abspath(os.path.dirname(__file__))
-                    score_sound_path = os.path.join(repo_root, 'assets', 'score_sound.mp3')
-                    try:
-                        score_snd = pygame.mixer.Sound(score_sound_path)
-                        try:
-                            score_snd.set_volume(0.9)
-                        except Exception:
-                            pass
-                        score_snd.play()
-                        print(f"[SFX] played score sound: {score_sound_path}")
-                    except Exception as e:
-                        print(f"[SFX] failed to load/play score sound: {score_sound_path} -> {e}")
-                except Exception:
-                    pass
+        # 绘制键盘平台、泡泡、飞行道具和玩家
+        state.draw_entities(screen)
 
-                # determine winner and loser objects
-                if winner == "PLAYER 1":
-                    play_score_animation(screen, player1, player2, winner_avatar=local_p1)
-                else:
-                    play_score_animation(screen, player2, player1, winner_avatar=local_p2)
-                score_shown = True
+        # 绘制UI
+        draw_ui(screen, self.players, self.hud_avatars, self.hud_colors, self.hud_labels)
+
+        # 游戏结束画面
+        if self.match_over:
             overlay = pygame.Surface((WIDTH, HEIGHT))
             overlay.set_alpha(200)
             overlay.fill(BLACK)
             screen.blit(overlay, (0, 0))
 
-            win_text = font_large.render(f"{winner} WINS!", True, ORANGE)
+            win_text = render_text(font_large, f"{state.winner_name} WINS!", ORANGE)
             win_rect = win_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 50))
             screen.blit(win_text, win_rect)
 
-            restart_text = font_medium.render("Press SPACE to restart", True, WHITE)
+            restart_text = render_text(font_medium, "Press SPACE to restart", WHITE)
             restart_rect = restart_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
             screen.blit(restart_text, restart_rect)
 
-        pygame.display.flip()
-    
-    pygame.quit()
+
+def main(memory_watch=None):
+    """运行整个游戏（开始画面 → 对局 → 结算 → 开始画面 ...），直到关闭窗口"""
+    global screen
+    # settings 导入时不再创建窗口；整个进程只在这里初始化一次运行时和显示窗口
+    if not pygame.get_init() or not pygame.display.get_init() or pygame.display.get_surface() is None:
+        screen = init_runtime()
+    else:
+        # 调用方（或嵌入脚本）已经建好了窗口，直接用它
+        screen = pygame.display.get_surface()
+    # Initialize and attach the animated background once; the arena draws it every frame.
+    try:
+        if background.screen is not screen:
+            # initialize background module sizes and streams (no new display)
+            background.init(WIDTH, HEIGHT, create_display=False)
+            background.set_surface(screen)
+        # 强制使用项目内的像素字体以确保嵌入时的视觉与独立运行一致
+        try:
+            background.module_font = ASSETS.font(FONT_PATH, background.font_size)
+            background.module_is_pixel_font = True
+        except Exception:
+            # 如果字体加载失败，忽略并允许模块回退到默认字体
+            pass
+    except Exception:
+        pass
+
+    manager = SceneManager(screen)
+    GameFlow(manager, memory_watch).show_start()
+    try:
+        manager.run()
+    finally:
+        manager.close()
+        pygame.quit()
+
+
+_match_number = 0
+_net_transport = None
+
+
+def net_transport():
+    """联机用的 UDP 套接字，各局之间复用（数据包带对局编号，旧包会被忽略）"""
+    global _net_transport
+    if _net_transport is None:
+        _net_transport = UdpTransport(NET_PORT, peer=parse_address(NET_PEER))
+        print(f"[NET] listening on port {NET_PORT}, peer {NET_PEER}, playing as P{NET_SLOT}")
+    return _net_transport
+
+
+_spectator_server = None
+
+
+def spectator_server():
+    """观战服务器（KOP_SPECTATE_PORT），第一次调用时在后台线程启动，各局之间复用"""
+    global _spectator_server
+    if _spectator_server is None and SPECTATE_PORT:
+        try:
+            _spectator_server = SpectatorServer(port=SPECTATE_PORT).start()
+            print(f"[SPECTATE] spectators can connect to port {SPECTATE_PORT}")
+        except OSError as e:
+            print(f"[SPECTATE] failed to start spectator server on port {SPECTATE_PORT}: {e}")
+    return _spectator_server
+
 
 if __name__ == "__main__":
-    while True:
-        main()
+    # KOP_MEMWATCH=1：每局结束后记录内存快照，发现跨局增长时警告
+    memory_watch = MemoryWatch().start() if memwatch_enabled() else None
+    main(memory_watch)
@@ -1,11 +1,35 @@
-import pygame
+"""游戏配置常量。
+
+本模块只包含纯常量，导入时不会初始化 pygame、打开窗口或加载字体，
+因此无界面模拟、基准测试和多进程 worker 都可以廉价地导入实体代码。
+显示窗口与字体由 `init_runtime()` 显式创建。
+"""
+import os
+
+
+def _env_number(name, default, cast):
+    """读取数值型环境变量；没设置或写错时用默认值（写错时打印警告，不让导入失败）"""
+    raw = os.environ.get(name, '').strip()
+    if not raw:
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        print(f"[SETTINGS] ignoring {name}={raw!r}: not a valid {cast.__name__}, using {default}")
+        return default
+
+
+def _env_int(name, default):
+    return _env_number(name, default, int)
+
+
+def _env_float(name, default):
+    return _env_number(name, default, float)
 
-pygame.init()
 
 # 游戏窗口设置
 WIDTH, HEIGHT = 1200, 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("King of Python - The Great Keyboard")
+CAPTION = "King of Python - The Great Keyboard"
 
 # 颜色定义
 WHITE = (255, 255, 255)
@@ -33,19 +57,143 @@ FPS = 60
 GRAVITY = 1.0
 JUMP_POWER = -18
 MOVE_SPEED = 6
-ATTACK_COOLDOWN = 30
 BUBBLE_SPAWN_TIME = 60
-FREEZE_DURATION = 180
-REVERSED_DURATION = 600
+# 状态效果和冷却的时长（秒），由 game.timers 的计时轮按 FPS 换算成模拟帧
+ATTACK_COOLDOWN_TIME = 0.5
+FREEZE_TIME = 3.0
+REVERSED_TIME = 10.0
+SUPER_TIME = 5.0
+SUPER_HIT_COOLDOWN_TIME = 0.5  # super() 形态撞人后的冷却
+ATTACK_SWING_FRAMES = 15  # 一次挥击动画的帧数（第 5 帧判定命中）
+# 以帧为单位的旧常量
+ATTACK_COOLDOWN = int(ATTACK_COOLDOWN_TIME * FPS)
+FREEZE_DURATION = int(FREEZE_TIME * FPS)
+REVERSED_DURATION = int(REVERSED_TIME * FPS)
 PROJECTILE_SPEED = 10
 
+# 多人模式：玩家数量 2~MAX_PLAYERS（环境变量 KOP_PLAYERS），
+# KOP_TEAMS 为队伍数量，0 表示各自为战（free-for-all）
+MAX_PLAYERS = 8
+PLAYER_COUNT = max(2, min(MAX_PLAYERS, _env_int('KOP_PLAYERS', 2)))
+
+# 每个玩家槽位的角色颜色和 HUD 颜色（前两个与原来的双人模式一致）
+PLAYER_COLORS = [BLUE, RED, GREEN, ORANGE, PURPLE, CYAN, YELLOW, (255, 120, 200)]
+PLAYER_HUD_COLORS = [
+    (104, 143, 255),
+    (255, 104, 147),
+    (110, 220, 120),
+    (255, 170, 80),
+    (190, 110, 255),
+    (90, 230, 230),
+    (255, 225, 90),
+    (255, 150, 210),
+]
+# 组队模式下按队伍着色（HUD 和头顶标记）
+TEAM_COLORS = [(104, 143, 255), (255, 104, 147), (110, 220, 120), (255, 225, 90)]
+TEAM_NAMES = ["TEAM A", "TEAM B", "TEAM C", "TEAM D"]
+TEAM_COUNT = _env_int('KOP_TEAMS', 0)
+TEAM_COUNT = min(TEAM_COUNT, len(TEAM_COLORS), PLAYER_COUNT) if TEAM_COUNT >= 2 else 0
+
+# 电脑玩家："槽位:策略" 逗号分隔，如 "2:melee"（单人模式）或 "all:random"（见 game/bots.py）
+BOT_SPEC = os.environ.get('KOP_BOTS', '')
+
+# 双人联机（game/netplay.py）：KOP_NET_PEER 为对方地址 "host:port"，设置后进入联机模式；
+# KOP_NET_PORT 为本机端口，KOP_NET_SLOT 为本机玩家槽位（1 或 2，双方必须不同），
+# KOP_NET_DELAY 为本地输入延迟帧数
+NET_PEER = os.environ.get('KOP_NET_PEER', '').strip()
+NET_PORT = _env_int('KOP_NET_PORT', 7000)
+NET_SLOT = 2 if os.environ.get('KOP_NET_SLOT', '1').strip() == '2' else 1
+NET_INPUT_DELAY = _env_int('KOP_NET_DELAY', 2)
+
+# 观战直播（game/spectate.py）：KOP_SPECTATE_PORT 设为端口号后主机向局域网观众推送对局，0 表示关闭
+SPECTATE_PORT = _env_int('KOP_SPECTATE_PORT', 0)
+
+# 关卡：world/levels 下的关卡名，可用环境变量 KOP_STAGE 切换（如 full_keyboard）
+STAGE = os.environ.get('KOP_STAGE', 'arena')
+
+# 开始界面视频：首轮播放后按视频原始尺寸缓存解码好的帧的内存上限（MB）；
+# 自带的片头（1024x578，121 帧）约 205 MB，超出上限时不缓存，一直边解码边播
+START_VIDEO_CACHE_MB = 256
+
+# 头像库（face_detection/avatar_store.py）：记住最近捕获的玩家，回头客不用再等倒计时；
+# KOP_AVATAR_STORE 为最多保留的头像数（超出时淘汰最久没用的），0 表示关闭
+AVATAR_STORE_SIZE = _env_int('KOP_AVATAR_STORE', 24)
+
+# 人脸检测后端（face_detection/detectors.py）：KOP_DETECTOR 为 auto（启动时测速自动选择）或
+# mediapipe / yunet / dnn / haar / haar_fast；auto 时选每帧不超过 KOP_DETECT_BUDGET_MS 毫秒的最准的后端
+FACE_DETECTOR = os.environ.get('KOP_DETECTOR', 'auto').strip().lower() or 'auto'
+FACE_DETECT_BUDGET_MS = _env_float('KOP_DETECT_BUDGET_MS', 20.0)
+# 人脸捕获的画面来源（face_detection/sources.py）：摄像头编号，或录好的视频 / 图片目录（循环播放，
+# 方便没有摄像头时演示和调试）
+CAMERA_SOURCE = os.environ.get('KOP_CAMERA', '0').strip() or '0'
+# 人脸要保持不动多少秒才开始倒计时（face_detection/stability.py，按时间算，和帧率无关）
+FACE_STABLE_SECONDS = _env_float('KOP_STABLE_SECONDS', 0.25)
+
 # 字体 - 使用方舟像素字体
-import os
 FONT_PATH = os.path.join(os.path.dirname(__file__), 'fonts', 'ark-pixel-12px-proportional-zh_cn.otf')
 
-font_large = pygame.font.Font(FONT_PATH, 72)  # 开始界面标题
-font_medium = pygame.font.Font(FONT_PATH, 32)  # 开始界面选项
-font_small = pygame.font.Font(FONT_PATH, 24)  # 玩家名称
-font_tiny = pygame.font.Font(FONT_PATH, 18)  # 技能说明
-font_bubble = pygame.font.Font(FONT_PATH, 18)  # 泡泡标签
-font_key = pygame.font.Font(FONT_PATH, 22)  # 键盘平台文字
+
+class _FontHandle:
+    """字体句柄：真正的 pygame.font.Font 在 `init_runtime()` 或首次使用时才创建。
+
+    句柄把属性访问（render、size、get_height ...）转发给底层字体，
+    所以 `font_small.render(...)` 的调用方式保持不变。
+    """
+
+    def __init__(self, path, size):
+        # 下划线命名，避免遮住 Font.size() 等同名方法
+        self._path = path
+        self._size = size
+        self._font = None
+
+    def load(self, force=False):
+        if self._font is None or force:
+            import pygame
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(self._path, self._size)
+        return self._font
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return f"<font {os.path.basename(self._path) if self._path else 'default'} {self._size}px>"
+
+
+font_large = _FontHandle(FONT_PATH, 72)  # 开始界面标题
+font_medium = _FontHandle(FONT_PATH, 32)  # 开始界面选项
+font_small = _FontHandle(FONT_PATH, 24)  # 玩家名称
+font_tiny = _FontHandle(FONT_PATH, 18)  # 技能说明
+font_bubble = _FontHandle(FONT_PATH, 18)  # 泡泡标签
+font_key = _FontHandle(FONT_PATH, 22)  # 键盘平台文字
+font_indicator = _FontHandle(None, 14)  # 玩家头顶技能指示
+
+_FONTS = (font_large, font_medium, font_small, font_tiny, font_bubble, font_key, font_indicator)
+
+# 显示窗口（由 init_runtime 创建）
+screen = None
+
+
+def init_runtime(create_display=True):
+    """初始化 pygame 运行时资源：pygame 子系统、显示窗口和全部字体。
+
+    Args:
+        create_display: 为 False 时只初始化 pygame 和字体，不打开窗口
+
+    Returns:
+        显示 Surface（create_display=False 时为 None）
+    """
+    global screen
+    import pygame
+
+    pygame.init()
+    if create_display:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption(CAPTION)
+    # pygame.quit() 之后旧的字体对象会失效，所以每次初始化都重新创建
+    for font in _FONTS:
+        font.load(force=True)
+    return screen
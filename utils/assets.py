@@ -0,0 +1,298 @@
+"""进程级资源注册表
+
+`main.py` 的 `main()` 用场景栈在一个进程里循环 开始画面 → 对局 → 开始画面，
+每进一次对局场景都会重新创建玩家、取音效和图片。这些资源从不改变，所以统一交给
+`ASSETS` 按键缓存：第一次使用时从磁盘加载（并 convert / 缩放），之后各局直接复用，
+重开一局不再读盘。
+
+    from utils.assets import ASSETS
+    img = ASSETS.scaled('frame1.png', (60, 60))
+    snd = ASSETS.sound('magic_hit_lightning.mp3', volume=0.8)
+
+文件名按以下顺序查找：绝对路径 / 当前目录、仓库根目录、仓库 assets 目录。
+找不到或加载失败时返回 None（同样会被缓存，不会每局重复探测）。
+
+场景管理器会在后台线程预加载下一个场景的资源，所以未命中时的加载加了锁：
+同一个键只加载一次，命中时不加锁。
+
+Surface 在 pygame.quit() 之后仍然可用；Sound 和 Font 依赖 mixer / font 子系统，
+pygame.quit() 时会自动丢弃，下次使用时重新加载。
+
+如果存在离线构建的资源包（`python -m utils.bundle build`，见 utils.bundle），
+缩放后的图片、键帽精灵和音效 PCM 直接从资源包的映射内存取出，跳过解码和缩放。
+"""
+import contextlib
+import os
+import threading
+from collections import namedtuple
+
+import pygame
+
+from utils.bundle import open_bundle
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ASSETS_DIR = os.path.join(REPO_ROOT, 'assets')
+
+_MISSING = object()
+
+# recording() 收集到的可打包条目：kind 为 'image' 或 'sound'，sources 为来源文件（相对仓库根目录）
+BakedItem = namedtuple('BakedItem', 'kind key sources value')
+
+
+def _display_ready():
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+
+class AssetRegistry:
+    """按键缓存图片、缩放后的图片、字体、音效以及任意一次性计算结果"""
+
+    def __init__(self, search_paths=(REPO_ROOT, ASSETS_DIR)):
+        self.search_paths = tuple(search_paths)
+        self._items = {}
+        # 依赖 pygame 子系统的缓存键，pygame.quit() 时清除
+        self._runtime_keys = set()
+        self._quit_hook_registered = False
+        self.hits = 0
+        self.misses = 0
+        self._bundle = _MISSING
+        self._recording = None
+        # loader 里会递归调用 get()（scaled → image），所以用可重入锁
+        self._lock = threading.RLock()
+
+    # ---- 通用接口 ----
+
+    def get(self, key, loader, runtime=False):
+        """取出 key 对应的资源；第一次调用时用 loader() 创建
+
+        Args:
+            runtime: 为 True 时资源在 pygame.quit() 时失效（Sound、Font 等）
+        """
+        value = self._items.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        with self._lock:
+            # 等锁期间可能已被另一个线程加载好
+            value = self._items.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = loader()
+            self._items[key] = value
+            if runtime:
+                self._runtime_keys.add(key)
+                self._register_quit_hook()
+        return value
+
+    def discard(self, key):
+        self._items.pop(key, None)
+        self._runtime_keys.discard(key)
+
+    def clear(self):
+        self._items.clear()
+        self._runtime_keys.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return {'items': len(self._items), 'hits': self.hits, 'misses': self.misses}
+
+    def _register_quit_hook(self):
+        if not self._quit_hook_registered:
+            pygame.register_quit(self._on_pygame_quit)
+            self._quit_hook_registered = True
+
+    def _on_pygame_quit(self):
+        for key in self._runtime_keys:
+            self._items.pop(key, None)
+        self._runtime_keys.clear()
+        # pygame 每次 quit 后会清空回调列表
+        self._quit_hook_registered = False
+
+    # ---- 资源包 ----
+
+    @property
+    def bundle(self):
+        """离线资源包（第一次访问时打开）；不存在时为 None"""
+        if self._bundle is _MISSING:
+            self._bundle = open_bundle()
+        return self._bundle
+
+    def use_bundle(self, bundle):
+        """替换当前使用的资源包（None 表示不使用）"""
+        self._bundle = bundle
+
+    @contextlib.contextmanager
+    def recording(self):
+        """构建资源包时使用：关闭资源包，记录期间所有 baked() / sound() 的加载结果"""
+        previous = self._bundle
+        self._bundle = None
+        self._recording = items = []
+        try:
+            yield items
+        finally:
+            self._recording = None
+            self._bundle = previous
+
+    def baked(self, key, loader, sources=(), alpha=True):
+        """取出可预计算的图片：资源包里有且未过期时直接使用，否则调用 loader()
+
+        结果不会缓存在注册表里，调用方自行缓存。
+
+        Args:
+            key: 资源包中的条目名
+            sources: 结果依赖的文件（相对仓库根目录），任意一个变化都会让条目失效
+            alpha: 是否保留逐像素透明度
+        """
+        bundle = self.bundle
+        if bundle is not None:
+            surf = bundle.surface(key)
+            if surf is not None:
+                return self._to_display(surf, alpha)
+        surf = loader()
+        if self._recording is not None and surf is not None:
+            self._recording.append(BakedItem('image', key, tuple(sources), surf))
+        return surf
+
+    @staticmethod
+    def _to_display(surf, alpha):
+        """资源包里的 BGRA 图片与常见的窗口格式一致，只有格式不同时才转换"""
+        if not _display_ready():
+            return surf
+        if not alpha:
+            return surf.convert()
+        if surf.get_masks()[:3] != pygame.display.get_surface().get_masks()[:3]:
+            return surf.convert_alpha()
+        return surf
+
+    @staticmethod
+    def relpath(path):
+        """仓库内文件的相对路径（用作资源包条目名）；仓库外的文件返回 None"""
+        if path is None:
+            return None
+        rel = os.path.relpath(os.path.abspath(path), REPO_ROOT)
+        if rel.startswith('..'):
+            return None
+        return rel.replace(os.sep, '/')
+
+    # ---- 路径 ----
+
+    def find(self, name):
+        """返回资源文件的完整路径，找不到时返回 None"""
+        if name is None:
+            return None
+        if os.path.isabs(name) or os.path.exists(name):
+            return name if os.path.exists(name) else None
+        for base in self.search_paths:
+            path = os.path.join(base, name)
+            if os.path.exists(path):
+                return path
+        return None
+
+    # ---- 图片 ----
+
+    def image(self, name, alpha=True):
+        """加载图片；显示窗口存在时 convert / convert_alpha 成显示格式"""
+        ready = _display_ready()
+        key = ('image', name, alpha, ready)
+
+        def load():
+            path = self.find(name)
+            if path is None:
+                return None
+            try:
+                surf = pygame.image.load(path)
+            except Exception:
+                return None
+            if ready:
+                surf = surf.convert_alpha() if alpha else surf.convert()
+            return surf
+
+        return self.get(key, load)
+
+    def scaled(self, name, size, smooth=True, alpha=True):
+        """加载并缩放到 size 的图片（缩放结果同样缓存）"""
+        size = (int(size[0]), int(size[1]))
+        key = ('scaled', name, size, smooth, alpha, _display_ready())
+
+        def scale():
+            src = self.image(name, alpha)
+            if src is None:
+                return None
+            if src.get_size() == size:
+                return src
+            if smooth:
+                try:
+                    return pygame.transform.smoothscale(src, size)
+                except Exception:
+                    pass
+            return pygame.transform.scale(src, size)
+
+        def load():
+            rel = self.relpath(self.find(name))
+            if rel is None:
+                return scale()
+            return self.baked(f"scaled:{rel}:{size[0]}x{size[1]}:{int(smooth)}:{int(alpha)}",
+                              scale, sources=(rel,), alpha=alpha)
+
+        return self.get(key, load)
+
+    def flipped(self, name, size, smooth=True, alpha=True):
+        """水平翻转后的缩放图片"""
+        size = (int(size[0]), int(size[1]))
+        key = ('flipped', name, size, smooth, alpha, _display_ready())
+
+        def flip():
+            src = self.scaled(name, size, smooth, alpha)
+            return pygame.transform.flip(src, True, False) if src is not None else None
+
+        def load():
+            rel = self.relpath(self.find(name))
+            if rel is None:
+                return flip()
+            return self.baked(f"flipped:{rel}:{size[0]}x{size[1]}:{int(smooth)}:{int(alpha)}",
+                              flip, sources=(rel,), alpha=alpha)
+
+        return self.get(key, load)
+
+    # ---- 字体 / 音效 ----
+
+    def font(self, path, size):
+        def load():
+            if not pygame.font.get_init():
+                pygame.font.init()
+            return pygame.font.Font(path, size)
+
+        return self.get(('font', path, size), load, runtime=True)
+
+    def sound(self, name, volume=None):
+        """加载音效（需要 mixer）；失败时返回 None"""
+
+        def load():
+            path = self.find(name)
+            if path is None:
+                return None
+            rel = self.relpath(path)
+            bundle = self.bundle
+            snd = bundle.sound(f"sound:{rel}") if bundle is not None and rel else None
+            if snd is None:
+                try:
+                    if not pygame.mixer.get_init():
+                        pygame.mixer.init()
+                    snd = pygame.mixer.Sound(path)
+                except Exception:
+                    return None
+                if self._recording is not None and rel:
+                    self._recording.append(BakedItem('sound', f"sound:{rel}", (rel,), snd))
+            if volume is not None:
+                try:
+                    snd.set_volume(volume)
+                except Exception:
+                    pass
+            return snd
+
+        return self.get(('sound', name, volume), load, runtime=True)
+
+
+ASSETS = AssetRegistry()
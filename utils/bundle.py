@@ -0,0 +1,303 @@
+"""离线预计算资源包
+
+启动时最慢的是解码 PNG / MP3 和 smoothscale 大图（玩家贴图原图 1281x1265，
+开始画面 2782x1560，结算画面背景 2560x1440）。资源包把游戏运行时真正用到的结果
+提前算好，按显示格式（BGRA，与 ARGB8888 窗口的像素布局一致）打包成一个文件：
+
+    - 缩放到玩家尺寸的 frame1 / frame2（含水平翻转）
+    - 缩放到 1200x800 的开始画面
+    - 结算画面的皇冠、显示器和预缩放背景
+    - 所有关卡用到的键帽主体和发光边精灵
+    - 解码成 mixer 格式 PCM 的音效
+
+    python -m utils.bundle build     # 生成 build/assets.kopb
+    python -m utils.bundle info      # 查看资源包内容
+
+运行时 `utils.assets.ASSETS` 用 mmap 打开资源包，图片直接由映射内存构造 Surface，
+音效直接由 PCM 构造 Sound，不再解码和缩放。每个条目记录了来源文件的大小和修改时间，
+来源文件变化后该条目自动失效、回退到正常加载（重新 build 即可）。
+资源包不存在或损坏时同样回退，游戏行为不变。
+
+环境变量 KOP_BUNDLE 可以指定资源包路径，设为 0 则禁用资源包。
+"""
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_BUNDLE_PATH = os.path.join(REPO_ROOT, 'build', 'assets.kopb')
+
+MAGIC = b'KOPB'
+VERSION = 1
+# 文件头：魔数、版本号、索引长度；随后是 JSON 索引，数据块按 ALIGN 字节对齐
+_HEADER = struct.Struct('<4sII')
+ALIGN = 64
+PIXEL_FORMAT = 'BGRA'
+
+# 运行时用到的音效（背景音乐由 mixer.music 流式播放，不打包）
+BUNDLED_SOUNDS = (
+    'magic_hit_lightning.mp3',
+    'score_sound.mp3',
+    '436972_creeeeak_ice_sounds5.wav',
+    'Game_Enter.mp3',
+)
+
+
+def bundle_path():
+    """资源包路径；KOP_BUNDLE=0 时返回 None"""
+    path = os.environ.get('KOP_BUNDLE')
+    if path is None:
+        return DEFAULT_BUNDLE_PATH
+    if path.strip() in ('', '0'):
+        return None
+    return path
+
+
+def source_stamp(rel):
+    """来源文件的 [大小, 修改时间]；文件不存在时返回 None"""
+    try:
+        st = os.stat(os.path.join(REPO_ROOT, rel))
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class AssetBundle:
+    """只读打开的资源包
+
+    Surface 直接引用映射内存（mmap 以写时复制方式打开，Surface 可以安全地被绘制），
+    所以资源包在进程结束前一直保持打开。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        try:
+            magic, version, index_len = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a version {VERSION} asset bundle: {path}")
+            start = _HEADER.size
+            index = json.loads(bytes(self._map[start:start + index_len]).decode('utf-8'))
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            self._map.close()
+            raise ValueError(f"corrupt asset bundle: {path}") from e
+        except ValueError:
+            self._map.close()
+            raise
+        self.entries = index['entries']
+        self.sources = index['sources']
+        self.mixer = tuple(index['mixer']) if index.get('mixer') else None
+        self._fresh = {}
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def _source_ok(self, rel):
+        ok = self._fresh.get(rel)
+        if ok is None:
+            ok = self._fresh[rel] = source_stamp(rel) == self.sources.get(rel)
+        return ok
+
+    def _entry(self, key, kind):
+        entry = self.entries.get(key)
+        if entry is None or entry['kind'] != kind:
+            return None
+        if not all(self._source_ok(rel) for rel in entry['sources']):
+            return None
+        return entry
+
+    def _view(self, entry):
+        return memoryview(self._map)[entry['offset']:entry['offset'] + entry['length']]
+
+    def surface(self, key):
+        """取出图片条目（BGRA，带 SRCALPHA）；不存在或已过期时返回 None"""
+        entry = self._entry(key, 'image')
+        if entry is None:
+            return None
+        try:
+            return pygame.image.frombuffer(self._view(entry), tuple(entry['size']), PIXEL_FORMAT)
+        except (ValueError, pygame.error):
+            return None
+
+    def sound(self, key):
+        """取出音效条目；mixer 格式与打包时不一致时返回 None"""
+        entry = self._entry(key, 'sound')
+        if entry is None:
+            return None
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            if pygame.mixer.get_init() != self.mixer:
+                return None
+            return pygame.mixer.Sound(buffer=self._view(entry))
+        except pygame.error:
+            return None
+
+    def info(self):
+        images = [e for e in self.entries.values() if e['kind'] == 'image']
+        sounds = [e for e in self.entries.values() if e['kind'] == 'sound']
+        return {
+            'path': self.path,
+            'bytes': len(self._map),
+            'images': len(images),
+            'image_bytes': sum(e['length'] for e in images),
+            'sounds': len(sounds),
+            'sound_bytes': sum(e['length'] for e in sounds),
+            'stale': sorted(rel for rel in self.sources if not self._source_ok(rel)),
+        }
+
+
+def open_bundle(path=None):
+    """打开资源包；未启用、不存在或损坏时返回 None"""
+    path = path or bundle_path()
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        return AssetBundle(path)
+    except (OSError, ValueError) as e:
+        print(f"[ASSETS] ignoring asset bundle: {e}")
+        return None
+
+
+# ---- 离线构建 ----
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_bundle(path, items, mixer=None):
+    """把 AssetRegistry.recording() 收集的条目写成资源包，返回条目数"""
+    entries = {}
+    sources = {}
+    blobs = []
+    for item in items:
+        if item.key in entries:
+            continue
+        if item.kind == 'image':
+            data = pygame.image.tobytes(item.value, PIXEL_FORMAT)
+            meta = {'size': list(item.value.get_size())}
+        else:
+            data = item.value.get_raw()
+            meta = {}
+        stamps = {rel: source_stamp(rel) for rel in item.sources}
+        if any(stamp is None for stamp in stamps.values()):
+            continue
+        sources.update(stamps)
+        entries[item.key] = {'kind': item.kind, 'sources': list(item.sources), 'length': len(data), **meta}
+        blobs.append((item.key, data))
+
+    # 索引里的偏移量依赖索引本身的长度，先用占位偏移估算长度，再按最终长度排布
+    index = {'entries': entries, 'sources': sources, 'mixer': list(mixer) if mixer else None}
+    for _ in range(3):
+        offset = _align(_HEADER.size + len(json.dumps(index).encode('utf-8')))
+        for key, data in blobs:
+            entries[key]['offset'] = offset
+            offset = _align(offset + len(data))
+    index_bytes = json.dumps(index).encode('utf-8')
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for key, data in blobs:
+            f.write(b'\0' * (entries[key]['offset'] - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+    return len(entries)
+
+
+def collect_assets():
+    """按游戏运行时的代码路径加载一遍所有可预计算的资源，返回记录下的条目"""
+    from settings import WIDTH, HEIGHT, PLAYER_COLORS
+    from utils.assets import ASSETS
+    from entities.player import Player
+    from entities.platform import GLOW_LEVELS
+    from game.controls import PLAYER_CONTROLS
+    from world.level import LEVELS_DIR, load_level
+    from final import score
+
+    ASSETS.clear()
+    with ASSETS.recording() as items:
+        # 玩家贴图
+        player = Player(0, 0, PLAYER_COLORS[0], PLAYER_CONTROLS[0])
+
+        # 开始画面（视频无法播放时的静态图）
+        ASSETS.scaled(os.path.join(REPO_ROOT, 'assets', 'StartGamePic.png'), (WIDTH, HEIGHT),
+                      smooth=False, alpha=False)
+
+        # 结算画面
+        score.reload_assets()
+        score.crown_sprite(player.width)
+
+        # 所有关卡的键帽精灵
+        names = sorted({os.path.splitext(os.path.basename(p))[0]
+                        for p in glob.glob(os.path.join(LEVELS_DIR, '*.json')) +
+                        glob.glob(os.path.join(LEVELS_DIR, '*.toml'))})
+        for name in names:
+            for plat in load_level(name).platforms:
+                plat._key_face(plat._face_color())
+                levels = range(GLOW_LEVELS) if plat.is_dynamic else (-1,)
+                for level in levels:
+                    plat._glow_sprite_at(level)
+
+        # 音效
+        for name in BUNDLED_SOUNDS:
+            ASSETS.sound(name)
+    ASSETS.clear()
+    return items
+
+
+def build(path=None):
+    """离线构建资源包（使用 dummy 显示 / 音频驱动，无需窗口）"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    from settings import init_runtime
+
+    path = path or DEFAULT_BUNDLE_PATH
+    t0 = time.perf_counter()
+    init_runtime(create_display=True)
+    items = collect_assets()
+    count = write_bundle(path, items, mixer=pygame.mixer.get_init())
+    elapsed = time.perf_counter() - t0
+    print(f"[BUNDLE] wrote {count} entries to {path} "
+          f"({os.path.getsize(path) / (1024 * 1024):.1f} MB) in {elapsed:.1f}s")
+    pygame.quit()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or inspect the precomputed asset bundle')
+    parser.add_argument('command', choices=('build', 'info'))
+    parser.add_argument('--output', default=None, help=f'bundle path (default: {DEFAULT_BUNDLE_PATH})')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        build(args.output)
+        return
+    bundle = open_bundle(args.output)
+    if bundle is None:
+        print("[BUNDLE] no asset bundle found; run `python -m utils.bundle build`")
+        return
+    info = bundle.info()
+    print(f"[BUNDLE] {info['path']}: {info['bytes'] / (1024 * 1024):.1f} MB, "
+          f"{info['images']} images ({info['image_bytes'] / (1024 * 1024):.1f} MB), "
+          f"{info['sounds']} sounds ({info['sound_bytes'] / (1024 * 1024):.1f} MB)")
+    for rel in info['stale']:
+        print(f"[BUNDLE] stale: {rel} changed since the bundle was built")
+    for key in sorted(bundle.entries):
+        print(f"  {key}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""长时间运行的内存增长监控
+
+街机上 `main.py` 的 `main()` 会连续跑几天：场景栈在同一个进程、同一个窗口里
+开始画面 → 对局 → 开始画面地循环，每局的对象都留在这个进程里。每局结束时记录一次：
+    - tracemalloc 快照（Python 层分配）及相对上一局 / 第一局增长最多的代码位置
+    - 存活的 pygame Surface / Sound 数量和估算的像素、音频内存（SDL 分配，tracemalloc 看不到）
+如果每局结束后仍被保留的内存连续几局上涨，打印 [MEM] 警告。
+
+tracemalloc 有额外开销，默认关闭；设置环境变量 KOP_MEMWATCH=1 开启
+（浸泡测试用 `python -m game.soak --memwatch`）。
+"""
+import gc
+import os
+import time
+import tracemalloc
+
+import pygame
+
+# 统计增长位置时忽略的分配来源
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def memwatch_enabled():
+    return os.environ.get('KOP_MEMWATCH') == '1'
+
+
+def count_pygame_objects():
+    """统计仍被 Python 对象引用的 Surface / Sound 数量和估算内存（字节）
+
+    Surface 和 Sound 不受 gc 跟踪，所以从所有受跟踪容器的引用中去重查找。
+    """
+    surfaces = {}
+    sounds = {}
+    for obj in gc.get_objects():
+        for ref in gc.get_referents(obj):
+            if isinstance(ref, pygame.Surface):
+                surfaces[id(ref)] = ref
+            elif isinstance(ref, pygame.mixer.Sound):
+                sounds[id(ref)] = ref
+
+    surface_bytes = 0
+    for surf in surfaces.values():
+        try:
+            w, h = surf.get_size()
+            surface_bytes += w * h * surf.get_bytesize()
+        except pygame.error:
+            pass
+
+    sound_bytes = 0
+    mixer = pygame.mixer.get_init()
+    if mixer:
+        freq, fmt, channels = mixer
+        for snd in sounds.values():
+            try:
+                sound_bytes += int(snd.get_length() * freq) * channels * (abs(fmt) // 8)
+            except pygame.error:
+                pass
+
+    return {
+        'surfaces': len(surfaces),
+        'surface_bytes': surface_bytes,
+        'sounds': len(sounds),
+        'sound_bytes': sound_bytes,
+    }
+
+
+class MemoryWatch:
+    """每局记录一次内存状态，检测跨局的内存增长
+
+    Args:
+        frames: tracemalloc 记录的调用栈深度
+        top: 报告中列出的增长位置数量
+        warn_matches: 连续多少局保留内存上涨时发出警告
+        warn_bytes: 这几局累计上涨超过多少字节才警告（避免小幅抖动误报）
+    """
+
+    def __init__(self, frames=8, top=10, warn_matches=3, warn_bytes=512 * 1024):
+        self.frames = frames
+        self.top = top
+        self.warn_matches = warn_matches
+        self.warn_bytes = warn_bytes
+        self.baseline = None
+        self.previous = None
+        self.history = []
+        self.matches = 0
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        return self
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _snapshot(self):
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def match_finished(self, label=None, verbose=True):
+        """一局结束（对象已释放）后调用，返回本局的报告 dict"""
+        if not tracemalloc.is_tracing():
+            self.start()
+        self.matches += 1
+        label = label or f"match {self.matches}"
+
+        snapshot = self._snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        objects = count_pygame_objects()
+        retained = traced + objects['surface_bytes'] + objects['sound_bytes']
+        self.history.append(retained)
+
+        report = {
+            'label': label,
+            'time': time.time(),
+            'traced': traced,
+            'peak': peak,
+            'retained': retained,
+            **objects,
+            'growth_since_last': [],
+            'growth_since_start': [],
+            'warning': None,
+        }
+        if self.previous is not None:
+            report['growth_since_last'] = [s for s in snapshot.compare_to(self.previous, 'lineno')
+                                           if s.size_diff > 0][:self.top]
+        if self.baseline is not None:
+            report['growth_since_start'] = [s for s in snapshot.compare_to(self.baseline, 'lineno')
+                                            if s.size_diff > 0][:self.top]
+        else:
+            self.baseline = snapshot
+        self.previous = snapshot
+        tracemalloc.reset_peak()
+
+        report['warning'] = self._check_growth()
+        if verbose:
+            self.print_report(report)
+        return report
+
+    def _check_growth(self):
+        """保留内存连续 warn_matches 局上涨且累计超过 warn_bytes 时返回警告文字"""
+        n = self.warn_matches
+        if len(self.history) <= n:
+            return None
+        recent = self.history[-(n + 1):]
+        rising = all(b > a for a, b in zip(recent, recent[1:]))
+        growth = recent[-1] - recent[0]
+        if rising and growth >= self.warn_bytes:
+            return f"retained memory rose {n} matches in a row (+{growth / 1024:.0f} KiB)"
+        return None
+
+    @staticmethod
+    def print_report(report):
+        print(f"[MEM] {report['label']}: python={report['traced'] / 1024:.0f} KiB "
+              f"(peak {report['peak'] / 1024:.0f} KiB), "
+              f"surfaces={report['surfaces']} ({report['surface_bytes'] / 1024:.0f} KiB), "
+              f"sounds={report['sounds']} ({report['sound_bytes'] / 1024:.0f} KiB)")
+        if report['growth_since_last']:
+            print("[MEM] top growth since last match:")
+            for stat in report['growth_since_last']:
+                frame = stat.traceback[0]
+                print(f"[MEM]   +{stat.size_diff / 1024:8.1f} KiB  +{stat.count_diff:5d} blocks  "
+                      f"{frame.filename}:{frame.lineno}")
+        if report['warning']:
+            print(f"[MEM] WARNING: {report['warning']}")
+            for stat in report['growth_since_start'][:5]:
+                frame = stat.traceback[0]
+                print(f"[MEM]   since start +{stat.size_diff / 1024:8.1f} KiB  {frame.filename}:{frame.lineno}")
@@ -0,0 +1,60 @@
+"""文字渲染缓存
+
+泡泡标签、"Attack!"、平台标签和状态倒计时每帧都在重复渲染同样的字符串。
+所有 settings 中的 font_* 调用都通过 `render_text` 走这里的 LRU 缓存，
+键为 (font, text, color, antialias)。返回的 Surface 是共享的，调用方不要修改它。
+"""
+from collections import OrderedDict
+
+
+class TextCache:
+    """按 (font, text, color, antialias) 缓存 font.render 结果的 LRU 缓存"""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), bool(antialias))
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """返回命中/未命中计数和当前容量，便于调试查看"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total) if total else 0.0,
+            'size': len(self._surfaces),
+            'maxsize': self.maxsize,
+        }
+
+
+TEXT_CACHE = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """渲染文字（带缓存）"""
+    return TEXT_CACHE.render(font, text, color, antialias)
+
+
+def text_cache_info():
+    return TEXT_CACHE.info()
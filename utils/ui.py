@@ -1,66 +1,90 @@
 """UI绘制相关函数"""
 import pygame
 from settings import *
+from utils.text_cache import render_text
 
 
-def draw_ui(screen, player1, player2, p1_avatar=None, p2_avatar=None):
-    """绘制游戏UI：血条、头像、技能说明"""
-    hp_bar_width = 300
-    hp_bar_height = 25
-    hp_bar_y = 60
-    
-    # 玩家1血条
-    p1_x = 50
-    pygame.draw.rect(screen, GRAY, (p1_x, hp_bar_y, hp_bar_width, hp_bar_height))
-    hp1_width = int((player1.hp / player1.max_hp) * hp_bar_width)
-    pygame.draw.rect(screen, player1.color, (p1_x, hp_bar_y, hp1_width, hp_bar_height))
-    pygame.draw.rect(screen, BLACK, (p1_x, hp_bar_y, hp_bar_width, hp_bar_height), 2)
-    
-    name1 = "PLAYER 1"
-    p1_text = font_tiny.render(name1, True, player1.color)
-    if p1_text.get_width() > hp_bar_width:
-        small_font = pygame.font.Font(FONT_PATH, 18)
-        p1_text = small_font.render(name1, True, player1.color)
-    p1_text_rect = p1_text.get_rect(center=(p1_x + hp_bar_width // 2, hp_bar_y - 12))
-    screen.blit(p1_text, p1_text_rect)
-    
-    if p1_avatar:
-        aw = p1_avatar.get_width()
-        ah = p1_avatar.get_height()
-        ax = p1_x - aw - 8
-        ay = hp_bar_y + (hp_bar_height // 2) - (ah // 2)
-        if ax < 8:
-            ax = 8
-        if ay < 8:
-            ay = 8
-        screen.blit(p1_avatar, (ax, ay))
-    
-    # 玩家2血条（从右到左填充，扣血时从左边减少，保持右对齐）
-    p2_x = WIDTH - 50 - hp_bar_width
-    pygame.draw.rect(screen, GRAY, (p2_x, hp_bar_y, hp_bar_width, hp_bar_height))
-    hp2_width = int((player2.hp / player2.max_hp) * hp_bar_width)
-    hp2_start_x = p2_x + (hp_bar_width - hp2_width)
-    pygame.draw.rect(screen, player2.color, (hp2_start_x, hp_bar_y, hp2_width, hp_bar_height))
-    pygame.draw.rect(screen, BLACK, (p2_x, hp_bar_y, hp_bar_width, hp_bar_height), 2)
-    
-    name2 = "PLAYER 2"
-    p2_text = font_tiny.render(name2, True, player2.color)
-    if p2_text.get_width() > hp_bar_width:
-        small_font = pygame.font.Font(FONT_PATH, 18)
-        p2_text = small_font.render(name2, True, player2.color)
-    p2_text_rect = p2_text.get_rect(center=(p2_x + hp_bar_width // 2, hp_bar_y - 12))
-    screen.blit(p2_text, p2_text_rect)
-    
-    if p2_avatar:
-        aw = p2_avatar.get_width()
-        ah = p2_avatar.get_height()
-        ax = p2_x + hp_bar_width + 8
-        ay = hp_bar_y + (hp_bar_height // 2) - (ah // 2)
-        if ax + aw > WIDTH - 8:
-            ax = WIDTH - aw - 8
+def hud_layout(count):
+    """HUD 血条布局：返回每个玩家的 (x, y, 宽, 高, 是否右对齐)
+
+    双人时保持原来的左右两条长血条；多人时最多 4 列、按行排布，右半边的血条右对齐。
+    """
+    if count <= 2:
+        return [(50, 60, 300, 25, False), (WIDTH - 50 - 300, 60, 300, 25, True)][:count]
+    cols = min(count, 4)
+    gap = 30
+    bar_width = (WIDTH - 100 - gap * (cols - 1)) // cols
+    layout = []
+    for i in range(count):
+        row, col = divmod(i, cols)
+        x = 50 + col * (bar_width + gap)
+        layout.append((x, 50 + row * 56, bar_width, 18, col >= cols / 2))
+    return layout
+
+
+def draw_player_hud(screen, player, rect, color, label, avatar=None):
+    """绘制单个玩家的血条、名称和头像"""
+    bar_x, bar_y, bar_width, bar_height, align_right = rect
+    # draw a colored outer glow around the HP border using layered outlines
+    try:
+        glow = 12
+        glow_surf = pygame.Surface((bar_width + glow * 2, bar_height + glow * 2), pygame.SRCALPHA)
+        # draw rings from inner (near border) to outer; alpha decreases outward
+        max_alpha = 120
+        for r in range(0, glow):
+            # r=0 is the inner ring (strongest), larger r are farther out (weaker)
+            a = int(max_alpha * (1 - (r / float(max(1, glow)))))
+            clr = (color[0], color[1], color[2], a)
+            ring = (glow - r, glow - r, bar_width + r * 2, bar_height + r * 2)
+            try:
+                # inner ring slightly thicker for a crisper edge
+                width = 2 if r == 0 else 1
+                pygame.draw.rect(glow_surf, clr, ring, width)
+            except Exception:
+                pass
+        # blit glow behind the HP bar so the border sits on top
+        screen.blit(glow_surf, (bar_x - glow, bar_y - glow))
+    except Exception:
+        pass
+    pygame.draw.rect(screen, GRAY, (bar_x, bar_y, bar_width, bar_height))
+    hp_width = int((player.hp / player.max_hp) * bar_width)
+    # 右侧血条右对齐，扣血时从左边消失
+    hp_start_x = bar_x + (bar_width - hp_width) if align_right else bar_x
+    if hp_width > 0:
+        pygame.draw.rect(screen, color, (hp_start_x, bar_y, hp_width, bar_height))
+    pygame.draw.rect(screen, color, (bar_x, bar_y, bar_width, bar_height), 2)
+
+    name_text = render_text(font_small, label, color)
+    if name_text.get_width() > bar_width:
+        small_font = pygame.font.Font(None, 20)
+        name_text = small_font.render(label, True, player.color)
+    name_rect = name_text.get_rect(center=(bar_x + bar_width // 2, bar_y - 12))
+    screen.blit(name_text, name_rect)
+
+    if avatar:
+        aw = avatar.get_width()
+        ah = avatar.get_height()
+        ay = bar_y + (bar_height // 2) - (ah // 2)
+        if align_right:
+            ax = bar_x + bar_width + 8
+            if ax + aw > WIDTH - 8:
+                ax = WIDTH - aw - 8
+        else:
+            ax = bar_x - aw - 8
+            if ax < 8:
+                ax = 8
         if ay < 8:
             ay = 8
-        screen.blit(p2_avatar, (ax, ay))
+        screen.blit(avatar, (ax, ay))
+
+
+def draw_ui(screen, players, avatars=(), hud_colors=None, labels=None):
+    layout = hud_layout(len(players))
+    for i, player in enumerate(players):
+        color = hud_colors[i] if hud_colors else PLAYER_HUD_COLORS[i % len(PLAYER_HUD_COLORS)]
+        label = labels[i] if labels else (player.name or f"PLAYER {i + 1}")
+        avatar = avatars[i] if i < len(avatars) else None
+        draw_player_hud(screen, player, layout[i], color, label, avatar)
     
     # 技能说明 - SPACE 平台下方，等间距水平排列，整体居中
     space_bottom = HEIGHT - 100 + 38
@@ -85,7 +109,7 @@ def draw_ui(screen, player1, player2, p1_avatar=None, p2_avatar=None):
     skill_items = []
     total_content_width = 0
     for text, color in skill_infos:
-        skill_text = font_tiny.render(text, True, WHITE)
+        skill_text = render_text(font_tiny, text, WHITE)
         item_width = icon_radius * 2 + icon_text_gap + skill_text.get_width()
         skill_items.append((skill_text, color, item_width))
         total_content_width += item_width
@@ -109,7 +133,7 @@ def draw_ui(screen, player1, player2, p1_avatar=None, p2_avatar=None):
         text_y = int(info_y)
         
         # 文字阴影（增强可读性）
-        shadow_text = font_tiny.render(skill_infos[i][0], True, BLACK)
+        shadow_text = render_text(font_tiny, skill_infos[i][0], BLACK)
         shadow_rect = shadow_text.get_rect(midleft=(text_x + 1, text_y + 1))
         screen.blit(shadow_text, shadow_rect)
         
@@ -119,4 +143,3 @@ def draw_ui(screen, player1, player2, p1_avatar=None, p2_avatar=None):
         
         # 移动到下一个技能项
         current_x += item_width + item_spacing
-
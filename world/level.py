@@ -1,31 +1,165 @@
-"""关卡和平台布局配置"""
+"""关卡和平台布局配置
+
+关卡以数据文件描述（world/levels/*.json 或 *.toml），格式：
+
+    name    关卡名
+    size    [宽, 高]，烘焙静态层时使用，默认 [WIDTH, HEIGHT]
+    spawns  [[x, y], ...] 玩家出生点
+    keys    键帽列表，每项：
+        label, x, y, w, h       标签与矩形
+        move  (可选)  {"axis": "x"|"y", "range": 60, "speed": 1,
+                       "direction": 1, "carry_boost": 1.0}
+        break (可选)  {"threshold": 0, "respawn_seconds": 3.0}
+                      threshold 为站立多少帧后断裂；旧写法 "respawn" 以帧为单位
+
+加载时把不动的键帽登记进碰撞网格并（可选地）烘焙成一张背景层，
+这样即使是完整的 104 键键盘，每帧也只需处理动态键帽和玩家附近的几个格子。
+"""
+import json
+import os
+
+import pygame
+
 from entities.platform import KeyPlatform
-from settings import HEIGHT
+from game.collision import CollisionGrid
+from game.timers import ticks
+from settings import WIDTH, HEIGHT
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
 
-def create_keyboard_platforms():
-    """创建键盘主题的平台布局"""
-    platforms = []
-    
-    # SPACE键 - 最底部的主平台（超长）
-    platforms.append(KeyPlatform(75, HEIGHT - 100, 1050, 38, "SPACE"))
-    
-    # QWER 行 - 中层平台（调整位置，增加横向和纵向间距）
-    platforms.append(KeyPlatform(280, 480, 100, 32, "Q"))
-    platforms.append(KeyPlatform(400, 410, 100, 32, "W"))
-    platforms.append(KeyPlatform(580, 485, 100, 32, "E"))
-    platforms.append(KeyPlatform(920, 465, 100, 32, "R"))
-    
-    # ASD 行 - 较低层（调整位置，增加间距）
-    platforms.append(KeyPlatform(150, 580, 100, 32, "A"))
-    platforms.append(KeyPlatform(680, 570, 100, 32, "S"))
-    platforms.append(KeyPlatform(850, 590, 100, 32, "D"))
-    
-    # Shift键 - 可断裂平台（左侧，位置调整避免正好被Q接住）
-    platforms.append(KeyPlatform(75, 360, 100, 32, "Shift", is_dynamic=True, is_breakable=True))
-    
-    # Tab键 - 高层平台
-    platforms.append(KeyPlatform(950, 320, 125, 32, "Tab"))
-    
-    return platforms
+LEVELS_DIR = os.path.join(os.path.dirname(__file__), 'levels')
+DEFAULT_LEVEL = 'arena'
+
+# 碰撞查询时在玩家扫过区域外额外放宽的像素
+COLLISION_MARGIN = 16
+
+
+def _build_platform(spec):
+    """根据一条键帽描述创建 KeyPlatform"""
+    move = spec.get('move')
+    brk = spec.get('break')
+    kwargs = {}
+    if move:
+        kwargs.update(
+            move_axis=move.get('axis', 'y'),
+            move_range=move.get('range', 60),
+            move_speed=move.get('speed', 1),
+            move_direction=move.get('direction', 1),
+            carry_boost=move.get('carry_boost', 1.0),
+        )
+    if brk:
+        kwargs.update(
+            break_threshold=brk.get('threshold', 0),
+            respawn_time=ticks(brk['respawn_seconds']) if 'respawn_seconds' in brk else brk.get('respawn', 180),
+        )
+    # 可断裂平台需要每帧 update（断裂/重生），所以和移动平台一样算作动态
+    return KeyPlatform(spec['x'], spec['y'], spec['w'], spec['h'], str(spec['label']),
+                       is_dynamic=bool(move or brk), is_breakable=bool(brk), **kwargs)
+
+
+class Level:
+    """加载好的关卡：平台列表、出生点、静态碰撞索引和烘焙背景层"""
+
+    def __init__(self, data, name=None):
+        self.name = name or data.get('name', 'level')
+        self.size = tuple(data.get('size', (WIDTH, HEIGHT)))
+        self.spawns = [tuple(p) for p in data.get('spawns', [])]
+        self.platforms = [_build_platform(spec) for spec in data.get('keys', [])]
+
+        self.static_platforms = [p for p in self.platforms if not p.is_dynamic]
+        self.dynamic_platforms = [p for p in self.platforms if p.is_dynamic]
+
+        # 静态平台编入网格；动态平台数量很少，每次查询都直接带上
+        self.grid = CollisionGrid()
+        self._dynamic_indices = []
+        for i, p in enumerate(self.platforms):
+            if p.is_dynamic:
+                self._dynamic_indices.append(i)
+            else:
+                self.grid.insert(i, (p.x, p.y, p.width, p.height))
+
+        self.static_layer = None
 
+    def spawn_point(self, index):
+        """第 index 个玩家的出生点（出生点不够时循环使用）"""
+        if not self.spawns:
+            return (WIDTH // 2, 300)
+        return self.spawns[index % len(self.spawns)]
+
+    def bake(self):
+        """把所有静态键帽预先绘制到一张透明 Surface 上"""
+        layer = pygame.Surface(self.size, pygame.SRCALPHA)
+        for p in self.static_platforms:
+            p.draw(layer)
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            layer = layer.convert_alpha()
+        self.static_layer = layer
+        return layer
+
+    def attach_timers(self, timers):
+        """让所有平台使用共享的计时轮（GameState 创建时调用）"""
+        for p in self.platforms:
+            p.attach_timers(timers)
+
+    def update(self, players):
+        """只更新动态平台（移动、断裂与重生）"""
+        for p in self.dynamic_platforms:
+            p.update(players=players)
+
+    def collision_candidates(self, player):
+        """返回玩家本帧可能碰到的未断裂平台，保持关卡中的原始顺序"""
+        # 覆盖玩家这一帧可能移动到的范围
+        vx = abs(getattr(player, 'vel_x', 0)) + abs(getattr(player, 'knockback_x', 0))
+        vy = abs(getattr(player, 'vel_y', 0)) + 1
+        m = COLLISION_MARGIN
+        found = self.grid.query(player.x - vx - m, player.y - vy - m,
+                                player.width + 2 * (vx + m), player.height + 2 * (vy + m))
+        found.update(self._dynamic_indices)
+        platforms = self.platforms
+        return [platforms[i] for i in sorted(found) if not platforms[i].is_broken]
+
+    def draw_static(self, screen):
+        if self.static_layer is None:
+            self.bake()
+        screen.blit(self.static_layer, (0, 0))
+
+    def draw_dynamic(self, screen):
+        for p in self.dynamic_platforms:
+            p.draw(screen)
+
+    def draw(self, screen):
+        self.draw_static(screen)
+        self.draw_dynamic(screen)
+
+
+def _resolve_level_path(name_or_path):
+    if os.path.exists(name_or_path):
+        return name_or_path
+    for ext in ('.json', '.toml'):
+        path = os.path.join(LEVELS_DIR, name_or_path + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f'Level not found: {name_or_path}')
+
+
+def load_level(name_or_path=DEFAULT_LEVEL):
+    """按名称（world/levels 下的文件）或路径加载关卡"""
+    path = _resolve_level_path(name_or_path)
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise RuntimeError('TOML levels require Python 3.11+ (tomllib)')
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return Level(data, name=data.get('name', name))
+
+
+def create_keyboard_platforms():
+    """创建键盘主题的平台布局（默认关卡）"""
+    return load_level(DEFAULT_LEVEL).platforms